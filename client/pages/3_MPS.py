@@ -2,12 +2,18 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import io
 from services.api_client import APIClient
 
 # Inicializar cliente API
 api_client = APIClient()
 
+# Formatos de exportación del MPS y su tipo de contenido
+FORMATOS_EXPORTACION = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
 # Configuración de la página
 st.set_page_config(page_title="MPS - Café de Altura", page_icon="☕", layout="wide")
 
@@ -25,10 +31,10 @@ def load_skus():
 # Función para cargar datos del MPS
 @st.cache_data(ttl=60)
 def load_mps():
-    response = api_client.get("/mps")
-    if isinstance(response, dict) and "data" in response:
+    response = api_client.get("/mps", params={"format": "columnar"})
+    if isinstance(response, dict) and "sku_ids" in response:
         return response
-    return {"data": [], "semanas": [], "capacidad_semanal": 0}
+    return {"sku_ids": [], "semanas": [], "capacidad_semanal": 0}
 
 # Función para actualizar el pronóstico
 def actualizar_pronostico():
@@ -47,50 +53,48 @@ def actualizar_pronostico():
 skus_df = load_skus()
 mps_data = load_mps()
 
-# Extraer datos del MPS
-mps_items = mps_data.get("data", [])
+# Extraer datos del MPS (formato columnar: una matriz SKU × semana por métrica)
+sku_ids = mps_data.get("sku_ids", [])
 semanas = mps_data.get("semanas", [])
 capacidad_semanal = mps_data.get("capacidad_semanal", 0)
 
+# Columnas del DataFrame del MPS y métrica de la que salen
+COLUMNAS_MPS = {
+    "demanda": "demanda",
+    "inv_inicial": "inventario_inicial",
+    "ss": "stock_seguridad",
+    "produccion": "produccion",
+    "inv_final": "inventario_final",
+}
+
 # Crear DataFrame del MPS
-if mps_items and semanas:
-    # Crear lista para almacenar filas del DataFrame
-    rows = []
+if sku_ids and semanas:
+    productos = [
+        f"{nombre} ({presentacion}g)"
+        for nombre, presentacion in zip(mps_data["nombres"], mps_data["presentacion_g"])
+    ]
     
-    for item in mps_items:
-        sku_id = item.get("sku_id")
-        sku_nombre = item.get("nombre", "")
-        presentacion = item.get("presentacion_g", 0)
-        
-        # Datos base del SKU
-        base_row = {
-            "sku_id": sku_id,
-            "producto": f"{sku_nombre} ({presentacion}g)"
-        }
-        
-        # Agregar datos de demanda
-        for i, semana in enumerate(semanas):
-            demanda = item.get("demanda", {}).get(semana, 0)
-            inv_inicial = item.get("inventario_inicial", {}).get(semana, 0)
-            ss = item.get("stock_seguridad", {}).get(semana, 0)
-            scrap = item.get("scrap", {}).get(semana, 0)
-            produccion = item.get("produccion", {}).get(semana, 0)
-            inv_final = item.get("inventario_final", {}).get(semana, 0)
-            alerta = item.get("alertas", {}).get(semana, [])
-            
-            base_row[f"demanda_{i}"] = demanda
-            base_row[f"inv_inicial_{i}"] = inv_inicial
-            base_row[f"ss_{i}"] = ss
-            base_row[f"scrap_{i}"] = scrap
-            base_row[f"produccion_{i}"] = produccion
-            base_row[f"inv_final_{i}"] = inv_final
-            base_row[f"alerta_{i}"] = alerta
-        
-        rows.append(base_row)
+    # Matrices SKU × semana de cada métrica
+    matrices = {prefijo: np.array(mps_data[metrica]) for prefijo, metrica in COLUMNAS_MPS.items()}
     
-    # Crear DataFrame
-    mps_df = pd.DataFrame(rows)
+    # Alertas por celda a partir de las ternas [fila, columna, regla]
+    catalogo_alertas = mps_data.get("catalogo_alertas", [])
+    alertas_celda = [[[] for _ in semanas] for _ in sku_ids]
+    for fila, columna, k in mps_data.get("alertas", []):
+        alertas_celda[fila][columna].append(catalogo_alertas[k]["codigo"])
+    reglas_alerta = {regla["codigo"]: regla for regla in catalogo_alertas}
+    
+    columnas = {"sku_id": sku_ids, "producto": productos}
+    for i in range(len(semanas)):
+        for prefijo, matriz in matrices.items():
+            columnas[f"{prefijo}_{i}"] = matriz[:, i]
+        columnas[f"scrap_{i}"] = mps_data["scrap"]
+        columnas[f"alerta_{i}"] = [alertas_celda[fila][i] for fila in range(len(sku_ids))]
+    
+    mps_df = pd.DataFrame(columnas)
 else:
+    matrices = {}
+    reglas_alerta = {}
     mps_df = pd.DataFrame()
 
 # Mostrar información de semanas
@@ -133,36 +137,16 @@ with col2:
     st.info(f"Capacidad de producción semanal: {capacidad_semanal} kg de café verde")
 
 # Crear pestañas para diferentes vistas del MPS
-tab1, tab2, tab3 = st.tabs(["Vista General", "Edición de Parámetros", "Alertas"])
+tab1, tab2, tab3, tab4 = st.tabs(["Vista General", "Edición de Parámetros", "Alertas", "Largo Plazo"])
 
 with tab1:
     if not mps_df.empty:
         st.subheader("Plan Maestro de Producción - Vista General")
         
-        # Preparar datos para la vista general
-        vista_general = []
-        
-        for _, row in mps_df.iterrows():
-            producto = row["producto"]
-            
-            for i in range(len(semanas)):
-                vista_general.append({
-                    "producto": producto,
-                    "semana": semanas[i],
-                    "demanda": row[f"demanda_{i}"],
-                    "inv_inicial": row[f"inv_inicial_{i}"],
-                    "produccion": row[f"produccion_{i}"],
-                    "inv_final": row[f"inv_final_{i}"],
-                    "tiene_alerta": len(row[f"alerta_{i}"]) > 0
-                })
-        
-        # Convertir a DataFrame
-        vista_df = pd.DataFrame(vista_general)
-        
-        # Crear tabla pivotada para mejor visualización
-        pivot_demanda = vista_df.pivot(index="producto", columns="semana", values="demanda")
-        pivot_produccion = vista_df.pivot(index="producto", columns="semana", values="produccion")
-        pivot_inv_final = vista_df.pivot(index="producto", columns="semana", values="inv_final")
+        # Tablas producto × semana directamente desde las matrices del plan
+        pivot_demanda = pd.DataFrame(matrices["demanda"], index=mps_df["producto"], columns=semanas)
+        pivot_produccion = pd.DataFrame(matrices["produccion"], index=mps_df["producto"], columns=semanas)
+        pivot_inv_final = pd.DataFrame(matrices["inv_final"], index=mps_df["producto"], columns=semanas)
         
         # Mostrar tablas
         st.write("### Demanda Proyectada (unidades)")
@@ -174,22 +158,25 @@ with tab1:
         st.write("### Inventario Final Proyectado (unidades)")
         st.dataframe(pivot_inv_final)
         
-        # Opción para exportar a Excel
-        buffer = io.BytesIO()
-        
-        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-            pivot_demanda.to_excel(writer, sheet_name="Demanda")
-            pivot_produccion.to_excel(writer, sheet_name="Producción")
-            pivot_inv_final.to_excel(writer, sheet_name="Inventario Final")
+        # Exportar el MPS: el archivo se genera en el servidor solo al solicitarlo
+        col_formato, col_exportar = st.columns([1, 3])
+        with col_formato:
+            formato_exportacion = st.selectbox("Formato de exportación", options=list(FORMATOS_EXPORTACION.keys()))
         
-        buffer.seek(0)
-        
-        st.download_button(
-            label="📥 Exportar MPS a Excel",
-            data=buffer,
-            file_name=f"MPS_Cafe_de_Altura_{datetime.now().strftime('%Y%m%d')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
+        with col_exportar:
+            if st.button("📥 Preparar exportación del MPS"):
+                with st.spinner("Generando archivo..."):
+                    contenido = api_client.get_bytes("/mps/export", params={"format": formato_exportacion})
+                
+                if isinstance(contenido, bytes):
+                    st.download_button(
+                        label=f"Descargar MPS ({formato_exportacion.upper()})",
+                        data=contenido,
+                        file_name=f"MPS_Cafe_de_Altura_{datetime.now().strftime('%Y%m%d')}.{formato_exportacion}",
+                        mime=FORMATOS_EXPORTACION[formato_exportacion],
+                    )
+                else:
+                    st.error(f"Error al exportar el MPS: {contenido.get('detail', 'Error desconocido')}")
     else:
         st.warning("No hay datos disponibles para el MPS. Intente actualizar el pronóstico.")
 
@@ -220,7 +207,7 @@ with tab2:
                     "scrap": producto_row[f"scrap_{i}"] * 100,  # Convertir a porcentaje
                     "produccion": producto_row[f"produccion_{i}"],
                     "inv_final": producto_row[f"inv_final_{i}"],
-                    "alerta": ", ".join(producto_row[f"alerta_{i}"]) if producto_row[f"alerta_{i}"] else ""
+                    "alerta": ", ".join(reglas_alerta[codigo]["mensaje"] for codigo in producto_row[f"alerta_{i}"])
                 })
             
             # Crear DataFrame para edición
@@ -285,12 +272,14 @@ with tab3:
                 alertas_semana = row[f"alerta_{i}"]
                 
                 if alertas_semana:
-                    for alerta in alertas_semana:
+                    for codigo in alertas_semana:
                         alertas.append({
                             "producto": producto,
                             "sku_id": sku_id,
                             "semana": semana,
-                            "mensaje": alerta
+                            "codigo": codigo,
+                            "severidad": reglas_alerta[codigo]["severidad"],
+                            "mensaje": reglas_alerta[codigo]["mensaje"]
                         })
         
         # Convertir a DataFrame
@@ -303,6 +292,8 @@ with tab3:
                 column_config={
                     "producto": st.column_config.TextColumn("Producto"),
                     "semana": st.column_config.TextColumn("Semana"),
+                    "codigo": st.column_config.TextColumn("Código"),
+                    "severidad": st.column_config.TextColumn("Severidad"),
                     "mensaje": st.column_config.TextColumn("Mensaje de Alerta"),
                 },
                 hide_index=True,
@@ -313,8 +304,8 @@ with tab3:
             
             # Agrupar por tipo de alerta
             if "mensaje" in alertas_df.columns:
-                tipos_alerta = alertas_df["mensaje"].value_counts().reset_index()
-                tipos_alerta.columns = ["Tipo de Alerta", "Cantidad"]
+                tipos_alerta = alertas_df.groupby(["codigo", "severidad", "mensaje"]).size().reset_index()
+                tipos_alerta.columns = ["Código", "Severidad", "Tipo de Alerta", "Cantidad"]
                 
                 st.write("### Resumen por Tipo de Alerta")
                 st.dataframe(tipos_alerta, hide_index=True)
@@ -323,6 +314,46 @@ with tab3:
     else:
         st.warning("No hay datos disponibles para mostrar alertas. Intente actualizar el pronóstico.")
 
+with tab4:
+    st.subheader("Plan de Producción de Largo Plazo")
+    st.caption("Las primeras semanas se planifican por semana y el resto por mes.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        semanas_largo = st.number_input("Semanas del horizonte", min_value=13, max_value=104, value=52, step=1)
+    with col2:
+        semanas_detalle = st.number_input("Semanas con detalle semanal", min_value=1, max_value=26, value=13, step=1)
+    
+    if st.button("Generar Plan de Largo Plazo"):
+        progreso = st.progress(0.0)
+        tabla = st.empty()
+        filas = []
+        total_skus = 0
+        
+        # Mostrar los SKUs a medida que llegan los bloques
+        for bloque in api_client.get_ndjson(
+            "/mps/largo-plazo",
+            params={"semanas": semanas_largo, "semanas_detalle": semanas_detalle}
+        ):
+            if bloque.get("tipo") == "encabezado":
+                total_skus = bloque.get("total_skus", 0)
+            elif bloque.get("tipo") == "skus":
+                for item in bloque.get("data", []):
+                    filas.append({
+                        "producto": f"{item.get('nombre', '')} ({item.get('presentacion_g', 0)}g)",
+                        **item.get("produccion", {})
+                    })
+                
+                tabla.dataframe(pd.DataFrame(filas).set_index("producto"))
+                if total_skus:
+                    progreso.progress(min(1.0, len(filas) / total_skus))
+            elif bloque.get("tipo") == "error" or "detail" in bloque:
+                st.error(f"Error al generar el plan: {bloque['detail']}")
+                break
+        
+        if filas:
+            st.success(f"Plan de producción generado para {len(filas)} productos")
+
 # Sección para ajustar capacidad semanal
 st.subheader("Ajustar Capacidad de Producción")
 
@@ -1,8 +1,7 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from services.api_client import APIClient
 
 # Inicializar cliente API
@@ -14,215 +13,285 @@ st.set_page_config(page_title="Dashboard - Café de Altura", page_icon="☕", la
 # Título de la página
 st.title("📊 Dashboard de KPIs")
 
-# Función para cargar KPIs
-@st.cache_data(ttl=60)
-def load_kpis():
+# Funciones que consultan la API sin caché
+def fetch_kpis():
     response = api_client.get("/dashboard/kpis")
     return response
 
-# Función para cargar datos históricos de KPIs
+def fetch_kpis_por_grupo(agrupar):
+    response = api_client.get("/dashboard/kpis", params={"agrupar": agrupar})
+    if isinstance(response, dict) and "data" in response:
+        return pd.DataFrame(response["data"]), response.get("objetivos", {})
+    return pd.DataFrame(), {}
+
+def fetch_kpis_historicos(desde, hasta, resolucion):
+    response = api_client.get(
+        "/dashboard/kpis/historico",
+        params={
+            "desde": desde.isoformat(),
+            "hasta": hasta.isoformat(),
+            "resolucion": resolucion,
+            "max_puntos": MAX_PUNTOS_GRAFICO
+        }
+    )
+    if isinstance(response, dict) and "data" in response:
+        return pd.DataFrame(response["data"]), response.get("resumen", {})
+    return pd.DataFrame(), {}
+
+# Versiones con caché por tiempo, para cuando no hay actualización en vivo
+@st.cache_data(ttl=60)
+def load_kpis():
+    return fetch_kpis()
+
+@st.cache_data(ttl=60)
+def load_kpis_por_grupo(agrupar):
+    return fetch_kpis_por_grupo(agrupar)
+
 @st.cache_data(ttl=300)
-def load_kpis_historicos():
-    response = api_client.get("/dashboard/kpis/historico")
-    if isinstance(response, list):
-        return pd.DataFrame(response)
-    return pd.DataFrame()
+def load_kpis_historicos(desde, hasta, resolucion):
+    return fetch_kpis_historicos(desde, hasta, resolucion)
+
+# Puntos máximos por gráfico histórico
+MAX_PUNTOS_GRAFICO = 400
+
+# Resoluciones del historial
+RESOLUCIONES = {"Día": "dia", "Semana": "semana", "Mes": "mes"}
+
+# Agrupaciones del desglose de KPIs
+AGRUPACIONES = {"SKU": "sku", "Presentación": "presentacion"}
+
+# KPIs del desglose: etiqueta, escala y si un valor mayor es mejor
+KPIS_DESGLOSE = {
+    "otd": ("OTD (%)", 100, True),
+    "cumplimiento_plan": ("Cumplimiento del Plan (%)", 100, True),
+    "dias_inventario": ("Días de Inventario", 1, True),
+    "rechazos": ("Rechazos (%)", 100, False)
+}
+
+# Con la actualización en vivo los datos se consultan sin caché: el
+# servidor avisa de cada cambio y no hace falta volver a consultar cada
+# cierto tiempo
+en_vivo = st.toggle(
+    "Actualización en vivo",
+    value=True,
+    help="Recibe los cambios de los KPIs desde el servidor en cuanto cambian los datos"
+)
 
 # Cargar datos
-kpis = load_kpis()
-kpis_historicos = load_kpis_historicos()
+kpis = fetch_kpis() if en_vivo else load_kpis()
+
+def mostrar_kpis(kpis):
+    """
+    Muestra los KPIs actuales en su contenedor, reemplazando los anteriores.
+    """
+    with contenedor_kpis.container():
+        # Crear columnas para los KPIs
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            dias_inventario = kpis.get("dias_inventario", 0)
+            st.metric(
+                "Días de Inventario",
+                f"{dias_inventario:.1f} días",
+                delta=None,
+                help="Promedio de días que el inventario actual puede cubrir la demanda"
+            )
+        
+        with col2:
+            cumplimiento_plan = kpis.get("cumplimiento_plan", 0) * 100
+            st.metric(
+                "Cumplimiento del Plan",
+                f"{cumplimiento_plan:.1f}%",
+                delta=None,
+                help="Porcentaje de cumplimiento del plan de producción"
+            )
+        
+        with col3:
+            otd = kpis.get("otd", 0) * 100
+            st.metric(
+                "On-Time Delivery (OTD)",
+                f"{otd:.1f}%",
+                delta=None,
+                help="Porcentaje de entregas a tiempo"
+            )
+        
+        with col4:
+            rechazos = kpis.get("rechazos", 0) * 100
+            st.metric(
+                "Tasa de Rechazos",
+                f"{rechazos:.1f}%",
+                delta=None,
+                delta_color="inverse",
+                help="Porcentaje de productos rechazados por control de calidad"
+            )
 
 # Mostrar KPIs actuales
 if kpis:
     st.subheader("Indicadores Clave de Desempeño (KPIs)")
     
-    # Crear columnas para los KPIs
-    col1, col2, col3, col4 = st.columns(4)
+    contenedor_kpis = st.empty()
+    mostrar_kpis(kpis)
     
-    with col1:
-        dias_inventario = kpis.get("dias_inventario", 0)
-        st.metric(
-            "Días de Inventario",
-            f"{dias_inventario:.1f} días",
-            delta=None,
-            help="Promedio de días que el inventario actual puede cubrir la demanda"
-        )
+    # Desglose por SKU o presentación, calculado en una sola consulta
+    st.subheader("Desglose de KPIs")
     
-    with col2:
-        cumplimiento_plan = kpis.get("cumplimiento_plan", 0) * 100
-        st.metric(
-            "Cumplimiento del Plan",
-            f"{cumplimiento_plan:.1f}%",
-            delta=None,
-            help="Porcentaje de cumplimiento del plan de producción"
+    col_agrupar, col_kpi, col_filtro = st.columns(3)
+    with col_agrupar:
+        agrupar = st.radio("Agrupar por", list(AGRUPACIONES.keys()), horizontal=True)
+    with col_kpi:
+        kpi_desglose = st.selectbox(
+            "Ordenar por",
+            list(KPIS_DESGLOSE.keys()),
+            format_func=lambda kpi: KPIS_DESGLOSE[kpi][0]
         )
+    with col_filtro:
+        solo_fuera_objetivo = st.checkbox("Solo fuera del objetivo")
     
-    with col3:
-        otd = kpis.get("otd", 0) * 100
-        st.metric(
-            "On-Time Delivery (OTD)",
-            f"{otd:.1f}%",
-            delta=None,
-            help="Porcentaje de entregas a tiempo"
-        )
+    if en_vivo:
+        desglose, objetivos = fetch_kpis_por_grupo(AGRUPACIONES[agrupar])
+    else:
+        desglose, objetivos = load_kpis_por_grupo(AGRUPACIONES[agrupar])
     
-    with col4:
-        rechazos = kpis.get("rechazos", 0) * 100
-        st.metric(
-            "Tasa de Rechazos",
-            f"{rechazos:.1f}%",
-            delta=None,
-            delta_color="inverse",
-            help="Porcentaje de productos rechazados por control de calidad"
-        )
+    if not desglose.empty:
+        # Filtrar y ordenar en el cliente, sin volver a consultar la API
+        _, _, mayor_es_mejor = KPIS_DESGLOSE[kpi_desglose]
+        objetivo = objetivos.get(kpi_desglose)
+        if solo_fuera_objetivo and objetivo is not None:
+            if mayor_es_mejor:
+                desglose = desglose[desglose[kpi_desglose] < objetivo]
+            else:
+                desglose = desglose[desglose[kpi_desglose] > objetivo]
+        desglose = desglose.sort_values(kpi_desglose, ascending=mayor_es_mejor, na_position="last")
+        
+        for kpi, (_, escala, _) in KPIS_DESGLOSE.items():
+            desglose[kpi] = desglose[kpi] * escala
+        
+        desglose = desglose.rename(columns={
+            "sku_id": "SKU",
+            "nombre": "Nombre",
+            "presentacion_g": "Presentación (g)",
+            "unidades_vendidas": "Unidades Vendidas",
+            "unidades_planificadas": "Unidades Planificadas",
+            **{kpi: etiqueta for kpi, (etiqueta, _, _) in KPIS_DESGLOSE.items()}
+        })
+        
+        st.dataframe(desglose, use_container_width=True, hide_index=True)
+    else:
+        st.info("No hay datos para el desglose de KPIs.")
+
 
 # Mostrar gráficos históricos
-if not kpis_historicos.empty:
-    st.subheader("Evolución Histórica de KPIs")
+st.subheader("Evolución Histórica de KPIs")
+
+col_desde, col_hasta, col_resolucion = st.columns(3)
+with col_hasta:
+    hasta = st.date_input("Hasta", value=date.today() - timedelta(days=1))
+with col_desde:
+    desde = st.date_input("Desde", value=hasta - timedelta(days=89))
+with col_resolucion:
+    resolucion = st.selectbox("Resolución", list(RESOLUCIONES.keys()))
+
+if en_vivo:
+    kpis_historicos, resumen_historico = fetch_kpis_historicos(desde, hasta, RESOLUCIONES[resolucion])
+else:
+    kpis_historicos, resumen_historico = load_kpis_historicos(desde, hasta, RESOLUCIONES[resolucion])
+
+def grafico_kpi(kpi, titulo, etiqueta, escala, objetivo, color_objetivo, formato):
+    """
+    Grafica la media de un KPI por periodo con su rango mínimo-máximo y
+    muestra el resumen del rango calculado en el servidor.
+    """
+    fig = go.Figure()
+    
+    if (kpis_historicos[f"{kpi}_max"] != kpis_historicos[f"{kpi}_min"]).any():
+        fig.add_trace(go.Scatter(
+            x=pd.concat([kpis_historicos["fecha"], kpis_historicos["fecha"][::-1]]),
+            y=pd.concat([kpis_historicos[f"{kpi}_max"], kpis_historicos[f"{kpi}_min"][::-1]]) * escala,
+            fill="toself",
+            line=dict(width=0),
+            opacity=0.2,
+            name="Mínimo - Máximo",
+            hoverinfo="skip"
+        ))
+    
+    fig.add_trace(go.Scatter(
+        x=kpis_historicos["fecha"],
+        y=kpis_historicos[kpi] * escala,
+        mode="lines+markers" if len(kpis_historicos) <= 100 else "lines",
+        name="Promedio"
+    ))
+    
+    fig.add_hline(
+        y=objetivo * escala,
+        line_dash="dash",
+        line_color=color_objetivo,
+        annotation_text=f"Objetivo: {formato(objetivo * escala)}"
+    )
+    
+    fig.update_layout(title=titulo, xaxis_title="Fecha", yaxis_title=etiqueta)
+    st.plotly_chart(fig, use_container_width=True)
     
+    # Estadísticas del rango completo
+    resumen = resumen_historico.get(kpi, {})
+    if resumen.get("media") is not None:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Promedio", formato(resumen["media"] * escala))
+        with col2:
+            st.metric("Mínimo", formato(resumen["min"] * escala))
+        with col3:
+            st.metric("Máximo", formato(resumen["max"] * escala))
+
+if kpis and not kpis_historicos.empty:
     # Convertir fechas
-    if "fecha" in kpis_historicos.columns:
-        kpis_historicos["fecha"] = pd.to_datetime(kpis_historicos["fecha"])
+    kpis_historicos["fecha"] = pd.to_datetime(kpis_historicos["fecha"])
     
     # Crear pestañas para diferentes gráficos
     tab1, tab2, tab3, tab4 = st.tabs(["Días de Inventario", "Cumplimiento del Plan", "OTD", "Rechazos"])
     
     with tab1:
-        # Gráfico de días de inventario
-        if "dias_inventario" in kpis_historicos.columns:
-            fig_inv = px.line(
-                kpis_historicos,
-                x="fecha",
-                y="dias_inventario",
-                title="Evolución de Días de Inventario",
-                labels={"dias_inventario": "Días", "fecha": "Fecha"},
-                markers=True
-            )
-            
-            # Añadir línea objetivo
-            objetivo_dias = kpis.get("objetivo_dias_inventario", 15)
-            fig_inv.add_hline(
-                y=objetivo_dias,
-                line_dash="dash",
-                line_color="green",
-                annotation_text=f"Objetivo: {objetivo_dias} días"
-            )
-            
-            st.plotly_chart(fig_inv, use_container_width=True)
-            
-            # Estadísticas
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Promedio", f"{kpis_historicos['dias_inventario'].mean():.1f} días")
-            with col2:
-                st.metric("Mínimo", f"{kpis_historicos['dias_inventario'].min():.1f} días")
-            with col3:
-                st.metric("Máximo", f"{kpis_historicos['dias_inventario'].max():.1f} días")
+        grafico_kpi(
+            "dias_inventario",
+            "Evolución de Días de Inventario",
+            "Días",
+            1,
+            kpis.get("objetivo_dias_inventario", 15),
+            "green",
+            lambda valor: f"{valor:.1f} días"
+        )
     
     with tab2:
-        # Gráfico de cumplimiento del plan
-        if "cumplimiento_plan" in kpis_historicos.columns:
-            # Convertir a porcentaje
-            kpis_historicos["cumplimiento_plan_pct"] = kpis_historicos["cumplimiento_plan"] * 100
-            
-            fig_plan = px.line(
-                kpis_historicos,
-                x="fecha",
-                y="cumplimiento_plan_pct",
-                title="Evolución del Cumplimiento del Plan",
-                labels={"cumplimiento_plan_pct": "Cumplimiento (%)", "fecha": "Fecha"},
-                markers=True
-            )
-            
-            # Añadir línea objetivo
-            objetivo_plan = kpis.get("objetivo_cumplimiento_plan", 0.95) * 100
-            fig_plan.add_hline(
-                y=objetivo_plan,
-                line_dash="dash",
-                line_color="green",
-                annotation_text=f"Objetivo: {objetivo_plan:.0f}%"
-            )
-            
-            st.plotly_chart(fig_plan, use_container_width=True)
-            
-            # Estadísticas
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Promedio", f"{kpis_historicos['cumplimiento_plan'].mean() * 100:.1f}%")
-            with col2:
-                st.metric("Mínimo", f"{kpis_historicos['cumplimiento_plan'].min() * 100:.1f}%")
-            with col3:
-                st.metric("Máximo", f"{kpis_historicos['cumplimiento_plan'].max() * 100:.1f}%")
+        grafico_kpi(
+            "cumplimiento_plan",
+            "Evolución del Cumplimiento del Plan",
+            "Cumplimiento (%)",
+            100,
+            kpis.get("objetivo_cumplimiento_plan", 0.95),
+            "green",
+            lambda valor: f"{valor:.1f}%"
+        )
     
     with tab3:
-        # Gráfico de OTD
-        if "otd" in kpis_historicos.columns:
-            # Convertir a porcentaje
-            kpis_historicos["otd_pct"] = kpis_historicos["otd"] * 100
-            
-            fig_otd = px.line(
-                kpis_historicos,
-                x="fecha",
-                y="otd_pct",
-                title="Evolución del On-Time Delivery (OTD)",
-                labels={"otd_pct": "OTD (%)", "fecha": "Fecha"},
-                markers=True
-            )
-            
-            # Añadir línea objetivo
-            objetivo_otd = kpis.get("objetivo_otd", 0.98) * 100
-            fig_otd.add_hline(
-                y=objetivo_otd,
-                line_dash="dash",
-                line_color="green",
-                annotation_text=f"Objetivo: {objetivo_otd:.0f}%"
-            )
-            
-            st.plotly_chart(fig_otd, use_container_width=True)
-            
-            # Estadísticas
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Promedio", f"{kpis_historicos['otd'].mean() * 100:.1f}%")
-            with col2:
-                st.metric("Mínimo", f"{kpis_historicos['otd'].min() * 100:.1f}%")
-            with col3:
-                st.metric("Máximo", f"{kpis_historicos['otd'].max() * 100:.1f}%")
+        grafico_kpi(
+            "otd",
+            "Evolución de On-Time Delivery (OTD)",
+            "OTD (%)",
+            100,
+            kpis.get("objetivo_otd", 0.98),
+            "green",
+            lambda valor: f"{valor:.1f}%"
+        )
     
     with tab4:
-        # Gráfico de rechazos
-        if "rechazos" in kpis_historicos.columns:
-            # Convertir a porcentaje
-            kpis_historicos["rechazos_pct"] = kpis_historicos["rechazos"] * 100
-            
-            fig_rechazos = px.line(
-                kpis_historicos,
-                x="fecha",
-                y="rechazos_pct",
-                title="Evolución de la Tasa de Rechazos",
-                labels={"rechazos_pct": "Rechazos (%)", "fecha": "Fecha"},
-                markers=True
-            )
-            
-            # Añadir línea objetivo
-            objetivo_rechazos = kpis.get("objetivo_rechazos", 0.02) * 100
-            fig_rechazos.add_hline(
-                y=objetivo_rechazos,
-                line_dash="dash",
-                line_color="red",
-                annotation_text=f"Objetivo: {objetivo_rechazos:.1f}%"
-            )
-            
-            st.plotly_chart(fig_rechazos, use_container_width=True)
-            
-            # Estadísticas
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Promedio", f"{kpis_historicos['rechazos'].mean() * 100:.1f}%")
-            with col2:
-                st.metric("Mínimo", f"{kpis_historicos['rechazos'].min() * 100:.1f}%")
-            with col3:
-                st.metric("Máximo", f"{kpis_historicos['rechazos'].max() * 100:.1f}%")
+        grafico_kpi(
+            "rechazos",
+            "Evolución de Tasa de Rechazos",
+            "Rechazos (%)",
+            100,
+            kpis.get("objetivo_rechazos", 0.02),
+            "red",
+            lambda valor: f"{valor:.1f}%"
+        )
 
     # Gráfico de radar para comparación de KPIs actuales vs objetivos
     st.subheader("Comparación de KPIs Actuales vs Objetivos")
@@ -275,7 +344,7 @@ if not kpis_historicos.empty:
     
     if not kpis_historicos.empty:
         # Preparar datos para exportar
-        export_df = kpis_historicos.copy()
+        export_df = kpis_historicos[["fecha", "dias_inventario", "cumplimiento_plan", "otd", "rechazos"]].copy()
         
         # Convertir decimales a porcentajes para mejor visualización
         if "cumplimiento_plan" in export_df.columns:
@@ -304,3 +373,14 @@ if not kpis_historicos.empty:
         )
 else:
     st.info("No hay datos históricos de KPIs disponibles.")
+
+# En modo en vivo, actualizar los KPIs con los eventos del servidor. El
+# servidor solo envía los KPIs que cambian; Streamlit corta este ciclo al
+# volver a ejecutar la página.
+if kpis and en_vivo:
+    for evento, datos in api_client.get_eventos("/dashboard/stream"):
+        if evento == "error":
+            st.warning(f"Se perdió la conexión en vivo: {datos.get('detail', '')}")
+            break
+        kpis.update(datos.get("kpis", {}))
+        mostrar_kpis(kpis)
@@ -74,6 +74,101 @@ class APIClient:
         except Exception as e:
             return {"detail": str(e)}
     
+    def get_ndjson(self, endpoint, params=None):
+        """
+        Realiza una petición GET a un endpoint NDJSON y entrega cada línea
+        a medida que llega.
+        
+        Args:
+            endpoint: Ruta del endpoint
+            params: Parámetros de la petición
+        
+        Returns:
+            Iterador con los objetos de cada línea o un mensaje de error
+        """
+        # Eliminar la barra inicial si está presente
+        if endpoint.startswith("/"):
+            endpoint = endpoint[1:]
+        
+        url = f"{self.base_url}{endpoint}"
+        
+        try:
+            with requests.get(url, params=params, stream=True) as response:
+                if not response.ok:
+                    yield self._handle_response(response)
+                    return
+                
+                for linea in response.iter_lines():
+                    if linea:
+                        yield json.loads(linea)
+        except Exception as e:
+            yield {"detail": str(e)}
+    
+    def get_eventos(self, endpoint, params=None):
+        """
+        Realiza una petición GET a un endpoint de Server-Sent Events y
+        entrega cada evento a medida que llega.
+        
+        Args:
+            endpoint: Ruta del endpoint
+            params: Parámetros de la petición
+        
+        Returns:
+            Iterador de tuplas (evento, datos) o un mensaje de error con el
+            evento "error"
+        """
+        # Eliminar la barra inicial si está presente
+        if endpoint.startswith("/"):
+            endpoint = endpoint[1:]
+        
+        url = f"{self.base_url}{endpoint}"
+        
+        try:
+            with requests.get(url, params=params, stream=True) as response:
+                if not response.ok:
+                    yield "error", self._handle_response(response)
+                    return
+                
+                evento, datos = "message", []
+                for linea in response.iter_lines(decode_unicode=True):
+                    if linea:
+                        # Las líneas que empiezan con ":" son comentarios
+                        if linea.startswith("event:"):
+                            evento = linea[6:].strip()
+                        elif linea.startswith("data:"):
+                            datos.append(linea[5:].strip())
+                    elif datos:
+                        # Una línea vacía cierra el evento
+                        yield evento, json.loads("\n".join(datos))
+                        evento, datos = "message", []
+        except Exception as e:
+            yield "error", {"detail": str(e)}
+    
+    def get_bytes(self, endpoint, params=None):
+        """
+        Realiza una petición GET a un endpoint que devuelve un archivo.
+        
+        Args:
+            endpoint: Ruta del endpoint
+            params: Parámetros de la petición
+        
+        Returns:
+            Contenido del archivo o un mensaje de error
+        """
+        # Eliminar la barra inicial si está presente
+        if endpoint.startswith("/"):
+            endpoint = endpoint[1:]
+        
+        url = f"{self.base_url}{endpoint}"
+        
+        try:
+            response = requests.get(url, params=params)
+            if not response.ok:
+                return self._handle_response(response)
+            return response.content
+        except Exception as e:
+            return {"detail": str(e)}
+    
     def post(self, endpoint, json=None, data=None):
         """
         Realiza una petición POST a la API.
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from typing import List, Optional
+
+from app.db.session import get_session
+from app.models.regla_alerta import ReglaAlertaCreate, ReglaAlertaUpdate, ReglaAlertaRead
+from app.crud.reglas_alerta import (
+    get_reglas_alerta,
+    create_regla_alerta,
+    update_regla_alerta,
+    delete_regla_alerta
+)
+from app.services.alertas import compilar_expresion, SEVERIDADES, VARIABLES_ALERTA
+
+router = APIRouter()
+
+def _validar_regla(expresion: Optional[str], severidad: Optional[str]) -> None:
+    """
+    Verifica que la expresión compile y que la severidad sea válida.
+    """
+    if severidad is not None and severidad not in SEVERIDADES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Severidad no válida: {severidad}. Valores permitidos: {', '.join(SEVERIDADES)}"
+        )
+    
+    if expresion is not None:
+        try:
+            compilar_expresion(expresion)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/alertas/reglas", response_model=List[ReglaAlertaRead])
+def read_reglas_alerta(activo: Optional[bool] = None, db: Session = Depends(get_session)):
+    """
+    Obtiene las reglas de alerta del MPS.
+    """
+    return get_reglas_alerta(db, activo=activo)
+
+@router.get("/alertas/variables")
+def read_variables_alerta():
+    """
+    Obtiene las variables que pueden usar las expresiones de las reglas.
+    """
+    return VARIABLES_ALERTA
+
+@router.post("/alertas/reglas", response_model=ReglaAlertaRead)
+def create_regla_alerta_endpoint(regla: ReglaAlertaCreate, db: Session = Depends(get_session)):
+    """
+    Crea una regla de alerta. La expresión se valida antes de guardarla.
+    """
+    _validar_regla(regla.expresion, regla.severidad)
+    
+    if any(r.codigo == regla.codigo for r in get_reglas_alerta(db)):
+        raise HTTPException(status_code=400, detail=f"Ya existe una regla con el código {regla.codigo}")
+    
+    return create_regla_alerta(db, regla)
+
+@router.put("/alertas/reglas/{regla_id}", response_model=ReglaAlertaRead)
+def update_regla_alerta_endpoint(
+    regla_id: int,
+    regla: ReglaAlertaUpdate,
+    db: Session = Depends(get_session)
+):
+    """
+    Actualiza una regla de alerta.
+    """
+    # Solo el umbral admite null; el resto de columnas son obligatorias
+    nulos = [
+        campo for campo, valor in regla.dict(exclude_unset=True).items()
+        if valor is None and campo != "umbral"
+    ]
+    if nulos:
+        raise HTTPException(status_code=400, detail=f"Campos que no admiten null: {', '.join(nulos)}")
+    
+    _validar_regla(regla.expresion, regla.severidad)
+    
+    db_regla = update_regla_alerta(db, regla_id, regla)
+    if db_regla is None:
+        raise HTTPException(status_code=404, detail="Regla de alerta no encontrada")
+    return db_regla
+
+@router.delete("/alertas/reglas/{regla_id}")
+def delete_regla_alerta_endpoint(regla_id: int, db: Session = Depends(get_session)):
+    """
+    Elimina una regla de alerta.
+    """
+    success = delete_regla_alerta(db, regla_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Regla de alerta no encontrada")
+    return {"success": True, "message": "Regla de alerta eliminada correctamente"}
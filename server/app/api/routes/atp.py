@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Body
+from sqlmodel import Session
+from typing import Dict, Any, List, Optional
+
+from app.db.session import get_session
+from app.models.pedido import PedidoCreate, PedidoRead
+from app.crud.pedidos import get_pedidos, create_pedido, delete_pedido
+from app.crud.skus import get_sku
+from app.services.atp import consultar_atp
+
+router = APIRouter()
+
+@router.get("/atp")
+def get_atp(sku_id: int, semana: str, cantidad: int, db: Session = Depends(get_session)):
+    """
+    Indica si se puede prometer una cantidad de un SKU en una semana
+    ("YYYY-SWW") y la primera semana en que sería posible.
+    """
+    try:
+        return consultar_atp(db, [{"sku_id": sku_id, "semana": semana, "cantidad": cantidad}])[0]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al consultar ATP: {str(e)}")
+
+@router.post("/atp")
+def post_atp(
+    lineas: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_session)
+):
+    """
+    Consulta el ATP de varias líneas a la vez. Cada línea indica
+    ``sku_id``, ``semana`` y ``cantidad``.
+    """
+    try:
+        return consultar_atp(db, lineas)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Línea de consulta no válida: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al consultar ATP: {str(e)}")
+
+@router.get("/pedidos", response_model=List[PedidoRead])
+def read_pedidos(
+    skip: int = 0,
+    limit: int = 100,
+    sku_id: Optional[int] = None,
+    db: Session = Depends(get_session)
+):
+    """
+    Obtiene la lista de pedidos comprometidos.
+    """
+    return get_pedidos(db, skip=skip, limit=limit, sku_id=sku_id)
+
+@router.post("/pedidos", response_model=PedidoRead)
+def create_pedido_endpoint(pedido: PedidoCreate, db: Session = Depends(get_session)):
+    """
+    Registra un pedido comprometido.
+    """
+    if get_sku(db, pedido.sku_id) is None:
+        raise HTTPException(status_code=404, detail="SKU no encontrado")
+    
+    return create_pedido(db, pedido)
+
+@router.delete("/pedidos/{pedido_id}")
+def delete_pedido_endpoint(pedido_id: int, db: Session = Depends(get_session)):
+    """
+    Elimina un pedido comprometido.
+    """
+    success = delete_pedido(db, pedido_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Pedido no encontrado")
+    
+    return {"success": True, "message": "Pedido eliminado correctamente"}
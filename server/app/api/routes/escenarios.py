@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from typing import List
+
+from app.db.session import get_session
+from app.models.escenario import EscenarioCreate, EscenarioUpdate, EscenarioRead
+from app.models.ajuste_escenario import AjusteEscenarioCreate, AjusteEscenarioRead
+from app.crud.escenarios import (
+    get_escenarios,
+    get_escenario,
+    get_escenario_por_nombre,
+    create_escenario,
+    update_escenario,
+    delete_escenario,
+    get_ajustes_escenario,
+    create_ajuste_escenario,
+    delete_ajuste_escenario
+)
+from app.services.escenarios import validar_ajuste
+
+router = APIRouter()
+
+@router.get("/escenarios", response_model=List[EscenarioRead])
+def read_escenarios(skip: int = 0, limit: int = 100, db: Session = Depends(get_session)):
+    """
+    Obtiene la lista de escenarios de planificación guardados.
+    """
+    return get_escenarios(db, skip=skip, limit=limit)
+
+@router.post("/escenarios", response_model=EscenarioRead)
+def create_escenario_endpoint(escenario: EscenarioCreate, db: Session = Depends(get_session)):
+    """
+    Crea un escenario vacío. Sus ajustes se agregan con
+    ``POST /escenarios/{escenario_id}/ajustes`` y el MPS del escenario se
+    obtiene con ``GET /mps?escenario={escenario_id}``.
+    """
+    if get_escenario_por_nombre(db, escenario.nombre) is not None:
+        raise HTTPException(status_code=400, detail=f"Ya existe un escenario con el nombre {escenario.nombre}")
+    
+    return create_escenario(db, escenario)
+
+@router.get("/escenarios/{escenario_id}", response_model=EscenarioRead)
+def read_escenario(escenario_id: int, db: Session = Depends(get_session)):
+    """
+    Obtiene un escenario por su ID.
+    """
+    db_escenario = get_escenario(db, escenario_id)
+    if db_escenario is None:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+    return db_escenario
+
+@router.put("/escenarios/{escenario_id}", response_model=EscenarioRead)
+def update_escenario_endpoint(
+    escenario_id: int,
+    escenario: EscenarioUpdate,
+    db: Session = Depends(get_session)
+):
+    """
+    Actualiza el nombre o la descripción de un escenario.
+    """
+    if escenario.nombre is not None:
+        existente = get_escenario_por_nombre(db, escenario.nombre)
+        if existente is not None and existente.id != escenario_id:
+            raise HTTPException(status_code=400, detail=f"Ya existe un escenario con el nombre {escenario.nombre}")
+    
+    db_escenario = update_escenario(db, escenario_id, escenario)
+    if db_escenario is None:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+    return db_escenario
+
+@router.delete("/escenarios/{escenario_id}")
+def delete_escenario_endpoint(escenario_id: int, db: Session = Depends(get_session)):
+    """
+    Elimina un escenario y sus ajustes.
+    """
+    success = delete_escenario(db, escenario_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+    return {"success": True, "message": "Escenario eliminado correctamente"}
+
+@router.get("/escenarios/{escenario_id}/ajustes", response_model=List[AjusteEscenarioRead])
+def read_ajustes_escenario(escenario_id: int, db: Session = Depends(get_session)):
+    """
+    Obtiene los ajustes de un escenario.
+    """
+    if get_escenario(db, escenario_id) is None:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+    return get_ajustes_escenario(db, escenario_id)
+
+@router.post("/escenarios/{escenario_id}/ajustes", response_model=AjusteEscenarioRead)
+def create_ajuste_escenario_endpoint(
+    escenario_id: int,
+    ajuste: AjusteEscenarioCreate,
+    db: Session = Depends(get_session)
+):
+    """
+    Agrega un ajuste a un escenario: un parámetro sobrescrito, unidades de
+    demanda o de producción extra de un SKU (en una semana o en todo el
+    horizonte).
+    """
+    if get_escenario(db, escenario_id) is None:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+    
+    try:
+        validar_ajuste(ajuste)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return create_ajuste_escenario(db, escenario_id, ajuste)
+
+@router.delete("/escenarios/{escenario_id}/ajustes/{ajuste_id}")
+def delete_ajuste_escenario_endpoint(escenario_id: int, ajuste_id: int, db: Session = Depends(get_session)):
+    """
+    Quita un ajuste de un escenario.
+    """
+    success = delete_ajuste_escenario(db, escenario_id, ajuste_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Ajuste de escenario no encontrado")
+    return {"success": True, "message": "Ajuste eliminado correctamente"}
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+from typing import List
+
+from app.db.session import get_session
+from app.models.estadistica_demanda import EstadisticaDemandaRead
+from app.crud.estadisticas import get_estadisticas_demanda, refrescar_estadisticas_demanda
+
+router = APIRouter()
+
+@router.get("/estadisticas-demanda", response_model=List[EstadisticaDemandaRead])
+def read_estadisticas_demanda(db: Session = Depends(get_session)):
+    """
+    Obtiene las estadísticas de demanda por SKU.
+    """
+    return list(get_estadisticas_demanda(db).values())
+
+@router.post("/estadisticas-demanda/refrescar")
+def refresh_estadisticas_demanda(db: Session = Depends(get_session)):
+    """
+    Recalcula las estadísticas de demanda de todos los SKUs.
+    """
+    actualizados = refrescar_estadisticas_demanda(db)
+    return {"success": True, "message": f"Estadísticas recalculadas para {actualizados} SKUs"}
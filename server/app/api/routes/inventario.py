@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from typing import List, Optional
+from datetime import date
+
+from app.db.session import get_session
+from app.models.sku import SKU
+from app.models.movimiento_inventario import AjusteInventarioCreate, MovimientoInventarioRead
+from app.crud.inventario import get_movimientos_inventario, create_ajuste_inventario
+from app.services.inventario import obtener_inventario
+
+router = APIRouter()
+
+@router.get("/inventario")
+def read_inventario(
+    fecha: Optional[date] = None,
+    sku_id: Optional[int] = None,
+    db: Session = Depends(get_session)
+):
+    """
+    Obtiene el inventario de cada SKU al cierre de una fecha (por defecto,
+    hoy), según el libro de inventario.
+    """
+    try:
+        return obtener_inventario(db, fecha, sku_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener inventario: {str(e)}")
+
+@router.get("/inventario/movimientos", response_model=List[MovimientoInventarioRead])
+def read_movimientos_inventario(
+    skip: int = 0,
+    limit: int = 100,
+    sku_id: Optional[int] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    db: Session = Depends(get_session)
+):
+    """
+    Obtiene los movimientos del libro de inventario.
+    """
+    return get_movimientos_inventario(db, skip, limit, sku_id, desde, hasta)
+
+@router.post("/inventario/ajustes", response_model=MovimientoInventarioRead)
+def create_ajuste_inventario_endpoint(ajuste: AjusteInventarioCreate, db: Session = Depends(get_session)):
+    """
+    Registra un ajuste de inventario, por ejemplo tras un conteo físico.
+    """
+    if db.get(SKU, ajuste.sku_id) is None:
+        raise HTTPException(status_code=404, detail="SKU no encontrado")
+    if ajuste.cantidad == 0:
+        raise HTTPException(status_code=400, detail="La cantidad del ajuste no puede ser cero")
+    return create_ajuste_inventario(db, ajuste)
@@ -1,30 +1,92 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
-from typing import Dict, Any, List
+from typing import Optional
+from datetime import date
 
 from app.db.session import get_session
-from app.services.kpis import obtener_kpis, obtener_kpis_historicos
+from app.services.kpis import (
+    obtener_kpis,
+    obtener_kpis_por_grupo,
+    obtener_kpis_historicos,
+    materializar_kpis_diarios
+)
+from app.services.kpis_en_vivo import transmitir_kpis
+from app.crud.kpis_diarios import invalidar_kpis_diarios
 
 router = APIRouter()
 
 @router.get("/dashboard/kpis")
-def get_kpis(db: Session = Depends(get_session)):
+def get_kpis(
+    fecha_corte: Optional[date] = None,
+    agrupar: Optional[str] = None,
+    db: Session = Depends(get_session)
+):
     """
-    Obtiene los KPIs actuales.
+    Obtiene los KPIs actuales, o a una fecha de corte.
+    
+    Con ``agrupar=sku`` o ``agrupar=presentacion`` devuelve una tabla
+    columnar con los KPIs de cada grupo, calculada en una sola consulta.
     """
     try:
-        kpis = obtener_kpis(db)
+        if agrupar is not None:
+            return obtener_kpis_por_grupo(db, agrupar, fecha_corte)
+        kpis = obtener_kpis(db, fecha_corte)
         return kpis
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener KPIs: {str(e)}")
 
+@router.get("/dashboard/stream")
+async def stream_kpis(request: Request):
+    """
+    Transmite los KPIs como Server-Sent Events.
+    
+    Envía primero todos los KPIs (evento ``kpis``) y luego solo los que
+    cambian (evento ``delta``) cada vez que cambian las ventas, la
+    producción, el plan congelado o los parámetros.
+    """
+    return StreamingResponse(
+        transmitir_kpis(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/dashboard/kpis/historico")
-def get_kpis_historicos(dias: int = 90, db: Session = Depends(get_session)):
+def get_kpis_historicos(
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    resolucion: str = "dia",
+    max_puntos: Optional[int] = None,
+    dias: int = 90,
+    db: Session = Depends(get_session)
+):
     """
-    Obtiene el historial de KPIs.
+    Obtiene el historial de KPIs entre dos fechas.
+    
+    Con ``resolucion=semana`` o ``resolucion=mes`` cada punto es la media
+    del periodo, con su mínimo y máximo. Con ``max_puntos`` la serie se
+    reduce con LTTB para no enviar más puntos de los que se pueden graficar.
     """
     try:
-        historico = obtener_kpis_historicos(db, dias)
+        historico = obtener_kpis_historicos(db, desde, hasta, resolucion, max_puntos, dias)
         return historico
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener historial de KPIs: {str(e)}")
+
+@router.post("/dashboard/kpis/materializar")
+def materialize_kpis(desde: Optional[date] = None, db: Session = Depends(get_session)):
+    """
+    Materializa los KPIs de los días cerrados que aún no están guardados.
+    
+    Con ``desde`` se recalculan también los días a partir de esa fecha.
+    """
+    try:
+        if desde is not None:
+            invalidar_kpis_diarios(db, desde)
+        return {"dias_materializados": materializar_kpis_diarios(db)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al materializar KPIs: {str(e)}")
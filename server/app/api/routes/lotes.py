@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+from typing import List, Optional
+from datetime import date
+
+from app.db.session import get_session
+from app.models.lote import LoteRead
+from app.models.asignacion_lote import AsignacionLoteRead
+from app.crud.lotes import get_lotes, get_lote, get_asignaciones_lote, get_asignaciones_venta
+from app.crud.ventas import get_venta
+from app.services.lotes import obtener_stock_antiguo
+
+router = APIRouter()
+
+@router.get("/lotes", response_model=List[LoteRead])
+def read_lotes(
+    skip: int = 0,
+    limit: int = 100,
+    sku_id: Optional[int] = None,
+    solo_disponibles: bool = False,
+    db: Session = Depends(get_session)
+):
+    """
+    Obtiene los lotes de café tostado.
+    """
+    return get_lotes(db, skip, limit, sku_id, solo_disponibles)
+
+@router.get("/lotes/antiguos")
+def read_lotes_antiguos(
+    dias: int = Query(..., ge=0, description="Días desde el tueste"),
+    sku_id: Optional[int] = None,
+    fecha: Optional[date] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_session)
+):
+    """
+    Obtiene el stock de lotes tostados hace más de `dias` días, resumido
+    por SKU y con el detalle de los lotes.
+    """
+    try:
+        return obtener_stock_antiguo(db, dias, sku_id, fecha, skip, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener stock antiguo: {str(e)}")
+
+@router.get("/lotes/{lote_id}", response_model=LoteRead)
+def read_lote(lote_id: int, db: Session = Depends(get_session)):
+    """
+    Obtiene un lote por su ID.
+    """
+    db_lote = get_lote(db, lote_id)
+    if db_lote is None:
+        raise HTTPException(status_code=404, detail="Lote no encontrado")
+    return db_lote
+
+@router.get("/lotes/{lote_id}/asignaciones", response_model=List[AsignacionLoteRead])
+def read_asignaciones_lote(lote_id: int, db: Session = Depends(get_session)):
+    """
+    Obtiene las ventas despachadas desde un lote.
+    """
+    if get_lote(db, lote_id) is None:
+        raise HTTPException(status_code=404, detail="Lote no encontrado")
+    return get_asignaciones_lote(db, lote_id)
+
+@router.get("/ventas/{venta_id}/lotes", response_model=List[AsignacionLoteRead])
+def read_lotes_venta(venta_id: int, db: Session = Depends(get_session)):
+    """
+    Obtiene los lotes desde los que se despachó una venta.
+    """
+    if get_venta(db, venta_id) is None:
+        raise HTTPException(status_code=404, detail="Venta no encontrada")
+    return get_asignaciones_venta(db, venta_id)
@@ -1,24 +1,202 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from datetime import datetime
 
 from app.db.session import get_session
 from app.services.mps import generar_mps, guardar_ajustes_mps
-from app.crud.parametros import update_parametro, get_parametro
-from app.models.parametro import ParametroUpdate
+from app.services.replanificacion import generar_mps_replanificado
+from app.services.plantas import generar_mps_plantas
+from app.services.exportacion import generar_exportacion, FORMATOS_EXPORTACION
+from app.services.escenarios import evaluar_escenarios
+from app.services.backtest import generar_backtest
+from app.services.adherencia import obtener_adherencia
+from app.services.simulacion import generar_simulacion_mps, MAX_MUESTRAS
+from app.services.programacion import generar_programa, MAX_LIMITE_SEGUNDOS
+from app.services.snapshots import publicar_snapshot, diferencias_snapshots
+from app.services.largo_plazo import cargar_datos_largo_plazo, calcular_mps_largo_plazo, generar_mps_largo_plazo
+from app.crud.snapshots import get_snapshots
+from app.models.mps_snapshot import MPSSnapshotRead
 
 router = APIRouter()
 
 @router.get("/mps")
-def get_mps(semanas: int = 6, db: Session = Depends(get_session)):
+def get_mps(
+    semanas: int = 6,
+    nivelar: bool = False,
+    respetar_fences: bool = False,
+    formato: str = Query("json", alias="format"),
+    escenario: Optional[int] = None,
+    db: Session = Depends(get_session)
+):
     """
     Obtiene el Plan Maestro de Producción (MPS).
+    
+    Con ``nivelar=true`` la producción que excede la capacidad semanal
+    compartida se adelanta a semanas anteriores con holgura. Con
+    ``respetar_fences=true`` las semanas dentro de las time fences se toman
+    del último snapshot y solo se recalcula el resto del horizonte. Con
+    ``format=columnar`` cada métrica se devuelve como una matriz SKU × semana.
+    Con ``escenario=<id>`` los ajustes del escenario guardado se aplican sobre
+    los datos vigentes sin modificarlos.
     """
     try:
-        mps = generar_mps(db, semanas)
+        if respetar_fences:
+            return generar_mps_replanificado(db, semanas, nivelar, formato, escenario)
+        mps = generar_mps(db, semanas, nivelar, formato, escenario)
         return mps
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar MPS: {str(e)}")
+
+@router.get("/mps/plantas")
+def get_mps_plants(semanas: int = 6, nivelar: bool = False, db: Session = Depends(get_session)):
+    """
+    Obtiene el MPS de cada planta, calculado en paralelo con la capacidad,
+    los SKUs asignados y el inventario de cada una, y el consolidado por SKU.
+    """
+    try:
+        return generar_mps_plantas(db, semanas, nivelar)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar MPS por planta: {str(e)}")
+
+@router.get("/mps/export")
+def export_mps(
+    formato: str = Query("xlsx", alias="format"),
+    semanas: int = 6,
+    nivelar: bool = False,
+    db: Session = Depends(get_session)
+):
+    """
+    Exporta el MPS como archivo XLSX, CSV o Parquet.
+    
+    El archivo se arma en el servidor a partir de los arreglos del plan y
+    se envía por bloques.
+    """
+    if formato not in FORMATOS_EXPORTACION:
+        raise HTTPException(status_code=400, detail=f"Formato de exportación no válido: {formato}")
+    
+    try:
+        contenido = generar_exportacion(db, formato, semanas, nivelar)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al exportar MPS: {str(e)}")
+    
+    media_type, extension = FORMATOS_EXPORTACION[formato]
+    nombre_archivo = f"MPS_Cafe_de_Altura_{datetime.now().strftime('%Y%m%d')}.{extension}"
+    
+    return StreamingResponse(
+        contenido,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{nombre_archivo}"'}
+    )
+
+@router.get("/mps/simulacion")
+def get_mps_simulation(
+    semanas: int = 6,
+    muestras: int = Query(5000, gt=0, le=MAX_MUESTRAS),
+    semilla: Optional[int] = None,
+    nivelar: bool = False,
+    db: Session = Depends(get_session)
+):
+    """
+    Simula trayectorias de demanda sobre el MPS y estima, por SKU y semana,
+    la probabilidad de quiebre de stock y el faltante esperado.
+    """
+    try:
+        return generar_simulacion_mps(db, semanas, muestras, semilla, nivelar)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al simular MPS: {str(e)}")
+
+@router.get("/mps/programa")
+def get_mps_schedule(
+    semana: Optional[str] = None,
+    semanas: int = 6,
+    metodo: str = "heuristico",
+    limite_segundos: float = Query(1.0, gt=0, le=MAX_LIMITE_SEGUNDOS),
+    nivelar: bool = False,
+    db: Session = Depends(get_session)
+):
+    """
+    Obtiene el programa de tandas por tostador, día y turno para una semana
+    del MPS. ``metodo=exacto`` busca la asignación óptima hasta
+    ``limite_segundos``.
+    """
+    try:
+        return generar_programa(db, semana, semanas, metodo, limite_segundos, nivelar)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar programa: {str(e)}")
+
+@router.post("/mps/snapshots", response_model=MPSSnapshotRead)
+def create_mps_snapshot(
+    semanas: int = 6,
+    nivelar: bool = False,
+    descripcion: Optional[str] = None,
+    respetar_fences: bool = False,
+    db: Session = Depends(get_session)
+):
+    """
+    Publica el MPS actual como snapshot.
+    """
+    try:
+        return publicar_snapshot(db, semanas, nivelar, descripcion, respetar_fences)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al publicar snapshot: {str(e)}")
+
+@router.get("/mps/snapshots", response_model=List[MPSSnapshotRead])
+def read_mps_snapshots(skip: int = 0, limit: int = 100, db: Session = Depends(get_session)):
+    """
+    Obtiene la lista de snapshots publicados del MPS.
+    """
+    return get_snapshots(db, skip=skip, limit=limit)
+
+@router.get("/mps/snapshots/{snapshot_a}/diff/{snapshot_b}")
+def get_mps_snapshot_diff(snapshot_a: int, snapshot_b: int, db: Session = Depends(get_session)):
+    """
+    Obtiene los cambios celda a celda entre dos snapshots del MPS.
+    """
+    diferencias = diferencias_snapshots(db, snapshot_a, snapshot_b)
+    if diferencias is None:
+        raise HTTPException(status_code=404, detail="Snapshot no encontrado")
+    return diferencias
+
+@router.get("/mps/largo-plazo")
+def get_mps_long_horizon(
+    semanas: int = 52,
+    semanas_detalle: int = 13,
+    nivelar: bool = False,
+    skus_por_bloque: int = 50,
+    db: Session = Depends(get_session)
+):
+    """
+    Obtiene el MPS de largo plazo como NDJSON.
+    
+    Las primeras ``semanas_detalle`` semanas se planifican por semana y el
+    resto por mes. La respuesta se envía por bloques de SKUs; si falla el
+    armado de un bloque, la última línea es un objeto con ``tipo: error``.
+    """
+    if semanas_detalle < 0 or skus_por_bloque <= 0:
+        raise HTTPException(status_code=400, detail="semanas_detalle y skus_por_bloque deben ser positivos")
+    
+    try:
+        datos = cargar_datos_largo_plazo(db, semanas, semanas_detalle)
+        plan, condiciones = calcular_mps_largo_plazo(datos, nivelar)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al generar MPS: {str(e)}")
+    
+    return StreamingResponse(
+        generar_mps_largo_plazo(datos, plan, condiciones, skus_por_bloque),
+        media_type="application/x-ndjson"
+    )
 
 @router.post("/mps/guardar")
 def save_mps_adjustments(
@@ -44,3 +222,64 @@ def save_mps_adjustments(
             raise HTTPException(status_code=500, detail="Error al guardar ajustes")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@router.post("/mps/escenarios")
+def evaluate_mps_scenarios(
+    escenarios: List[Dict[str, Any]] = Body(...),
+    semanas: int = 6,
+    db: Session = Depends(get_session)
+):
+    """
+    Evalúa escenarios what-if del MPS sobre la misma demanda.
+    
+    Cada escenario puede sobrescribir ``capacidad_semanal``, ``nivel_servicio``,
+    ``scrap`` (valor único o por SKU) y ``nivelar``, sin modificar los
+    parámetros guardados.
+    """
+    try:
+        return evaluar_escenarios(db, escenarios, semanas)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al evaluar escenarios: {str(e)}")
+
+@router.post("/mps/backtest")
+def backtest_mps_policies(
+    politicas: List[Dict[str, Any]] = Body(...),
+    semanas_historia: int = 52,
+    ventana: Optional[int] = None,
+    detalle: bool = False,
+    db: Session = Depends(get_session)
+):
+    """
+    Evalúa políticas de inventario reproduciendo las ventas históricas.
+    
+    Cada política puede definir ``nivel_servicio``, ``lead_time_semanas`` y
+    ``cobertura_semanas`` (semanas de pronóstico adicionales en el stock de
+    seguridad). Devuelve fill rate, unidades perdidas, inventario promedio y
+    tandas usadas por política.
+    """
+    try:
+        return generar_backtest(db, politicas, semanas_historia, ventana, detalle)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al ejecutar el backtest: {str(e)}")
+
+@router.get("/mps/adherencia")
+def get_mps_adherence(
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    sku_id: Optional[int] = None,
+    db: Session = Depends(get_session)
+):
+    """
+    Compara el plan congelado al inicio de cada semana ("YYYY-SWW") con la
+    producción registrada, por SKU y semana.
+    """
+    try:
+        return obtener_adherencia(db, desde, hasta, sku_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener adherencia: {str(e)}")
@@ -0,0 +1,128 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from typing import List, Optional
+
+from app.db.session import get_session
+from app.models.componente import ComponenteCreate, ComponenteUpdate, ComponenteRead
+from app.models.lista_materiales import ListaMaterialesCreate, ListaMaterialesUpdate, ListaMaterialesRead
+from app.crud.componentes import get_componentes, get_componente, create_componente, update_componente, delete_componente
+from app.crud.lista_materiales import (
+    get_lista_materiales,
+    create_linea_materiales,
+    update_linea_materiales,
+    delete_linea_materiales
+)
+from app.crud.skus import get_sku
+from app.services.mrp import generar_mrp
+
+router = APIRouter()
+
+@router.get("/mrp")
+def get_mrp(semanas: int = 6, nivelar: bool = False, db: Session = Depends(get_session)):
+    """
+    Obtiene los requerimientos de café verde y empaque por semana,
+    explotando el MPS con la lista de materiales de cada SKU.
+    """
+    try:
+        return generar_mrp(db, semanas, nivelar)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar MRP: {str(e)}")
+
+@router.get("/componentes", response_model=List[ComponenteRead])
+def read_componentes(
+    skip: int = 0,
+    limit: int = 100,
+    activo: Optional[bool] = None,
+    db: Session = Depends(get_session)
+):
+    """
+    Obtiene la lista de componentes.
+    """
+    return get_componentes(db, skip=skip, limit=limit, activo=activo)
+
+@router.post("/componentes", response_model=ComponenteRead)
+def create_componente_endpoint(componente: ComponenteCreate, db: Session = Depends(get_session)):
+    """
+    Crea un nuevo componente.
+    """
+    return create_componente(db, componente)
+
+@router.get("/componentes/{componente_id}", response_model=ComponenteRead)
+def read_componente(componente_id: int, db: Session = Depends(get_session)):
+    """
+    Obtiene un componente por su ID.
+    """
+    db_componente = get_componente(db, componente_id)
+    if db_componente is None:
+        raise HTTPException(status_code=404, detail="Componente no encontrado")
+    return db_componente
+
+@router.put("/componentes/{componente_id}", response_model=ComponenteRead)
+def update_componente_endpoint(
+    componente_id: int,
+    componente: ComponenteUpdate,
+    db: Session = Depends(get_session)
+):
+    """
+    Actualiza un componente existente.
+    """
+    db_componente = update_componente(db, componente_id, componente)
+    if db_componente is None:
+        raise HTTPException(status_code=404, detail="Componente no encontrado")
+    return db_componente
+
+@router.delete("/componentes/{componente_id}")
+def delete_componente_endpoint(componente_id: int, db: Session = Depends(get_session)):
+    """
+    Elimina un componente (baja lógica).
+    """
+    success = delete_componente(db, componente_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Componente no encontrado")
+    return {"success": True, "message": "Componente eliminado correctamente"}
+
+@router.get("/lista-materiales", response_model=List[ListaMaterialesRead])
+def read_lista_materiales(
+    sku_id: Optional[int] = None,
+    componente_id: Optional[int] = None,
+    db: Session = Depends(get_session)
+):
+    """
+    Obtiene las líneas de la lista de materiales.
+    """
+    return get_lista_materiales(db, sku_id=sku_id, componente_id=componente_id)
+
+@router.post("/lista-materiales", response_model=ListaMaterialesRead)
+def create_linea_materiales_endpoint(linea: ListaMaterialesCreate, db: Session = Depends(get_session)):
+    """
+    Agrega un componente a la lista de materiales de un SKU.
+    """
+    if get_sku(db, linea.sku_id) is None:
+        raise HTTPException(status_code=404, detail="SKU no encontrado")
+    if get_componente(db, linea.componente_id) is None:
+        raise HTTPException(status_code=404, detail="Componente no encontrado")
+    return create_linea_materiales(db, linea)
+
+@router.put("/lista-materiales/{linea_id}", response_model=ListaMaterialesRead)
+def update_linea_materiales_endpoint(
+    linea_id: int,
+    linea: ListaMaterialesUpdate,
+    db: Session = Depends(get_session)
+):
+    """
+    Actualiza una línea de la lista de materiales.
+    """
+    db_linea = update_linea_materiales(db, linea_id, linea)
+    if db_linea is None:
+        raise HTTPException(status_code=404, detail="Línea de lista de materiales no encontrada")
+    return db_linea
+
+@router.delete("/lista-materiales/{linea_id}")
+def delete_linea_materiales_endpoint(linea_id: int, db: Session = Depends(get_session)):
+    """
+    Elimina una línea de la lista de materiales.
+    """
+    success = delete_linea_materiales(db, linea_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Línea de lista de materiales no encontrada")
+    return {"success": True, "message": "Línea de lista de materiales eliminada correctamente"}
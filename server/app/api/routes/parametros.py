@@ -30,7 +30,10 @@ def update_parametro_endpoint(nombre: str, parametro: ParametroUpdate, db: Sessi
     """
     Actualiza un parámetro existente.
     """
-    db_parametro = update_parametro(db, nombre, parametro)
+    try:
+        db_parametro = update_parametro(db, nombre, parametro)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if db_parametro is None:
         raise HTTPException(status_code=404, detail="Parámetro no encontrado")
     return db_parametro
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from typing import List, Optional
+
+from app.db.session import get_session
+from app.models.planta import PlantaCreate, PlantaUpdate, PlantaRead
+from app.models.asignacion_planta import AsignacionPlantaCreate, AsignacionPlantaRead
+from app.crud.plantas import (
+    get_plantas,
+    get_planta,
+    create_planta,
+    update_planta,
+    get_asignaciones_planta,
+    asignar_sku_planta,
+    delete_asignacion_planta
+)
+from app.crud.skus import get_sku
+from app.services.plantas import validar_participacion
+
+router = APIRouter()
+
+@router.get("/plantas", response_model=List[PlantaRead])
+def read_plantas(activo: Optional[bool] = None, db: Session = Depends(get_session)):
+    """
+    Obtiene la lista de plantas de tostado.
+    """
+    return get_plantas(db, activo=activo)
+
+@router.post("/plantas", response_model=PlantaRead)
+def create_planta_endpoint(planta: PlantaCreate, db: Session = Depends(get_session)):
+    """
+    Crea una nueva planta de tostado.
+    """
+    return create_planta(db, planta)
+
+@router.put("/plantas/{planta_id}", response_model=PlantaRead)
+def update_planta_endpoint(planta_id: int, planta: PlantaUpdate, db: Session = Depends(get_session)):
+    """
+    Actualiza una planta existente.
+    """
+    db_planta = update_planta(db, planta_id, planta)
+    if db_planta is None:
+        raise HTTPException(status_code=404, detail="Planta no encontrada")
+    return db_planta
+
+@router.get("/plantas/{planta_id}/skus", response_model=List[AsignacionPlantaRead])
+def read_asignaciones_planta(planta_id: int, db: Session = Depends(get_session)):
+    """
+    Obtiene los SKUs asignados a una planta.
+    """
+    if get_planta(db, planta_id) is None:
+        raise HTTPException(status_code=404, detail="Planta no encontrada")
+    return get_asignaciones_planta(db, planta_id)
+
+@router.post("/plantas/{planta_id}/skus", response_model=AsignacionPlantaRead)
+def asignar_sku_planta_endpoint(
+    planta_id: int,
+    asignacion: AsignacionPlantaCreate,
+    db: Session = Depends(get_session)
+):
+    """
+    Asigna un SKU a una planta con su participación en la demanda y su
+    inventario en la planta.
+    """
+    if get_planta(db, planta_id) is None:
+        raise HTTPException(status_code=404, detail="Planta no encontrada")
+    if get_sku(db, asignacion.sku_id) is None:
+        raise HTTPException(status_code=404, detail="SKU no encontrado")
+    
+    try:
+        validar_participacion(
+            get_asignaciones_planta(db, sku_id=asignacion.sku_id),
+            planta_id,
+            asignacion.participacion
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return asignar_sku_planta(db, planta_id, asignacion)
+
+@router.delete("/plantas/{planta_id}/skus/{sku_id}")
+def delete_asignacion_planta_endpoint(planta_id: int, sku_id: int, db: Session = Depends(get_session)):
+    """
+    Quita un SKU de una planta.
+    """
+    success = delete_asignacion_planta(db, planta_id, sku_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Asignación no encontrada")
+    return {"success": True, "message": "SKU quitado de la planta correctamente"}
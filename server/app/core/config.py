@@ -23,6 +23,9 @@ class Settings(BaseSettings):
     # Capacidad semanal en kg de café verde
     CAPACIDAD_SEMANAL: float = float(os.getenv("CAPACIDAD_SEMANAL", "300"))
 
+    # Procesos para cálculos en paralelo (0 = número de CPUs)
+    MPS_WORKERS: int = int(os.getenv("MPS_WORKERS", "0"))
+
     # Objetivos para KPIs
     DIAS_INVENTARIO_OBJETIVO: float = float(os.getenv("DIAS_INVENTARIO_OBJETIVO", "15"))
     OBJETIVO_CUMPLIMIENTO_PLAN: float = float(
@@ -0,0 +1,111 @@
+from sqlmodel import Session, select
+from typing import List, Optional
+from datetime import datetime
+from app.models.componente import Componente, ComponenteCreate, ComponenteUpdate
+
+def get_componentes(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    activo: Optional[bool] = None
+) -> List[Componente]:
+    """
+    Obtiene la lista de componentes.
+    
+    Args:
+        db: Sesión de base de datos
+        skip: Número de registros a omitir
+        limit: Número máximo de registros a devolver
+        activo: Filtrar por estado activo
+    
+    Returns:
+        Lista de componentes
+    """
+    query = select(Componente)
+    
+    if activo is not None:
+        query = query.where(Componente.activo == activo)
+    
+    return db.exec(query.offset(skip).limit(limit)).all()
+
+def get_componente(db: Session, componente_id: int) -> Optional[Componente]:
+    """
+    Obtiene un componente por su ID.
+    
+    Args:
+        db: Sesión de base de datos
+        componente_id: ID del componente
+    
+    Returns:
+        Componente o None si no existe
+    """
+    return db.get(Componente, componente_id)
+
+def create_componente(db: Session, componente: ComponenteCreate) -> Componente:
+    """
+    Crea un nuevo componente.
+    
+    Args:
+        db: Sesión de base de datos
+        componente: Datos del componente a crear
+    
+    Returns:
+        Componente creado
+    """
+    db_componente = Componente.from_orm(componente)
+    db.add(db_componente)
+    db.commit()
+    db.refresh(db_componente)
+    return db_componente
+
+def update_componente(
+    db: Session,
+    componente_id: int,
+    componente: ComponenteUpdate
+) -> Optional[Componente]:
+    """
+    Actualiza un componente existente.
+    
+    Args:
+        db: Sesión de base de datos
+        componente_id: ID del componente a actualizar
+        componente: Datos actualizados del componente
+    
+    Returns:
+        Componente actualizado o None si no existe
+    """
+    db_componente = get_componente(db, componente_id)
+    if not db_componente:
+        return None
+    
+    for key, value in componente.dict(exclude_unset=True, exclude_none=True).items():
+        setattr(db_componente, key, value)
+    
+    db_componente.updated_at = datetime.now()
+    
+    db.add(db_componente)
+    db.commit()
+    db.refresh(db_componente)
+    return db_componente
+
+def delete_componente(db: Session, componente_id: int) -> bool:
+    """
+    Elimina un componente (baja lógica).
+    
+    Args:
+        db: Sesión de base de datos
+        componente_id: ID del componente a eliminar
+    
+    Returns:
+        True si se eliminó correctamente, False en caso contrario
+    """
+    db_componente = get_componente(db, componente_id)
+    if not db_componente:
+        return False
+    
+    db_componente.activo = False
+    db_componente.updated_at = datetime.now()
+    
+    db.add(db_componente)
+    db.commit()
+    return True
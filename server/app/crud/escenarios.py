@@ -0,0 +1,164 @@
+from sqlmodel import Session, select, delete
+from typing import List, Optional
+from datetime import datetime
+from app.models.escenario import Escenario, EscenarioCreate, EscenarioUpdate
+from app.models.ajuste_escenario import AjusteEscenario, AjusteEscenarioCreate
+
+def get_escenarios(db: Session, skip: int = 0, limit: int = 100) -> List[Escenario]:
+    """
+    Obtiene la lista de escenarios.
+    
+    Args:
+        db: Sesión de base de datos
+        skip: Número de registros a omitir
+        limit: Número máximo de registros a devolver
+    
+    Returns:
+        Lista de escenarios
+    """
+    return db.exec(select(Escenario).order_by(Escenario.id).offset(skip).limit(limit)).all()
+
+def get_escenario(db: Session, escenario_id: int) -> Optional[Escenario]:
+    """
+    Obtiene un escenario por su ID.
+    
+    Args:
+        db: Sesión de base de datos
+        escenario_id: ID del escenario
+    
+    Returns:
+        Escenario o None si no existe
+    """
+    return db.get(Escenario, escenario_id)
+
+def get_escenario_por_nombre(db: Session, nombre: str) -> Optional[Escenario]:
+    """
+    Obtiene un escenario por su nombre.
+    
+    Args:
+        db: Sesión de base de datos
+        nombre: Nombre del escenario
+    
+    Returns:
+        Escenario o None si no existe
+    """
+    return db.exec(select(Escenario).where(Escenario.nombre == nombre)).first()
+
+def create_escenario(db: Session, escenario: EscenarioCreate) -> Escenario:
+    """
+    Crea un nuevo escenario (sin ajustes).
+    
+    Args:
+        db: Sesión de base de datos
+        escenario: Datos del escenario a crear
+    
+    Returns:
+        Escenario creado
+    """
+    db_escenario = Escenario.from_orm(escenario)
+    db.add(db_escenario)
+    db.commit()
+    db.refresh(db_escenario)
+    return db_escenario
+
+def update_escenario(db: Session, escenario_id: int, escenario: EscenarioUpdate) -> Optional[Escenario]:
+    """
+    Actualiza un escenario existente.
+    
+    Args:
+        db: Sesión de base de datos
+        escenario_id: ID del escenario a actualizar
+        escenario: Datos actualizados del escenario
+    
+    Returns:
+        Escenario actualizado o None si no existe
+    """
+    db_escenario = get_escenario(db, escenario_id)
+    if not db_escenario:
+        return None
+    
+    for key, value in escenario.dict(exclude_unset=True).items():
+        setattr(db_escenario, key, value)
+    
+    db_escenario.updated_at = datetime.now()
+    
+    db.add(db_escenario)
+    db.commit()
+    db.refresh(db_escenario)
+    return db_escenario
+
+def delete_escenario(db: Session, escenario_id: int) -> bool:
+    """
+    Elimina un escenario y sus ajustes.
+    
+    Args:
+        db: Sesión de base de datos
+        escenario_id: ID del escenario a eliminar
+    
+    Returns:
+        True si se eliminó correctamente, False en caso contrario
+    """
+    db_escenario = get_escenario(db, escenario_id)
+    if not db_escenario:
+        return False
+    
+    db.exec(delete(AjusteEscenario).where(AjusteEscenario.escenario_id == escenario_id))
+    db.delete(db_escenario)
+    db.commit()
+    return True
+
+def get_ajustes_escenario(db: Session, escenario_id: int) -> List[AjusteEscenario]:
+    """
+    Obtiene los ajustes de un escenario en el orden en que se crearon.
+    
+    Args:
+        db: Sesión de base de datos
+        escenario_id: ID del escenario
+    
+    Returns:
+        Lista de ajustes
+    """
+    query = select(AjusteEscenario).where(AjusteEscenario.escenario_id == escenario_id)
+    return db.exec(query.order_by(AjusteEscenario.id)).all()
+
+def create_ajuste_escenario(
+    db: Session,
+    escenario_id: int,
+    ajuste: AjusteEscenarioCreate
+) -> AjusteEscenario:
+    """
+    Agrega un ajuste a un escenario.
+    
+    Args:
+        db: Sesión de base de datos
+        escenario_id: ID del escenario
+        ajuste: Datos del ajuste
+    
+    Returns:
+        Ajuste creado
+    """
+    db_ajuste = AjusteEscenario(escenario_id=escenario_id, **ajuste.dict())
+    db.add(db_ajuste)
+    db.commit()
+    db.refresh(db_ajuste)
+    return db_ajuste
+
+def delete_ajuste_escenario(db: Session, escenario_id: int, ajuste_id: int) -> bool:
+    """
+    Quita un ajuste de un escenario.
+    
+    Args:
+        db: Sesión de base de datos
+        escenario_id: ID del escenario
+        ajuste_id: ID del ajuste
+    
+    Returns:
+        True si se eliminó correctamente, False en caso contrario
+    """
+    db_ajuste = db.get(AjusteEscenario, ajuste_id)
+    if not db_ajuste or db_ajuste.escenario_id != escenario_id:
+        return False
+    
+    db.delete(db_ajuste)
+    db.commit()
+    return True
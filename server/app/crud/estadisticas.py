@@ -0,0 +1,169 @@
+from sqlmodel import Session, select
+from sqlalchemy import func
+from typing import Dict, List, Optional
+from datetime import date, datetime
+import numpy as np
+from app.models.estadistica_demanda import EstadisticaDemanda
+from app.models.venta import Venta
+from app.models.sku import SKU
+from app.services.parametros import obtener_parametro
+from app.utils.iso_weeks import fecha_a_semana_iso, semana_iso_a_fecha
+
+# Semanas mínimas en la ventana para usar las estadísticas
+MIN_SEMANAS_ESTADISTICAS = 4
+
+def _indice_semana(año: int, semana: int) -> int:
+    """
+    Convierte un año y semana ISO en un índice correlativo de semanas.
+    """
+    # Los lunes tienen ordinal 7k + 1, por lo que k identifica la semana
+    return semana_iso_a_fecha(año, semana).toordinal() // 7
+
+def _lunes_de_indice(indice: int) -> date:
+    """
+    Obtiene el lunes de una semana a partir de su índice correlativo.
+    """
+    return date.fromordinal(indice * 7 + 1)
+
+def get_estadisticas_demanda(
+    db: Session,
+    sku_ids: Optional[List[int]] = None
+) -> Dict[int, EstadisticaDemanda]:
+    """
+    Obtiene las estadísticas de demanda en una sola consulta.
+    
+    Args:
+        db: Sesión de base de datos
+        sku_ids: Filtrar por SKUs (opcional)
+    
+    Returns:
+        Diccionario de estadísticas por ID de SKU
+    """
+    query = select(EstadisticaDemanda)
+    
+    if sku_ids is not None:
+        query = query.where(EstadisticaDemanda.sku_id.in_(sku_ids))
+    
+    return {e.sku_id: e for e in db.exec(query).all()}
+
+def actualizar_estadisticas_demanda(db: Session, sku_id: int) -> Optional[EstadisticaDemanda]:
+    """
+    Recalcula las estadísticas de demanda de un SKU.
+    
+    Solo se agregan las ventas del SKU dentro de la ventana configurada,
+    por lo que el costo no crece con la historia del resto del catálogo.
+    La ventana termina en la semana ISO en curso (o en la última venta, si
+    es posterior) y las semanas sin ventas cuentan como demanda cero,
+    también las posteriores a la última venta: un SKU que deja de venderse
+    baja su media y su desviación.
+    
+    Args:
+        db: Sesión de base de datos
+        sku_id: ID del SKU
+    
+    Returns:
+        Estadísticas actualizadas o None si el SKU no tiene ventas
+    """
+    db_estadistica = db.get(EstadisticaDemanda, sku_id)
+    
+    # Rango de fechas con ventas
+    fecha_min, fecha_max = db.exec(
+        select(func.min(Venta.fecha), func.max(Venta.fecha)).where(Venta.sku_id == sku_id)
+    ).one()
+    
+    if fecha_min is None:
+        if db_estadistica:
+            db.delete(db_estadistica)
+            db.commit()
+        return None
+    
+    ventana = obtener_parametro("ventana_estadisticas_semanas")
+    
+    primera_semana = _indice_semana(*fecha_a_semana_iso(fecha_min))
+    ultima_semana = max(
+        _indice_semana(*fecha_a_semana_iso(fecha_max)),
+        _indice_semana(*fecha_a_semana_iso(date.today()))
+    )
+    inicio_ventana = max(primera_semana, ultima_semana - ventana + 1)
+    
+    # Ventas semanales dentro de la ventana
+    filas = db.exec(
+        select(Venta.año_iso, Venta.semana_iso, func.sum(Venta.unidades))
+        .where(Venta.sku_id == sku_id)
+        .where(Venta.fecha >= _lunes_de_indice(inicio_ventana))
+        .group_by(Venta.año_iso, Venta.semana_iso)
+    ).all()
+    
+    ventas_semanales = np.zeros(ultima_semana - inicio_ventana + 1)
+    for año, semana, unidades in filas:
+        ventas_semanales[_indice_semana(año, semana) - inicio_ventana] += unidades
+    
+    media = float(ventas_semanales.mean())
+    desviacion = float(ventas_semanales.std(ddof=1)) if len(ventas_semanales) > 1 else 0.0
+    
+    valores = {
+        "media": media,
+        "desviacion": desviacion,
+        "cv": desviacion / media if media > 0 else 0.0,
+        "semanas_historia": ultima_semana - primera_semana + 1,
+        "ventana_semanas": len(ventas_semanales),
+        "updated_at": datetime.now()
+    }
+    
+    if db_estadistica:
+        for key, value in valores.items():
+            setattr(db_estadistica, key, value)
+    else:
+        db_estadistica = EstadisticaDemanda(sku_id=sku_id, **valores)
+    
+    db.add(db_estadistica)
+    db.commit()
+    db.refresh(db_estadistica)
+    return db_estadistica
+
+def refrescar_estadisticas_demanda(db: Session, solo_faltantes: bool = False) -> int:
+    """
+    Recalcula las estadísticas de demanda de los SKUs.
+    
+    Args:
+        db: Sesión de base de datos
+        solo_faltantes: Si es True, solo calcula los SKUs sin estadísticas
+    
+    Returns:
+        Número de SKUs recalculados
+    """
+    sku_ids = db.exec(select(SKU.id)).all()
+    
+    if solo_faltantes:
+        existentes = set(get_estadisticas_demanda(db).keys())
+        sku_ids = [sku_id for sku_id in sku_ids if sku_id not in existentes]
+    
+    for sku_id in sku_ids:
+        actualizar_estadisticas_demanda(db, sku_id)
+    
+    return len(sku_ids)
+
+def refrescar_estadisticas_vencidas(db: Session) -> int:
+    """
+    Recalcula las estadísticas de demanda calculadas antes de la semana en
+    curso.
+
+    Las estadísticas se actualizan con cada venta, pero la ventana avanza
+    con las semanas aunque no haya ventas nuevas. Se ejecuta en las tareas
+    periódicas: cada SKU se recalcula como mucho una vez por semana.
+
+    Args:
+        db: Sesión de base de datos
+
+    Returns:
+        Número de SKUs recalculados
+    """
+    lunes = semana_iso_a_fecha(*fecha_a_semana_iso(date.today()))
+    sku_ids = db.exec(
+        select(EstadisticaDemanda.sku_id).where(EstadisticaDemanda.updated_at < datetime.combine(lunes, datetime.min.time()))
+    ).all()
+
+    for sku_id in sku_ids:
+        actualizar_estadisticas_demanda(db, sku_id)
+
+    return len(sku_ids)
@@ -0,0 +1,314 @@
+from sqlmodel import Session, select, update, delete
+from sqlalchemy import func, and_, or_
+from typing import List, Optional, Dict, Iterable
+from datetime import date
+from app.models.movimiento_inventario import MovimientoInventario, AjusteInventarioCreate
+from app.models.saldo_inventario import SaldoInventario
+from app.models.venta import Venta
+from app.models.produccion import Produccion
+from app.crud.lotes import registrar_ajuste_lotes
+from app.utils.iso_weeks import fecha_a_semana_iso, semana_iso_a_fecha
+
+def get_movimientos_inventario(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    sku_id: Optional[int] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None
+) -> List[MovimientoInventario]:
+    """
+    Obtiene los movimientos de inventario con filtros opcionales.
+
+    Args:
+        db: Sesión de base de datos
+        skip: Número de registros a omitir
+        limit: Número máximo de registros a devolver
+        sku_id: Filtrar por SKU
+        desde: Fecha inicial (inclusive)
+        hasta: Fecha final (inclusive)
+
+    Returns:
+        Lista de movimientos, del más reciente al más antiguo
+    """
+    query = select(MovimientoInventario)
+
+    if sku_id is not None:
+        query = query.where(MovimientoInventario.sku_id == sku_id)
+
+    if desde is not None:
+        query = query.where(MovimientoInventario.fecha >= desde)
+
+    if hasta is not None:
+        query = query.where(MovimientoInventario.fecha <= hasta)
+
+    query = query.order_by(MovimientoInventario.fecha.desc(), MovimientoInventario.id.desc())
+
+    return db.exec(query.offset(skip).limit(limit)).all()
+
+def registrar_movimiento(
+    db: Session,
+    sku_id: int,
+    fecha: date,
+    tipo: str,
+    cantidad: int,
+    origen_id: Optional[int] = None,
+    motivo: Optional[str] = None
+) -> MovimientoInventario:
+    """
+    Agrega un movimiento al libro de inventario.
+
+    Los saldos semanales posteriores a la fecha del movimiento se corrigen
+    en la misma transacción. No hace commit: el movimiento se confirma junto
+    con la venta, la producción o el ajuste que lo origina.
+
+    Args:
+        db: Sesión de base de datos
+        sku_id: ID del SKU
+        fecha: Fecha del movimiento
+        tipo: "produccion", "venta" o "ajuste"
+        cantidad: Unidades que entran (positivas) o salen (negativas)
+        origen_id: ID del registro que lo originó
+        motivo: Motivo del movimiento
+
+    Returns:
+        Movimiento registrado
+    """
+    año_iso, semana_iso = fecha_a_semana_iso(fecha)
+    db_movimiento = MovimientoInventario(
+        sku_id=sku_id,
+        fecha=fecha,
+        año_iso=año_iso,
+        semana_iso=semana_iso,
+        tipo=tipo,
+        cantidad=cantidad,
+        origen_id=origen_id,
+        motivo=motivo
+    )
+    db.add(db_movimiento)
+
+    _corregir_saldos(db, sku_id, fecha, cantidad)
+    return db_movimiento
+
+def anular_movimientos(db: Session, tipo: str, origen_id: int) -> None:
+    """
+    Elimina los movimientos de una venta o producción.
+
+    Se usa al modificar o eliminar el registro de origen. Los saldos
+    semanales posteriores se corrigen en la misma transacción (no hace
+    commit).
+
+    Args:
+        db: Sesión de base de datos
+        tipo: "produccion" o "venta"
+        origen_id: ID del registro de origen
+    """
+    movimientos = db.exec(
+        select(MovimientoInventario)
+        .where(MovimientoInventario.tipo == tipo, MovimientoInventario.origen_id == origen_id)
+    ).all()
+
+    for movimiento in movimientos:
+        _corregir_saldos(db, movimiento.sku_id, movimiento.fecha, -movimiento.cantidad)
+        db.delete(movimiento)
+
+def _corregir_saldos(db: Session, sku_id: int, fecha: date, cantidad: int) -> None:
+    """
+    Suma una cantidad a los saldos de un SKU posteriores a una fecha.
+    """
+    db.exec(
+        update(SaldoInventario)
+        .where(SaldoInventario.sku_id == sku_id, SaldoInventario.fecha > fecha)
+        .values(saldo=SaldoInventario.saldo + cantidad)
+    )
+
+def create_ajuste_inventario(db: Session, ajuste: AjusteInventarioCreate) -> MovimientoInventario:
+    """
+    Registra un ajuste de inventario.
+
+    Un ajuste positivo crea un lote y uno negativo se despacha de los lotes
+    por FEFO, de modo que los lotes siguen cuadrando con el libro.
+
+    Args:
+        db: Sesión de base de datos
+        ajuste: Datos del ajuste
+
+    Returns:
+        Movimiento de ajuste creado
+    """
+    db_movimiento = registrar_movimiento(
+        db,
+        ajuste.sku_id,
+        ajuste.fecha or date.today(),
+        "ajuste",
+        ajuste.cantidad,
+        motivo=ajuste.motivo
+    )
+    db.flush()
+    registrar_ajuste_lotes(db, db_movimiento)
+    db.commit()
+    db.refresh(db_movimiento)
+    return db_movimiento
+
+def get_saldos_inventario(
+    db: Session,
+    fecha: date,
+    sku_ids: Optional[Iterable[int]] = None
+) -> Dict[int, int]:
+    """
+    Obtiene el inventario de cada SKU al inicio de una fecha.
+
+    Para cada SKU se toma el último saldo semanal hasta la fecha y se le
+    suman los movimientos desde ese saldo, con lecturas por índice. Son dos
+    consultas para todos los SKUs, sin importar el largo de la historia.
+
+    Args:
+        db: Sesión de base de datos
+        fecha: Fecha a la que se calcula el inventario (sin sus movimientos)
+        sku_ids: SKUs a consultar (por defecto, todos los que tienen
+            movimientos)
+
+    Returns:
+        Diccionario con el inventario por SKU
+    """
+    ultimo = select(
+        SaldoInventario.sku_id,
+        func.max(SaldoInventario.fecha).label("fecha")
+    ).where(SaldoInventario.fecha <= fecha)
+    if sku_ids is not None:
+        ultimo = ultimo.where(SaldoInventario.sku_id.in_(list(sku_ids)))
+    ultimo = ultimo.group_by(SaldoInventario.sku_id).subquery()
+
+    saldos = dict(db.exec(
+        select(SaldoInventario.sku_id, SaldoInventario.saldo).join(
+            ultimo,
+            and_(SaldoInventario.sku_id == ultimo.c.sku_id, SaldoInventario.fecha == ultimo.c.fecha)
+        )
+    ).all())
+
+    deltas = select(MovimientoInventario.sku_id, func.sum(MovimientoInventario.cantidad)).outerjoin(
+        ultimo, ultimo.c.sku_id == MovimientoInventario.sku_id
+    ).where(
+        MovimientoInventario.fecha < fecha,
+        or_(ultimo.c.fecha.is_(None), MovimientoInventario.fecha >= ultimo.c.fecha)
+    )
+    if sku_ids is not None:
+        deltas = deltas.where(MovimientoInventario.sku_id.in_(list(sku_ids)))
+
+    for sku_id, cantidad in db.exec(deltas.group_by(MovimientoInventario.sku_id)).all():
+        saldos[sku_id] = saldos.get(sku_id, 0) + int(cantidad)
+
+    return saldos
+
+def get_ultima_fecha_saldo(db: Session) -> Optional[date]:
+    """
+    Obtiene la fecha del último saldo semanal guardado.
+
+    Args:
+        db: Sesión de base de datos
+
+    Returns:
+        Fecha o None si no hay saldos
+    """
+    return db.exec(select(func.max(SaldoInventario.fecha))).one()
+
+def get_movimientos_semanales(
+    db: Session,
+    desde: date,
+    hasta: date,
+    excluir_tipo: Optional[str] = None
+) -> List[tuple]:
+    """
+    Suma los movimientos por SKU y semana ISO en un rango de fechas.
+
+    Args:
+        db: Sesión de base de datos
+        desde: Fecha inicial (inclusive)
+        hasta: Fecha final (exclusive)
+        excluir_tipo: Tipo de movimiento a omitir (opcional)
+
+    Returns:
+        Lista de tuplas (sku_id, año_iso, semana_iso, cantidad)
+    """
+    query = select(
+        MovimientoInventario.sku_id,
+        MovimientoInventario.año_iso,
+        MovimientoInventario.semana_iso,
+        func.sum(MovimientoInventario.cantidad)
+    ).where(MovimientoInventario.fecha >= desde, MovimientoInventario.fecha < hasta)
+
+    if excluir_tipo is not None:
+        query = query.where(MovimientoInventario.tipo != excluir_tipo)
+
+    return db.exec(
+        query.group_by(MovimientoInventario.sku_id, MovimientoInventario.año_iso, MovimientoInventario.semana_iso)
+    ).all()
+
+def get_primera_fecha_movimiento(db: Session) -> Optional[date]:
+    """
+    Obtiene la fecha del primer movimiento de inventario.
+
+    Args:
+        db: Sesión de base de datos
+
+    Returns:
+        Fecha o None si el libro está vacío
+    """
+    return db.exec(select(func.min(MovimientoInventario.fecha))).one()
+
+def guardar_saldos_inventario(db: Session, saldos: List[SaldoInventario]) -> None:
+    """
+    Guarda un lote de saldos semanales en una sola transacción.
+
+    Args:
+        db: Sesión de base de datos
+        saldos: Saldos a guardar
+    """
+    db.add_all(saldos)
+    db.commit()
+
+def reconstruir_movimientos_inventario(db: Session) -> int:
+    """
+    Genera el libro de inventario a partir de las ventas y la producción.
+
+    Solo actúa si el libro está vacío; se usa para cargar la historia
+    registrada antes de que existiera el libro.
+
+    Args:
+        db: Sesión de base de datos
+
+    Returns:
+        Número de movimientos generados
+    """
+    if get_primera_fecha_movimiento(db) is not None:
+        return 0
+
+    db.exec(delete(SaldoInventario))
+
+    movimientos = []
+    for venta in db.exec(select(Venta)).all():
+        año_iso, semana_iso = fecha_a_semana_iso(venta.fecha)
+        movimientos.append(MovimientoInventario(
+            sku_id=venta.sku_id,
+            fecha=venta.fecha,
+            año_iso=año_iso,
+            semana_iso=semana_iso,
+            tipo="venta",
+            cantidad=-venta.unidades,
+            origen_id=venta.id
+        ))
+
+    for produccion in db.exec(select(Produccion)).all():
+        movimientos.append(MovimientoInventario(
+            sku_id=produccion.sku_id,
+            fecha=semana_iso_a_fecha(produccion.año_iso, produccion.semana_iso),
+            año_iso=produccion.año_iso,
+            semana_iso=produccion.semana_iso,
+            tipo="produccion",
+            cantidad=produccion.unidades_producidas,
+            origen_id=produccion.id
+        ))
+
+    db.add_all(movimientos)
+    db.commit()
+    return len(movimientos)
@@ -0,0 +1,73 @@
+from sqlmodel import Session, select, delete
+from sqlalchemy import func
+from typing import List, Optional, Tuple
+from datetime import date
+from app.models.kpi_diario import KpiDiario
+from app.models.kpi_recalculo import KpiRecalculo
+
+def get_ultima_fecha_kpi(db: Session) -> Optional[date]:
+    """
+    Obtiene la última fecha con KPIs materializados.
+    
+    Args:
+        db: Sesión de base de datos
+    
+    Returns:
+        Fecha o None si no hay KPIs materializados
+    """
+    return db.exec(select(func.max(KpiDiario.fecha))).one()
+
+def get_recalculo_pendiente(db: Session) -> Tuple[Optional[int], Optional[date]]:
+    """
+    Obtiene las solicitudes de recálculo de KPIs pendientes.
+    
+    Args:
+        db: Sesión de base de datos
+    
+    Returns:
+        Tupla (ID de la última solicitud, fecha más antigua a recalcular),
+        con None si no hay solicitudes
+    """
+    return db.exec(select(func.max(KpiRecalculo.id), func.min(KpiRecalculo.desde))).one()
+
+def reemplazar_kpis_diarios(
+    db: Session,
+    desde: date,
+    kpis: List[KpiDiario],
+    hasta_recalculo: Optional[int] = None
+) -> None:
+    """
+    Reemplaza los KPIs diarios desde una fecha en una sola transacción.
+    
+    Args:
+        db: Sesión de base de datos
+        desde: Primera fecha reemplazada
+        kpis: KPIs diarios calculados desde ``desde``
+        hasta_recalculo: ID de la última solicitud de recálculo atendida
+            (las posteriores quedan pendientes)
+    """
+    db.exec(delete(KpiDiario).where(KpiDiario.fecha >= desde))
+    if hasta_recalculo is not None:
+        db.exec(delete(KpiRecalculo).where(KpiRecalculo.id <= hasta_recalculo))
+    db.add_all(kpis)
+    db.commit()
+
+def invalidar_kpis_diarios(db: Session, desde: date) -> None:
+    """
+    Solicita recalcular los KPIs materializados desde una fecha.
+    
+    Se usa cuando se registran o modifican ventas o producción con fecha
+    pasada. Los KPIs guardados no se eliminan: la próxima materialización
+    los reemplaza. Si no hay días materializados desde esa fecha no se
+    registra nada.
+    
+    Args:
+        db: Sesión de base de datos
+        desde: Primera fecha afectada
+    """
+    ultima = get_ultima_fecha_kpi(db)
+    if ultima is None or desde > ultima:
+        return
+    
+    db.add(KpiRecalculo(desde=desde))
+    db.commit()
@@ -0,0 +1,123 @@
+from sqlmodel import Session, select
+from typing import List, Optional
+from datetime import datetime
+from app.models.lista_materiales import ListaMateriales, ListaMaterialesCreate, ListaMaterialesUpdate
+
+def get_lista_materiales(
+    db: Session,
+    sku_id: Optional[int] = None,
+    componente_id: Optional[int] = None
+) -> List[ListaMateriales]:
+    """
+    Obtiene las líneas de la lista de materiales.
+    
+    Args:
+        db: Sesión de base de datos
+        sku_id: Filtrar por SKU
+        componente_id: Filtrar por componente
+    
+    Returns:
+        Lista de líneas de la lista de materiales
+    """
+    query = select(ListaMateriales)
+    
+    if sku_id is not None:
+        query = query.where(ListaMateriales.sku_id == sku_id)
+    
+    if componente_id is not None:
+        query = query.where(ListaMateriales.componente_id == componente_id)
+    
+    return db.exec(query).all()
+
+def get_linea_materiales(db: Session, linea_id: int) -> Optional[ListaMateriales]:
+    """
+    Obtiene una línea de la lista de materiales por su ID.
+    
+    Args:
+        db: Sesión de base de datos
+        linea_id: ID de la línea
+    
+    Returns:
+        Línea de la lista de materiales o None si no existe
+    """
+    return db.get(ListaMateriales, linea_id)
+
+def create_linea_materiales(db: Session, linea: ListaMaterialesCreate) -> ListaMateriales:
+    """
+    Crea una línea de la lista de materiales.
+    
+    Si el SKU ya tiene una línea para el componente, se actualiza.
+    
+    Args:
+        db: Sesión de base de datos
+        linea: Datos de la línea a crear
+    
+    Returns:
+        Línea creada o actualizada
+    """
+    query = select(ListaMateriales).where(
+        ListaMateriales.sku_id == linea.sku_id,
+        ListaMateriales.componente_id == linea.componente_id
+    )
+    db_linea = db.exec(query).first()
+    
+    if db_linea:
+        db_linea.cantidad = linea.cantidad
+        db_linea.scrap = linea.scrap
+        db_linea.updated_at = datetime.now()
+    else:
+        db_linea = ListaMateriales.from_orm(linea)
+    
+    db.add(db_linea)
+    db.commit()
+    db.refresh(db_linea)
+    return db_linea
+
+def update_linea_materiales(
+    db: Session,
+    linea_id: int,
+    linea: ListaMaterialesUpdate
+) -> Optional[ListaMateriales]:
+    """
+    Actualiza una línea de la lista de materiales.
+    
+    Args:
+        db: Sesión de base de datos
+        linea_id: ID de la línea a actualizar
+        linea: Datos actualizados de la línea
+    
+    Returns:
+        Línea actualizada o None si no existe
+    """
+    db_linea = get_linea_materiales(db, linea_id)
+    if not db_linea:
+        return None
+    
+    for key, value in linea.dict(exclude_unset=True, exclude_none=True).items():
+        setattr(db_linea, key, value)
+    
+    db_linea.updated_at = datetime.now()
+    
+    db.add(db_linea)
+    db.commit()
+    db.refresh(db_linea)
+    return db_linea
+
+def delete_linea_materiales(db: Session, linea_id: int) -> bool:
+    """
+    Elimina una línea de la lista de materiales.
+    
+    Args:
+        db: Sesión de base de datos
+        linea_id: ID de la línea a eliminar
+    
+    Returns:
+        True si se eliminó correctamente, False en caso contrario
+    """
+    db_linea = get_linea_materiales(db, linea_id)
+    if not db_linea:
+        return False
+    
+    db.delete(db_linea)
+    db.commit()
+    return True
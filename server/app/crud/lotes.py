@@ -0,0 +1,446 @@
+from sqlmodel import Session, select
+from sqlalchemy import func
+from typing import List, Optional, Dict, Iterable, Tuple
+from datetime import date
+from app.models.lote import Lote
+from app.models.asignacion_lote import AsignacionLote
+from app.models.venta import Venta
+from app.models.produccion import Produccion
+from app.models.movimiento_inventario import MovimientoInventario
+from app.utils.iso_weeks import semana_iso_a_fecha
+
+def get_lotes(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    sku_id: Optional[int] = None,
+    solo_disponibles: bool = False
+) -> List[Lote]:
+    """
+    Obtiene los lotes con filtros opcionales.
+
+    Args:
+        db: Sesión de base de datos
+        skip: Número de registros a omitir
+        limit: Número máximo de registros a devolver
+        sku_id: Filtrar por SKU
+        solo_disponibles: Solo lotes con unidades restantes
+
+    Returns:
+        Lista de lotes, del tueste más antiguo al más reciente
+    """
+    query = select(Lote)
+
+    if sku_id is not None:
+        query = query.where(Lote.sku_id == sku_id)
+
+    if solo_disponibles:
+        query = query.where(Lote.restante > 0)
+
+    query = query.order_by(Lote.sku_id, Lote.fecha_tueste, Lote.id)
+
+    return db.exec(query.offset(skip).limit(limit)).all()
+
+def get_lote(db: Session, lote_id: int) -> Optional[Lote]:
+    """
+    Obtiene un lote por su ID.
+
+    Args:
+        db: Sesión de base de datos
+        lote_id: ID del lote
+
+    Returns:
+        Lote o None si no existe
+    """
+    return db.get(Lote, lote_id)
+
+def get_asignaciones_lote(db: Session, lote_id: int) -> List[AsignacionLote]:
+    """
+    Obtiene las ventas y los ajustes despachados desde un lote.
+
+    Args:
+        db: Sesión de base de datos
+        lote_id: ID del lote
+
+    Returns:
+        Lista de asignaciones del lote
+    """
+    return db.exec(
+        select(AsignacionLote).where(AsignacionLote.lote_id == lote_id).order_by(AsignacionLote.id)
+    ).all()
+
+def get_asignaciones_venta(db: Session, venta_id: int) -> List[AsignacionLote]:
+    """
+    Obtiene los lotes desde los que se despachó una venta.
+
+    Args:
+        db: Sesión de base de datos
+        venta_id: ID de la venta
+
+    Returns:
+        Lista de asignaciones de la venta
+    """
+    return db.exec(
+        select(AsignacionLote).where(AsignacionLote.venta_id == venta_id).order_by(AsignacionLote.id)
+    ).all()
+
+# Salida de unidades de un SKU: (fecha, unidades, venta_id, movimiento_id)
+Salida = Tuple[date, int, Optional[int], Optional[int]]
+
+def _salidas(ventas: Iterable[Venta], ajustes: Iterable[MovimientoInventario]) -> List[Salida]:
+    """
+    Une las ventas y los ajustes negativos de un SKU en orden de fecha.
+
+    En la misma fecha se despachan primero las ventas.
+    """
+    salidas = [(venta.fecha, venta.unidades, venta.id, None) for venta in ventas]
+    salidas += [(ajuste.fecha, -ajuste.cantidad, None, ajuste.id) for ajuste in ajustes]
+    return sorted(salidas, key=lambda salida: (salida[0], salida[2] is None, salida[2] or salida[3]))
+
+def _asignar_fefo(salidas: List[Salida], lotes: List[Lote]) -> List[AsignacionLote]:
+    """
+    Asigna salidas de un SKU a sus lotes por FEFO, en memoria.
+
+    Las salidas deben venir ordenadas por fecha y los lotes por fecha de
+    tueste: cada salida se despacha desde el lote más antiguo con unidades
+    restantes, entre los tostados hasta la fecha de la salida. Descuenta
+    las unidades asignadas de ``restante`` en cada lote.
+    """
+    asignaciones = []
+    i = 0
+    for fecha, unidades, venta_id, movimiento_id in salidas:
+        pendiente = unidades
+        while pendiente > 0 and i < len(lotes) and lotes[i].fecha_tueste <= fecha:
+            lote = lotes[i]
+            cantidad = min(pendiente, lote.restante)
+            if cantidad > 0:
+                lote.restante -= cantidad
+                asignaciones.append(AsignacionLote(
+                    venta_id=venta_id,
+                    movimiento_id=movimiento_id,
+                    lote_id=lote.id,
+                    cantidad=cantidad
+                ))
+                pendiente -= cantidad
+            if lote.restante == 0:
+                i += 1
+    return asignaciones
+
+def _query_ajustes_negativos(sku_id: int, desde: date):
+    """
+    Consulta de los ajustes de inventario negativos de un SKU desde una fecha.
+    """
+    return select(MovimientoInventario).where(
+        MovimientoInventario.sku_id == sku_id,
+        MovimientoInventario.tipo == "ajuste",
+        MovimientoInventario.cantidad < 0,
+        MovimientoInventario.fecha >= desde
+    )
+
+def reasignar_lotes_sku(
+    db: Session,
+    sku_id: int,
+    desde: date,
+    lotes_modificados: Iterable[Lote] = (),
+    excluir_venta_id: Optional[int] = None
+) -> None:
+    """
+    Vuelve a asignar por FEFO las salidas de un SKU desde una fecha.
+
+    Las salidas son las ventas y los ajustes negativos de inventario. Se
+    liberan las asignaciones de las salidas del SKU con fecha desde
+    ``desde``, se recalculan las unidades restantes de los lotes afectados
+    a partir de las asignaciones que quedan y se vuelven a asignar esas
+    salidas en orden de fecha. Así, tras cualquier alta, cambio o baja de
+    ventas, producción o ajustes, los lotes quedan como si las salidas se
+    hubieran asignado en orden, y las que antes no tenían lote toman las
+    unidades que ahora haya. No hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        sku_id: ID del SKU
+        desde: Fecha de la primera salida o lote afectado
+        lotes_modificados: Lotes cuya cantidad cambió, para recalcular sus
+            unidades restantes aunque no tengan asignaciones liberadas
+        excluir_venta_id: Venta que se va a eliminar (se liberan sus
+            asignaciones pero no se vuelve a asignar)
+    """
+    liberadas = db.exec(
+        select(AsignacionLote)
+        .join(Venta, Venta.id == AsignacionLote.venta_id)
+        .where(Venta.sku_id == sku_id, Venta.fecha >= desde)
+    ).all()
+    liberadas += db.exec(
+        select(AsignacionLote)
+        .join(MovimientoInventario, MovimientoInventario.id == AsignacionLote.movimiento_id)
+        .where(MovimientoInventario.sku_id == sku_id, MovimientoInventario.fecha >= desde)
+    ).all()
+
+    afectados = {asignacion.lote_id for asignacion in liberadas} | {lote.id for lote in lotes_modificados}
+    for asignacion in liberadas:
+        db.delete(asignacion)
+
+    if afectados:
+        asignado = dict(db.exec(
+            select(AsignacionLote.lote_id, func.sum(AsignacionLote.cantidad))
+            .where(AsignacionLote.lote_id.in_(afectados))
+            .group_by(AsignacionLote.lote_id)
+        ).all())
+        for lote in db.exec(select(Lote).where(Lote.id.in_(afectados))).all():
+            lote.restante = max(0, lote.cantidad - int(asignado.get(lote.id, 0)))
+            db.add(lote)
+
+    query_ventas = select(Venta).where(Venta.sku_id == sku_id, Venta.fecha >= desde)
+    if excluir_venta_id is not None:
+        query_ventas = query_ventas.where(Venta.id != excluir_venta_id)
+    salidas = _salidas(db.exec(query_ventas).all(), db.exec(_query_ajustes_negativos(sku_id, desde)).all())
+    if not salidas:
+        return
+
+    # Solo lotes con unidades restantes, desde el índice parcial
+    lotes = db.exec(
+        select(Lote)
+        .where(Lote.sku_id == sku_id, Lote.restante > 0, Lote.fecha_tueste <= salidas[-1][0])
+        .order_by(Lote.fecha_tueste, Lote.id)
+    ).all()
+
+    db.add_all(lotes)
+    db.add_all(_asignar_fefo(salidas, lotes))
+
+def registrar_ajuste_lotes(db: Session, movimiento: MovimientoInventario) -> Optional[Lote]:
+    """
+    Refleja en los lotes un ajuste de inventario ya guardado (con ID).
+
+    Un ajuste positivo crea un lote con la fecha del ajuste como fecha de
+    tueste; uno negativo se despacha de los lotes por FEFO como una salida
+    más. En ambos casos las salidas desde la fecha del ajuste se vuelven a
+    asignar, para que los lotes sigan cuadrando con el libro de
+    inventario. No hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        movimiento: Movimiento de ajuste
+
+    Returns:
+        Lote creado, o None si el ajuste es negativo
+    """
+    db_lote = None
+    if movimiento.cantidad > 0:
+        db_lote = Lote(
+            sku_id=movimiento.sku_id,
+            movimiento_id=movimiento.id,
+            fecha_tueste=movimiento.fecha,
+            cantidad=movimiento.cantidad,
+            restante=movimiento.cantidad
+        )
+        db.add(db_lote)
+        db.flush()
+
+    reasignar_lotes_sku(db, movimiento.sku_id, movimiento.fecha)
+    return db_lote
+
+def crear_lote_produccion(db: Session, produccion: Produccion) -> Lote:
+    """
+    Crea el lote de un registro de producción.
+
+    La fecha de tueste es el lunes de la semana producida, igual que la
+    entrada en el libro de inventario. Las salidas (ventas y ajustes
+    negativos) desde esa fecha se vuelven a asignar, para que las que no
+    tenían lote (o tomaron un lote más nuevo) pasen al lote creado. No
+    hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        produccion: Producción ya guardada (con ID)
+
+    Returns:
+        Lote creado
+    """
+    db_lote = Lote(
+        sku_id=produccion.sku_id,
+        produccion_id=produccion.id,
+        fecha_tueste=semana_iso_a_fecha(produccion.año_iso, produccion.semana_iso),
+        cantidad=produccion.unidades_producidas,
+        restante=produccion.unidades_producidas
+    )
+    db.add(db_lote)
+    db.flush()
+
+    reasignar_lotes_sku(db, db_lote.sku_id, db_lote.fecha_tueste)
+    return db_lote
+
+def actualizar_lote_produccion(db: Session, produccion: Produccion) -> Optional[Lote]:
+    """
+    Ajusta el lote de una producción modificada.
+
+    Las salidas desde la fecha de tueste anterior o la nueva (la más
+    antigua) se vuelven a asignar: si la cantidad bajó por debajo de lo ya
+    asignado, las salidas que sobran pasan a otros lotes o quedan sin lote.
+    No hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        produccion: Producción modificada
+
+    Returns:
+        Lote ajustado o None si la producción no tiene lote
+    """
+    db_lote = db.exec(select(Lote).where(Lote.produccion_id == produccion.id)).first()
+    if db_lote is None:
+        return None
+
+    fecha_anterior = db_lote.fecha_tueste
+    db_lote.fecha_tueste = semana_iso_a_fecha(produccion.año_iso, produccion.semana_iso)
+    db_lote.cantidad = produccion.unidades_producidas
+    db.add(db_lote)
+
+    reasignar_lotes_sku(db, db_lote.sku_id, min(fecha_anterior, db_lote.fecha_tueste), [db_lote])
+    return db_lote
+
+def eliminar_lote_produccion(db: Session, produccion_id: int) -> None:
+    """
+    Elimina el lote de una producción.
+
+    Las salidas despachadas desde el lote (y las posteriores) se vuelven a
+    asignar a los demás lotes. No hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        produccion_id: ID de la producción
+    """
+    db_lote = db.exec(select(Lote).where(Lote.produccion_id == produccion_id)).first()
+    if db_lote is None:
+        return
+
+    # Sin unidades, el lote no recibe asignaciones al reasignar
+    db_lote.cantidad = 0
+    db.add(db_lote)
+    reasignar_lotes_sku(db, db_lote.sku_id, db_lote.fecha_tueste, [db_lote])
+    db.delete(db_lote)
+
+def get_resumen_lotes_antiguos(
+    db: Session,
+    fecha_limite: date,
+    sku_id: Optional[int] = None
+) -> List[tuple]:
+    """
+    Resume por SKU el stock de lotes tostados antes de una fecha.
+
+    Args:
+        db: Sesión de base de datos
+        fecha_limite: Fecha de tueste límite (exclusive)
+        sku_id: Filtrar por SKU
+
+    Returns:
+        Lista de tuplas (sku_id, lotes, unidades restantes, tueste más antiguo)
+    """
+    query = select(
+        Lote.sku_id,
+        func.count(Lote.id),
+        func.sum(Lote.restante),
+        func.min(Lote.fecha_tueste)
+    ).where(Lote.restante > 0, Lote.fecha_tueste < fecha_limite)
+
+    if sku_id is not None:
+        query = query.where(Lote.sku_id == sku_id)
+
+    return db.exec(query.group_by(Lote.sku_id).order_by(Lote.sku_id)).all()
+
+def get_lotes_antiguos(
+    db: Session,
+    fecha_limite: date,
+    sku_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Lote]:
+    """
+    Obtiene los lotes con stock tostados antes de una fecha.
+
+    Args:
+        db: Sesión de base de datos
+        fecha_limite: Fecha de tueste límite (exclusive)
+        sku_id: Filtrar por SKU
+        skip: Número de registros a omitir
+        limit: Número máximo de registros a devolver
+
+    Returns:
+        Lista de lotes, del tueste más antiguo al más reciente por SKU
+    """
+    query = select(Lote).where(Lote.restante > 0, Lote.fecha_tueste < fecha_limite)
+
+    if sku_id is not None:
+        query = query.where(Lote.sku_id == sku_id)
+
+    query = query.order_by(Lote.sku_id, Lote.fecha_tueste, Lote.id)
+
+    return db.exec(query.offset(skip).limit(limit)).all()
+
+def reconstruir_lotes(db: Session) -> int:
+    """
+    Genera los lotes y sus asignaciones a partir de la producción, las
+    ventas y los ajustes de inventario registrados.
+
+    Solo actúa si no hay lotes; se usa para cargar la historia registrada
+    antes de que existieran los lotes. Cada producción y cada ajuste
+    positivo es un lote; las ventas y los ajustes negativos se asignan por
+    FEFO en orden de fecha, en memoria.
+
+    Args:
+        db: Sesión de base de datos
+
+    Returns:
+        Número de lotes generados
+    """
+    if db.exec(select(func.count(Lote.id))).one() > 0:
+        return 0
+
+    lotes = [
+        Lote(
+            sku_id=produccion.sku_id,
+            produccion_id=produccion.id,
+            fecha_tueste=semana_iso_a_fecha(produccion.año_iso, produccion.semana_iso),
+            cantidad=produccion.unidades_producidas,
+            restante=produccion.unidades_producidas
+        )
+        for produccion in db.exec(select(Produccion)).all()
+    ]
+    lotes += [
+        Lote(
+            sku_id=ajuste.sku_id,
+            movimiento_id=ajuste.id,
+            fecha_tueste=ajuste.fecha,
+            cantidad=ajuste.cantidad,
+            restante=ajuste.cantidad
+        )
+        for ajuste in db.exec(
+            select(MovimientoInventario).where(MovimientoInventario.tipo == "ajuste", MovimientoInventario.cantidad > 0)
+        ).all()
+    ]
+    if not lotes:
+        return 0
+
+    db.add_all(lotes)
+    db.flush()
+
+    lotes_por_sku: Dict[int, List[Lote]] = {}
+    for lote in sorted(lotes, key=lambda l: (l.fecha_tueste, l.id)):
+        lotes_por_sku.setdefault(lote.sku_id, []).append(lote)
+
+    ventas_por_sku: Dict[int, List[Venta]] = {}
+    for venta in db.exec(select(Venta)).all():
+        ventas_por_sku.setdefault(venta.sku_id, []).append(venta)
+
+    ajustes_por_sku: Dict[int, List[MovimientoInventario]] = {}
+    for ajuste in db.exec(
+        select(MovimientoInventario).where(MovimientoInventario.tipo == "ajuste", MovimientoInventario.cantidad < 0)
+    ).all():
+        ajustes_por_sku.setdefault(ajuste.sku_id, []).append(ajuste)
+
+    asignaciones = []
+    for sku_id in ventas_por_sku.keys() | ajustes_por_sku.keys():
+        salidas = _salidas(ventas_por_sku.get(sku_id, []), ajustes_por_sku.get(sku_id, []))
+        asignaciones += _asignar_fefo(salidas, lotes_por_sku.get(sku_id, []))
+
+    db.add_all(asignaciones)
+    db.commit()
+    return len(lotes)
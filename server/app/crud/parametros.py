@@ -2,7 +2,12 @@ from sqlmodel import Session, select
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from app.models.parametro import Parametro, ParametroUpdate
-from app.core.config import settings
+from app.services.parametros import (
+    PARAMETROS,
+    convertir_parametro,
+    cargar_parametros,
+    actualizar_cache_parametro
+)
 
 def get_parametros(db: Session) -> List[Parametro]:
     """
@@ -33,6 +38,9 @@ def update_parametro(db: Session, nombre: str, parametro: ParametroUpdate) -> Op
     """
     Actualiza un parámetro existente.
     
+    El valor se valida antes de guardarlo y, tras el commit, se reemplaza
+    en el caché de parámetros en memoria.
+    
     Args:
         db: Sesión de base de datos
         nombre: Nombre del parámetro a actualizar
@@ -40,11 +48,16 @@ def update_parametro(db: Session, nombre: str, parametro: ParametroUpdate) -> Op
     
     Returns:
         Parámetro actualizado o None si no existe
+    
+    Raises:
+        ValueError: Si el valor no es válido para el parámetro
     """
     db_parametro = get_parametro(db, nombre)
     if not db_parametro:
         return None
     
+    valor = convertir_parametro(nombre, parametro.valor)
+    
     # Actualizar valor
     db_parametro.valor = parametro.valor
     
@@ -54,11 +67,14 @@ def update_parametro(db: Session, nombre: str, parametro: ParametroUpdate) -> Op
     db.add(db_parametro)
     db.commit()
     db.refresh(db_parametro)
+    
+    actualizar_cache_parametro(nombre, valor)
     return db_parametro
 
 def inicializar_parametros(db: Session) -> None:
     """
-    Inicializa los parámetros por defecto si no existen.
+    Inicializa los parámetros por defecto si no existen y los carga en
+    memoria.
     
     Args:
         db: Sesión de base de datos
@@ -66,35 +82,11 @@ def inicializar_parametros(db: Session) -> None:
     # Definir parámetros por defecto
     parametros_default = [
         {
-            "nombre": "nivel_servicio",
-            "valor": str(settings.NIVEL_SERVICIO),
-            "descripcion": "Nivel de servicio para cálculo de stock de seguridad (0-1)"
-        },
-        {
-            "nombre": "capacidad_semanal",
-            "valor": str(settings.CAPACIDAD_SEMANAL),
-            "descripcion": "Capacidad de producción semanal en kg de café verde"
-        },
-        {
-            "nombre": "dias_inventario_objetivo",
-            "valor": str(settings.DIAS_INVENTARIO_OBJETIVO),
-            "descripcion": "Objetivo de días de inventario para KPI"
-        },
-        {
-            "nombre": "objetivo_cumplimiento_plan",
-            "valor": str(settings.OBJETIVO_CUMPLIMIENTO_PLAN),
-            "descripcion": "Objetivo de cumplimiento del plan para KPI (0-1)"
-        },
-        {
-            "nombre": "objetivo_otd",
-            "valor": str(settings.OBJETIVO_OTD),
-            "descripcion": "Objetivo de On-Time Delivery para KPI (0-1)"
-        },
-        {
-            "nombre": "objetivo_rechazos",
-            "valor": str(settings.OBJETIVO_RECHAZOS),
-            "descripcion": "Objetivo de tasa de rechazos para KPI (0-1)"
+            "nombre": nombre,
+            "valor": str(definicion["defecto"]),
+            "descripcion": definicion["descripcion"]
         }
+        for nombre, definicion in PARAMETROS.items()
     ]
     
     # Verificar y crear parámetros
@@ -105,3 +97,6 @@ def inicializar_parametros(db: Session) -> None:
             db.add(db_param)
     
     db.commit()
+    
+    # Cargar valores vigentes en memoria
+    cargar_parametros(db)
@@ -0,0 +1,98 @@
+from sqlmodel import Session, select, func
+from typing import List, Optional, Tuple
+from app.models.pedido import Pedido, PedidoCreate
+
+def get_pedidos(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    sku_id: Optional[int] = None
+) -> List[Pedido]:
+    """
+    Obtiene la lista de pedidos comprometidos.
+    
+    Args:
+        db: Sesión de base de datos
+        skip: Número de registros a omitir
+        limit: Número máximo de registros a devolver
+        sku_id: Filtrar por SKU
+    
+    Returns:
+        Lista de pedidos
+    """
+    query = select(Pedido)
+    
+    if sku_id is not None:
+        query = query.where(Pedido.sku_id == sku_id)
+    
+    query = query.order_by(Pedido.año_iso, Pedido.semana_iso)
+    
+    return db.exec(query.offset(skip).limit(limit)).all()
+
+def get_pedido(db: Session, pedido_id: int) -> Optional[Pedido]:
+    """
+    Obtiene un pedido por su ID.
+    
+    Args:
+        db: Sesión de base de datos
+        pedido_id: ID del pedido
+    
+    Returns:
+        Pedido o None si no existe
+    """
+    return db.get(Pedido, pedido_id)
+
+def create_pedido(db: Session, pedido: PedidoCreate) -> Pedido:
+    """
+    Registra un pedido comprometido.
+    
+    Args:
+        db: Sesión de base de datos
+        pedido: Datos del pedido a crear
+    
+    Returns:
+        Pedido creado
+    """
+    db_pedido = Pedido.from_orm(pedido)
+    db.add(db_pedido)
+    db.commit()
+    db.refresh(db_pedido)
+    return db_pedido
+
+def delete_pedido(db: Session, pedido_id: int) -> bool:
+    """
+    Elimina un pedido comprometido.
+    
+    Args:
+        db: Sesión de base de datos
+        pedido_id: ID del pedido a eliminar
+    
+    Returns:
+        True si se eliminó correctamente, False en caso contrario
+    """
+    db_pedido = get_pedido(db, pedido_id)
+    if not db_pedido:
+        return False
+    
+    db.delete(db_pedido)
+    db.commit()
+    return True
+
+def get_pedidos_semanales(db: Session) -> List[Tuple[int, int, int, int]]:
+    """
+    Obtiene las unidades comprometidas por SKU y semana.
+    
+    Args:
+        db: Sesión de base de datos
+    
+    Returns:
+        Lista de tuplas (sku_id, año ISO, semana ISO, unidades)
+    """
+    query = select(
+        Pedido.sku_id,
+        Pedido.año_iso,
+        Pedido.semana_iso,
+        func.sum(Pedido.cantidad)
+    ).group_by(Pedido.sku_id, Pedido.año_iso, Pedido.semana_iso)
+    
+    return db.exec(query).all()
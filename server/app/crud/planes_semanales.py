@@ -0,0 +1,165 @@
+from sqlmodel import Session, select, update
+from sqlalchemy import func, case
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, List, Optional, Tuple
+from app.models.plan_semanal import PlanSemanal
+from app.models.produccion import Produccion
+
+def _clave_plan():
+    """
+    Expresión SQL con la clave año * 100 + semana ISO del plan.
+    """
+    return PlanSemanal.año_iso * 100 + PlanSemanal.semana_iso
+
+def existe_plan_semanal(db: Session, año_iso: int, semana_iso: int) -> bool:
+    """
+    Indica si ya se congeló el plan de una semana.
+    
+    Args:
+        db: Sesión de base de datos
+        año_iso: Año ISO
+        semana_iso: Semana ISO
+    
+    Returns:
+        True si la semana tiene plan congelado
+    """
+    query = select(PlanSemanal.sku_id).where(
+        PlanSemanal.año_iso == año_iso,
+        PlanSemanal.semana_iso == semana_iso
+    )
+    return db.exec(query.limit(1)).first() is not None
+
+def congelar_plan_semanal(
+    db: Session,
+    año_iso: int,
+    semana_iso: int,
+    planificado: Dict[int, int]
+) -> int:
+    """
+    Guarda la producción planificada de una semana.
+    
+    La producción ya registrada para la semana se toma como punto de
+    partida. Si otro proceso congeló la semana primero, se conserva ese
+    plan.
+    
+    Args:
+        db: Sesión de base de datos
+        año_iso: Año ISO
+        semana_iso: Semana ISO
+        planificado: Unidades planificadas por SKU
+    
+    Returns:
+        Número de SKUs guardados
+    """
+    producido = dict(db.exec(
+        select(Produccion.sku_id, func.sum(Produccion.unidades_producidas))
+        .where(Produccion.año_iso == año_iso, Produccion.semana_iso == semana_iso)
+        .group_by(Produccion.sku_id)
+    ).all())
+    
+    db.add_all([
+        PlanSemanal(
+            año_iso=año_iso,
+            semana_iso=semana_iso,
+            sku_id=sku_id,
+            unidades_planificadas=unidades,
+            unidades_producidas=producido.get(sku_id, 0)
+        )
+        for sku_id, unidades in planificado.items()
+    ])
+    
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return 0
+    
+    return len(planificado)
+
+def registrar_produccion_plan(
+    db: Session,
+    sku_id: int,
+    año_iso: int,
+    semana_iso: int,
+    unidades: int
+) -> None:
+    """
+    Suma unidades producidas al plan congelado de un SKU y semana.
+    
+    Es una actualización por clave primaria dentro de la transacción en
+    curso (no hace commit). Si la semana no tiene plan congelado no hace
+    nada; al congelarla se toma la producción ya registrada.
+    
+    Args:
+        db: Sesión de base de datos
+        sku_id: ID del SKU
+        año_iso: Año ISO de la producción
+        semana_iso: Semana ISO de la producción
+        unidades: Unidades a sumar (negativas para descontar)
+    """
+    db.exec(
+        update(PlanSemanal)
+        .where(
+            PlanSemanal.año_iso == año_iso,
+            PlanSemanal.semana_iso == semana_iso,
+            PlanSemanal.sku_id == sku_id
+        )
+        .values(unidades_producidas=PlanSemanal.unidades_producidas + unidades)
+    )
+
+def get_planes_semanales(
+    db: Session,
+    clave_desde: int,
+    clave_hasta: int,
+    sku_id: Optional[int] = None
+) -> List[PlanSemanal]:
+    """
+    Obtiene el plan congelado y la producción de un rango de semanas.
+    
+    Args:
+        db: Sesión de base de datos
+        clave_desde: Primera semana (año * 100 + semana ISO)
+        clave_hasta: Última semana (año * 100 + semana ISO)
+        sku_id: Filtrar por SKU
+    
+    Returns:
+        Lista ordenada por semana y SKU
+    """
+    query = select(PlanSemanal).where(_clave_plan().between(clave_desde, clave_hasta))
+    
+    if sku_id is not None:
+        query = query.where(PlanSemanal.sku_id == sku_id)
+    
+    query = query.order_by(PlanSemanal.año_iso, PlanSemanal.semana_iso, PlanSemanal.sku_id)
+    
+    return db.exec(query).all()
+
+def get_cumplimiento_plan_semanal(db: Session, clave_desde: int, clave_hasta: int) -> Tuple[int, int]:
+    """
+    Suma lo planificado y lo cumplido en un rango de semanas.
+    
+    Lo cumplido de cada SKU y semana es lo producido hasta lo planificado;
+    la producción por encima del plan no compensa faltantes de otros SKUs
+    o semanas.
+    
+    Args:
+        db: Sesión de base de datos
+        clave_desde: Primera semana (año * 100 + semana ISO)
+        clave_hasta: Última semana (año * 100 + semana ISO)
+    
+    Returns:
+        Tupla (unidades planificadas, unidades cumplidas)
+    """
+    cumplido = case(
+        (PlanSemanal.unidades_producidas < PlanSemanal.unidades_planificadas, PlanSemanal.unidades_producidas),
+        else_=PlanSemanal.unidades_planificadas
+    )
+    
+    planificado, cumplido = db.exec(
+        select(
+            func.coalesce(func.sum(PlanSemanal.unidades_planificadas), 0),
+            func.coalesce(func.sum(cumplido), 0)
+        ).where(_clave_plan().between(clave_desde, clave_hasta))
+    ).one()
+    
+    return int(planificado), int(cumplido)
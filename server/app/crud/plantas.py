@@ -0,0 +1,173 @@
+from sqlmodel import Session, select
+from typing import List, Optional
+from datetime import date, datetime
+from app.models.planta import Planta, PlantaCreate, PlantaUpdate
+from app.models.asignacion_planta import AsignacionPlanta, AsignacionPlantaCreate
+
+def get_plantas(db: Session, activo: Optional[bool] = None) -> List[Planta]:
+    """
+    Obtiene la lista de plantas.
+    
+    Args:
+        db: Sesión de base de datos
+        activo: Filtrar por estado activo
+    
+    Returns:
+        Lista de plantas
+    """
+    query = select(Planta)
+    
+    if activo is not None:
+        query = query.where(Planta.activo == activo)
+    
+    return db.exec(query.order_by(Planta.id)).all()
+
+def get_planta(db: Session, planta_id: int) -> Optional[Planta]:
+    """
+    Obtiene una planta por su ID.
+    
+    Args:
+        db: Sesión de base de datos
+        planta_id: ID de la planta
+    
+    Returns:
+        Planta o None si no existe
+    """
+    return db.get(Planta, planta_id)
+
+def create_planta(db: Session, planta: PlantaCreate) -> Planta:
+    """
+    Crea una nueva planta.
+    
+    Args:
+        db: Sesión de base de datos
+        planta: Datos de la planta a crear
+    
+    Returns:
+        Planta creada
+    """
+    db_planta = Planta.from_orm(planta)
+    db.add(db_planta)
+    db.commit()
+    db.refresh(db_planta)
+    return db_planta
+
+def update_planta(db: Session, planta_id: int, planta: PlantaUpdate) -> Optional[Planta]:
+    """
+    Actualiza una planta existente.
+    
+    Args:
+        db: Sesión de base de datos
+        planta_id: ID de la planta a actualizar
+        planta: Datos actualizados de la planta
+    
+    Returns:
+        Planta actualizada o None si no existe
+    """
+    db_planta = get_planta(db, planta_id)
+    if not db_planta:
+        return None
+    
+    for key, value in planta.dict(exclude_unset=True, exclude_none=True).items():
+        setattr(db_planta, key, value)
+    
+    db_planta.updated_at = datetime.now()
+    
+    db.add(db_planta)
+    db.commit()
+    db.refresh(db_planta)
+    return db_planta
+
+def get_asignaciones_planta(
+    db: Session,
+    planta_id: Optional[int] = None,
+    sku_id: Optional[int] = None
+) -> List[AsignacionPlanta]:
+    """
+    Obtiene las asignaciones de SKUs a plantas.
+    
+    Args:
+        db: Sesión de base de datos
+        planta_id: Filtrar por planta
+        sku_id: Filtrar por SKU
+    
+    Returns:
+        Lista de asignaciones
+    """
+    query = select(AsignacionPlanta)
+    
+    if planta_id is not None:
+        query = query.where(AsignacionPlanta.planta_id == planta_id)
+    
+    if sku_id is not None:
+        query = query.where(AsignacionPlanta.sku_id == sku_id)
+    
+    return db.exec(query).all()
+
+def asignar_sku_planta(
+    db: Session,
+    planta_id: int,
+    asignacion: AsignacionPlantaCreate
+) -> AsignacionPlanta:
+    """
+    Asigna un SKU a una planta o actualiza su asignación.
+    
+    Args:
+        db: Sesión de base de datos
+        planta_id: ID de la planta
+        asignacion: Datos de la asignación
+    
+    Returns:
+        Asignación creada o actualizada
+    """
+    # El inventario contado es un saldo de apertura a su fecha (hoy si no
+    # se indica)
+    fecha_inventario = None
+    if asignacion.inventario_inicial is not None:
+        fecha_inventario = asignacion.fecha_inventario or date.today()
+    
+    query = select(AsignacionPlanta).where(
+        AsignacionPlanta.planta_id == planta_id,
+        AsignacionPlanta.sku_id == asignacion.sku_id
+    )
+    db_asignacion = db.exec(query).first()
+    
+    if db_asignacion:
+        db_asignacion.participacion = asignacion.participacion
+        db_asignacion.inventario_inicial = asignacion.inventario_inicial
+        db_asignacion.fecha_inventario = fecha_inventario
+        db_asignacion.updated_at = datetime.now()
+    else:
+        db_asignacion = AsignacionPlanta(
+            planta_id=planta_id,
+            **{**asignacion.dict(), "fecha_inventario": fecha_inventario}
+        )
+    
+    db.add(db_asignacion)
+    db.commit()
+    db.refresh(db_asignacion)
+    return db_asignacion
+
+def delete_asignacion_planta(db: Session, planta_id: int, sku_id: int) -> bool:
+    """
+    Quita un SKU de una planta.
+    
+    Args:
+        db: Sesión de base de datos
+        planta_id: ID de la planta
+        sku_id: ID del SKU
+    
+    Returns:
+        True si se eliminó correctamente, False en caso contrario
+    """
+    query = select(AsignacionPlanta).where(
+        AsignacionPlanta.planta_id == planta_id,
+        AsignacionPlanta.sku_id == sku_id
+    )
+    db_asignacion = db.exec(query).first()
+    if not db_asignacion:
+        return False
+    
+    db.delete(db_asignacion)
+    db.commit()
+    return True
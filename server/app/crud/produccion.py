@@ -1,9 +1,15 @@
 from sqlmodel import Session, select
+from sqlalchemy import func
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import pandas as pd
 from app.models.produccion import Produccion, ProduccionCreate, ProduccionUpdate
 from app.models.sku import SKU
+from app.crud.kpis_diarios import invalidar_kpis_diarios
+from app.crud.planes_semanales import registrar_produccion_plan
+from app.crud.inventario import registrar_movimiento, anular_movimientos
+from app.crud.lotes import crear_lote_produccion, actualizar_lote_produccion, eliminar_lote_produccion
+from app.utils.iso_weeks import semana_iso_a_fecha
 
 def get_producciones(
     db: Session,
@@ -94,7 +100,33 @@ def create_produccion(db: Session, produccion: ProduccionCreate) -> Produccion:
         db_produccion = Produccion.from_orm(produccion)
     
     db.add(db_produccion)
+    db.flush()
+    
+    registrar_produccion_plan(
+        db,
+        db_produccion.sku_id,
+        db_produccion.año_iso,
+        db_produccion.semana_iso,
+        db_produccion.unidades_producidas
+    )
+    
+    # Registrar la entrada en el libro de inventario el lunes de la semana
+    registrar_movimiento(
+        db,
+        db_produccion.sku_id,
+        semana_iso_a_fecha(db_produccion.año_iso, db_produccion.semana_iso),
+        "produccion",
+        db_produccion.unidades_producidas,
+        db_produccion.id
+    )
+    
+    # Crear el lote del tueste
+    crear_lote_produccion(db, db_produccion)
     db.commit()
+    
+    # Recalcular los KPIs diarios desde el inicio de la semana producida
+    invalidar_kpis_diarios(db, semana_iso_a_fecha(db_produccion.año_iso, db_produccion.semana_iso))
+    
     db.refresh(db_produccion)
     return db_produccion
 
@@ -116,6 +148,16 @@ def update_produccion(db: Session, produccion_id: int, produccion: ProduccionUpd
     
     # Actualizar campos
     produccion_data = produccion.dict(exclude_unset=True)
+    semana_anterior = semana_iso_a_fecha(db_produccion.año_iso, db_produccion.semana_iso)
+    
+    # Descontar la producción anterior del plan congelado de su semana
+    registrar_produccion_plan(
+        db,
+        db_produccion.sku_id,
+        db_produccion.año_iso,
+        db_produccion.semana_iso,
+        -db_produccion.unidades_producidas
+    )
     
     # Recalcular scrap si se actualizan kg_verde o unidades_producidas
     if "kg_verde" in produccion_data or "unidades_producidas" in produccion_data:
@@ -147,7 +189,33 @@ def update_produccion(db: Session, produccion_id: int, produccion: ProduccionUpd
     db_produccion.updated_at = datetime.now()
     
     db.add(db_produccion)
+    registrar_produccion_plan(
+        db,
+        db_produccion.sku_id,
+        db_produccion.año_iso,
+        db_produccion.semana_iso,
+        db_produccion.unidades_producidas
+    )
+    
+    # Reemplazar la entrada en el libro de inventario
+    anular_movimientos(db, "produccion", db_produccion.id)
+    registrar_movimiento(
+        db,
+        db_produccion.sku_id,
+        semana_iso_a_fecha(db_produccion.año_iso, db_produccion.semana_iso),
+        "produccion",
+        db_produccion.unidades_producidas,
+        db_produccion.id
+    )
+    
+    # Ajustar el lote del tueste
+    actualizar_lote_produccion(db, db_produccion)
     db.commit()
+    
+    # Recalcular los KPIs diarios desde la semana más antigua afectada
+    semana_nueva = semana_iso_a_fecha(db_produccion.año_iso, db_produccion.semana_iso)
+    invalidar_kpis_diarios(db, min(semana_anterior, semana_nueva))
+    
     db.refresh(db_produccion)
     return db_produccion
 
@@ -166,8 +234,22 @@ def delete_produccion(db: Session, produccion_id: int) -> bool:
     if not db_produccion:
         return False
     
+    semana = semana_iso_a_fecha(db_produccion.año_iso, db_produccion.semana_iso)
+    
+    registrar_produccion_plan(
+        db,
+        db_produccion.sku_id,
+        db_produccion.año_iso,
+        db_produccion.semana_iso,
+        -db_produccion.unidades_producidas
+    )
+    anular_movimientos(db, "produccion", db_produccion.id)
+    eliminar_lote_produccion(db, db_produccion.id)
     db.delete(db_produccion)
     db.commit()
+    
+    # Recalcular los KPIs diarios desde el inicio de la semana producida
+    invalidar_kpis_diarios(db, semana)
     return True
 
 def get_scrap_promedio(
@@ -219,3 +301,25 @@ def get_scrap_promedio(
     scrap_promedio = prod_df["scrap"].mean()
     
     return scrap_promedio if not pd.isna(scrap_promedio) else 0.05
+
+def get_scrap_promedios(db: Session, sku_ids: List[int]) -> Dict[int, float]:
+    """
+    Calcula el scrap promedio de varios SKUs con una sola consulta agrupada.
+    
+    Args:
+        db: Sesión de base de datos
+        sku_ids: IDs de los SKUs
+    
+    Returns:
+        Diccionario con el scrap promedio por SKU (0.05 si no hay datos)
+    """
+    promedios = dict(db.exec(
+        select(Produccion.sku_id, func.avg(Produccion.scrap))
+        .where(Produccion.sku_id.in_(sku_ids))
+        .group_by(Produccion.sku_id)
+    ).all()) if sku_ids else {}
+    
+    return {
+        sku_id: float(promedios[sku_id]) if promedios.get(sku_id) is not None else 0.05
+        for sku_id in sku_ids
+    }
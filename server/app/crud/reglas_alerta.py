@@ -0,0 +1,117 @@
+from sqlmodel import Session, select
+from typing import List, Optional
+from datetime import datetime
+from app.models.regla_alerta import ReglaAlerta, ReglaAlertaCreate, ReglaAlertaUpdate
+from app.services.alertas import REGLAS_ALERTA_DEFAULT
+
+def get_reglas_alerta(db: Session, activo: Optional[bool] = None) -> List[ReglaAlerta]:
+    """
+    Obtiene las reglas de alerta en orden de creación.
+    
+    Args:
+        db: Sesión de base de datos
+        activo: Filtrar por estado activo
+    
+    Returns:
+        Lista de reglas de alerta
+    """
+    query = select(ReglaAlerta)
+    
+    if activo is not None:
+        query = query.where(ReglaAlerta.activo == activo)
+    
+    return db.exec(query.order_by(ReglaAlerta.id)).all()
+
+def get_regla_alerta(db: Session, regla_id: int) -> Optional[ReglaAlerta]:
+    """
+    Obtiene una regla de alerta por su ID.
+    
+    Args:
+        db: Sesión de base de datos
+        regla_id: ID de la regla
+    
+    Returns:
+        Regla de alerta o None si no existe
+    """
+    return db.get(ReglaAlerta, regla_id)
+
+def create_regla_alerta(db: Session, regla: ReglaAlertaCreate) -> ReglaAlerta:
+    """
+    Crea una nueva regla de alerta.
+    
+    Args:
+        db: Sesión de base de datos
+        regla: Datos de la regla a crear
+    
+    Returns:
+        Regla de alerta creada
+    """
+    db_regla = ReglaAlerta.from_orm(regla)
+    db.add(db_regla)
+    db.commit()
+    db.refresh(db_regla)
+    return db_regla
+
+def update_regla_alerta(
+    db: Session,
+    regla_id: int,
+    regla: ReglaAlertaUpdate
+) -> Optional[ReglaAlerta]:
+    """
+    Actualiza una regla de alerta existente.
+    
+    Args:
+        db: Sesión de base de datos
+        regla_id: ID de la regla a actualizar
+        regla: Datos actualizados de la regla
+    
+    Returns:
+        Regla de alerta actualizada o None si no existe
+    """
+    db_regla = get_regla_alerta(db, regla_id)
+    if not db_regla:
+        return None
+    
+    for key, value in regla.dict(exclude_unset=True).items():
+        setattr(db_regla, key, value)
+    
+    db_regla.updated_at = datetime.now()
+    
+    db.add(db_regla)
+    db.commit()
+    db.refresh(db_regla)
+    return db_regla
+
+def delete_regla_alerta(db: Session, regla_id: int) -> bool:
+    """
+    Elimina una regla de alerta.
+    
+    Args:
+        db: Sesión de base de datos
+        regla_id: ID de la regla a eliminar
+    
+    Returns:
+        True si se eliminó correctamente, False en caso contrario
+    """
+    db_regla = get_regla_alerta(db, regla_id)
+    if not db_regla:
+        return False
+    
+    db.delete(db_regla)
+    db.commit()
+    return True
+
+def inicializar_reglas_alerta(db: Session) -> None:
+    """
+    Crea las reglas de alerta por defecto si la tabla está vacía.
+    
+    Args:
+        db: Sesión de base de datos
+    """
+    if db.exec(select(ReglaAlerta.id)).first() is not None:
+        return
+    
+    for regla in REGLAS_ALERTA_DEFAULT:
+        db.add(ReglaAlerta(**regla))
+    
+    db.commit()
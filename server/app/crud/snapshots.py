@@ -0,0 +1,129 @@
+from sqlmodel import Session, select
+from typing import List, Optional
+from datetime import datetime
+from app.models.mps_snapshot import MPSSnapshot, MPSSnapshotRead
+
+def get_snapshots(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100
+) -> List[MPSSnapshotRead]:
+    """
+    Obtiene la lista de snapshots del MPS sin cargar sus datos.
+    
+    Args:
+        db: Sesión de base de datos
+        skip: Número de registros a omitir
+        limit: Número máximo de registros a devolver
+    
+    Returns:
+        Lista de snapshots, del más reciente al más antiguo
+    """
+    query = select(
+        MPSSnapshot.id,
+        MPSSnapshot.descripcion,
+        MPSSnapshot.n_skus,
+        MPSSnapshot.n_semanas,
+        MPSSnapshot.tamaño_bytes,
+        MPSSnapshot.created_at
+    ).order_by(MPSSnapshot.created_at.desc(), MPSSnapshot.id.desc())
+    
+    return [
+        MPSSnapshotRead(**fila._mapping)
+        for fila in db.exec(query.offset(skip).limit(limit)).all()
+    ]
+
+def get_snapshot(db: Session, snapshot_id: int) -> Optional[MPSSnapshot]:
+    """
+    Obtiene un snapshot del MPS por su ID.
+    
+    Args:
+        db: Sesión de base de datos
+        snapshot_id: ID del snapshot
+    
+    Returns:
+        Snapshot o None si no existe
+    """
+    return db.get(MPSSnapshot, snapshot_id)
+
+def get_ultimo_snapshot(db: Session, antes_de: Optional[datetime] = None) -> Optional[MPSSnapshot]:
+    """
+    Obtiene el snapshot del MPS más reciente.
+    
+    Args:
+        db: Sesión de base de datos
+        antes_de: Considerar solo snapshots creados antes de esta fecha (opcional)
+    
+    Returns:
+        Snapshot o None si no hay ninguno
+    """
+    query = select(MPSSnapshot).order_by(MPSSnapshot.created_at.desc(), MPSSnapshot.id.desc())
+    
+    if antes_de is not None:
+        query = query.where(MPSSnapshot.created_at < antes_de)
+    
+    return db.exec(query.limit(1)).first()
+
+def get_ultimo_snapshot_id(db: Session) -> Optional[int]:
+    """
+    Obtiene el ID del snapshot del MPS más reciente sin cargar sus datos.
+    
+    Args:
+        db: Sesión de base de datos
+    
+    Returns:
+        ID del snapshot o None si no hay ninguno
+    """
+    query = select(MPSSnapshot.id).order_by(MPSSnapshot.created_at.desc(), MPSSnapshot.id.desc())
+    return db.exec(query.limit(1)).first()
+
+def get_primer_snapshot(db: Session, desde: datetime, hasta: datetime) -> Optional[MPSSnapshot]:
+    """
+    Obtiene el primer snapshot del MPS publicado en un intervalo.
+    
+    Args:
+        db: Sesión de base de datos
+        desde: Inicio del intervalo (inclusive)
+        hasta: Fin del intervalo (exclusive)
+    
+    Returns:
+        Snapshot o None si no se publicó ninguno en el intervalo
+    """
+    query = select(MPSSnapshot).where(
+        MPSSnapshot.created_at >= desde,
+        MPSSnapshot.created_at < hasta
+    ).order_by(MPSSnapshot.created_at, MPSSnapshot.id)
+    
+    return db.exec(query.limit(1)).first()
+
+def create_snapshot(
+    db: Session,
+    datos: bytes,
+    n_skus: int,
+    n_semanas: int,
+    descripcion: Optional[str] = None
+) -> MPSSnapshot:
+    """
+    Crea un snapshot del MPS.
+    
+    Args:
+        db: Sesión de base de datos
+        datos: Plan serializado y comprimido
+        n_skus: Número de SKUs del plan
+        n_semanas: Número de semanas del plan
+        descripcion: Descripción del snapshot (opcional)
+    
+    Returns:
+        Snapshot creado
+    """
+    db_snapshot = MPSSnapshot(
+        descripcion=descripcion,
+        n_skus=n_skus,
+        n_semanas=n_semanas,
+        tamaño_bytes=len(datos),
+        datos=datos
+    )
+    db.add(db_snapshot)
+    db.commit()
+    db.refresh(db_snapshot)
+    return db_snapshot
@@ -1,9 +1,14 @@
 from sqlmodel import Session, select
-from typing import List, Optional, Dict, Any
+from sqlalchemy import func
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import date, datetime, timedelta
 import pandas as pd
 from app.models.venta import Venta, VentaCreate, VentaUpdate
 from app.utils.iso_weeks import fecha_a_semana_iso
+from app.crud.estadisticas import actualizar_estadisticas_demanda
+from app.crud.kpis_diarios import invalidar_kpis_diarios
+from app.crud.inventario import registrar_movimiento, anular_movimientos
+from app.crud.lotes import reasignar_lotes_sku
 
 def get_ventas(
     db: Session,
@@ -89,7 +94,21 @@ def create_venta(db: Session, venta: VentaCreate) -> Venta:
         db_venta = Venta.from_orm(venta)
     
     db.add(db_venta)
+    db.flush()
+    
+    # Registrar la salida en el libro de inventario
+    registrar_movimiento(db, db_venta.sku_id, db_venta.fecha, "venta", -db_venta.unidades, db_venta.id)
+    
+    # Despachar desde los lotes más antiguos (FEFO) la venta y las posteriores
+    reasignar_lotes_sku(db, db_venta.sku_id, db_venta.fecha)
     db.commit()
+    
+    # Actualizar estadísticas de demanda del SKU
+    actualizar_estadisticas_demanda(db, db_venta.sku_id)
+    
+    # Recalcular los KPIs diarios desde la fecha de la venta
+    invalidar_kpis_diarios(db, db_venta.fecha)
+    
     db.refresh(db_venta)
     return db_venta
 
@@ -111,6 +130,7 @@ def update_venta(db: Session, venta_id: int, venta: VentaUpdate) -> Optional[Ven
     
     # Actualizar campos
     venta_data = venta.dict(exclude_unset=True)
+    fecha_anterior = db_venta.fecha
     
     # Si se actualiza la fecha, recalcular semana ISO
     if "fecha" in venta_data:
@@ -125,7 +145,21 @@ def update_venta(db: Session, venta_id: int, venta: VentaUpdate) -> Optional[Ven
     db_venta.updated_at = datetime.now()
     
     db.add(db_venta)
+    
+    # Reemplazar la salida en el libro de inventario
+    anular_movimientos(db, "venta", db_venta.id)
+    registrar_movimiento(db, db_venta.sku_id, db_venta.fecha, "venta", -db_venta.unidades, db_venta.id)
+    
+    # Volver a despachar desde los lotes las ventas desde la fecha más antigua
+    reasignar_lotes_sku(db, db_venta.sku_id, min(fecha_anterior, db_venta.fecha))
     db.commit()
+    
+    # Actualizar estadísticas de demanda del SKU
+    actualizar_estadisticas_demanda(db, db_venta.sku_id)
+    
+    # Recalcular los KPIs diarios desde la fecha más antigua afectada
+    invalidar_kpis_diarios(db, min(fecha_anterior, db_venta.fecha))
+    
     db.refresh(db_venta)
     return db_venta
 
@@ -144,8 +178,20 @@ def delete_venta(db: Session, venta_id: int) -> bool:
     if not db_venta:
         return False
     
+    sku_id = db_venta.sku_id
+    fecha = db_venta.fecha
+    
+    anular_movimientos(db, "venta", db_venta.id)
+    # Liberar sus lotes y volver a despachar las ventas posteriores
+    reasignar_lotes_sku(db, sku_id, fecha, excluir_venta_id=db_venta.id)
     db.delete(db_venta)
     db.commit()
+    
+    # Actualizar estadísticas de demanda del SKU
+    actualizar_estadisticas_demanda(db, sku_id)
+    
+    # Recalcular los KPIs diarios desde la fecha de la venta
+    invalidar_kpis_diarios(db, fecha)
     return True
 
 def get_ventas_semanales(db: Session) -> List[Dict[str, Any]]:
@@ -184,3 +230,33 @@ def get_ventas_semanales(db: Session) -> List[Dict[str, Any]]:
     
     # Convertir a lista de diccionarios
     return ventas_semanales.to_dict(orient="records")
+
+def get_ventas_por_semana(
+    db: Session,
+    fecha_inicio: date,
+    fecha_fin: date
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Obtiene las unidades vendidas por SKU y semana en un rango de fechas.
+    
+    La agregación se hace en la base de datos.
+    
+    Args:
+        db: Sesión de base de datos
+        fecha_inicio: Fecha inicial (inclusive)
+        fecha_fin: Fecha final (exclusive)
+    
+    Returns:
+        Lista de tuplas (sku_id, año ISO, semana ISO, unidades)
+    """
+    query = select(
+        Venta.sku_id,
+        Venta.año_iso,
+        Venta.semana_iso,
+        func.sum(Venta.unidades)
+    ).where(
+        Venta.fecha >= fecha_inicio,
+        Venta.fecha < fecha_fin
+    ).group_by(Venta.sku_id, Venta.año_iso, Venta.semana_iso)
+    
+    return db.exec(query).all()
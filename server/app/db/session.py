@@ -1,5 +1,7 @@
 from sqlmodel import SQLModel, create_engine, Session
 from app.core.config import settings
+from app.db import version  # Registra los eventos que versionan los datos de los KPIs
+from app.services.parametros import sincronizar_parametros
 import os
 
 # Crear motor de base de datos
@@ -12,8 +14,12 @@ engine = create_engine(
 def get_session():
     """
     Generador de sesiones de base de datos.
+    
+    Antes de entregar la sesión se sincroniza el caché de parámetros con
+    la base de datos, por si otro proceso los modificó.
     """
     with Session(engine) as session:
+        sincronizar_parametros(session)
         yield session
 
 def create_db_and_tables():
@@ -25,11 +31,60 @@ def create_db_and_tables():
     from app.models.venta import Venta
     from app.models.produccion import Produccion
     from app.models.parametro import Parametro
+    from app.models.estadistica_demanda import EstadisticaDemanda
+    from app.models.mps_snapshot import MPSSnapshot
+    from app.models.componente import Componente
+    from app.models.lista_materiales import ListaMateriales
+    from app.models.planta import Planta
+    from app.models.asignacion_planta import AsignacionPlanta
+    from app.models.pedido import Pedido
+    from app.models.regla_alerta import ReglaAlerta
+    from app.models.escenario import Escenario
+    from app.models.ajuste_escenario import AjusteEscenario
+    from app.models.kpi_diario import KpiDiario
+    from app.models.kpi_recalculo import KpiRecalculo
+    from app.models.plan_semanal import PlanSemanal
+    from app.models.movimiento_inventario import MovimientoInventario
+    from app.models.saldo_inventario import SaldoInventario
+    from app.models.lote import Lote
+    from app.models.asignacion_lote import AsignacionLote
+    from app.models.version_datos import VersionDatos
     
     # Crear tablas
     SQLModel.metadata.create_all(engine)
     
-    # Inicializar parámetros por defecto
     with Session(engine) as session:
+        # Crear la fila de la versión compartida de los datos de los KPIs
+        version.inicializar_version_datos(session)
+        
+        # Inicializar parámetros por defecto
         from app.crud.parametros import inicializar_parametros
         inicializar_parametros(session)
+        
+        # Inicializar reglas de alerta por defecto
+        from app.crud.reglas_alerta import inicializar_reglas_alerta
+        inicializar_reglas_alerta(session)
+        
+        # Materializar estadísticas de demanda que aún no existan
+        from app.crud.estadisticas import refrescar_estadisticas_demanda
+        refrescar_estadisticas_demanda(session, solo_faltantes=True)
+        
+        # Cargar en el libro de inventario la historia previa y consolidar
+        # los saldos semanales que falten
+        from app.crud.inventario import reconstruir_movimientos_inventario
+        from app.services.inventario import consolidar_saldos_inventario
+        reconstruir_movimientos_inventario(session)
+        consolidar_saldos_inventario(session)
+        
+        # Generar los lotes de la producción registrada antes de que
+        # existieran los lotes
+        from app.crud.lotes import reconstruir_lotes
+        reconstruir_lotes(session)
+        
+        # Congelar el plan de la semana en curso desde los snapshots
+        from app.services.adherencia import congelar_plan_semana_actual
+        congelar_plan_semana_actual(session)
+        
+        # Materializar los KPIs de los días cerrados que aún no existan
+        from app.services.kpis import materializar_kpis_diarios
+        materializar_kpis_diarios(session)
@@ -0,0 +1,81 @@
+from itertools import chain
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session, ORMExecuteState
+from app.models.version_datos import VersionDatos
+
+# Tablas cuyos cambios modifican los KPIs del dashboard, el inventario
+# inicial del MPS o el ATP (libro de inventario y pedidos)
+TABLAS_KPI = {"venta", "produccion", "plan_semanal", "parametro", "movimiento_inventario", "pedido"}
+
+def inicializar_version_datos(session: Session) -> None:
+    """
+    Crea la fila de la versión de los datos si no existe.
+
+    Args:
+        session: Sesión de base de datos
+    """
+    if session.get(VersionDatos, 1) is None:
+        session.add(VersionDatos(id=1, version=0))
+        session.commit()
+
+def version_datos(session: Session) -> int:
+    """
+    Obtiene la versión vigente de los datos de los KPIs.
+
+    La versión se guarda en la base de datos, así que refleja los commits
+    de cualquier proceso.
+
+    Args:
+        session: Sesión de base de datos
+
+    Returns:
+        Número de versión (cambia tras cada commit que afecta los KPIs)
+    """
+    version = session.execute(select(VersionDatos.version).where(VersionDatos.id == 1)).scalar()
+    return version or 0
+
+def _tablas_modificadas(session: Session) -> set:
+    """
+    Conjunto de tablas modificadas en la transacción en curso de la sesión.
+    """
+    return session.info.setdefault("tablas_modificadas", set())
+
+@event.listens_for(Session, "after_flush")
+def _registrar_flush(session: Session, flush_context) -> None:
+    """
+    Anota las tablas de los objetos insertados, modificados o eliminados.
+    """
+    _tablas_modificadas(session).update(
+        obj.__tablename__ for obj in chain(session.new, session.dirty, session.deleted)
+    )
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_sentencia(estado: ORMExecuteState) -> None:
+    """
+    Anota la tabla de las sentencias UPDATE y DELETE masivas.
+    """
+    if estado.is_update or estado.is_delete:
+        _tablas_modificadas(estado.session).add(estado.statement.table.name)
+
+@event.listens_for(Session, "before_commit")
+def _aumentar_version(session: Session) -> None:
+    """
+    Aumenta la versión en la misma transacción si se tocaron tablas de
+    KPIs. Los cambios pendientes se envían antes para conocer sus tablas.
+    """
+    session.flush()
+    if session.info.pop("tablas_modificadas", set()) & TABLAS_KPI:
+        session.execute(
+            update(VersionDatos)
+            .where(VersionDatos.id == 1)
+            .values(version=VersionDatos.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        session.info.pop("tablas_modificadas", None)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_cambios(session: Session, transaccion) -> None:
+    """
+    Olvida las tablas anotadas de una transacción revertida.
+    """
+    session.info.pop("tablas_modificadas", None)
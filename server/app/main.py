@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -10,9 +11,18 @@ from app.api.routes import (
     mps,
     kpis,
     parametros,
+    estadisticas,
+    mrp,
+    plantas,
+    atp,
+    alertas,
+    escenarios,
+    inventario,
+    lotes,
 )
 from app.db.session import create_db_and_tables
 from app.core.config import settings
+from app.services.tareas import ejecutar_tareas_periodicas
 
 # Crear la aplicación FastAPI
 app = FastAPI(
@@ -38,6 +48,14 @@ app.include_router(pronostico.router, prefix="/api/v1", tags=["Pronóstico"])
 app.include_router(mps.router, prefix="/api/v1", tags=["MPS"])
 app.include_router(kpis.router, prefix="/api/v1", tags=["KPIs"])
 app.include_router(parametros.router, prefix="/api/v1", tags=["Parámetros"])
+app.include_router(estadisticas.router, prefix="/api/v1", tags=["Estadísticas"])
+app.include_router(mrp.router, prefix="/api/v1", tags=["MRP"])
+app.include_router(plantas.router, prefix="/api/v1", tags=["Plantas"])
+app.include_router(atp.router, prefix="/api/v1", tags=["ATP"])
+app.include_router(alertas.router, prefix="/api/v1", tags=["Alertas"])
+app.include_router(escenarios.router, prefix="/api/v1", tags=["Escenarios"])
+app.include_router(inventario.router, prefix="/api/v1", tags=["Inventario"])
+app.include_router(lotes.router, prefix="/api/v1", tags=["Lotes"])
 
 # Endpoint de verificación de salud
 @app.get("/health", tags=["Health"])
@@ -57,10 +75,21 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": f"Error interno del servidor: {str(exc)}"},
     )
 
+# Tareas de fondo (KPIs diarios, congelamiento del plan semanal y saldos de inventario)
+tareas_fondo = []
+
 # Evento de inicio
 @app.on_event("startup")
 async def startup_event():
     create_db_and_tables()
+    tareas_fondo.append(asyncio.create_task(ejecutar_tareas_periodicas()))
+
+# Evento de cierre
+@app.on_event("shutdown")
+async def shutdown_event():
+    for tarea in tareas_fondo:
+        tarea.cancel()
+    tareas_fondo.clear()
 
 if __name__ == "__main__":
     import uvicorn
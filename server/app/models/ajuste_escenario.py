@@ -0,0 +1,49 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class AjusteEscenarioBase(SQLModel):
+    """
+    Modelo base para un ajuste de un escenario sobre los datos del MPS.
+
+    Tipos de ajuste:
+
+    - ``parametro``: sobrescribe el parámetro ``clave`` (``capacidad_semanal``,
+      ``nivel_servicio``, ``scrap`` o ``nivelar``); el scrap puede ser de un
+      solo SKU.
+    - ``demanda``: suma ``valor`` unidades a la demanda del SKU.
+    - ``produccion_extra``: suma ``valor`` unidades de producción ya
+      comprometida del SKU.
+
+    Sin semana, los ajustes de demanda y producción se aplican a todas las
+    semanas del horizonte.
+    """
+    tipo: str = Field(index=True)
+    clave: Optional[str] = Field(default=None)
+    sku_id: Optional[int] = Field(default=None, foreign_key="sku.id")
+    semana: Optional[str] = Field(default=None, description="Semana en formato YYYY-SWW")
+    valor: float
+
+class AjusteEscenario(AjusteEscenarioBase, table=True):
+    """
+    Modelo de ajuste de escenario para la base de datos.
+    """
+    __tablename__ = "ajuste_escenario"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    escenario_id: int = Field(foreign_key="escenario.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+class AjusteEscenarioCreate(AjusteEscenarioBase):
+    """
+    Modelo para crear un ajuste de escenario.
+    """
+    pass
+
+class AjusteEscenarioRead(AjusteEscenarioBase):
+    """
+    Modelo para leer un ajuste de escenario.
+    """
+    id: int
+    escenario_id: int
+    created_at: datetime
@@ -0,0 +1,31 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class AsignacionLoteBase(SQLModel):
+    """
+    Modelo base para las unidades despachadas desde un lote.
+
+    Las unidades salen por una venta o por un ajuste negativo de inventario
+    (el movimiento del ajuste); cada asignación tiene uno de los dos.
+    """
+    venta_id: Optional[int] = Field(default=None, foreign_key="venta.id", index=True)
+    movimiento_id: Optional[int] = Field(default=None, foreign_key="movimiento_inventario.id", index=True)
+    lote_id: int = Field(foreign_key="lote.id", index=True)
+    cantidad: int = Field(gt=0)
+
+class AsignacionLote(AsignacionLoteBase, table=True):
+    """
+    Modelo de asignación de lote para la base de datos.
+    """
+    __tablename__ = "asignacion_lote"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+class AsignacionLoteRead(AsignacionLoteBase):
+    """
+    Modelo para leer una asignación de lote.
+    """
+    id: int
+    created_at: datetime
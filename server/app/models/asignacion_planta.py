@@ -0,0 +1,46 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint
+from typing import Optional
+from datetime import date, datetime
+
+class AsignacionPlantaBase(SQLModel):
+    """
+    Modelo base para la asignación de un SKU a una planta.
+    """
+    sku_id: int = Field(foreign_key="sku.id", index=True)
+    planta_id: int = Field(foreign_key="planta.id", index=True)
+    participacion: float = Field(default=1.0, gt=0, le=1, description="Fracción de la demanda del SKU que atiende la planta")
+    inventario_inicial: Optional[int] = Field(default=None, ge=0, description="Inventario del SKU contado en la planta")
+    fecha_inventario: Optional[date] = Field(default=None, description="Fecha (al inicio del día) en que se contó el inventario de la planta")
+
+class AsignacionPlanta(AsignacionPlantaBase, table=True):
+    """
+    Modelo de asignación de SKU a planta para la base de datos.
+
+    Un SKU se asigna una sola vez a cada planta.
+    """
+    __tablename__ = "asignacion_planta"
+    __table_args__ = (
+        UniqueConstraint("sku_id", "planta_id", name="uq_asignacion_planta_sku_planta"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class AsignacionPlantaCreate(SQLModel):
+    """
+    Modelo para asignar un SKU a una planta.
+    """
+    sku_id: int
+    participacion: float = Field(default=1.0, gt=0, le=1)
+    inventario_inicial: Optional[int] = Field(default=None, ge=0)
+    fecha_inventario: Optional[date] = None
+
+class AsignacionPlantaRead(AsignacionPlantaBase):
+    """
+    Modelo para leer una asignación de SKU a planta.
+    """
+    id: int
+    created_at: datetime
+    updated_at: datetime
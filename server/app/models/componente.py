@@ -0,0 +1,45 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class ComponenteBase(SQLModel):
+    """
+    Modelo base para Componente (café verde, bolsas, válvulas, etiquetas).
+    """
+    nombre: str = Field(index=True)
+    tipo: str = Field(default="cafe_verde", description="cafe_verde, empaque, etiqueta u otro")
+    unidad: str = Field(default="kg", description="Unidad de medida del componente")
+    lead_time_semanas: int = Field(default=0, ge=0, description="Tiempo de abastecimiento en semanas")
+    activo: bool = Field(default=True)
+
+class Componente(ComponenteBase, table=True):
+    """
+    Modelo de Componente para la base de datos.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class ComponenteCreate(ComponenteBase):
+    """
+    Modelo para crear un Componente.
+    """
+    pass
+
+class ComponenteUpdate(SQLModel):
+    """
+    Modelo para actualizar un Componente.
+    """
+    nombre: Optional[str] = None
+    tipo: Optional[str] = None
+    unidad: Optional[str] = None
+    lead_time_semanas: Optional[int] = Field(default=None, ge=0)
+    activo: Optional[bool] = None
+
+class ComponenteRead(ComponenteBase):
+    """
+    Modelo para leer un Componente.
+    """
+    id: int
+    created_at: datetime
+    updated_at: datetime
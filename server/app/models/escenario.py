@@ -0,0 +1,43 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class EscenarioBase(SQLModel):
+    """
+    Modelo base para Escenario de planificación.
+    """
+    nombre: str = Field(index=True, unique=True)
+    descripcion: Optional[str] = Field(default=None)
+
+class Escenario(EscenarioBase, table=True):
+    """
+    Modelo de Escenario para la base de datos.
+
+    El escenario no copia datos: solo guarda sus ajustes
+    (``AjusteEscenario``), que se aplican sobre los datos vigentes al
+    calcular el MPS.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class EscenarioCreate(EscenarioBase):
+    """
+    Modelo para crear un Escenario.
+    """
+    pass
+
+class EscenarioUpdate(SQLModel):
+    """
+    Modelo para actualizar un Escenario.
+    """
+    nombre: Optional[str] = None
+    descripcion: Optional[str] = None
+
+class EscenarioRead(EscenarioBase):
+    """
+    Modelo para leer un Escenario.
+    """
+    id: int
+    created_at: datetime
+    updated_at: datetime
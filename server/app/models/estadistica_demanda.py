@@ -0,0 +1,27 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class EstadisticaDemandaBase(SQLModel):
+    """
+    Modelo base para Estadística de Demanda.
+    """
+    sku_id: int = Field(foreign_key="sku.id", primary_key=True)
+    media: float = Field(description="Demanda semanal media en unidades")
+    desviacion: float = Field(description="Desviación estándar de la demanda semanal")
+    cv: float = Field(description="Coeficiente de variación")
+    semanas_historia: int = Field(description="Semanas de historia de ventas")
+    ventana_semanas: int = Field(description="Semanas usadas en el cálculo")
+
+class EstadisticaDemanda(EstadisticaDemandaBase, table=True):
+    """
+    Modelo de Estadística de Demanda para la base de datos.
+    """
+    __tablename__ = "estadistica_demanda"
+
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class EstadisticaDemandaRead(EstadisticaDemandaBase):
+    """
+    Modelo para leer una Estadística de Demanda.
+    """
+    updated_at: datetime
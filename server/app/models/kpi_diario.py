@@ -0,0 +1,31 @@
+from sqlmodel import SQLModel, Field
+from datetime import date, datetime
+
+class KpiDiarioBase(SQLModel):
+    """
+    Modelo base para los KPIs materializados de un día.
+    """
+    fecha: date = Field(primary_key=True)
+    año_iso: int = Field(index=True)
+    semana_iso: int = Field()
+    dias_inventario: float = Field(description="Días de inventario al cierre del día")
+    cumplimiento_plan: float = Field(description="Cumplimiento del plan (0-1)")
+    otd: float = Field(description="On-Time Delivery (0-1)")
+    rechazos: float = Field(description="Tasa de rechazos (0-1)")
+
+class KpiDiario(KpiDiarioBase, table=True):
+    """
+    Modelo de KPIs diarios para la base de datos.
+
+    Cada fila se calcula una sola vez con los KPIs a esa fecha de corte y
+    se recalcula si cambian las ventas o la producción que la afectan.
+    """
+    __tablename__ = "kpi_diario"
+
+    created_at: datetime = Field(default_factory=datetime.now)
+
+class KpiDiarioRead(KpiDiarioBase):
+    """
+    Modelo para leer los KPIs de un día.
+    """
+    created_at: datetime
@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import date, datetime
+
+class KpiRecalculo(SQLModel, table=True):
+    """
+    Solicitud de recálculo de los KPIs diarios desde una fecha.
+
+    Se registra al modificar ventas o producción con fecha pasada; la
+    materialización recalcula los días desde la fecha más antigua pendiente
+    y elimina las solicitudes atendidas. Los KPIs guardados siguen
+    disponibles mientras tanto.
+    """
+    __tablename__ = "kpi_recalculo"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    desde: date = Field()
+    created_at: datetime = Field(default_factory=datetime.now)
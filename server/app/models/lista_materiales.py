@@ -0,0 +1,43 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class ListaMaterialesBase(SQLModel):
+    """
+    Modelo base para una línea de la lista de materiales (BOM) de un SKU.
+    """
+    sku_id: int = Field(foreign_key="sku.id", index=True)
+    componente_id: int = Field(foreign_key="componente.id", index=True)
+    cantidad: float = Field(gt=0, description="Cantidad del componente por unidad del SKU")
+    scrap: float = Field(default=0.0, ge=0, lt=1, description="Merma del componente")
+
+class ListaMateriales(ListaMaterialesBase, table=True):
+    """
+    Modelo de línea de lista de materiales para la base de datos.
+    """
+    __tablename__ = "lista_materiales"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class ListaMaterialesCreate(ListaMaterialesBase):
+    """
+    Modelo para crear una línea de lista de materiales.
+    """
+    pass
+
+class ListaMaterialesUpdate(SQLModel):
+    """
+    Modelo para actualizar una línea de lista de materiales.
+    """
+    cantidad: Optional[float] = Field(default=None, gt=0)
+    scrap: Optional[float] = Field(default=None, ge=0, lt=1)
+
+class ListaMaterialesRead(ListaMaterialesBase):
+    """
+    Modelo para leer una línea de lista de materiales.
+    """
+    id: int
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,45 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, text
+from typing import Optional
+from datetime import date, datetime
+
+class LoteBase(SQLModel):
+    """
+    Modelo base para un lote de café tostado.
+    """
+    sku_id: int = Field(foreign_key="sku.id")
+    produccion_id: Optional[int] = Field(default=None, foreign_key="produccion.id", index=True)
+    movimiento_id: Optional[int] = Field(default=None, foreign_key="movimiento_inventario.id", description="Ajuste de inventario positivo que originó el lote")
+    fecha_tueste: date = Field()
+    cantidad: int = Field(ge=0, description="Unidades producidas (o ajustadas) en el lote")
+    restante: int = Field(ge=0, description="Unidades aún no asignadas a ventas ni ajustes")
+
+class Lote(LoteBase, table=True):
+    """
+    Modelo de lote para la base de datos.
+
+    El índice parcial sobre (sku_id, fecha_tueste) solo incluye los lotes
+    con unidades restantes: la asignación FEFO y la consulta de stock
+    antiguo recorren únicamente lotes disponibles, aunque la tabla tenga
+    muchos lotes agotados. Un ajuste positivo de inventario crea un lote sin
+    producción, con la fecha del ajuste como fecha de tueste.
+    """
+    __table_args__ = (
+        Index(
+            "ix_lote_disponible_sku_fecha",
+            "sku_id",
+            "fecha_tueste",
+            sqlite_where=text("restante > 0"),
+            postgresql_where=text("restante > 0")
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+class LoteRead(LoteBase):
+    """
+    Modelo para leer un lote.
+    """
+    id: int
+    created_at: datetime
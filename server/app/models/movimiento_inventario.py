@@ -0,0 +1,49 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from typing import Optional
+from datetime import date, datetime
+
+class MovimientoInventarioBase(SQLModel):
+    """
+    Modelo base para un movimiento del libro de inventario.
+    """
+    sku_id: int = Field(foreign_key="sku.id")
+    fecha: date = Field()
+    año_iso: int = Field()
+    semana_iso: int = Field()
+    tipo: str = Field(description="produccion, venta o ajuste")
+    cantidad: int = Field(description="Unidades que entran (positivas) o salen (negativas)")
+    origen_id: Optional[int] = Field(default=None, description="ID de la venta o producción que lo originó")
+    motivo: Optional[str] = Field(default=None)
+
+class MovimientoInventario(MovimientoInventarioBase, table=True):
+    """
+    Modelo de movimiento de inventario para la base de datos.
+
+    Las producciones entran el lunes de su semana y las ventas salen en su
+    fecha; los ajustes corrigen el inventario a partir de un conteo físico.
+    """
+    __tablename__ = "movimiento_inventario"
+    __table_args__ = (
+        Index("ix_movimiento_inventario_sku_fecha", "sku_id", "fecha"),
+        Index("ix_movimiento_inventario_origen", "tipo", "origen_id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+class AjusteInventarioCreate(SQLModel):
+    """
+    Modelo para registrar un ajuste de inventario.
+    """
+    sku_id: int
+    fecha: Optional[date] = Field(default=None, description="Fecha del ajuste (por defecto, hoy)")
+    cantidad: int = Field(description="Unidades a sumar (positivas) o restar (negativas)")
+    motivo: Optional[str] = None
+
+class MovimientoInventarioRead(MovimientoInventarioBase):
+    """
+    Modelo para leer un movimiento de inventario.
+    """
+    id: int
+    created_at: datetime
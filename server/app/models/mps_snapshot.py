@@ -0,0 +1,31 @@
+from sqlmodel import SQLModel, Field, Column, LargeBinary
+from typing import Optional
+from datetime import datetime
+
+class MPSSnapshotBase(SQLModel):
+    """
+    Modelo base para Snapshot del MPS.
+    """
+    descripcion: Optional[str] = Field(default=None)
+    n_skus: int = Field(default=0)
+    n_semanas: int = Field(default=0)
+    tamaño_bytes: int = Field(default=0)
+
+class MPSSnapshot(MPSSnapshotBase, table=True):
+    """
+    Modelo de Snapshot del MPS para la base de datos.
+
+    El plan se guarda como arreglos columnares comprimidos (formato npz).
+    """
+    __tablename__ = "mps_snapshot"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    datos: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+
+class MPSSnapshotRead(MPSSnapshotBase):
+    """
+    Modelo para leer un Snapshot del MPS (sin los datos).
+    """
+    id: int
+    created_at: datetime
@@ -0,0 +1,33 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class PedidoBase(SQLModel):
+    """
+    Modelo base para Pedido comprometido.
+    """
+    sku_id: int = Field(foreign_key="sku.id", index=True)
+    semana_iso: int = Field(description="Semana ISO de entrega")
+    año_iso: int = Field(description="Año ISO de entrega")
+    cantidad: int = Field(gt=0, description="Unidades comprometidas")
+    cliente: Optional[str] = Field(default=None)
+
+class Pedido(PedidoBase, table=True):
+    """
+    Modelo de Pedido para la base de datos.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+class PedidoCreate(PedidoBase):
+    """
+    Modelo para crear un Pedido.
+    """
+    pass
+
+class PedidoRead(PedidoBase):
+    """
+    Modelo para leer un Pedido.
+    """
+    id: int
+    created_at: datetime
@@ -0,0 +1,31 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class PlanSemanalBase(SQLModel):
+    """
+    Modelo base para la producción planificada de un SKU en una semana.
+    """
+    año_iso: int = Field(primary_key=True)
+    semana_iso: int = Field(primary_key=True)
+    sku_id: int = Field(foreign_key="sku.id", primary_key=True)
+    unidades_planificadas: int = Field(ge=0, description="Unidades terminadas del plan al inicio de la semana")
+    unidades_producidas: int = Field(default=0, description="Producción registrada en la semana")
+
+class PlanSemanal(PlanSemanalBase, table=True):
+    """
+    Modelo de plan semanal congelado para la base de datos.
+
+    La producción planificada son las unidades terminadas del snapshot
+    vigente al inicio de la semana (o del primero publicado en ella) y no
+    cambia después; la producción registrada se actualiza con cada alta,
+    cambio o baja de producción de esa semana.
+    """
+    __tablename__ = "plan_semanal"
+
+    congelado_at: datetime = Field(default_factory=datetime.now)
+
+class PlanSemanalRead(PlanSemanalBase):
+    """
+    Modelo para leer el plan congelado de un SKU en una semana.
+    """
+    congelado_at: datetime
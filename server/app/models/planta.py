@@ -0,0 +1,41 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class PlantaBase(SQLModel):
+    """
+    Modelo base para Planta de tostado.
+    """
+    nombre: str = Field(index=True)
+    capacidad_semanal: float = Field(gt=0, description="Capacidad semanal en kg de café verde")
+    activo: bool = Field(default=True)
+
+class Planta(PlantaBase, table=True):
+    """
+    Modelo de Planta para la base de datos.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class PlantaCreate(PlantaBase):
+    """
+    Modelo para crear una Planta.
+    """
+    pass
+
+class PlantaUpdate(SQLModel):
+    """
+    Modelo para actualizar una Planta.
+    """
+    nombre: Optional[str] = None
+    capacidad_semanal: Optional[float] = Field(default=None, gt=0)
+    activo: Optional[bool] = None
+
+class PlantaRead(PlantaBase):
+    """
+    Modelo para leer una Planta.
+    """
+    id: int
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,48 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class ReglaAlertaBase(SQLModel):
+    """
+    Modelo base para Regla de alerta del MPS.
+    """
+    codigo: str = Field(index=True, unique=True, description="Código estable de la alerta")
+    expresion: str = Field(description="Condición sobre las variables del plan")
+    umbral: Optional[float] = Field(default=None, description="Valor de la variable umbral en la expresión")
+    severidad: str = Field(default="advertencia", description="info, advertencia o critica")
+    mensaje: str = Field(description="Descripción de la alerta")
+    activo: bool = Field(default=True)
+
+class ReglaAlerta(ReglaAlertaBase, table=True):
+    """
+    Modelo de Regla de alerta para la base de datos.
+    """
+    __tablename__ = "regla_alerta"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class ReglaAlertaCreate(ReglaAlertaBase):
+    """
+    Modelo para crear una Regla de alerta.
+    """
+    pass
+
+class ReglaAlertaUpdate(SQLModel):
+    """
+    Modelo para actualizar una Regla de alerta.
+    """
+    expresion: Optional[str] = None
+    umbral: Optional[float] = None
+    severidad: Optional[str] = None
+    mensaje: Optional[str] = None
+    activo: Optional[bool] = None
+
+class ReglaAlertaRead(ReglaAlertaBase):
+    """
+    Modelo para leer una Regla de alerta.
+    """
+    id: int
+    created_at: datetime
+    updated_at: datetime
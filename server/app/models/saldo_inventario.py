@@ -0,0 +1,17 @@
+from sqlmodel import SQLModel, Field
+from datetime import date, datetime
+
+class SaldoInventario(SQLModel, table=True):
+    """
+    Saldo de inventario de un SKU al inicio de un lunes.
+
+    Es la suma de los movimientos anteriores a ``fecha``. Se guarda uno por
+    semana para que la posición de cualquier día sea el saldo anterior más
+    los movimientos de unos pocos días.
+    """
+    __tablename__ = "saldo_inventario"
+
+    sku_id: int = Field(foreign_key="sku.id", primary_key=True)
+    fecha: date = Field(primary_key=True)
+    saldo: int = Field()
+    created_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field
+
+class VersionDatos(SQLModel, table=True):
+    """
+    Versión de los datos de los KPIs, compartida por todos los procesos.
+
+    Tiene una sola fila. Cada commit que modifica tablas de las que
+    dependen los KPIs aumenta la versión en la misma transacción.
+    """
+    __tablename__ = "version_datos"
+
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=0)
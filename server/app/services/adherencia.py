@@ -0,0 +1,166 @@
+import numpy as np
+from datetime import date, datetime, time, timedelta
+from sqlmodel import Session
+from typing import Dict, Any, Optional
+from app.crud.planes_semanales import (
+    existe_plan_semanal,
+    congelar_plan_semanal,
+    get_planes_semanales
+)
+from app.crud.snapshots import get_ultimo_snapshot, get_primer_snapshot
+from app.utils.iso_weeks import fecha_a_semana_iso, semana_iso_a_fecha, formato_semana_iso, parsear_semana_iso
+
+# Semanas que muestra la adherencia si no se indica el rango
+SEMANAS_ADHERENCIA = 13
+
+# Última semana (año, semana ISO) cuyo plan se sabe congelado en este
+# proceso, para no consultar la base de datos en cada revisión
+_semana_congelada: Optional[tuple] = None
+
+def unidades_terminadas(plan: Dict[str, Any]) -> np.ndarray:
+    """
+    Unidades terminadas que el plan de un snapshot espera producir.
+
+    La producción del plan es bruta (antes del scrap); las unidades que
+    entran al inventario son la variación del inventario más la demanda
+    de cada semana, que es lo comparable con la producción registrada.
+
+    Args:
+        plan: Plan deserializado de un snapshot
+
+    Returns:
+        Matriz de unidades terminadas SKU × semana
+    """
+    return plan["inventario_final"].astype(np.int64) - plan["inventario_inicial"] + plan["demanda"]
+
+def congelar_plan_semana(db: Session, año_iso: int, semana_iso: int) -> int:
+    """
+    Congela el plan de una semana a partir de los snapshots publicados.
+
+    Se usa el último snapshot publicado antes del lunes de la semana que
+    la incluya o, si no hay, el primero publicado durante la semana. Así
+    el plan congelado depende solo de lo publicado y no de quién calcula
+    el MPS primero ni con qué opciones. Si la semana ya tiene plan no se
+    modifica.
+
+    Args:
+        db: Sesión de base de datos
+        año_iso: Año ISO
+        semana_iso: Semana ISO
+
+    Returns:
+        Número de SKUs congelados (0 si ya estaba congelada o no hay
+        snapshot para la semana)
+    """
+    # Importación local: los snapshots dependen del servicio de MPS
+    from app.services.snapshots import deserializar_plan
+
+    if existe_plan_semanal(db, año_iso, semana_iso):
+        return 0
+
+    etiqueta = formato_semana_iso(año_iso, semana_iso)
+    inicio = datetime.combine(semana_iso_a_fecha(año_iso, semana_iso), time.min)
+
+    for snapshot in (
+        get_ultimo_snapshot(db, antes_de=inicio),
+        get_primer_snapshot(db, inicio, inicio + timedelta(weeks=1))
+    ):
+        if snapshot is None:
+            continue
+
+        plan = deserializar_plan(snapshot.datos)
+        if etiqueta not in plan["semanas"] or not plan["sku_ids"]:
+            continue
+
+        j = plan["semanas"].index(etiqueta)
+        return congelar_plan_semanal(db, año_iso, semana_iso, {
+            sku_id: int(unidades)
+            for sku_id, unidades in zip(plan["sku_ids"], unidades_terminadas(plan)[:, j])
+        })
+
+    return 0
+
+def congelar_plan_semana_actual(db: Session) -> None:
+    """
+    Congela el plan de la semana en curso si aún no lo está.
+
+    Se ejecuta al iniciar la aplicación, en la tarea periódica (con lo que
+    el plan se congela al empezar la semana) y al publicar un snapshot.
+
+    Args:
+        db: Sesión de base de datos
+    """
+    global _semana_congelada
+
+    semana = fecha_a_semana_iso(date.today())
+    if _semana_congelada == semana:
+        return
+
+    congelar_plan_semana(db, *semana)
+    if existe_plan_semanal(db, *semana):
+        _semana_congelada = semana
+
+def obtener_adherencia(
+    db: Session,
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    sku_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Compara el plan congelado de cada semana con la producción registrada.
+    
+    Args:
+        db: Sesión de base de datos
+        desde: Semana inicial ("YYYY-SWW"; por defecto, 12 semanas antes de
+            ``hasta``)
+        hasta: Semana final ("YYYY-SWW"; por defecto, la semana actual)
+        sku_id: Filtrar por SKU
+    
+    Returns:
+        Diccionario con la adherencia total, por semana y por SKU y semana
+    """
+    año_hasta, semana_hasta = parsear_semana_iso(hasta) if hasta else fecha_a_semana_iso(date.today())
+    if desde:
+        año_desde, semana_desde = parsear_semana_iso(desde)
+    else:
+        año_desde, semana_desde = fecha_a_semana_iso(
+            semana_iso_a_fecha(año_hasta, semana_hasta) - timedelta(weeks=SEMANAS_ADHERENCIA - 1)
+        )
+    
+    clave_desde = año_desde * 100 + semana_desde
+    clave_hasta = año_hasta * 100 + semana_hasta
+    if clave_desde > clave_hasta:
+        raise ValueError("La semana inicial debe ser anterior a la final")
+    
+    data = []
+    semanas: Dict[str, Dict[str, Any]] = {}
+    for fila in get_planes_semanales(db, clave_desde, clave_hasta, sku_id):
+        etiqueta = formato_semana_iso(fila.año_iso, fila.semana_iso)
+        cumplido = min(fila.unidades_producidas, fila.unidades_planificadas)
+        
+        data.append({
+            "sku_id": fila.sku_id,
+            "semana": etiqueta,
+            "planificado": fila.unidades_planificadas,
+            "producido": fila.unidades_producidas,
+            "cumplimiento": cumplido / fila.unidades_planificadas if fila.unidades_planificadas else None
+        })
+        
+        total = semanas.setdefault(etiqueta, {"semana": etiqueta, "planificado": 0, "producido": 0, "cumplido": 0})
+        total["planificado"] += fila.unidades_planificadas
+        total["producido"] += fila.unidades_producidas
+        total["cumplido"] += cumplido
+    
+    for total in semanas.values():
+        total["cumplimiento"] = total["cumplido"] / total["planificado"] if total["planificado"] else None
+    
+    planificado = sum(total["planificado"] for total in semanas.values())
+    cumplido = sum(total["cumplido"] for total in semanas.values())
+    
+    return {
+        "desde": formato_semana_iso(año_desde, semana_desde),
+        "hasta": formato_semana_iso(año_hasta, semana_hasta),
+        "cumplimiento": cumplido / planificado if planificado else None,
+        "semanas": list(semanas.values()),
+        "data": data
+    }
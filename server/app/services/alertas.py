@@ -0,0 +1,282 @@
+import ast
+import numpy as np
+from functools import lru_cache
+from typing import Dict, List, Any, Callable, Tuple
+
+# Variables que pueden usar las expresiones de las reglas de alerta
+VARIABLES_ALERTA = {
+    "demanda": "Demanda por SKU y semana",
+    "inventario_inicial": "Inventario inicial por SKU y semana",
+    "inventario_final": "Inventario final por SKU y semana",
+    "stock_seguridad": "Stock de seguridad por SKU y semana",
+    "produccion": "Producción por SKU y semana",
+    "kg_verde": "kg de café verde por SKU y semana",
+    "carga": "kg de café verde de todos los SKUs en la semana",
+    "capacidad": "Capacidad en kg de café verde de la semana",
+    "scrap": "Scrap del SKU",
+    "presentacion_g": "Presentación del SKU en gramos",
+    "unidades_por_tanda": "Unidades del SKU por tanda de 60 kg",
+    "semana": "Posición de la semana en el horizonte (0 es la primera)",
+    "umbral": "Umbral de la regla"
+}
+
+# Niveles de severidad de las reglas
+SEVERIDADES = ("info", "advertencia", "critica")
+
+# Reglas con las que se inicializa la tabla
+REGLAS_ALERTA_DEFAULT = [
+    {
+        "codigo": "SS_ELEVADO",
+        "expresion": "stock_seguridad > umbral * demanda and demanda > 0",
+        "umbral": 1.2,
+        "severidad": "advertencia",
+        "mensaje": "Stock de seguridad elevado"
+    },
+    {
+        "codigo": "BAJO_SS",
+        "expresion": "inventario_final < stock_seguridad",
+        "umbral": None,
+        "severidad": "critica",
+        "mensaje": "Inventario final por debajo del stock de seguridad"
+    },
+    {
+        "codigo": "EXCEDE_CAPACIDAD",
+        "expresion": "kg_verde > capacidad",
+        "umbral": None,
+        "severidad": "critica",
+        "mensaje": "Excede capacidad semanal"
+    },
+    {
+        "codigo": "ERROR_TANDA",
+        "expresion": "unidades_por_tanda <= 0",
+        "umbral": None,
+        "severidad": "critica",
+        "mensaje": "Error en cálculo de unidades por tanda"
+    }
+]
+
+Contexto = Dict[str, Any]
+Predicado = Callable[[Contexto], Any]
+
+_OPERADORES_BINARIOS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide
+}
+
+_COMPARACIONES = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal
+}
+
+_FUNCIONES = {
+    "abs": np.abs,
+    "min": np.minimum,
+    "max": np.maximum
+}
+
+def _compilar_nodo(nodo: ast.AST) -> Predicado:
+    """
+    Convierte un nodo del árbol sintáctico en una función sobre el contexto.
+    """
+    if isinstance(nodo, ast.BoolOp):
+        operandos = [_compilar_nodo(valor) for valor in nodo.values]
+        operacion = np.logical_and if isinstance(nodo.op, ast.And) else np.logical_or
+
+        def booleano(contexto: Contexto) -> Any:
+            resultado = operandos[0](contexto)
+            for operando in operandos[1:]:
+                resultado = operacion(resultado, operando(contexto))
+            return resultado
+        return booleano
+
+    if isinstance(nodo, ast.UnaryOp):
+        operando = _compilar_nodo(nodo.operand)
+        if isinstance(nodo.op, ast.Not):
+            return lambda contexto: np.logical_not(operando(contexto))
+        if isinstance(nodo.op, ast.USub):
+            return lambda contexto: np.negative(operando(contexto))
+        if isinstance(nodo.op, ast.UAdd):
+            return operando
+
+    if isinstance(nodo, ast.BinOp) and type(nodo.op) in _OPERADORES_BINARIOS:
+        izquierda = _compilar_nodo(nodo.left)
+        derecha = _compilar_nodo(nodo.right)
+        operacion = _OPERADORES_BINARIOS[type(nodo.op)]
+        return lambda contexto: operacion(izquierda(contexto), derecha(contexto))
+
+    if isinstance(nodo, ast.Compare):
+        # a < b < c equivale a (a < b) and (b < c)
+        terminos = [_compilar_nodo(nodo.left)] + [_compilar_nodo(c) for c in nodo.comparators]
+        operaciones = []
+        for operador in nodo.ops:
+            if type(operador) not in _COMPARACIONES:
+                raise ValueError(f"Comparación no permitida: {type(operador).__name__}")
+            operaciones.append(_COMPARACIONES[type(operador)])
+
+        def comparar(contexto: Contexto) -> Any:
+            valores = [termino(contexto) for termino in terminos]
+            resultado = operaciones[0](valores[0], valores[1])
+            for k in range(1, len(operaciones)):
+                resultado = np.logical_and(resultado, operaciones[k](valores[k], valores[k + 1]))
+            return resultado
+        return comparar
+
+    if isinstance(nodo, ast.Name):
+        if nodo.id not in VARIABLES_ALERTA:
+            raise ValueError(f"Variable desconocida: {nodo.id}")
+        nombre = nodo.id
+        return lambda contexto: contexto[nombre]
+
+    if isinstance(nodo, ast.Constant) and isinstance(nodo.value, (int, float)):
+        valor = nodo.value
+        return lambda contexto: valor
+
+    if (
+        isinstance(nodo, ast.Call)
+        and isinstance(nodo.func, ast.Name)
+        and nodo.func.id in _FUNCIONES
+        and not nodo.keywords
+    ):
+        funcion = _FUNCIONES[nodo.func.id]
+        argumentos = [_compilar_nodo(argumento) for argumento in nodo.args]
+        if len(argumentos) != (1 if nodo.func.id == "abs" else 2):
+            raise ValueError(f"Número de argumentos no válido para {nodo.func.id}")
+        return lambda contexto: funcion(*[argumento(contexto) for argumento in argumentos])
+
+    raise ValueError(f"Elemento no permitido en la expresión: {type(nodo).__name__}")
+
+@lru_cache(maxsize=256)
+def compilar_expresion(expresion: str) -> Predicado:
+    """
+    Compila la expresión de una regla en un predicado vectorizado.
+
+    La expresión se analiza con ``ast`` y solo admite variables del plan,
+    números, aritmética, comparaciones, ``and``/``or``/``not`` y las
+    funciones ``abs``, ``min`` y ``max``; nunca se ejecuta con ``eval``.
+    Las expresiones compiladas se guardan en caché.
+
+    Args:
+        expresion: Expresión de la regla, por ejemplo
+            ``"inventario_final < umbral * stock_seguridad"``
+
+    Returns:
+        Función que recibe el contexto del plan y devuelve la máscara
+
+    Raises:
+        ValueError: Si la expresión no es válida
+    """
+    try:
+        arbol = ast.parse(expresion, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Expresión no válida: {e.msg}")
+
+    cuerpo = arbol.body
+    es_condicion = isinstance(cuerpo, (ast.Compare, ast.BoolOp)) or (
+        isinstance(cuerpo, ast.UnaryOp) and isinstance(cuerpo.op, ast.Not)
+    )
+    if not es_condicion:
+        raise ValueError("La expresión debe ser una condición (comparación o combinación lógica)")
+
+    return _compilar_nodo(cuerpo)
+
+def contexto_alerta(datos: Dict[str, Any], plan: Dict[str, np.ndarray]) -> Contexto:
+    """
+    Arma las variables que pueden usar las reglas de alerta.
+
+    Las variables por SKU se dejan como columna y las de semana como fila,
+    de modo que todas se combinan por broadcasting con las matrices
+    SKU × semana sin copiarlas.
+
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+
+    Returns:
+        Diccionario con las variables
+    """
+    n_semanas = datos["demanda"].shape[1]
+    capacidad = np.broadcast_to(
+        np.asarray(datos["capacidad_semanal"] * datos.get("semanas_por_bucket", 1), dtype=float),
+        (n_semanas,)
+    )
+
+    return {
+        "demanda": datos["demanda"],
+        "inventario_inicial": plan["inventario_inicial"],
+        "inventario_final": plan["inventario_final"],
+        "stock_seguridad": plan["stock_seguridad"],
+        "produccion": plan["produccion"],
+        "kg_verde": plan["kg_verde"],
+        "carga": plan["kg_verde"].sum(axis=0)[None, :],
+        "capacidad": capacidad[None, :],
+        "scrap": datos["scrap"][:, None],
+        "presentacion_g": datos["presentacion_g"][:, None],
+        "unidades_por_tanda": plan["unidades_por_tanda"][:, None],
+        "semana": np.arange(n_semanas)[None, :]
+    }
+
+def evaluar_reglas(
+    datos: Dict[str, Any],
+    plan: Dict[str, np.ndarray],
+    reglas: List[Dict[str, Any]]
+) -> List[Tuple[np.ndarray, Dict[str, Any]]]:
+    """
+    Evalúa reglas de alerta sobre todo el plan.
+
+    Cada regla es una sola pasada vectorizada sobre las matrices del plan.
+
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+        reglas: Reglas con codigo, expresion, umbral, severidad y mensaje
+
+    Returns:
+        Lista de tuplas (máscara SKU × semana, regla)
+    """
+    contexto = contexto_alerta(datos, plan)
+    forma = datos["demanda"].shape
+
+    condiciones = []
+    for regla in reglas:
+        umbral = regla.get("umbral")
+        contexto["umbral"] = np.nan if umbral is None else umbral
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mascara = compilar_expresion(regla["expresion"])(contexto)
+
+        condiciones.append((np.broadcast_to(np.asarray(mascara, dtype=bool), forma), regla))
+
+    return condiciones
+
+def describir_reglas(reglas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Lista el código, el mensaje y la severidad de reglas de alerta.
+
+    Args:
+        reglas: Reglas con codigo, mensaje y severidad
+
+    Returns:
+        Lista con la descripción de cada regla, en el mismo orden
+    """
+    return [
+        {"codigo": regla["codigo"], "mensaje": regla["mensaje"], "severidad": regla["severidad"]}
+        for regla in reglas
+    ]
+
+def catalogo_alertas(condiciones: List[Tuple[np.ndarray, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Lista el código, el mensaje y la severidad de las reglas evaluadas.
+
+    Args:
+        condiciones: Condiciones evaluadas con ``evaluar_reglas``
+
+    Returns:
+        Lista con la descripción de cada regla, en el orden de evaluación
+    """
+    return describir_reglas([regla for _, regla in condiciones])
@@ -0,0 +1,188 @@
+import numpy as np
+from datetime import timedelta
+from sqlmodel import Session
+from typing import Dict, List, Any, Optional
+from app.crud.inventario import get_saldos_inventario, get_movimientos_semanales
+from app.crud.pedidos import get_pedidos_semanales
+from app.crud.snapshots import get_snapshot, get_ultimo_snapshot_id
+from app.db.version import version_datos
+from app.services.snapshots import deserializar_plan
+from app.utils.iso_weeks import formato_semana_iso, semana_iso_a_fecha, parsear_semana_iso
+
+# Entradas acumuladas del último plan publicado, por ID de snapshot
+_cache_plan: Optional[Dict[str, Any]] = None
+
+# ATP vigente. La clave se lee de la base de datos en cada consulta (plan
+# publicado y versión compartida de los datos, que solo aumenta con cada
+# commit que toca el libro de inventario o los pedidos), así que todos los
+# procesos ven los cambios de cualquiera. Se reemplaza completo en cada
+# actualización para que las consultas concurrentes vean un estado
+# consistente.
+_cache_atp: Optional[Dict[str, Any]] = None
+
+def preparar_plan_atp(snapshot_id: int, plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Precalcula las entradas acumuladas de un plan publicado.
+
+    Args:
+        snapshot_id: ID del snapshot del plan
+        plan: Arreglos del plan deserializado
+
+    Returns:
+        Diccionario con las semanas, los índices y las entradas acumuladas
+    """
+    rendimiento = 1 - plan["scrap"].astype(float)[:, None]
+    entradas = np.floor(plan["produccion"] * rendimiento).astype(np.int64)
+
+    return {
+        "snapshot_id": snapshot_id,
+        "semanas": list(plan["semanas"]),
+        "sku_ids": list(plan["sku_ids"]),
+        "columna_semana": {semana: j for j, semana in enumerate(plan["semanas"])},
+        "fila_sku": {sku_id: i for i, sku_id in enumerate(plan["sku_ids"])},
+        "entradas": np.cumsum(entradas, axis=1)
+    }
+
+def calcular_disponible(db: Session, plan_atp: Dict[str, Any]) -> np.ndarray:
+    """
+    Calcula el disponible acumulado del plan publicado con el libro actual.
+
+    El inventario de partida es el saldo del libro al lunes de la primera
+    semana del plan. A las entradas planificadas se suman, en su semana,
+    las ventas y los ajustes registrados dentro del horizonte; la
+    producción se toma del plan hasta que se publique otro.
+
+    Args:
+        db: Sesión de base de datos
+        plan_atp: Plan preparado con ``preparar_plan_atp``
+
+    Returns:
+        Matriz de disponible acumulado SKU × semana
+    """
+    semanas = plan_atp["semanas"]
+    desde = semana_iso_a_fecha(*parsear_semana_iso(semanas[0]))
+    hasta = semana_iso_a_fecha(*parsear_semana_iso(semanas[-1])) + timedelta(weeks=1)
+
+    saldos = get_saldos_inventario(db, desde, plan_atp["sku_ids"])
+    inicial = np.array([max(0, saldos.get(sku_id, 0)) for sku_id in plan_atp["sku_ids"]], dtype=np.int64)
+
+    movimientos = np.zeros_like(plan_atp["entradas"])
+    for sku_id, año, semana, cantidad in get_movimientos_semanales(db, desde, hasta, excluir_tipo="produccion"):
+        i = plan_atp["fila_sku"].get(sku_id)
+        j = plan_atp["columna_semana"].get(formato_semana_iso(año, semana))
+        if i is not None and j is not None:
+            movimientos[i, j] += int(cantidad)
+
+    return inicial[:, None] + plan_atp["entradas"] + np.cumsum(movimientos, axis=1)
+
+def calcular_atp(disponible: np.ndarray, comprometido: np.ndarray) -> np.ndarray:
+    """
+    Calcula el ATP acumulado con anticipación (look-ahead).
+
+    El ATP de una semana es el mínimo del disponible acumulado menos los
+    pedidos acumulados desde esa semana hasta el final del horizonte: lo
+    que se puede prometer sin dejar sin cubrir pedidos ya comprometidos en
+    semanas posteriores. Cada fila resulta no decreciente.
+
+    Args:
+        disponible: Inventario inicial más entradas acumuladas (SKU × semana)
+        comprometido: Unidades comprometidas en pedidos (SKU × semana)
+
+    Returns:
+        Matriz de ATP acumulado SKU × semana
+    """
+    acumulado = disponible - np.cumsum(comprometido, axis=1)
+    minimo_posterior = np.minimum.accumulate(acumulado[:, ::-1], axis=1)[:, ::-1]
+    return np.maximum(0, minimo_posterior)
+
+def obtener_atp(db: Session) -> Dict[str, Any]:
+    """
+    Obtiene el ATP del último plan publicado, calculándolo si hace falta.
+
+    El ATP se recalcula si se publicó otro snapshot del MPS o si cambió la
+    versión de los datos (libro de inventario, pedidos y demás tablas de
+    ``TABLAS_KPI``); nunca se vuelve a pronosticar la demanda. Sin cambios,
+    la consulta son dos lecturas de una fila. ``publicar_snapshot`` lo
+    calcula al publicar el plan; los demás procesos lo calculan en su
+    primera consulta.
+
+    Args:
+        db: Sesión de base de datos
+
+    Returns:
+        Diccionario con las semanas, los índices y la matriz de ATP
+    """
+    global _cache_plan, _cache_atp
+
+    snapshot_id = get_ultimo_snapshot_id(db)
+    if snapshot_id is None:
+        raise ValueError("No hay un MPS publicado: publique un snapshot para consultar el ATP")
+
+    clave = (snapshot_id, version_datos(db))
+    cache = _cache_atp
+    if cache is not None and cache["clave"] == clave:
+        return cache
+
+    plan_atp = _cache_plan
+    if plan_atp is None or plan_atp["snapshot_id"] != snapshot_id:
+        plan_atp = preparar_plan_atp(snapshot_id, deserializar_plan(get_snapshot(db, snapshot_id).datos))
+        _cache_plan = plan_atp
+
+    disponible = calcular_disponible(db, plan_atp)
+
+    comprometido = np.zeros_like(disponible)
+    for sku_id, año, semana, unidades in get_pedidos_semanales(db):
+        i = plan_atp["fila_sku"].get(sku_id)
+        j = plan_atp["columna_semana"].get(formato_semana_iso(año, semana))
+        if i is not None and j is not None:
+            comprometido[i, j] += unidades
+
+    cache = {**plan_atp, "clave": clave, "atp": calcular_atp(disponible, comprometido)}
+    _cache_atp = cache
+    return cache
+
+def consultar_atp(db: Session, lineas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Responde si se pueden prometer cantidades de SKUs en semanas dadas.
+
+    Cada línea se busca en el ATP precalculado: la semana pedida es un
+    acceso directo y la primera semana con ATP suficiente es una búsqueda
+    binaria sobre la fila del SKU. Las líneas se evalúan de forma
+    independiente.
+
+    Args:
+        db: Sesión de base de datos
+        lineas: Lista de consultas con sku_id, semana ("YYYY-SWW") y cantidad
+
+    Returns:
+        Lista con la respuesta de cada línea
+    """
+    cache = obtener_atp(db)
+    atp = cache["atp"]
+    semanas = cache["semanas"]
+
+    respuestas = []
+    for linea in lineas:
+        sku_id, semana, cantidad = linea["sku_id"], linea["semana"], int(linea["cantidad"])
+
+        i = cache["fila_sku"].get(sku_id)
+        if i is None:
+            raise ValueError(f"El SKU {sku_id} no está en el MPS publicado")
+
+        j = cache["columna_semana"].get(semana)
+        if j is None:
+            raise ValueError(f"La semana {semana} no está en el horizonte del MPS publicado")
+
+        disponible = int(atp[i, j])
+        primera = int(np.searchsorted(atp[i], cantidad, side="left"))
+
+        respuestas.append({
+            "sku_id": sku_id,
+            "semana": semana,
+            "cantidad": cantidad,
+            "atp": disponible,
+            "prometible": disponible >= cantidad,
+            "semana_mas_temprana": semanas[primera] if primera < len(semanas) else None
+        })
+
+    return respuestas
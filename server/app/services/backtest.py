@@ -0,0 +1,280 @@
+import numpy as np
+from datetime import date, timedelta
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlmodel import Session, select
+from typing import Dict, List, Any, Optional
+from app.crud.produccion import get_scrap_promedios
+from app.crud.ventas import get_ventas_por_semana
+from app.models.sku import SKU
+from app.services.mps import factor_nivel_servicio, calcular_kg_por_unidad
+from app.services.parametros import obtener_parametro
+from app.utils.iso_weeks import fecha_a_semana_iso, semana_iso_a_fecha, formato_semana_iso
+
+# Parámetros que puede definir una política del backtest
+PARAMETROS_POLITICA = {"nombre", "nivel_servicio", "lead_time_semanas", "cobertura_semanas"}
+
+# kg de café verde por tanda de tostado
+KG_POR_TANDA = 60
+
+def cargar_historia_ventas(db: Session, semanas_historia: int, ventana: int) -> Dict[str, Any]:
+    """
+    Carga las ventas semanales reales como una matriz SKU × semana.
+
+    Se toman las ``semanas_historia`` semanas completas anteriores a la
+    semana actual, más ``ventana`` semanas previas para el primer
+    pronóstico. Las semanas sin ventas cuentan como demanda cero. Las
+    ventas de SKUs que ya no existen se omiten.
+
+    Args:
+        db: Sesión de base de datos
+        semanas_historia: Semanas a reproducir
+        ventana: Semanas del promedio móvil del pronóstico
+
+    Returns:
+        Diccionario con las semanas, los SKUs y la matriz de ventas
+    """
+    lunes_actual = semana_iso_a_fecha(*fecha_a_semana_iso(date.today()))
+    n_semanas = semanas_historia + ventana
+    inicio = lunes_actual - timedelta(weeks=n_semanas)
+    primera = inicio.toordinal() // 7
+
+    filas = get_ventas_por_semana(db, inicio, lunes_actual)
+    con_ventas = {sku_id for sku_id, _, _, _ in filas}
+    skus = {sku.id: sku for sku in db.exec(select(SKU).where(SKU.id.in_(con_ventas))).all()}
+    sku_ids = sorted(skus)
+    fila_sku = {sku_id: i for i, sku_id in enumerate(sku_ids)}
+
+    ventas = np.zeros((len(sku_ids), n_semanas), dtype=np.int64)
+    for sku_id, año, semana, unidades in filas:
+        if sku_id in fila_sku:
+            ventas[fila_sku[sku_id], semana_iso_a_fecha(año, semana).toordinal() // 7 - primera] += unidades
+
+    scrap = get_scrap_promedios(db, sku_ids)
+
+    return {
+        "semanas": [
+            formato_semana_iso(*fecha_a_semana_iso(inicio + timedelta(weeks=j)))
+            for j in range(n_semanas)
+        ],
+        "sku_ids": sku_ids,
+        "presentacion_g": np.array([skus[sku_id].presentacion_g for sku_id in sku_ids], dtype=float),
+        "scrap": np.array([scrap[sku_id] for sku_id in sku_ids], dtype=float),
+        "ventas": ventas
+    }
+
+def validar_politica(politica: Dict[str, Any]) -> None:
+    """
+    Verifica los tipos y rangos de los parámetros de una política.
+
+    Args:
+        politica: Política con todos sus parámetros
+
+    Raises:
+        ValueError: Si algún parámetro no es válido
+    """
+    if not isinstance(politica["nombre"], str):
+        raise ValueError("El nombre de la política debe ser texto")
+
+    for clave in ("nivel_servicio", "lead_time_semanas", "cobertura_semanas"):
+        valor = politica[clave]
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not np.isfinite(valor):
+            raise ValueError(f"El parámetro {clave} debe ser numérico")
+
+    if not 0 <= politica["nivel_servicio"] <= 1:
+        raise ValueError("El nivel de servicio debe estar entre 0 y 1")
+    if politica["lead_time_semanas"] < 0 or politica["cobertura_semanas"] < 0:
+        raise ValueError("El lead time y la cobertura no pueden ser negativos")
+
+def simular_politicas(
+    historia: Dict[str, Any],
+    politicas: List[Dict[str, Any]],
+    ventana: int
+) -> Dict[str, np.ndarray]:
+    """
+    Reproduce la historia de ventas bajo varias políticas de inventario.
+
+    Cada semana se pronostica la demanda con el promedio móvil de las
+    ``ventana`` semanas anteriores y se fija el stock de seguridad de cada
+    política como z · σ · √(lead time) más ``cobertura_semanas`` semanas de
+    pronóstico (mínimo 10 unidades). La producción se obtiene con el mismo
+    neteo del MPS (necesidad neta, merma y tandas de 60 kg) y luego se
+    atienden las ventas reales; lo que no se atiende se pierde. La
+    recurrencia recorre las semanas en orden, pero cada paso se calcula para
+    todas las políticas y SKUs a la vez (arreglos política × SKU).
+
+    Args:
+        historia: Ventas históricas de ``cargar_historia_ventas``
+        politicas: Políticas con nivel_servicio, lead_time_semanas y
+            cobertura_semanas
+        ventana: Semanas del promedio móvil del pronóstico
+
+    Returns:
+        Diccionario con los totales por política (arreglos de largo P) y por
+        política y SKU (matrices P × SKU)
+    """
+    ventas = historia["ventas"]
+    scrap = historia["scrap"]
+    rendimiento = 1 - scrap
+
+    # Pronóstico y desviación de cada semana a partir de las anteriores
+    ventanas = sliding_window_view(ventas[:, :-1].astype(np.float64), ventana, axis=1)
+    pronostico = np.round(ventanas.mean(axis=2)).astype(np.int64)
+    desviacion = ventanas.std(axis=2, ddof=1)
+    reales = ventas[:, ventana:]
+
+    # Stock de seguridad política × SKU × semana
+    z = np.array([factor_nivel_servicio(p["nivel_servicio"]) for p in politicas])[:, None, None]
+    raiz_lead_time = np.sqrt([p["lead_time_semanas"] for p in politicas])[:, None, None]
+    cobertura = np.array([p["cobertura_semanas"] for p in politicas], dtype=float)[:, None, None]
+    stock_seguridad = np.maximum(
+        10,
+        np.floor(z * desviacion[None] * raiz_lead_time + cobertura * pronostico[None])
+    ).astype(np.int64)
+
+    kg_por_unidad = calcular_kg_por_unidad(historia)
+    n_politicas = len(politicas)
+    forma = (n_politicas, len(historia["sku_ids"]))
+
+    # Cada política empieza con su propio nivel objetivo
+    inventario = pronostico[None, :, 0] + stock_seguridad[:, :, 0]
+
+    atendido = np.zeros(forma, dtype=np.int64)
+    inventario_acumulado = np.zeros(forma, dtype=np.int64)
+    semanas_quiebre = np.zeros(forma, dtype=np.int64)
+    tandas = np.zeros(forma, dtype=np.int64)
+    kg_verde = np.zeros(forma, dtype=np.float64)
+
+    for j in range(reales.shape[1]):
+        necesidad_neta = np.maximum(0, pronostico[None, :, j] + stock_seguridad[:, :, j] - inventario)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            produccion = np.where(
+                scrap < 1,
+                np.floor(necesidad_neta / rendimiento),
+                necesidad_neta
+            ).astype(np.int64)
+
+        kg = produccion * kg_por_unidad
+        kg_verde += kg
+        tandas += np.ceil(kg / KG_POR_TANDA).astype(np.int64)
+
+        disponible = inventario + np.floor(produccion * rendimiento).astype(np.int64)
+        servido = np.minimum(disponible, reales[:, j])
+
+        atendido += servido
+        semanas_quiebre += servido < reales[:, j]
+        inventario = disponible - servido
+        inventario_acumulado += inventario
+
+    n_semanas = max(reales.shape[1], 1)
+    demanda = reales.sum(axis=1)
+
+    return {
+        "demanda": np.broadcast_to(demanda, forma),
+        "atendido": atendido,
+        "inventario_promedio": inventario_acumulado / n_semanas,
+        "semanas_quiebre": semanas_quiebre,
+        "tandas": tandas,
+        "kg_verde": kg_verde
+    }
+
+def generar_backtest(
+    db: Session,
+    politicas: List[Dict[str, Any]],
+    semanas_historia: int = 52,
+    ventana: Optional[int] = None,
+    detalle: bool = False
+) -> Dict[str, Any]:
+    """
+    Evalúa políticas de inventario reproduciendo las ventas históricas.
+
+    Las ventas se cargan una sola vez y todas las políticas se simulan en
+    la misma pasada.
+
+    Args:
+        db: Sesión de base de datos
+        politicas: Parámetros de cada política; los que falten se toman de
+            los parámetros vigentes
+        semanas_historia: Semanas de historia a reproducir
+        ventana: Semanas del promedio móvil del pronóstico (por defecto, la
+            ventana de las estadísticas de demanda)
+        detalle: Si es True, incluye los resultados por SKU
+
+    Returns:
+        Diccionario con las métricas de cada política
+    """
+    if not politicas:
+        raise ValueError("Se requiere al menos una política")
+    if semanas_historia <= 0:
+        raise ValueError("Las semanas de historia deben ser mayores que cero")
+
+    if ventana is None:
+        ventana = obtener_parametro("ventana_estadisticas_semanas")
+    if ventana < 2:
+        raise ValueError("La ventana del pronóstico debe ser de al menos 2 semanas")
+
+    nivel_servicio = obtener_parametro("nivel_servicio")
+    lead_time = obtener_parametro("lead_time_semanas")
+
+    politicas_completas = []
+    for k, politica in enumerate(politicas):
+        if not isinstance(politica, dict):
+            raise ValueError("Cada política debe ser un objeto con sus parámetros")
+
+        desconocidos = set(politica) - PARAMETROS_POLITICA
+        if desconocidos:
+            raise ValueError(f"Parámetros de política no válidos: {', '.join(sorted(desconocidos))}")
+
+        politica = {
+            "nombre": f"Política {k + 1}",
+            "nivel_servicio": nivel_servicio,
+            "lead_time_semanas": lead_time,
+            "cobertura_semanas": 0.0,
+            **politica
+        }
+        validar_politica(politica)
+        politicas_completas.append(politica)
+
+    historia = cargar_historia_ventas(db, semanas_historia, ventana)
+    semanas_simuladas = historia["semanas"][ventana:]
+
+    if not historia["sku_ids"]:
+        return {"semanas": semanas_simuladas, "ventana": ventana, "sku_ids": [], "politicas": []}
+
+    resultado = simular_politicas(historia, politicas_completas, ventana)
+
+    demanda_total = resultado["demanda"].sum(axis=1)
+    atendido_total = resultado["atendido"].sum(axis=1)
+
+    data = []
+    for k, politica in enumerate(politicas_completas):
+        resumen = {
+            "nombre": politica["nombre"],
+            "parametros": politica,
+            "fill_rate": float(atendido_total[k] / demanda_total[k]) if demanda_total[k] > 0 else 1.0,
+            "unidades_perdidas": int(demanda_total[k] - atendido_total[k]),
+            "inventario_promedio": float(resultado["inventario_promedio"][k].sum()),
+            "semanas_con_quiebre": int(resultado["semanas_quiebre"][k].sum()),
+            "tandas": int(resultado["tandas"][k].sum()),
+            "kg_verde": float(resultado["kg_verde"][k].sum())
+        }
+
+        if detalle:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fill_rate_sku = np.where(
+                    resultado["demanda"][k] > 0,
+                    resultado["atendido"][k] / resultado["demanda"][k],
+                    1.0
+                )
+            resumen["fill_rate_por_sku"] = fill_rate_sku.tolist()
+            resumen["inventario_promedio_por_sku"] = resultado["inventario_promedio"][k].tolist()
+            resumen["tandas_por_sku"] = resultado["tandas"][k].tolist()
+
+        data.append(resumen)
+
+    return {
+        "semanas": semanas_simuladas,
+        "ventana": ventana,
+        "sku_ids": historia["sku_ids"],
+        "politicas": data
+    }
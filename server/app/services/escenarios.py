@@ -0,0 +1,320 @@
+import numpy as np
+from sqlmodel import Session
+from typing import Dict, List, Any, Tuple
+from app.crud.escenarios import get_escenario, get_ajustes_escenario
+from app.models.ajuste_escenario import AjusteEscenarioBase
+from app.services.mps import cargar_datos_mps, calcular_plan, nivelar_plan, condiciones_alerta
+from app.utils.iso_weeks import parsear_semana_iso
+
+# Parámetros que un escenario puede sobrescribir
+PARAMETROS_ESCENARIO = {"nombre", "capacidad_semanal", "nivel_servicio", "scrap", "nivelar"}
+
+# Tipos de ajuste de un escenario guardado
+TIPOS_AJUSTE = ("parametro", "demanda", "produccion_extra")
+
+def _numero(clave: str, valor: Any) -> float:
+    """
+    Convierte el valor de un parámetro de escenario a número.
+    """
+    if isinstance(valor, bool):
+        raise ValueError(f"El parámetro {clave} debe ser numérico")
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"El parámetro {clave} debe ser numérico")
+
+def validar_parametro(clave: str, valor: Any) -> float:
+    """
+    Verifica el valor de un parámetro numérico de escenario.
+
+    Args:
+        clave: "capacidad_semanal", "nivel_servicio" o "scrap"
+        valor: Valor del parámetro
+
+    Returns:
+        Valor convertido a número
+
+    Raises:
+        ValueError: Si el valor no es válido
+    """
+    numero = _numero(clave, valor)
+
+    if clave == "capacidad_semanal" and not numero > 0:
+        raise ValueError("La capacidad semanal debe ser mayor que 0")
+    if clave == "nivel_servicio" and not 0 <= numero <= 1:
+        raise ValueError("El nivel de servicio debe estar entre 0 y 1")
+    if clave == "scrap" and not 0 <= numero < 1:
+        raise ValueError("El scrap debe estar entre 0 y 1")
+
+    return numero
+
+def aplicar_overrides(datos: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aplica los parámetros de un escenario sobre los datos del MPS.
+
+    Los datos originales no se modifican; solo se copian los arreglos
+    que el escenario cambia. Solo se validan los valores sobrescritos:
+    los datos vigentes se usan tal como están.
+
+    Args:
+        datos: Datos de entrada del MPS
+        overrides: Parámetros del escenario
+
+    Returns:
+        Datos del MPS con los parámetros del escenario
+
+    Raises:
+        ValueError: Si un parámetro no existe o su valor no es válido
+    """
+    desconocidos = set(overrides) - PARAMETROS_ESCENARIO
+    if desconocidos:
+        raise ValueError(f"Parámetros de escenario no válidos: {', '.join(sorted(desconocidos))}")
+
+    datos_escenario = dict(datos)
+
+    for clave in ("capacidad_semanal", "nivel_servicio"):
+        if overrides.get(clave) is not None:
+            datos_escenario[clave] = validar_parametro(clave, overrides[clave])
+
+    scrap = overrides.get("scrap")
+    if isinstance(scrap, dict):
+        # Scrap por SKU
+        nuevo_scrap = datos["scrap"].copy()
+        for i, sku_id in enumerate(datos["sku_ids"]):
+            valor = scrap.get(str(sku_id), scrap.get(sku_id))
+            if valor is not None:
+                nuevo_scrap[i] = validar_parametro("scrap", valor)
+        datos_escenario["scrap"] = nuevo_scrap
+    elif scrap is not None:
+        # Scrap único para todos los SKUs
+        datos_escenario["scrap"] = np.full_like(datos["scrap"], validar_parametro("scrap", scrap))
+
+    return datos_escenario
+
+def validar_ajuste(ajuste: AjusteEscenarioBase) -> None:
+    """
+    Verifica que un ajuste de escenario se pueda aplicar.
+
+    Args:
+        ajuste: Ajuste a validar
+
+    Raises:
+        ValueError: Si el ajuste no es válido
+    """
+    if ajuste.tipo not in TIPOS_AJUSTE:
+        raise ValueError(f"Tipo de ajuste no válido: {ajuste.tipo}")
+
+    if ajuste.tipo == "parametro":
+        if ajuste.clave not in PARAMETROS_ESCENARIO - {"nombre"}:
+            raise ValueError(f"Parámetro de escenario no válido: {ajuste.clave}")
+        if ajuste.sku_id is not None and ajuste.clave != "scrap":
+            raise ValueError("Solo el scrap se puede ajustar por SKU")
+        if ajuste.semana is not None:
+            raise ValueError("Los parámetros no se ajustan por semana")
+        if ajuste.clave != "nivelar":
+            validar_parametro(ajuste.clave, ajuste.valor)
+        return
+
+    if ajuste.sku_id is None:
+        raise ValueError(f"El ajuste de {ajuste.tipo} requiere sku_id")
+    if ajuste.semana is not None:
+        parsear_semana_iso(ajuste.semana)
+
+def aplicar_ajustes(
+    datos: Dict[str, Any],
+    ajustes: List[AjusteEscenarioBase]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Aplica los ajustes de un escenario guardado sobre los datos del MPS.
+
+    Los datos originales no se modifican: los parámetros pasan por
+    ``aplicar_overrides`` y solo se copian las matrices que algún ajuste
+    toca. Los ajustes de SKUs o semanas fuera del horizonte se ignoran.
+
+    Args:
+        datos: Datos de entrada del MPS
+        ajustes: Ajustes del escenario
+
+    Returns:
+        Tupla (datos con el escenario aplicado, parámetros sobrescritos)
+    """
+    overrides: Dict[str, Any] = {}
+    scrap_por_sku: Dict[int, float] = {}
+    for ajuste in ajustes:
+        if ajuste.tipo != "parametro":
+            continue
+        if ajuste.clave == "scrap" and ajuste.sku_id is not None:
+            scrap_por_sku[ajuste.sku_id] = ajuste.valor
+        elif ajuste.clave == "nivelar":
+            overrides["nivelar"] = bool(ajuste.valor)
+        else:
+            overrides[ajuste.clave] = ajuste.valor
+
+    datos_escenario = aplicar_overrides(datos, overrides)
+    if scrap_por_sku:
+        datos_escenario = aplicar_overrides(datos_escenario, {"scrap": scrap_por_sku})
+
+    fila_sku = {sku_id: i for i, sku_id in enumerate(datos["sku_ids"])}
+    columna_semana = {semana: j for j, semana in enumerate(datos["semanas"])}
+    todas_columnas = list(range(len(datos["semanas"])))
+
+    for tipo in ("demanda", "produccion_extra"):
+        filas, columnas, valores = [], [], []
+        for ajuste in ajustes:
+            if ajuste.tipo != tipo or ajuste.sku_id not in fila_sku:
+                continue
+            if ajuste.semana is None:
+                columnas_ajuste = todas_columnas
+            elif ajuste.semana in columna_semana:
+                columnas_ajuste = [columna_semana[ajuste.semana]]
+            else:
+                continue
+            filas.extend([fila_sku[ajuste.sku_id]] * len(columnas_ajuste))
+            columnas.extend(columnas_ajuste)
+            valores.extend([round(ajuste.valor)] * len(columnas_ajuste))
+
+        if not filas:
+            continue
+
+        delta = np.zeros_like(datos["demanda"])
+        np.add.at(delta, (filas, columnas), valores)
+
+        if tipo == "demanda":
+            # El ajuste desplaza el pronóstico y su intervalo
+            for clave in ("demanda", "demanda_min", "demanda_max"):
+                datos_escenario[clave] = np.maximum(0, datos[clave] + delta)
+        else:
+            extra = datos.get("produccion_extra")
+            datos_escenario["produccion_extra"] = delta if extra is None else extra + delta
+
+    return datos_escenario, overrides
+
+def aplicar_escenario(
+    db: Session,
+    datos: Dict[str, Any],
+    escenario_id: int
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Aplica un escenario guardado sobre los datos del MPS.
+
+    Args:
+        db: Sesión de base de datos
+        datos: Datos de entrada del MPS
+        escenario_id: ID del escenario
+
+    Returns:
+        Tupla (datos con el escenario aplicado, parámetros sobrescritos)
+
+    Raises:
+        ValueError: Si el escenario no existe
+    """
+    if get_escenario(db, escenario_id) is None:
+        raise ValueError(f"Escenario {escenario_id} no encontrado")
+
+    return aplicar_ajustes(datos, get_ajustes_escenario(db, escenario_id))
+
+def demanda_no_atendida(datos: Dict[str, Any], plan: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Calcula la demanda que el plan no atiende con la capacidad disponible.
+
+    El plan no limita la producción a la capacidad, así que su inventario
+    nunca es negativo. Aquí la producción de cada semana que supera la
+    capacidad se recorta en la misma proporción para todos los SKUs y se
+    recorre el horizonte con ventas perdidas: la demanda que no cubre el
+    inventario disponible de la semana no se atiende.
+
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+
+    Returns:
+        Matriz SKU × semana de unidades de demanda no atendidas
+    """
+    carga = plan["kg_verde"].sum(axis=0)
+    capacidad = datos["capacidad_semanal"] * datos.get("semanas_por_bucket", 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(carga > capacidad, capacidad / carga, 1.0)
+
+    produccion = np.floor(plan["produccion"] * factor[None, :])
+    entradas = np.floor(produccion * (1 - datos["scrap"][:, None])).astype(np.int64)
+    if datos.get("produccion_extra") is not None:
+        entradas = entradas + datos["produccion_extra"]
+
+    no_atendida = np.zeros_like(entradas)
+    inventario = np.maximum(0, datos["inventario_inicial"].astype(np.int64))
+    for j in range(entradas.shape[1]):
+        disponible = inventario + entradas[:, j]
+        no_atendida[:, j] = np.maximum(0, datos["demanda"][:, j] - disponible)
+        inventario = np.maximum(0, disponible - datos["demanda"][:, j])
+
+    return no_atendida
+
+def resumir_escenario(tarea: Tuple[Dict[str, Any], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Calcula el plan de un escenario y resume sus métricas.
+
+    Args:
+        tarea: Tupla (datos del MPS con el escenario aplicado, parámetros del escenario)
+
+    Returns:
+        Diccionario con las métricas del escenario
+    """
+    datos, overrides = tarea
+
+    plan = calcular_plan(datos)
+    if overrides.get("nivelar", False):
+        plan = nivelar_plan(datos, plan)
+
+    carga_semanal = plan["kg_verde"].sum(axis=0)
+    no_atendida = demanda_no_atendida(datos, plan)
+
+    return {
+        "nombre": overrides.get("nombre"),
+        "parametros": overrides,
+        "kg_total": float(carga_semanal.sum()),
+        "unidades_total": int(plan["produccion"].sum()),
+        "semanas_sobre_capacidad": int((carga_semanal > datos["capacidad_semanal"]).sum()),
+        "quiebres_proyectados": int((no_atendida > 0).sum()),
+        "demanda_no_atendida": int(no_atendida.sum()),
+        "alertas": {
+            regla["codigo"]: int(mascara.sum())
+            for mascara, regla in condiciones_alerta(datos, plan)
+        }
+    }
+
+def evaluar_escenarios(
+    db: Session,
+    escenarios: List[Dict[str, Any]],
+    semanas: int = 6
+) -> List[Dict[str, Any]]:
+    """
+    Evalúa varios escenarios de parámetros sobre la misma demanda.
+
+    El pronóstico y los datos del MPS se cargan una sola vez; cada escenario
+    solo recalcula el plan sobre los arreglos. Se evalúan en serie: cada
+    plan son operaciones de numpy de microsegundos, y enviar los datos a
+    otros procesos costaría más que calcularlo.
+
+    Args:
+        db: Sesión de base de datos
+        escenarios: Lista de parámetros a sobrescribir por escenario
+        semanas: Número de semanas a planificar
+
+    Returns:
+        Lista con las métricas de cada escenario
+
+    Raises:
+        ValueError: Si un escenario no es un objeto o sus parámetros no son
+            válidos
+    """
+    if not all(isinstance(overrides, dict) for overrides in escenarios):
+        raise ValueError("Cada escenario debe ser un objeto con sus parámetros")
+
+    datos = cargar_datos_mps(db, semanas)
+
+    tareas = []
+    for i, overrides in enumerate(escenarios):
+        overrides = {"nombre": f"Escenario {i + 1}", **overrides}
+        tareas.append((aplicar_overrides(datos, overrides), overrides))
+
+    return [resumir_escenario(tarea) for tarea in tareas]
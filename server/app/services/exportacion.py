@@ -0,0 +1,208 @@
+import csv
+import io
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from sqlmodel import Session
+from tempfile import SpooledTemporaryFile
+from typing import Dict, List, Any, Iterator, BinaryIO
+from app.services.mps import cargar_datos_mps, calcular_plan, nivelar_plan
+
+# Métricas del plan que se exportan, con el nombre de su hoja en Excel
+METRICAS_EXPORTACION = [
+    ("demanda", "Demanda"),
+    ("inventario_inicial", "Inventario Inicial"),
+    ("stock_seguridad", "Stock Seguridad"),
+    ("produccion", "Producción"),
+    ("inventario_final", "Inventario Final")
+]
+
+# Formatos de exportación: tipo de contenido y extensión del archivo
+FORMATOS_EXPORTACION = {
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet")
+}
+
+# Tamaño de los bloques que se envían al cliente
+BYTES_POR_BLOQUE = 64 * 1024
+
+# Archivos temporales por debajo de este tamaño se mantienen en memoria
+MAX_BYTES_EN_MEMORIA = 8 * 1024 * 1024
+
+# SKUs que se convierten a filas a la vez en CSV y Parquet
+SKUS_POR_BLOQUE = 200
+
+def _valores_metrica(datos: Dict[str, Any], plan: Dict[str, np.ndarray], metrica: str) -> np.ndarray:
+    """
+    Obtiene la matriz SKU × semana de una métrica (la demanda viene de los datos).
+    """
+    return datos["demanda"] if metrica == "demanda" else plan[metrica]
+
+def _productos(datos: Dict[str, Any]) -> List[str]:
+    """
+    Arma la etiqueta de producto de cada SKU.
+    """
+    return [
+        f"{nombre} ({int(presentacion)}g)"
+        for nombre, presentacion in zip(datos["nombres"], datos["presentacion_g"])
+    ]
+
+def _leer_en_bloques(archivo: BinaryIO) -> Iterator[bytes]:
+    """
+    Entrega el contenido de un archivo temporal por bloques y lo cierra.
+    """
+    try:
+        archivo.seek(0)
+        while True:
+            bloque = archivo.read(BYTES_POR_BLOQUE)
+            if not bloque:
+                break
+            yield bloque
+    finally:
+        archivo.close()
+
+def exportar_xlsx(datos: Dict[str, Any], plan: Dict[str, np.ndarray]) -> Iterator[bytes]:
+    """
+    Exporta el plan a Excel con una hoja por métrica.
+
+    El libro se escribe en modo de solo escritura de openpyxl, que no
+    mantiene las celdas en memoria, sobre un archivo temporal que solo pasa
+    a disco si crece.
+
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+
+    Returns:
+        Iterador con los bloques del archivo
+    """
+    libro = Workbook(write_only=True)
+    productos = _productos(datos)
+
+    for metrica, titulo in METRICAS_EXPORTACION:
+        hoja = libro.create_sheet(title=titulo)
+        hoja.append(["producto", *datos["semanas"]])
+        for producto, fila in zip(productos, _valores_metrica(datos, plan, metrica).tolist()):
+            hoja.append([producto, *fila])
+
+    archivo = SpooledTemporaryFile(max_size=MAX_BYTES_EN_MEMORIA)
+    libro.save(archivo)
+    return _leer_en_bloques(archivo)
+
+def exportar_csv(datos: Dict[str, Any], plan: Dict[str, np.ndarray]) -> Iterator[bytes]:
+    """
+    Exporta el plan a CSV en formato largo (una fila por SKU y semana).
+
+    Las filas se generan por bloques de SKUs directamente desde las matrices
+    del plan.
+
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+
+    Returns:
+        Iterador con los bloques del archivo
+    """
+    semanas = datos["semanas"]
+    productos = _productos(datos)
+    matrices = [_valores_metrica(datos, plan, metrica) for metrica, _ in METRICAS_EXPORTACION]
+    n_skus = len(datos["sku_ids"])
+
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(["sku_id", "producto", "semana", *[metrica for metrica, _ in METRICAS_EXPORTACION]])
+
+    for inicio in range(0, n_skus, SKUS_POR_BLOQUE):
+        fin = min(inicio + SKUS_POR_BLOQUE, n_skus)
+        valores = [matriz[inicio:fin].tolist() for matriz in matrices]
+
+        for k, i in enumerate(range(inicio, fin)):
+            for j, semana in enumerate(semanas):
+                escritor.writerow([datos["sku_ids"][i], productos[i], semana, *[v[k][j] for v in valores]])
+
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def exportar_parquet(datos: Dict[str, Any], plan: Dict[str, np.ndarray]) -> Iterator[bytes]:
+    """
+    Exporta el plan a Parquet en formato largo (una fila por SKU y semana).
+
+    Cada bloque de SKUs se escribe como un grupo de filas a partir de las
+    columnas de las matrices, sin pasar por objetos Python por celda.
+
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+
+    Returns:
+        Iterador con los bloques del archivo
+    """
+    semanas = np.array(datos["semanas"])
+    sku_ids = np.array(datos["sku_ids"], dtype=np.int64)
+    productos = np.array(_productos(datos))
+    n_skus, n_semanas = datos["demanda"].shape
+
+    esquema = pa.schema(
+        [("sku_id", pa.int64()), ("producto", pa.string()), ("semana", pa.string())]
+        + [(metrica, pa.int64()) for metrica, _ in METRICAS_EXPORTACION]
+    )
+
+    archivo = SpooledTemporaryFile(max_size=MAX_BYTES_EN_MEMORIA)
+    with pq.ParquetWriter(archivo, esquema, compression="snappy") as escritor:
+        for inicio in range(0, n_skus, SKUS_POR_BLOQUE):
+            fin = min(inicio + SKUS_POR_BLOQUE, n_skus)
+            columnas = {
+                "sku_id": np.repeat(sku_ids[inicio:fin], n_semanas),
+                "producto": np.repeat(productos[inicio:fin], n_semanas),
+                "semana": np.tile(semanas, fin - inicio)
+            }
+            for metrica, _ in METRICAS_EXPORTACION:
+                columnas[metrica] = _valores_metrica(datos, plan, metrica)[inicio:fin].astype(np.int64).ravel()
+
+            escritor.write_table(pa.table(columnas, schema=esquema))
+
+    return _leer_en_bloques(archivo)
+
+# Función de exportación de cada formato
+EXPORTADORES = {
+    "xlsx": exportar_xlsx,
+    "csv": exportar_csv,
+    "parquet": exportar_parquet
+}
+
+def generar_exportacion(
+    db: Session,
+    formato: str,
+    semanas: int = 6,
+    nivelar: bool = False
+) -> Iterator[bytes]:
+    """
+    Calcula el MPS y lo exporta en el formato indicado.
+
+    El plan se calcula antes de devolver el iterador, de modo que los
+    errores se informan antes de empezar a enviar el archivo.
+
+    Args:
+        db: Sesión de base de datos
+        formato: "xlsx", "csv" o "parquet"
+        semanas: Número de semanas a planificar
+        nivelar: Si es True, exporta el plan nivelado por capacidad
+
+    Returns:
+        Iterador con los bloques del archivo
+    """
+    if formato not in EXPORTADORES:
+        raise ValueError(f"Formato de exportación no válido: {formato}")
+
+    datos = cargar_datos_mps(db, semanas)
+    plan = calcular_plan(datos)
+    if nivelar:
+        plan = nivelar_plan(datos, plan)
+
+    return EXPORTADORES[formato](datos, plan)
@@ -0,0 +1,116 @@
+import numpy as np
+from datetime import date, timedelta
+from sqlmodel import Session
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, List, Any, Optional
+from app.crud.inventario import (
+    get_saldos_inventario,
+    get_ultima_fecha_saldo,
+    get_primera_fecha_movimiento,
+    get_movimientos_semanales,
+    guardar_saldos_inventario
+)
+from app.models.saldo_inventario import SaldoInventario
+from app.utils.iso_weeks import fecha_a_semana_iso, semana_iso_a_fecha, parsear_semana_iso
+
+def _lunes(fecha: date) -> date:
+    """
+    Obtiene el lunes de la semana ISO de una fecha.
+    """
+    return semana_iso_a_fecha(*fecha_a_semana_iso(fecha))
+
+def consolidar_saldos_inventario(db: Session, hasta: Optional[date] = None) -> int:
+    """
+    Guarda los saldos semanales de inventario que falten.
+
+    Se parte del último saldo guardado (o de cero antes del primer
+    movimiento) y se suman los movimientos de cada semana, obtenidos con
+    una sola consulta agrupada. Solo se guardan saldos de lunes ya
+    iniciados.
+
+    Args:
+        db: Sesión de base de datos
+        hasta: Fecha hasta la que se consolida (por defecto, hoy)
+
+    Returns:
+        Número de saldos guardados
+    """
+    lunes_hasta = _lunes(hasta or date.today())
+
+    ultima = get_ultima_fecha_saldo(db)
+    if ultima is not None:
+        base = ultima
+        saldos = get_saldos_inventario(db, ultima)
+    else:
+        primera = get_primera_fecha_movimiento(db)
+        if primera is None:
+            return 0
+        base = _lunes(primera)
+        saldos = {}
+
+    if base + timedelta(weeks=1) > lunes_hasta:
+        return 0
+
+    deltas: Dict[date, Dict[int, int]] = {}
+    for sku_id, año, semana, cantidad in get_movimientos_semanales(db, base, lunes_hasta):
+        deltas.setdefault(semana_iso_a_fecha(año, semana), {})[sku_id] = int(cantidad)
+
+    nuevos: List[SaldoInventario] = []
+    lunes = base
+    while lunes < lunes_hasta:
+        for sku_id, cantidad in deltas.get(lunes, {}).items():
+            saldos[sku_id] = saldos.get(sku_id, 0) + cantidad
+        lunes += timedelta(weeks=1)
+        nuevos += [SaldoInventario(sku_id=sku_id, fecha=lunes, saldo=saldo) for sku_id, saldo in saldos.items()]
+
+    try:
+        guardar_saldos_inventario(db, nuevos)
+    except IntegrityError:
+        # Otro proceso consolidó las mismas semanas
+        db.rollback()
+        return 0
+
+    return len(nuevos)
+
+def calcular_inventarios_iniciales(db: Session, sku_ids: List[int], semana: str) -> np.ndarray:
+    """
+    Obtiene el inventario de varios SKUs al inicio de una semana.
+
+    Es el saldo del libro de inventario al lunes de la semana, sin sus
+    movimientos. Los saldos negativos (ventas sin producción registrada)
+    se toman como cero. Solo lee: los saldos semanales se consolidan en
+    las tareas periódicas.
+
+    Args:
+        db: Sesión de base de datos
+        sku_ids: IDs de los SKUs
+        semana: Semana en formato "YYYY-SWW"
+
+    Returns:
+        Arreglo con el inventario inicial de cada SKU
+    """
+    saldos = get_saldos_inventario(db, semana_iso_a_fecha(*parsear_semana_iso(semana)), sku_ids)
+    return np.array([max(0, saldos.get(sku_id, 0)) for sku_id in sku_ids], dtype=np.int64)
+
+def obtener_inventario(db: Session, fecha: Optional[date] = None, sku_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Obtiene el inventario de cada SKU al cierre de una fecha.
+
+    Solo lee: los saldos semanales se consolidan en las tareas periódicas.
+
+    Args:
+        db: Sesión de base de datos
+        fecha: Fecha de cierre (por defecto, hoy)
+        sku_id: Filtrar por SKU
+
+    Returns:
+        Diccionario con la fecha y el inventario por SKU
+    """
+    fecha = fecha or date.today()
+
+    saldos = get_saldos_inventario(db, fecha + timedelta(days=1), None if sku_id is None else [sku_id])
+
+    return {
+        "fecha": fecha.isoformat(),
+        "data": [{"sku_id": sku_id, "inventario": saldo} for sku_id, saldo in sorted(saldos.items())]
+    }
@@ -1,131 +1,242 @@
 from sqlmodel import Session, select
+from sqlalchemy import func, case, literal, union_all, extract
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-import pandas as pd
-import random
-from app.models.sku import SKU
+from datetime import date, timedelta
+import numpy as np
 from app.models.venta import Venta
 from app.models.produccion import Produccion
-from app.crud.parametros import get_parametro
+from app.models.kpi_diario import KpiDiario
+from app.models.plan_semanal import PlanSemanal
+from app.models.sku import SKU
+from app.crud.kpis_diarios import get_ultima_fecha_kpi, get_recalculo_pendiente, reemplazar_kpis_diarios
+from app.crud.planes_semanales import get_cumplimiento_plan_semanal
+from app.services.parametros import obtener_parametro
+from app.utils.iso_weeks import fecha_a_semana_iso, semana_iso_a_fecha
+from app.utils.muestreo import lttb
+
+# Semanas hacia atrás que consideran los KPIs de flujo (OTD y rechazos)
+SEMANAS_VENTANA_KPI = 13
+
+# Días de venta con los que se estima la venta diaria promedio
+DIAS_VENTA_PROMEDIO = 28
+
+# KPIs que se materializan por día
+KPIS_DIARIOS = ["dias_inventario", "cumplimiento_plan", "otd", "rechazos"]
+
+# Resoluciones del historial de KPIs
+RESOLUCIONES_KPI = ("dia", "semana", "mes")
+
+# Columnas de SKU por las que se pueden desglosar los KPIs
+AGRUPACIONES_KPI = {
+    "sku": {"sku_id": SKU.id, "nombre": SKU.nombre, "presentacion_g": SKU.presentacion_g},
+    "presentacion": {"presentacion_g": SKU.presentacion_g}
+}
+
+# Componentes que se suman por grupo para calcular cada KPI
+COMPONENTES_KPI = (
+    "producido", "vendido", "vendido_reciente",
+    "planificado", "cumplido",
+    "a_tiempo", "despachado",
+    "kg_rechazados", "kg_verde"
+)
 
-def calcular_dias_inventario(db: Session) -> float:
+def _clave_semana(fecha: date) -> int:
+    """
+    Convierte una fecha en la clave ordenable año * 100 + semana ISO.
+    """
+    año, semana = fecha_a_semana_iso(fecha)
+    return año * 100 + semana
+
+def _clave_produccion():
+    """
+    Expresión SQL con la clave año * 100 + semana ISO de la producción.
+    """
+    return Produccion.año_iso * 100 + Produccion.semana_iso
+
+def calcular_dias_inventario(db: Session, fecha_corte: Optional[date] = None) -> float:
     """
     Calcula el KPI de días de inventario.
     
+    El inventario es la producción acumulada menos las ventas acumuladas a
+    la fecha de corte, y se divide por la venta diaria promedio de los
+    últimos días. Se resuelve en una sola consulta.
+    
     Args:
         db: Sesión de base de datos
+        fecha_corte: Fecha a la que se calcula el KPI (por defecto, hoy)
     
     Returns:
-        Días de inventario
+        Días de inventario (0 si no hay ventas recientes)
     """
-    # En una implementación real, esto se calcularía con datos reales de inventario
-    # Por ahora, generamos un valor simulado
+    fecha_corte = fecha_corte or date.today()
+    
+    producido = select(func.coalesce(func.sum(Produccion.unidades_producidas), 0)).where(
+        _clave_produccion() <= _clave_semana(fecha_corte)
+    ).scalar_subquery()
+    vendido = select(func.coalesce(func.sum(Venta.unidades), 0)).where(
+        Venta.fecha <= fecha_corte
+    ).scalar_subquery()
+    vendido_reciente = select(func.coalesce(func.sum(Venta.unidades), 0)).where(
+        Venta.fecha > fecha_corte - timedelta(days=DIAS_VENTA_PROMEDIO),
+        Venta.fecha <= fecha_corte
+    ).scalar_subquery()
     
-    # Obtener objetivo de días de inventario
-    param = get_parametro(db, "dias_inventario_objetivo")
-    objetivo = float(param.valor) if param else 15.0
+    inventario, venta_reciente = db.exec(select(producido - vendido, vendido_reciente)).one()
     
-    # Simular valor actual (entre 70% y 130% del objetivo)
-    factor = random.uniform(0.7, 1.3)
-    dias_inventario = objetivo * factor
+    if not venta_reciente:
+        return 0.0
     
-    return dias_inventario
+    return max(0.0, float(inventario)) / (float(venta_reciente) / DIAS_VENTA_PROMEDIO)
 
-def calcular_cumplimiento_plan(db: Session) -> float:
+def calcular_cumplimiento_plan(db: Session, fecha_corte: Optional[date] = None) -> float:
     """
     Calcula el KPI de cumplimiento del plan.
     
+    Se compara el plan congelado al inicio de cada semana cerrada de las
+    últimas semanas con la producción registrada, que se mantiene al día
+    en ``plan_semanal`` a medida que se registra producción. La producción
+    por encima del plan no compensa los faltantes de otros SKUs o semanas.
+    
     Args:
         db: Sesión de base de datos
+        fecha_corte: Fecha a la que se calcula el KPI (por defecto, hoy)
     
     Returns:
-        Porcentaje de cumplimiento (0-1)
+        Porcentaje de cumplimiento (0-1; 0 si no hay plan en semanas cerradas)
     """
-    # En una implementación real, esto se calcularía comparando la producción real vs planificada
-    # Por ahora, generamos un valor simulado
+    fecha_corte = fecha_corte or date.today()
     
-    # Obtener objetivo de cumplimiento
-    param = get_parametro(db, "objetivo_cumplimiento_plan")
-    objetivo = float(param.valor) if param else 0.95
+    planificado, cumplido = get_cumplimiento_plan_semanal(
+        db,
+        _clave_semana(fecha_corte - timedelta(weeks=SEMANAS_VENTANA_KPI)),
+        _clave_semana(fecha_corte - timedelta(weeks=1))
+    )
     
-    # Simular valor actual (entre 80% y 105% del objetivo)
-    factor = random.uniform(0.8, 1.05)
-    cumplimiento = objetivo * factor
+    if planificado == 0:
+        return 0.0
     
-    return min(1.0, cumplimiento)  # Limitar a 1.0 (100%)
+    return cumplido / planificado
+
+def _saldos_semanales(fecha_corte: date):
+    """
+    Subconsulta con las ventas y el saldo acumulado (producción menos
+    ventas) de cada SKU y semana hasta la fecha de corte.
+    """
+    clave_corte = _clave_semana(fecha_corte)
+    
+    movimientos = union_all(
+        select(
+            Produccion.sku_id.label("sku_id"),
+            Produccion.año_iso.label("año"),
+            Produccion.semana_iso.label("semana"),
+            Produccion.unidades_producidas.label("entrada"),
+            literal(0).label("salida")
+        ).where(_clave_produccion() <= clave_corte),
+        select(
+            Venta.sku_id,
+            Venta.año_iso,
+            Venta.semana_iso,
+            literal(0),
+            Venta.unidades
+        ).where(Venta.fecha <= fecha_corte)
+    ).subquery()
+    
+    return select(
+        movimientos.c.sku_id,
+        movimientos.c.año,
+        movimientos.c.semana,
+        func.sum(movimientos.c.salida).label("salida"),
+        func.sum(func.sum(movimientos.c.entrada - movimientos.c.salida)).over(
+            partition_by=movimientos.c.sku_id,
+            order_by=(movimientos.c.año, movimientos.c.semana)
+        ).label("saldo")
+    ).group_by(movimientos.c.sku_id, movimientos.c.año, movimientos.c.semana).subquery()
 
-def calcular_otd(db: Session) -> float:
+def calcular_otd(db: Session, fecha_corte: Optional[date] = None) -> float:
     """
     Calcula el KPI de On-Time Delivery.
     
+    Las ventas de una semana se consideran a tiempo si la producción
+    acumulada del SKU cubre sus ventas acumuladas hasta esa semana, es decir,
+    si se despacharon desde inventario. El saldo acumulado se obtiene con
+    una función de ventana sobre los movimientos semanales, en una sola
+    consulta, y el KPI se pondera por unidades vendidas en las últimas
+    semanas.
+    
     Args:
         db: Sesión de base de datos
+        fecha_corte: Fecha a la que se calcula el KPI (por defecto, hoy)
     
     Returns:
-        Porcentaje de OTD (0-1)
+        Porcentaje de OTD (0-1; 0 si no hay ventas en la ventana)
     """
-    # En una implementación real, esto se calcularía con datos de entregas
-    # Por ahora, generamos un valor simulado
+    fecha_corte = fecha_corte or date.today()
+    clave_inicio = _clave_semana(fecha_corte - timedelta(weeks=SEMANAS_VENTANA_KPI - 1))
+    
+    semanal = _saldos_semanales(fecha_corte)
     
-    # Obtener objetivo de OTD
-    param = get_parametro(db, "objetivo_otd")
-    objetivo = float(param.valor) if param else 0.98
+    a_tiempo, total = db.exec(
+        select(
+            func.sum(case((semanal.c.saldo >= 0, semanal.c.salida), else_=0)),
+            func.sum(semanal.c.salida)
+        ).where(semanal.c.año * 100 + semanal.c.semana >= clave_inicio)
+    ).one()
     
-    # Simular valor actual (entre 90% y 102% del objetivo)
-    factor = random.uniform(0.9, 1.02)
-    otd = objetivo * factor
+    if not total:
+        return 0.0
     
-    return min(1.0, otd)  # Limitar a 1.0 (100%)
+    return float(a_tiempo) / float(total)
 
-def calcular_rechazos(db: Session) -> float:
+def calcular_rechazos(db: Session, fecha_corte: Optional[date] = None) -> float:
     """
     Calcula el KPI de tasa de rechazos.
     
+    Es el scrap de la producción de las últimas semanas ponderado por los
+    kg de café verde procesados, en una sola consulta.
+    
     Args:
         db: Sesión de base de datos
+        fecha_corte: Fecha a la que se calcula el KPI (por defecto, hoy)
     
     Returns:
-        Porcentaje de rechazos (0-1)
+        Porcentaje de rechazos (0-1; 0 si no hay producción en la ventana)
     """
-    # En una implementación real, esto se calcularía con datos de control de calidad
-    # Por ahora, generamos un valor simulado
+    fecha_corte = fecha_corte or date.today()
+    clave_inicio = _clave_semana(fecha_corte - timedelta(weeks=SEMANAS_VENTANA_KPI - 1))
     
-    # Obtener objetivo de rechazos
-    param = get_parametro(db, "objetivo_rechazos")
-    objetivo = float(param.valor) if param else 0.02
+    kg_rechazados, kg_total = db.exec(
+        select(func.sum(Produccion.scrap * Produccion.kg_verde), func.sum(Produccion.kg_verde))
+        .where(_clave_produccion().between(clave_inicio, _clave_semana(fecha_corte)))
+        .where(Produccion.scrap.is_not(None))
+    ).one()
     
-    # Simular valor actual (entre 80% y 150% del objetivo)
-    factor = random.uniform(0.8, 1.5)
-    rechazos = objetivo * factor
+    if not kg_total:
+        return 0.0
     
-    return rechazos
+    return float(kg_rechazados) / float(kg_total)
 
-def obtener_kpis(db: Session) -> Dict[str, Any]:
+def obtener_kpis(db: Session, fecha_corte: Optional[date] = None) -> Dict[str, Any]:
     """
-    Obtiene todos los KPIs actuales.
+    Obtiene todos los KPIs a una fecha de corte.
     
     Args:
         db: Sesión de base de datos
+        fecha_corte: Fecha a la que se calculan los KPIs (por defecto, hoy)
     
     Returns:
         Diccionario con los KPIs
     """
     # Calcular KPIs
-    dias_inventario = calcular_dias_inventario(db)
-    cumplimiento_plan = calcular_cumplimiento_plan(db)
-    otd = calcular_otd(db)
-    rechazos = calcular_rechazos(db)
+    dias_inventario = calcular_dias_inventario(db, fecha_corte)
+    cumplimiento_plan = calcular_cumplimiento_plan(db, fecha_corte)
+    otd = calcular_otd(db, fecha_corte)
+    rechazos = calcular_rechazos(db, fecha_corte)
     
     # Obtener objetivos
-    param_dias = get_parametro(db, "dias_inventario_objetivo")
-    param_cumplimiento = get_parametro(db, "objetivo_cumplimiento_plan")
-    param_otd = get_parametro(db, "objetivo_otd")
-    param_rechazos = get_parametro(db, "objetivo_rechazos")
-    
-    objetivo_dias = float(param_dias.valor) if param_dias else 15.0
-    objetivo_cumplimiento = float(param_cumplimiento.valor) if param_cumplimiento else 0.95
-    objetivo_otd = float(param_otd.valor) if param_otd else 0.98
-    objetivo_rechazos = float(param_rechazos.valor) if param_rechazos else 0.02
+    objetivo_dias = obtener_parametro("dias_inventario_objetivo")
+    objetivo_cumplimiento = obtener_parametro("objetivo_cumplimiento_plan")
+    objetivo_otd = obtener_parametro("objetivo_otd")
+    objetivo_rechazos = obtener_parametro("objetivo_rechazos")
     
     return {
         "dias_inventario": dias_inventario,
@@ -138,61 +249,441 @@ def obtener_kpis(db: Session) -> Dict[str, Any]:
         "objetivo_rechazos": objetivo_rechazos
     }
 
-def obtener_kpis_historicos(db: Session, dias: int = 90) -> List[Dict[str, Any]]:
+def _hechos_kpi(sku_id, **componentes):
     """
-    Obtiene el historial de KPIs.
+    Selecciona ``sku_id`` y todos los componentes de los KPIs, con cero en
+    los que no se indican, para unir hechos de distintas tablas.
+    """
+    return select(
+        sku_id.label("sku_id"),
+        *[componentes.get(nombre, literal(0)).label(nombre) for nombre in COMPONENTES_KPI]
+    )
+
+def obtener_kpis_por_grupo(
+    db: Session,
+    agrupar: str,
+    fecha_corte: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    Desglosa los KPIs por SKU o por presentación.
+    
+    Los componentes de los cuatro KPIs (producción, ventas, plan congelado,
+    saldos semanales y scrap) se unen por SKU y se suman por grupo en una
+    sola consulta con ``GROUP BY``; cada KPI del grupo es el cociente de sus
+    sumas, con las mismas reglas que los KPIs globales. El resultado es
+    columnar: cada columna es una lista con un valor por grupo.
     
     Args:
         db: Sesión de base de datos
-        dias: Número de días de historial
+        agrupar: "sku" o "presentacion"
+        fecha_corte: Fecha a la que se calculan los KPIs (por defecto, hoy)
     
     Returns:
-        Lista de diccionarios con los KPIs históricos
+        Diccionario con los objetivos y las columnas de la tabla por grupo
+        (None en los KPIs sin datos en el grupo)
     """
-    # En una implementación real, esto se obtendría de una tabla de historial
-    # Por ahora, generamos datos simulados
-    
-    # Obtener objetivos
-    kpis_actuales = obtener_kpis(db)
+    if agrupar not in AGRUPACIONES_KPI:
+        raise ValueError(f"Agrupación no válida: {agrupar}. Valores permitidos: {', '.join(AGRUPACIONES_KPI)}")
+    
+    fecha_corte = fecha_corte or date.today()
+    clave_corte = _clave_semana(fecha_corte)
+    clave_inicio = _clave_semana(fecha_corte - timedelta(weeks=SEMANAS_VENTANA_KPI - 1))
+    clave_plan = PlanSemanal.año_iso * 100 + PlanSemanal.semana_iso
+    semanal = _saldos_semanales(fecha_corte)
+    
+    hechos = union_all(
+        _hechos_kpi(
+            Produccion.sku_id,
+            producido=Produccion.unidades_producidas,
+            kg_rechazados=case(
+                (_clave_produccion() >= clave_inicio, func.coalesce(Produccion.scrap, 0) * Produccion.kg_verde),
+                else_=0
+            ),
+            kg_verde=case(
+                ((_clave_produccion() >= clave_inicio) & Produccion.scrap.is_not(None), Produccion.kg_verde),
+                else_=0
+            )
+        ).where(_clave_produccion() <= clave_corte),
+        _hechos_kpi(
+            Venta.sku_id,
+            vendido=Venta.unidades,
+            vendido_reciente=case(
+                (Venta.fecha > fecha_corte - timedelta(days=DIAS_VENTA_PROMEDIO), Venta.unidades),
+                else_=0
+            )
+        ).where(Venta.fecha <= fecha_corte),
+        _hechos_kpi(
+            PlanSemanal.sku_id,
+            planificado=PlanSemanal.unidades_planificadas,
+            cumplido=case(
+                (PlanSemanal.unidades_producidas < PlanSemanal.unidades_planificadas, PlanSemanal.unidades_producidas),
+                else_=PlanSemanal.unidades_planificadas
+            )
+        ).where(clave_plan.between(
+            _clave_semana(fecha_corte - timedelta(weeks=SEMANAS_VENTANA_KPI)),
+            _clave_semana(fecha_corte - timedelta(weeks=1))
+        )),
+        _hechos_kpi(
+            semanal.c.sku_id,
+            a_tiempo=case((semanal.c.saldo >= 0, semanal.c.salida), else_=0),
+            despachado=semanal.c.salida
+        ).where(semanal.c.año * 100 + semanal.c.semana >= clave_inicio)
+    ).subquery()
+    
+    columnas_grupo = list(AGRUPACIONES_KPI[agrupar])
+    grupo = list(AGRUPACIONES_KPI[agrupar].values())
+    filas = db.exec(
+        select(*grupo, *[func.sum(hechos.c[nombre]) for nombre in COMPONENTES_KPI])
+        .select_from(hechos)
+        .join(SKU, SKU.id == hechos.c.sku_id)
+        .group_by(*grupo)
+        .order_by(*grupo)
+    ).all()
+    
+    data: Dict[str, List[Any]] = {nombre: [] for nombre in columnas_grupo}
+    for kpi in KPIS_DIARIOS:
+        data[kpi] = []
+    data["unidades_vendidas"] = []
+    data["unidades_planificadas"] = []
+    
+    for fila in filas:
+        for nombre, valor in zip(columnas_grupo, fila):
+            data[nombre].append(valor)
+        c = dict(zip(COMPONENTES_KPI, (float(valor or 0) for valor in fila[len(grupo):])))
+        
+        data["dias_inventario"].append(
+            max(0.0, c["producido"] - c["vendido"]) / (c["vendido_reciente"] / DIAS_VENTA_PROMEDIO)
+            if c["vendido_reciente"] else None
+        )
+        data["cumplimiento_plan"].append(c["cumplido"] / c["planificado"] if c["planificado"] else None)
+        data["otd"].append(c["a_tiempo"] / c["despachado"] if c["despachado"] else None)
+        data["rechazos"].append(c["kg_rechazados"] / c["kg_verde"] if c["kg_verde"] else None)
+        data["unidades_vendidas"].append(int(c["despachado"]))
+        data["unidades_planificadas"].append(int(c["planificado"]))
     
-    objetivo_dias = kpis_actuales["objetivo_dias_inventario"]
-    objetivo_cumplimiento = kpis_actuales["objetivo_cumplimiento_plan"]
-    objetivo_otd = kpis_actuales["objetivo_otd"]
-    objetivo_rechazos = kpis_actuales["objetivo_rechazos"]
+    return {
+        "fecha_corte": fecha_corte.isoformat(),
+        "agrupar": agrupar,
+        "objetivos": {
+            "dias_inventario": obtener_parametro("dias_inventario_objetivo"),
+            "cumplimiento_plan": obtener_parametro("objetivo_cumplimiento_plan"),
+            "otd": obtener_parametro("objetivo_otd"),
+            "rechazos": obtener_parametro("objetivo_rechazos")
+        },
+        "data": data
+    }
+
+def _acumulado(matriz: np.ndarray) -> np.ndarray:
+    """
+    Suma acumulada por columnas con una columna inicial de ceros, para
+    obtener la suma de un rango de columnas [i, j) como ``a[j] - a[i]``.
+    """
+    return np.concatenate([np.zeros(matriz.shape[:-1] + (1,)), np.cumsum(matriz, axis=-1)], axis=-1)
+
+def calcular_kpis_diarios(db: Session, desde: date, hasta: date) -> List[KpiDiario]:
+    """
+    Calcula los KPIs de cada día de un rango en una sola pasada.
     
-    # Generar fechas
-    hoy = datetime.now()
-    fechas = [hoy - timedelta(days=i) for i in range(dias)]
-    fechas.sort()  # Ordenar de más antiguo a más reciente
+    Se leen con consultas agrupadas las ventas por SKU y día, la producción
+    por SKU y semana, el scrap y el plan congelado por semana del rango
+    (más las semanas de ventana anteriores) y los acumulados previos. Los
+    saldos por SKU y las sumas de las ventanas se llevan día a día con
+    sumas acumuladas, con los mismos criterios que ``calcular_*`` a una
+    fecha de corte.
     
-    # Generar datos históricos
-    historico = []
+    Args:
+        db: Sesión de base de datos
+        desde: Primer día a calcular
+        hasta: Último día a calcular
     
-    for fecha in fechas:
-        # Simular valores con tendencia y algo de ruido
-        progreso = fechas.index(fecha) / len(fechas)  # 0 a 1
-        
-        # Días de inventario: tendencia a mejorar
-        dias_inv = objetivo_dias * (0.8 + 0.4 * progreso + random.uniform(-0.1, 0.1))
+    Returns:
+        Lista de KPIs diarios, uno por día del rango
+    """
+    if desde > hasta:
+        return []
+    
+    # Lunes desde el que se necesitan datos: la ventana de venta promedio
+    # y las semanas de ventana de OTD, rechazos y cumplimiento del plan
+    lunes_desde = desde - timedelta(days=desde.weekday())
+    inicio = min(desde - timedelta(days=DIAS_VENTA_PROMEDIO), lunes_desde - timedelta(weeks=SEMANAS_VENTANA_KPI))
+    inicio -= timedelta(days=inicio.weekday())
+    clave_inicio = _clave_semana(inicio)
+    clave_hasta = _clave_semana(hasta)
+    
+    n_dias = (hasta - inicio).days + 1
+    n_semanas = (n_dias + 6) // 7
+    
+    def indice_semana(año: int, semana: int) -> int:
+        return (semana_iso_a_fecha(año, semana) - inicio).days // 7
+    
+    ventas_previas = db.exec(
+        select(Venta.sku_id, func.sum(Venta.unidades)).where(Venta.fecha < inicio).group_by(Venta.sku_id)
+    ).all()
+    ventas_diarias = db.exec(
+        select(Venta.sku_id, Venta.fecha, func.sum(Venta.unidades))
+        .where(Venta.fecha >= inicio, Venta.fecha <= hasta)
+        .group_by(Venta.sku_id, Venta.fecha)
+    ).all()
+    produccion_semanal = db.exec(
+        select(Produccion.sku_id, Produccion.año_iso, Produccion.semana_iso, func.sum(Produccion.unidades_producidas))
+        .where(_clave_produccion() <= clave_hasta)
+        .group_by(Produccion.sku_id, Produccion.año_iso, Produccion.semana_iso)
+    ).all()
+    scrap_semanal = db.exec(
+        select(
+            Produccion.año_iso,
+            Produccion.semana_iso,
+            func.sum(Produccion.scrap * Produccion.kg_verde),
+            func.sum(Produccion.kg_verde)
+        )
+        .where(_clave_produccion().between(clave_inicio, clave_hasta), Produccion.scrap.is_not(None))
+        .group_by(Produccion.año_iso, Produccion.semana_iso)
+    ).all()
+    clave_plan = PlanSemanal.año_iso * 100 + PlanSemanal.semana_iso
+    plan_semanal = db.exec(
+        select(
+            PlanSemanal.año_iso,
+            PlanSemanal.semana_iso,
+            func.sum(PlanSemanal.unidades_planificadas),
+            func.sum(case(
+                (PlanSemanal.unidades_producidas < PlanSemanal.unidades_planificadas, PlanSemanal.unidades_producidas),
+                else_=PlanSemanal.unidades_planificadas
+            ))
+        )
+        .where(clave_plan.between(clave_inicio, clave_hasta))
+        .group_by(PlanSemanal.año_iso, PlanSemanal.semana_iso)
+    ).all()
+    
+    sku_ids = sorted(
+        {fila[0] for fila in ventas_previas} | {fila[0] for fila in ventas_diarias} | {fila[0] for fila in produccion_semanal}
+    )
+    fila_sku = {sku_id: i for i, sku_id in enumerate(sku_ids)}
+    
+    # Ventas por SKU y día, y producción por SKU y semana, con los
+    # acumulados anteriores al inicio aparte
+    vendido_previo = np.zeros(len(sku_ids))
+    for sku_id, unidades in ventas_previas:
+        vendido_previo[fila_sku[sku_id]] = unidades
+    
+    ventas = np.zeros((len(sku_ids), n_semanas * 7))
+    for sku_id, fecha, unidades in ventas_diarias:
+        ventas[fila_sku[sku_id], (fecha - inicio).days] = unidades
+    
+    producido_previo = np.zeros(len(sku_ids))
+    produccion = np.zeros((len(sku_ids), n_semanas))
+    for sku_id, año, semana, unidades in produccion_semanal:
+        if año * 100 + semana < clave_inicio:
+            producido_previo[fila_sku[sku_id]] += unidades
+        else:
+            produccion[fila_sku[sku_id], indice_semana(año, semana)] = unidades
+    
+    # Totales por semana de rechazos y plan, acumulados para sumar ventanas
+    scrap = np.zeros((2, n_semanas))
+    for año, semana, kg_rechazados, kg_verde in scrap_semanal:
+        scrap[:, indice_semana(año, semana)] = (kg_rechazados, kg_verde)
+    
+    plan = np.zeros((2, n_semanas))
+    for año, semana, planificado, cumplido in plan_semanal:
+        plan[:, indice_semana(año, semana)] = (planificado, cumplido)
+    
+    scrap_acumulado = _acumulado(scrap)
+    plan_acumulado = _acumulado(plan)
+    
+    # Saldos por SKU: ventas acumuladas al cierre de cada día y producción
+    # acumulada al cierre de cada semana
+    vendido = vendido_previo[:, None] + np.cumsum(ventas, axis=1)
+    producido = producido_previo[:, None] + np.cumsum(produccion, axis=1)
+    venta_total_acumulada = _acumulado(ventas.sum(axis=0))
+    
+    # OTD de las semanas cerradas: ventas de la semana despachadas con saldo
+    # no negativo al cierre de la semana
+    ventas_semana = ventas.reshape(len(sku_ids), n_semanas, 7).sum(axis=2)
+    saldo_semana = producido - vendido[:, 6::7]
+    otd_acumulado = _acumulado(np.stack([
+        np.where(saldo_semana >= 0, ventas_semana, 0).sum(axis=0),
+        ventas_semana.sum(axis=0)
+    ]))
+    
+    kpis = []
+    for t in range((desde - inicio).days, n_dias):
+        fecha = inicio + timedelta(days=t)
+        w = t // 7
         
-        # Cumplimiento: tendencia a mejorar
-        cumpl = objetivo_cumplimiento * (0.85 + 0.2 * progreso + random.uniform(-0.05, 0.05))
-        cumpl = min(1.0, cumpl)  # Limitar a 1.0
+        inventario = producido[:, w].sum() - vendido[:, t].sum()
+        venta_reciente = venta_total_acumulada[t + 1] - venta_total_acumulada[t + 1 - DIAS_VENTA_PROMEDIO]
+        dias_inventario = max(0.0, float(inventario)) / (venta_reciente / DIAS_VENTA_PROMEDIO) if venta_reciente else 0.0
         
-        # OTD: tendencia a mejorar
-        otd = objetivo_otd * (0.9 + 0.15 * progreso + random.uniform(-0.03, 0.03))
-        otd = min(1.0, otd)  # Limitar a 1.0
+        # Semanas cerradas de la ventana más la semana en curso hasta el día
+        primera = max(0, w - (SEMANAS_VENTANA_KPI - 1))
+        a_tiempo, despachado = otd_acumulado[:, w] - otd_acumulado[:, primera]
+        venta_parcial = vendido[:, t] - (vendido[:, 7 * w - 1] if w > 0 else vendido_previo)
+        a_tiempo += venta_parcial[producido[:, w] - vendido[:, t] >= 0].sum()
+        despachado += venta_parcial.sum()
         
-        # Rechazos: tendencia a disminuir
-        rech = objetivo_rechazos * (1.5 - 0.5 * progreso + random.uniform(-0.2, 0.2))
-        rech = max(0.001, rech)  # Evitar valores negativos
+        kg_rechazados, kg_verde = scrap_acumulado[:, w + 1] - scrap_acumulado[:, primera]
+        planificado, cumplido = plan_acumulado[:, w] - plan_acumulado[:, max(0, w - SEMANAS_VENTANA_KPI)]
         
-        historico.append({
-            "fecha": fecha.strftime("%Y-%m-%d"),
-            "dias_inventario": dias_inv,
-            "cumplimiento_plan": cumpl,
-            "otd": otd,
-            "rechazos": rech
-        })
-    
-    return historico
+        año, semana = fecha_a_semana_iso(fecha)
+        kpis.append(KpiDiario(
+            fecha=fecha,
+            año_iso=año,
+            semana_iso=semana,
+            dias_inventario=dias_inventario,
+            cumplimiento_plan=float(cumplido / planificado) if planificado else 0.0,
+            otd=float(a_tiempo / despachado) if despachado else 0.0,
+            rechazos=float(kg_rechazados / kg_verde) if kg_verde else 0.0
+        ))
+    
+    return kpis
+
+def materializar_kpis_diarios(db: Session, hasta: Optional[date] = None) -> int:
+    """
+    Calcula y guarda los KPIs de los días que aún no están materializados
+    o cuyo recálculo está pendiente.
+    
+    Se calculan los días desde la fecha de recálculo pendiente más antigua
+    o, si no hay, desde el día siguiente al último materializado (o desde
+    el primer dato de ventas o producción), hasta ayer: el día en curso no
+    está cerrado. Todos los días se calculan en una sola pasada con
+    ``calcular_kpis_diarios``. Se ejecuta al iniciar la aplicación, en las
+    tareas periódicas y a pedido; nunca al leer el historial.
+    
+    Args:
+        db: Sesión de base de datos
+        hasta: Último día a materializar (por defecto, ayer)
+    
+    Returns:
+        Número de días materializados
+    """
+    hasta = min(hasta or date.today(), date.today() - timedelta(days=1))
+    
+    ultima = get_ultima_fecha_kpi(db)
+    ultimo_recalculo, recalcular_desde = get_recalculo_pendiente(db)
+    
+    if ultima is not None:
+        desde = ultima + timedelta(days=1)
+    else:
+        primera_venta, primera_clave = db.exec(
+            select(
+                select(func.min(Venta.fecha)).scalar_subquery(),
+                select(func.min(_clave_produccion())).scalar_subquery()
+            )
+        ).one()
+        inicios = [fecha for fecha in (
+            primera_venta,
+            semana_iso_a_fecha(primera_clave // 100, primera_clave % 100) if primera_clave else None
+        ) if fecha is not None]
+        desde = min(inicios) if inicios else hasta + timedelta(days=1)
+    
+    if recalcular_desde is not None:
+        desde = min(desde, recalcular_desde)
+    
+    if desde > hasta and ultimo_recalculo is None:
+        return 0
+    
+    kpis = calcular_kpis_diarios(db, desde, hasta)
+    reemplazar_kpis_diarios(db, desde, kpis, ultimo_recalculo)
+    
+    return len(kpis)
+
+def obtener_kpis_historicos(
+    db: Session,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    resolucion: str = "dia",
+    max_puntos: Optional[int] = None,
+    dias: int = 90
+) -> Dict[str, Any]:
+    """
+    Obtiene el historial de KPIs agregado por día, semana o mes.
+    
+    Es una lectura por rango sobre los KPIs diarios ya materializados: la
+    media, el mínimo y el máximo de cada periodo, y el resumen de todo el
+    rango, se calculan en la base de datos. Si hay más periodos que
+    ``max_puntos`` se reduce cada KPI con LTTB y se devuelven los periodos
+    elegidos para alguno de ellos.
+    
+    Args:
+        db: Sesión de base de datos
+        desde: Fecha inicial (por defecto, ``dias`` días antes de ``hasta``)
+        hasta: Fecha final (por defecto, ayer)
+        resolucion: "dia", "semana" o "mes"
+        max_puntos: Número máximo de periodos a devolver (opcional)
+        dias: Días de historial si no se indica ``desde``
+    
+    Returns:
+        Diccionario con los periodos y el resumen del rango
+    """
+    if resolucion not in RESOLUCIONES_KPI:
+        raise ValueError(f"Resolución no válida: {resolucion}. Valores permitidos: {', '.join(RESOLUCIONES_KPI)}")
+    if max_puntos is not None and max_puntos < 3 * len(KPIS_DIARIOS):
+        # LTTB necesita al menos tres puntos por KPI
+        raise ValueError(f"max_puntos debe ser al menos {3 * len(KPIS_DIARIOS)}")
+    
+    hasta = hasta or date.today() - timedelta(days=1)
+    desde = desde or hasta - timedelta(days=dias - 1)
+    if desde > hasta:
+        raise ValueError("La fecha inicial debe ser anterior a la final")
+    
+    rango = (KpiDiario.fecha >= desde, KpiDiario.fecha <= hasta)
+    
+    if resolucion == "dia":
+        periodo = [KpiDiario.fecha]
+    elif resolucion == "semana":
+        periodo = [KpiDiario.año_iso, KpiDiario.semana_iso]
+    else:
+        periodo = [extract("year", KpiDiario.fecha), extract("month", KpiDiario.fecha)]
+    
+    agregados = []
+    for kpi in KPIS_DIARIOS:
+        columna = getattr(KpiDiario, kpi)
+        agregados += [func.avg(columna), func.min(columna), func.max(columna)]
+    
+    filas = db.exec(
+        select(*periodo, *agregados).where(*rango).group_by(*periodo).order_by(*periodo)
+    ).all()
+    
+    resumen = db.exec(select(*agregados).where(*rango)).one()
+    
+    # Fecha de inicio de cada periodo
+    if resolucion == "dia":
+        fechas = [fila[0] for fila in filas]
+    elif resolucion == "semana":
+        fechas = [semana_iso_a_fecha(fila[0], fila[1]) for fila in filas]
+    else:
+        fechas = [date(int(fila[0]), int(fila[1]), 1) for fila in filas]
+    
+    valores = np.array([fila[len(periodo):] for fila in filas], dtype=float).reshape(len(filas), len(agregados))
+    
+    seleccion = np.arange(len(filas))
+    if max_puntos is not None and len(filas) > max_puntos:
+        x = np.array([fecha.toordinal() for fecha in fechas], dtype=float)
+        por_kpi = max_puntos // len(KPIS_DIARIOS)
+        seleccion = np.unique(np.concatenate([
+            lttb(x, valores[:, 3 * k], por_kpi) for k in range(len(KPIS_DIARIOS))
+        ]))
+    
+    data = []
+    for i in seleccion.tolist():
+        fila = {"fecha": fechas[i].isoformat()}
+        for k, kpi in enumerate(KPIS_DIARIOS):
+            fila[kpi] = valores[i, 3 * k]
+            fila[f"{kpi}_min"] = valores[i, 3 * k + 1]
+            fila[f"{kpi}_max"] = valores[i, 3 * k + 2]
+        data.append(fila)
+    
+    return {
+        "desde": desde.isoformat(),
+        "hasta": hasta.isoformat(),
+        "resolucion": resolucion,
+        "periodos": len(filas),
+        "resumen": {
+            kpi: {
+                "media": resumen[3 * k],
+                "min": resumen[3 * k + 1],
+                "max": resumen[3 * k + 2]
+            }
+            for k, kpi in enumerate(KPIS_DIARIOS)
+        },
+        "data": data
+    }
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import time
+from datetime import date
+from fastapi import Request
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, AsyncIterator, Optional, Tuple
+from app.db.session import engine
+from app.db.version import version_datos
+from app.services.kpis import obtener_kpis
+
+# Segundos entre revisiones de la versión de los datos (una lectura de una
+# fila, compartida por todas las conexiones)
+INTERVALO_REVISION = 1.0
+
+# Segundos sin eventos tras los que se envía un comentario para mantener
+# abierta la conexión
+INTERVALO_LATIDO = 15.0
+
+# KPIs calculados para una versión de los datos y un día. Lo comparten
+# todas las conexiones abiertas: cada versión se calcula una sola vez.
+_cache_kpis: Optional[Tuple[Tuple[int, date], Dict[str, Any]]] = None
+_bloqueo_calculo = asyncio.Lock()
+
+# Última versión leída de la base de datos y el momento de la lectura
+_version_leida: Optional[Tuple[float, int]] = None
+
+def _leer_version() -> int:
+    """
+    Lee la versión compartida de los datos con una sesión propia.
+    """
+    with Session(engine) as db:
+        return version_datos(db)
+
+async def version_vigente() -> int:
+    """
+    Obtiene la versión de los datos, leyéndola de la base de datos como
+    mucho una vez cada ``INTERVALO_REVISION`` segundos para todas las
+    conexiones.
+
+    Returns:
+        Versión de los datos de los KPIs
+    """
+    global _version_leida
+
+    leida = _version_leida
+    if leida is None or time.monotonic() - leida[0] >= INTERVALO_REVISION:
+        leida = (time.monotonic(), await run_in_threadpool(_leer_version))
+        _version_leida = leida
+
+    return leida[1]
+
+def _calcular_kpis() -> Dict[str, Any]:
+    """
+    Calcula los KPIs actuales con una sesión propia.
+    """
+    with Session(engine) as db:
+        return obtener_kpis(db)
+
+async def kpis_vigentes() -> Tuple[Tuple[int, date], Dict[str, Any]]:
+    """
+    Obtiene los KPIs de la versión vigente de los datos.
+
+    Solo se recalculan cuando cambia la versión de los datos (de cualquier
+    proceso) o el día; las conexiones que piden la misma versión esperan el
+    mismo cálculo.
+
+    Returns:
+        Tupla ((versión de los datos, día), KPIs)
+    """
+    global _cache_kpis
+
+    clave = (await version_vigente(), date.today())
+    cache = _cache_kpis
+    if cache is None or cache[0] != clave:
+        async with _bloqueo_calculo:
+            clave = (await version_vigente(), date.today())
+            cache = _cache_kpis
+            if cache is None or cache[0] != clave:
+                cache = (clave, await run_in_threadpool(_calcular_kpis))
+                _cache_kpis = cache
+
+    return cache
+
+def formatear_evento(evento: str, datos: Dict[str, Any], version: int) -> str:
+    """
+    Da formato de Server-Sent Event a un mensaje.
+
+    Args:
+        evento: Nombre del evento
+        datos: Contenido del evento (se envía como JSON)
+        version: Versión de los datos, usada como id del evento
+
+    Returns:
+        Texto del evento
+    """
+    return f"id: {version}\nevent: {evento}\ndata: {json.dumps(datos)}\n\n"
+
+async def transmitir_kpis(request: Request) -> AsyncIterator[str]:
+    """
+    Transmite los KPIs como Server-Sent Events.
+
+    El primer evento (``kpis``) trae todos los KPIs. Después solo se envía
+    un evento ``delta`` con los KPIs que cambiaron, cuando cambia la
+    versión de los datos o el día; el costo de cálculo depende de las
+    escrituras y no del número de conexiones.
+
+    Args:
+        request: Petición de la conexión, para detectar la desconexión
+
+    Returns:
+        Iterador asíncrono con el texto de los eventos
+    """
+    enviados: Dict[str, Any] = {}
+    ultima_clave: Optional[Tuple[int, date]] = None
+    ultimo_envio = time.monotonic()
+
+    while not await request.is_disconnected():
+        clave, kpis = await kpis_vigentes()
+
+        if clave != ultima_clave:
+            cambios = {nombre: valor for nombre, valor in kpis.items() if enviados.get(nombre) != valor}
+            if ultima_clave is None or cambios:
+                evento = "kpis" if ultima_clave is None else "delta"
+                yield formatear_evento(evento, {"version": clave[0], "kpis": cambios}, clave[0])
+                ultimo_envio = time.monotonic()
+            enviados = kpis
+            ultima_clave = clave
+        elif time.monotonic() - ultimo_envio >= INTERVALO_LATIDO:
+            yield ": latido\n\n"
+            ultimo_envio = time.monotonic()
+
+        await asyncio.sleep(INTERVALO_REVISION)
@@ -0,0 +1,139 @@
+import json
+import numpy as np
+from sqlmodel import Session
+from typing import Dict, List, Any, Iterator, Tuple
+from app.services.mps import cargar_datos_mps, calcular_plan, nivelar_plan, condiciones_alerta, formatear_skus
+from app.services.alertas import catalogo_alertas
+from app.utils.iso_weeks import parsear_semana_iso, semana_iso_a_fecha
+
+def agrupar_periodos(semanas: List[str], semanas_detalle: int) -> Tuple[List[str], np.ndarray]:
+    """
+    Agrupa semanas en periodos semanales y mensuales.
+
+    Las primeras ``semanas_detalle`` semanas quedan como periodos semanales;
+    las siguientes se agrupan por el mes de su lunes.
+
+    Args:
+        semanas: Semanas ordenadas en formato "YYYY-SWW"
+        semanas_detalle: Número de semanas con detalle semanal
+
+    Returns:
+        Tupla (etiquetas de los periodos, matriz de agregación semana × periodo)
+    """
+    etiquetas: List[str] = []
+    columna_de_semana = []
+
+    for j, semana in enumerate(semanas):
+        if j < semanas_detalle:
+            etiqueta = semana
+        else:
+            lunes = semana_iso_a_fecha(*parsear_semana_iso(semana))
+            etiqueta = f"{lunes.year}-M{lunes.month:02d}"
+
+        if not etiquetas or etiquetas[-1] != etiqueta:
+            etiquetas.append(etiqueta)
+        columna_de_semana.append(len(etiquetas) - 1)
+
+    agregacion = np.zeros((len(semanas), len(etiquetas)), dtype=np.int64)
+    agregacion[np.arange(len(semanas)), columna_de_semana] = 1
+
+    return etiquetas, agregacion
+
+def cargar_datos_largo_plazo(
+    db: Session,
+    semanas: int = 52,
+    semanas_detalle: int = 13
+) -> Dict[str, Any]:
+    """
+    Carga los datos del MPS agregados en periodos semanales y mensuales.
+
+    Args:
+        db: Sesión de base de datos
+        semanas: Número de semanas del horizonte
+        semanas_detalle: Número de semanas con detalle semanal
+
+    Returns:
+        Datos de entrada del MPS con una columna por periodo
+    """
+    datos = cargar_datos_mps(db, semanas)
+    etiquetas, agregacion = agrupar_periodos(datos["semanas"], semanas_detalle)
+
+    return {
+        **datos,
+        "semanas": etiquetas,
+        "semanas_por_bucket": agregacion.sum(axis=0),
+        "demanda": datos["demanda"] @ agregacion,
+        "demanda_min": datos["demanda_min"] @ agregacion,
+        "demanda_max": datos["demanda_max"] @ agregacion
+    }
+
+def calcular_mps_largo_plazo(
+    datos: Dict[str, Any],
+    nivelar: bool = False
+) -> Tuple[Dict[str, np.ndarray], List[Tuple[np.ndarray, Dict[str, Any]]]]:
+    """
+    Calcula el plan y las alertas del MPS de largo plazo.
+
+    Se calcula completo antes de empezar a enviar la respuesta, para que
+    un error se informe con el código de estado y no corte el NDJSON.
+
+    Args:
+        datos: Datos del MPS agregados por periodo
+        nivelar: Si es True, nivela la producción por capacidad
+
+    Returns:
+        Tupla (plan, condiciones de alerta)
+    """
+    plan = calcular_plan(datos)
+    if nivelar:
+        plan = nivelar_plan(datos, plan)
+
+    return plan, condiciones_alerta(datos, plan)
+
+def generar_mps_largo_plazo(
+    datos: Dict[str, Any],
+    plan: Dict[str, np.ndarray],
+    condiciones: List[Tuple[np.ndarray, Dict[str, Any]]],
+    skus_por_bloque: int = 50
+) -> Iterator[str]:
+    """
+    Genera el MPS de largo plazo como líneas NDJSON.
+
+    La primera línea describe los periodos y la carga total; cada línea
+    siguiente contiene un bloque de SKUs. Solo se arma en memoria el bloque
+    que se está enviando. Si falla el armado de una línea, la última línea
+    es ``{"tipo": "error", "detail": ...}``.
+
+    Args:
+        datos: Datos del MPS agregados por periodo
+        plan: Plan calculado con ``calcular_mps_largo_plazo``
+        condiciones: Lista de tuplas (máscara SKU × periodo, regla de alerta)
+        skus_por_bloque: Número de SKUs por línea
+
+    Returns:
+        Iterador de líneas NDJSON
+    """
+    n_skus = len(datos["sku_ids"])
+
+    try:
+        yield json.dumps({
+            "tipo": "encabezado",
+            "semanas": datos["semanas"],
+            "semanas_por_periodo": datos["semanas_por_bucket"].tolist(),
+            "capacidad_semanal": datos["capacidad_semanal"],
+            "carga_semanal": dict(zip(datos["semanas"], plan["kg_verde"].sum(axis=0).tolist())),
+            "catalogo_alertas": catalogo_alertas(condiciones),
+            "total_skus": n_skus
+        }, ensure_ascii=False) + "\n"
+
+        for inicio in range(0, n_skus, skus_por_bloque):
+            filas = range(inicio, min(inicio + skus_por_bloque, n_skus))
+            yield json.dumps({
+                "tipo": "skus",
+                "data": formatear_skus(datos, plan, condiciones, filas)
+            }, ensure_ascii=False) + "\n"
+    except Exception as e:
+        yield json.dumps({
+            "tipo": "error",
+            "detail": f"Error al generar MPS: {str(e)}"
+        }, ensure_ascii=False) + "\n"
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+from sqlmodel import Session
+from typing import Dict, Any, Optional
+from app.crud.lotes import get_resumen_lotes_antiguos, get_lotes_antiguos
+from app.models.lote import LoteRead
+
+def obtener_stock_antiguo(
+    db: Session,
+    dias: int,
+    sku_id: Optional[int] = None,
+    fecha: Optional[date] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> Dict[str, Any]:
+    """
+    Obtiene el stock de lotes con más de cierta cantidad de días desde el
+    tueste.
+
+    Args:
+        db: Sesión de base de datos
+        dias: Días desde el tueste a partir de los que un lote es antiguo
+        sku_id: Filtrar por SKU
+        fecha: Fecha de referencia (por defecto, hoy)
+        skip: Número de lotes a omitir en el detalle
+        limit: Número máximo de lotes en el detalle
+
+    Returns:
+        Diccionario con el resumen por SKU y el detalle de los lotes
+    """
+    fecha = fecha or date.today()
+    fecha_limite = fecha - timedelta(days=dias)
+
+    resumen = [
+        {
+            "sku_id": sku,
+            "lotes": lotes,
+            "unidades": int(unidades),
+            "tueste_mas_antiguo": tueste.isoformat(),
+            "dias_mas_antiguo": (fecha - tueste).days
+        }
+        for sku, lotes, unidades, tueste in get_resumen_lotes_antiguos(db, fecha_limite, sku_id)
+    ]
+
+    return {
+        "fecha": fecha.isoformat(),
+        "dias": dias,
+        "fecha_limite": fecha_limite.isoformat(),
+        "total_unidades": sum(r["unidades"] for r in resumen),
+        "por_sku": resumen,
+        "data": [
+            LoteRead.from_orm(lote).dict()
+            for lote in get_lotes_antiguos(db, fecha_limite, sku_id, skip, limit)
+        ]
+    }
@@ -1,57 +1,47 @@
-import pandas as pd
 import numpy as np
-from sqlmodel import Session, select
-from typing import Dict, List, Optional, Tuple, Any
+from sqlmodel import Session
+from typing import Dict, List, Optional, Tuple, Any, Union
 from datetime import datetime, timedelta
 from app.models.sku import SKU
-from app.models.produccion import Produccion
 from app.services.pronostico import obtener_pronostico_futuro
-from app.crud.produccion import get_scrap_promedio
-from app.crud.parametros import get_parametro
+from app.crud.produccion import get_scrap_promedios
+from app.services.parametros import obtener_parametro
+from app.crud.estadisticas import get_estadisticas_demanda, MIN_SEMANAS_ESTADISTICAS
+from app.models.estadistica_demanda import EstadisticaDemanda
+from app.services.nivelacion import nivelar_produccion
+from app.services.inventario import calcular_inventarios_iniciales
+from app.services.alertas import evaluar_reglas, catalogo_alertas, describir_reglas, REGLAS_ALERTA_DEFAULT
+from app.crud.reglas_alerta import get_reglas_alerta
 
-def calcular_inventario_inicial(
-    db: Session,
-    sku_id: int,
-    semana_actual: str
-) -> int:
+# Arreglos de datos con un valor por SKU
+ARREGLOS_POR_SKU = ["presentacion_g", "scrap", "inventario_inicial", "desviacion_demanda"]
+
+# Matrices de datos SKU × semana
+MATRICES_DATOS = ["demanda", "demanda_min", "demanda_max"]
+
+Indice = Union[slice, np.ndarray]
+
+def factor_nivel_servicio(nivel_servicio: float) -> float:
     """
-    Calcula el inventario inicial para un SKU en la semana actual.
+    Obtiene el factor de seguridad para un nivel de servicio.
     
     Args:
-        db: Sesión de base de datos
-        sku_id: ID del SKU
-        semana_actual: Semana actual en formato "YYYY-SWW"
+        nivel_servicio: Nivel de servicio (0-1)
     
     Returns:
-        Inventario inicial en unidades
+        Factor de seguridad
     """
-    # En una implementación real, esto se obtendría de un sistema de inventario
-    # Por ahora, asumimos un valor inicial basado en la producción reciente
-    
-    # Obtener producciones recientes
-    query = select(Produccion).where(Produccion.sku_id == sku_id)
-    producciones = db.exec(query).all()
-    
-    if not producciones:
-        return 100  # Valor por defecto
-    
-    # Convertir a DataFrame
-    prod_df = pd.DataFrame([{
-        "semana_iso": p.semana_iso,
-        "año_iso": p.año_iso,
-        "unidades_producidas": p.unidades_producidas
-    } for p in producciones])
-    
-    # Crear clave de semana
-    prod_df["semana_clave"] = prod_df["año_iso"].astype(str) + "-S" + prod_df["semana_iso"].astype(str).str.zfill(2)
-    
-    # Calcular promedio de producción
-    promedio_produccion = prod_df["unidades_producidas"].mean()
-    
-    # Inventario inicial aproximado (2 semanas de producción)
-    inventario_inicial = int(promedio_produccion * 2)
-    
-    return max(100, inventario_inicial)  # Mínimo 100 unidades
+    # Aproximación simple: para 95% usamos 1.65 (distribución normal)
+    if nivel_servicio >= 0.99:
+        return 2.33
+    elif nivel_servicio >= 0.98:
+        return 2.05
+    elif nivel_servicio >= 0.95:
+        return 1.65
+    elif nivel_servicio >= 0.90:
+        return 1.28
+    else:
+        return 1.0
 
 def calcular_stock_seguridad(
     db: Session,
@@ -70,25 +60,20 @@ def calcular_stock_seguridad(
         Stock de seguridad en unidades
     """
     # Obtener nivel de servicio
-    param_nivel_servicio = get_parametro(db, "nivel_servicio")
-    nivel_servicio = float(param_nivel_servicio.valor) if param_nivel_servicio else 0.95
+    nivel_servicio = obtener_parametro("nivel_servicio")
     
     # Factor de seguridad basado en nivel de servicio
-    # Aproximación simple: para 95% usamos 1.65 (distribución normal)
-    if nivel_servicio >= 0.99:
-        factor = 2.33
-    elif nivel_servicio >= 0.98:
-        factor = 2.05
-    elif nivel_servicio >= 0.95:
-        factor = 1.65
-    elif nivel_servicio >= 0.90:
-        factor = 1.28
-    else:
-        factor = 1.0
+    factor = factor_nivel_servicio(nivel_servicio)
     
-    # Calcular stock de seguridad como porcentaje de la demanda
-    # En una implementación real, se usaría la desviación estándar de la demanda
-    stock_seguridad = int(demanda * 0.2 * factor)
+    estadistica = db.get(EstadisticaDemanda, sku_id)
+    
+    if estadistica and estadistica.ventana_semanas >= MIN_SEMANAS_ESTADISTICAS:
+        # Stock de seguridad estadístico: z * σ * √(lead time)
+        lead_time = obtener_parametro("lead_time_semanas")
+        stock_seguridad = int(factor * estadistica.desviacion * np.sqrt(lead_time))
+    else:
+        # Sin historia suficiente, usar un porcentaje de la demanda
+        stock_seguridad = int(demanda * 0.2 * factor)
     
     return max(10, stock_seguridad)  # Mínimo 10 unidades
 
@@ -151,23 +136,33 @@ def calcular_produccion_con_regla_60kg(
     
     return (produccion_total, alertas)
 
-def generar_mps(db: Session, semanas: int = 6) -> Dict[str, Any]:
+def cargar_datos_mps(
+    db: Session,
+    semanas: int = 6,
+    demanda_conocida: Optional[Dict[int, Dict[str, int]]] = None
+) -> Dict[str, Any]:
     """
-    Genera el Plan Maestro de Producción (MPS).
+    Carga los datos de entrada del MPS como arreglos SKU × semana.
+    
+    Todas las consultas a la base de datos se hacen aquí, de modo que el
+    cálculo del plan trabaja solo sobre arreglos de numpy.
     
     Args:
         db: Sesión de base de datos
         semanas: Número de semanas a planificar
+        demanda_conocida: Demanda ya fijada por SKU y semana, que no se
+            pronostica (opcional)
     
     Returns:
-        Diccionario con el MPS
+        Diccionario con los arreglos de entrada del MPS
     """
     # Obtener pronóstico
-    pronostico = obtener_pronostico_futuro(db, semanas)
+    pronostico = obtener_pronostico_futuro(db, semanas, demanda_conocida)
     
-    # Obtener capacidad semanal
-    param_capacidad = get_parametro(db, "capacidad_semanal")
-    capacidad_semanal = float(param_capacidad.valor) if param_capacidad else 300
+    # Obtener parámetros
+    capacidad_semanal = obtener_parametro("capacidad_semanal")
+    nivel_servicio = obtener_parametro("nivel_servicio")
+    lead_time = obtener_parametro("lead_time_semanas")
     
     # Extraer semanas únicas
     todas_semanas = set()
@@ -175,100 +170,479 @@ def generar_mps(db: Session, semanas: int = 6) -> Dict[str, Any]:
         todas_semanas.update(sku_data["semanas"])
     
     semanas_ordenadas = sorted(todas_semanas)
+    indice_semana = {semana: j for j, semana in enumerate(semanas_ordenadas)}
+    
+    sku_ids = list(pronostico.keys())
+    
+    # Matrices de demanda SKU × semana (pronóstico e intervalo)
+    demanda = np.zeros((len(sku_ids), len(semanas_ordenadas)), dtype=np.int64)
+    demanda_min = np.zeros_like(demanda)
+    demanda_max = np.zeros_like(demanda)
+    for i, sku_id in enumerate(sku_ids):
+        for semana, valor in pronostico[sku_id]["demanda"].items():
+            demanda[i, indice_semana[semana]] = valor
+        for semana, valor in pronostico[sku_id].get("demanda_min", {}).items():
+            demanda_min[i, indice_semana[semana]] = valor
+        for semana, valor in pronostico[sku_id].get("demanda_max", {}).items():
+            demanda_max[i, indice_semana[semana]] = valor
+    
+    # Datos por SKU
+    scrap_por_sku = get_scrap_promedios(db, sku_ids)
+    scrap = np.array([scrap_por_sku[sku_id] for sku_id in sku_ids], dtype=float)
+    
+    # Inventario inicial de todos los SKUs desde el libro de inventario
+    inventario_inicial = (
+        calcular_inventarios_iniciales(db, sku_ids, semanas_ordenadas[0])
+        if sku_ids else np.zeros(0, dtype=np.int64)
+    )
+    
+    # Desviación de la demanda (una sola lectura para todos los SKUs);
+    # NaN indica que el SKU no tiene historia suficiente
+    estadisticas = get_estadisticas_demanda(db, sku_ids)
+    desviacion_demanda = np.array([
+        estadisticas[sku_id].desviacion
+        if sku_id in estadisticas and estadisticas[sku_id].ventana_semanas >= MIN_SEMANAS_ESTADISTICAS
+        else np.nan
+        for sku_id in sku_ids
+    ], dtype=float)
     
-    # Generar MPS para cada SKU
-    mps_data = []
+    return {
+        "semanas": semanas_ordenadas,
+        "sku_ids": sku_ids,
+        "nombres": [pronostico[sku_id]["nombre"] for sku_id in sku_ids],
+        "presentacion_g": np.array([pronostico[sku_id]["presentacion_g"] for sku_id in sku_ids], dtype=float),
+        "demanda": demanda,
+        "demanda_min": demanda_min,
+        "demanda_max": demanda_max,
+        "scrap": scrap,
+        "inventario_inicial": inventario_inicial,
+        "desviacion_demanda": desviacion_demanda,
+        "lead_time_semanas": lead_time,
+        "nivel_servicio": nivel_servicio,
+        "capacidad_semanal": capacidad_semanal,
+        "reglas_alerta": [
+            {
+                "codigo": regla.codigo,
+                "expresion": regla.expresion,
+                "umbral": regla.umbral,
+                "severidad": regla.severidad,
+                "mensaje": regla.mensaje
+            }
+            for regla in get_reglas_alerta(db, activo=True)
+        ]
+    }
+
+def recortar_datos(
+    datos: Dict[str, Any],
+    filas: Indice = slice(None),
+    columnas: Indice = slice(None)
+) -> Dict[str, Any]:
+    """
+    Recorta los datos del MPS a un subconjunto de SKUs y semanas.
+
+    Args:
+        datos: Datos de entrada del MPS
+        filas: SKUs a conservar (slice o arreglo de índices)
+        columnas: Semanas a conservar (slice o arreglo de índices)
+
+    Returns:
+        Datos del MPS recortados
+    """
+    indices_skus = np.arange(len(datos["sku_ids"]))[filas]
+    indices_semanas = np.arange(len(datos["semanas"]))[columnas]
+
+    recorte = {
+        **datos,
+        "sku_ids": [datos["sku_ids"][i] for i in indices_skus],
+        "nombres": [datos["nombres"][i] for i in indices_skus],
+        "semanas": [datos["semanas"][j] for j in indices_semanas]
+    }
+
+    for clave in ARREGLOS_POR_SKU:
+        recorte[clave] = datos[clave][indices_skus]
+
+    for clave in MATRICES_DATOS:
+        recorte[clave] = datos[clave][np.ix_(indices_skus, indices_semanas)]
+
+    if datos.get("produccion_extra") is not None:
+        recorte["produccion_extra"] = datos["produccion_extra"][np.ix_(indices_skus, indices_semanas)]
+
+    if isinstance(datos.get("semanas_por_bucket"), np.ndarray):
+        recorte["semanas_por_bucket"] = datos["semanas_por_bucket"][indices_semanas]
+
+    return recorte
+
+def calcular_kg_por_unidad(datos: Dict[str, Any]) -> np.ndarray:
+    """
+    Calcula los kg de café verde necesarios por unidad producida de cada SKU.
+    
+    Args:
+        datos: Datos de entrada del MPS
+    
+    Returns:
+        Arreglo con kg de café verde por unidad para cada SKU
+    """
+    with np.errstate(divide="ignore"):
+        return datos["presentacion_g"] / (1000 * (1 - datos["scrap"]))
+
+def calcular_inventarios(
+    datos: Dict[str, Any],
+    produccion: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula el inventario inicial y final de cada semana para una producción dada.
+    
+    Args:
+        datos: Datos de entrada del MPS
+        produccion: Matriz de producción SKU × semana
+    
+    Returns:
+        Tupla (inventario inicial, inventario final) como matrices SKU × semana
+    """
+    rendimiento = 1 - datos["scrap"][:, None]
+    entradas = np.floor(produccion * rendimiento).astype(np.int64) - datos["demanda"]
+    if datos.get("produccion_extra") is not None:
+        entradas = entradas + datos["produccion_extra"]
+    
+    inventario_final = datos["inventario_inicial"][:, None] + np.cumsum(entradas, axis=1)
+    inventario_inicial = np.empty_like(inventario_final)
+    if inventario_final.shape[1] > 0:
+        inventario_inicial[:, 0] = datos["inventario_inicial"]
+        inventario_inicial[:, 1:] = inventario_final[:, :-1]
+    
+    return inventario_inicial, inventario_final
+
+def calcular_plan(datos: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Calcula el MPS sobre los arreglos de entrada.
+    
+    La recurrencia de inventario recorre las semanas en orden, pero cada
+    semana se calcula para todos los SKUs a la vez.
     
-    for sku_id, sku_data in pronostico.items():
-        # Obtener scrap promedio
-        scrap_promedio = get_scrap_promedio(db, sku_id)
+    Args:
+        datos: Datos de entrada del MPS
+    
+    Returns:
+        Diccionario con las matrices SKU × semana del plan
+    """
+    demanda = datos["demanda"]
+    scrap = datos["scrap"]
+    rendimiento = 1 - scrap
+    
+    # Calcular stock de seguridad: z * σ * √(lead time) con las estadísticas
+    # de demanda, o un porcentaje de la demanda semanal si no hay historia
+    # suficiente (los periodos pueden agrupar varias semanas)
+    factor = factor_nivel_servicio(datos["nivel_servicio"])
+    demanda_semanal = demanda / datos.get("semanas_por_bucket", 1)
+    ss_estadistico = factor * datos["desviacion_demanda"] * np.sqrt(datos["lead_time_semanas"])
+    stock_seguridad = np.where(
+        np.isnan(ss_estadistico)[:, None],
+        demanda_semanal * 0.2 * factor,
+        ss_estadistico[:, None]
+    )
+    stock_seguridad = np.maximum(10, np.floor(stock_seguridad)).astype(np.int64)
+    
+    # Producción ya comprometida fuera del plan (por ejemplo, en un escenario)
+    produccion_extra = datos.get("produccion_extra")
+    if produccion_extra is None:
+        produccion_extra = np.zeros_like(demanda)
+    
+    produccion = np.zeros_like(demanda)
+    inventario = datos["inventario_inicial"].astype(np.int64)
+    
+    for j in range(demanda.shape[1]):
+        inventario = inventario + produccion_extra[:, j]
         
-        # Inicializar datos del SKU en el MPS
-        mps_sku = {
-            "sku_id": sku_id,
-            "nombre": sku_data["nombre"],
-            "presentacion_g": sku_data["presentacion_g"],
-            "demanda": {},
-            "inventario_inicial": {},
-            "stock_seguridad": {},
-            "scrap": {},
-            "produccion": {},
-            "inventario_final": {},
-            "alertas": {}
-        }
+        # Calcular necesidad neta
+        necesidad_neta = np.maximum(0, demanda[:, j] + stock_seguridad[:, j] - inventario)
         
-        # Inventario inicial para la primera semana
-        inv_inicial = calcular_inventario_inicial(db, sku_id, semanas_ordenadas[0])
+        # Calcular necesidad bruta (considerando scrap)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            necesidad_bruta = np.where(
+                scrap < 1,
+                np.floor(necesidad_neta / rendimiento),
+                necesidad_neta
+            ).astype(np.int64)
         
-        # Procesar cada semana
-        for i, semana in enumerate(semanas_ordenadas):
-            # Obtener demanda de la semana
-            demanda = sku_data["demanda"].get(semana, 0)
-            
-            # Calcular stock de seguridad
-            ss = calcular_stock_seguridad(db, sku_id, demanda)
-            
-            # Usar scrap promedio si no hay un valor específico
-            scrap = scrap_promedio
-            
-            # Calcular necesidad neta
-            if i == 0:
-                # Primera semana
-                necesidad_neta = max(0, demanda + ss - inv_inicial)
-            else:
-                # Semanas siguientes
-                necesidad_neta = max(0, demanda + ss - mps_sku["inventario_final"][semanas_ordenadas[i-1]])
-            
-            # Aplicar regla de 60 kg
-            produccion, alertas_produccion = calcular_produccion_con_regla_60kg(
-                db, sku_id, necesidad_neta, scrap
-            )
-            
-            # Calcular inventario final
-            if i == 0:
-                inv_final = inv_inicial + int(produccion * (1 - scrap)) - demanda
-            else:
-                inv_final = mps_sku["inventario_final"][semanas_ordenadas[i-1]] + int(produccion * (1 - scrap)) - demanda
-            
-            # Almacenar valores
-            mps_sku["demanda"][semana] = demanda
-            mps_sku["inventario_inicial"][semana] = inv_inicial if i == 0 else mps_sku["inventario_final"][semanas_ordenadas[i-1]]
-            mps_sku["stock_seguridad"][semana] = ss
-            mps_sku["scrap"][semana] = scrap
-            mps_sku["produccion"][semana] = produccion
-            mps_sku["inventario_final"][semana] = inv_final
-            
-            # Verificar alertas
-            alertas = []
-            
-            # Alerta si SS > 1.2 * demanda
-            if ss > 1.2 * demanda and demanda > 0:
-                alertas.append("Stock de seguridad elevado")
-            
-            # Alerta si inventario final < stock de seguridad
-            if inv_final < ss:
-                alertas.append("Inventario final por debajo del stock de seguridad")
-            
-            # Calcular kg de café verde necesarios
-            kg_verde_necesarios = (produccion * sku_data["presentacion_g"]) / (1000 * (1 - scrap))
-            
-            # Alerta si se excede la capacidad semanal
-            if kg_verde_necesarios > capacidad_semanal:
-                alertas.append("Excede capacidad semanal")
-            
-            # Agregar alertas de producción
-            alertas.extend(alertas_produccion)
-            
-            mps_sku["alertas"][semana] = alertas
+        # La regla de 60 kg completa tandas con un resto parcial,
+        # por lo que la producción coincide con la necesidad bruta
+        produccion[:, j] = necesidad_bruta
         
-        mps_data.append(mps_sku)
+        inventario = inventario + np.floor(necesidad_bruta * rendimiento).astype(np.int64) - demanda[:, j]
+    
+    return completar_plan(datos, produccion, stock_seguridad)
+
+def completar_plan(
+    datos: Dict[str, Any],
+    produccion: np.ndarray,
+    stock_seguridad: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Arma el plan completo a partir de una producción y un stock de seguridad.
+    
+    Args:
+        datos: Datos de entrada del MPS
+        produccion: Matriz de producción SKU × semana
+        stock_seguridad: Matriz de stock de seguridad SKU × semana
+    
+    Returns:
+        Diccionario con las matrices SKU × semana del plan
+    """
+    inventario_inicial, inventario_final = calcular_inventarios(datos, produccion)
+    
+    # Calcular cuántas unidades salen de una tanda de 60 kg
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unidades_por_tanda = np.floor((60 * 1000) / datos["presentacion_g"] * (1 - datos["scrap"]))
     
     return {
-        "semanas": semanas_ordenadas,
-        "capacidad_semanal": capacidad_semanal,
-        "data": mps_data
+        "stock_seguridad": stock_seguridad,
+        "produccion": produccion,
+        "inventario_inicial": inventario_inicial,
+        "inventario_final": inventario_final,
+        "kg_verde": produccion * calcular_kg_por_unidad(datos)[:, None],
+        "unidades_por_tanda": unidades_por_tanda
     }
 
+def nivelar_plan(datos: Dict[str, Any], plan: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Nivela el plan respecto a la capacidad semanal compartida entre SKUs.
+    
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado con ``calcular_plan``
+    
+    Returns:
+        Plan con la producción nivelada y los inventarios recalculados
+    """
+    kg_por_unidad = calcular_kg_por_unidad(datos)
+    capacidad = datos["capacidad_semanal"] * datos.get("semanas_por_bucket", 1)
+    produccion = nivelar_produccion(
+        plan["produccion"],
+        kg_por_unidad,
+        capacidad,
+        rendimiento=1 - datos["scrap"]
+    )
+    
+    return completar_plan(datos, produccion, plan["stock_seguridad"])
+
+def condiciones_alerta(datos: Dict[str, Any], plan: Dict[str, np.ndarray]) -> List[Tuple[np.ndarray, Dict[str, Any]]]:
+    """
+    Evalúa las reglas de alerta activas sobre todo el plan.
+    
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+    
+    Returns:
+        Lista de tuplas (máscara SKU × semana, regla de alerta)
+    """
+    return evaluar_reglas(datos, plan, datos.get("reglas_alerta", REGLAS_ALERTA_DEFAULT))
+
+def calcular_alertas(
+    datos: Dict[str, Any],
+    plan: Dict[str, np.ndarray],
+    condiciones: Optional[List[Tuple[np.ndarray, Dict[str, Any]]]] = None,
+    filas: Optional[range] = None
+) -> List[List[List[str]]]:
+    """
+    Calcula los códigos de alerta del plan para cada SKU y semana.
+    
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+        condiciones: Condiciones ya evaluadas con ``condiciones_alerta`` (opcional)
+        filas: Rango de SKUs a incluir (por defecto todos)
+    
+    Returns:
+        Lista por SKU de listas por semana con los códigos de alerta
+    """
+    n_skus, n_semanas = datos["demanda"].shape
+    condiciones = condiciones if condiciones is not None else condiciones_alerta(datos, plan)
+    filas = filas if filas is not None else range(n_skus)
+    
+    alertas = [[[] for _ in range(n_semanas)] for _ in filas]
+    for mascara, regla in condiciones:
+        for i, j in zip(*np.nonzero(mascara[filas.start:filas.stop])):
+            alertas[i][j].append(regla["codigo"])
+    
+    return alertas
+
+def formatear_skus(
+    datos: Dict[str, Any],
+    plan: Dict[str, np.ndarray],
+    condiciones: List[Tuple[np.ndarray, Dict[str, Any]]],
+    filas: range
+) -> List[Dict[str, Any]]:
+    """
+    Convierte un rango de SKUs del plan al formato de respuesta del MPS.
+    
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+        condiciones: Condiciones de alerta evaluadas sobre todo el plan
+        filas: Rango de SKUs a convertir
+    
+    Returns:
+        Lista con los datos del MPS de cada SKU
+    """
+    semanas = datos["semanas"]
+    alertas = calcular_alertas(datos, plan, condiciones, filas)
+    
+    mps_data = []
+    for k, i in enumerate(filas):
+        scrap = float(datos["scrap"][i])
+        mps_data.append({
+            "sku_id": datos["sku_ids"][i],
+            "nombre": datos["nombres"][i],
+            "presentacion_g": int(datos["presentacion_g"][i]),
+            "demanda": dict(zip(semanas, datos["demanda"][i].tolist())),
+            "inventario_inicial": dict(zip(semanas, plan["inventario_inicial"][i].tolist())),
+            "stock_seguridad": dict(zip(semanas, plan["stock_seguridad"][i].tolist())),
+            "scrap": {semana: scrap for semana in semanas},
+            "produccion": dict(zip(semanas, plan["produccion"][i].tolist())),
+            "inventario_final": dict(zip(semanas, plan["inventario_final"][i].tolist())),
+            "alertas": dict(zip(semanas, alertas[k]))
+        })
+    
+    return mps_data
+
+def formatear_mps(datos: Dict[str, Any], plan: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Convierte los arreglos del plan al formato de respuesta del MPS.
+    
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+    
+    Returns:
+        Diccionario con el MPS
+    """
+    semanas = datos["semanas"]
+    condiciones = condiciones_alerta(datos, plan)
+    
+    return {
+        "semanas": semanas,
+        "capacidad_semanal": datos["capacidad_semanal"],
+        "carga_semanal": dict(zip(semanas, plan["kg_verde"].sum(axis=0).tolist())),
+        "catalogo_alertas": catalogo_alertas(condiciones),
+        "data": formatear_skus(datos, plan, condiciones, range(len(datos["sku_ids"])))
+    }
+
+def formatear_mps_vacio(datos: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Arma la respuesta del MPS en formato JSON cuando no hay SKUs, con las
+    mismas claves que ``formatear_mps``.
+    
+    Args:
+        datos: Datos de entrada del MPS (sin SKUs)
+    
+    Returns:
+        Diccionario con el MPS vacío
+    """
+    return {
+        "semanas": datos["semanas"],
+        "capacidad_semanal": datos["capacidad_semanal"],
+        "carga_semanal": {},
+        "catalogo_alertas": describir_reglas(datos.get("reglas_alerta", REGLAS_ALERTA_DEFAULT)),
+        "data": []
+    }
+
+def formatear_mps_columnar(datos: Dict[str, Any], plan: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Convierte los arreglos del plan al formato columnar del MPS.
+    
+    Las semanas y los SKUs se envían una sola vez y cada métrica como una
+    matriz SKU × semana. Las alertas se envían como ternas dispersas
+    ``[fila, columna, índice de la regla]`` sobre el catálogo de alertas.
+    
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+    
+    Returns:
+        Diccionario con el MPS en formato columnar
+    """
+    condiciones = condiciones_alerta(datos, plan)
+    
+    ternas = [
+        np.column_stack(np.nonzero(mascara) + (np.full(int(mascara.sum()), k),))
+        for k, (mascara, _) in enumerate(condiciones)
+    ]
+    alertas = np.concatenate(ternas) if ternas else np.empty((0, 3), dtype=np.int64)
+    alertas = alertas[np.lexsort((alertas[:, 2], alertas[:, 1], alertas[:, 0]))]
+    
+    return {
+        "formato": "columnar",
+        "semanas": datos["semanas"],
+        "capacidad_semanal": datos["capacidad_semanal"],
+        "carga_semanal": plan["kg_verde"].sum(axis=0).tolist(),
+        "sku_ids": list(datos["sku_ids"]),
+        "nombres": list(datos["nombres"]),
+        "presentacion_g": datos["presentacion_g"].astype(int).tolist(),
+        "scrap": datos["scrap"].tolist(),
+        "demanda": datos["demanda"].tolist(),
+        "inventario_inicial": plan["inventario_inicial"].tolist(),
+        "stock_seguridad": plan["stock_seguridad"].tolist(),
+        "produccion": plan["produccion"].tolist(),
+        "inventario_final": plan["inventario_final"].tolist(),
+        "catalogo_alertas": catalogo_alertas(condiciones),
+        "alertas": alertas.tolist()
+    }
+
+# Formatos de respuesta del MPS
+FORMATEADORES_MPS = {
+    "json": formatear_mps,
+    "columnar": formatear_mps_columnar
+}
+
+def generar_mps(
+    db: Session,
+    semanas: int = 6,
+    nivelar: bool = False,
+    formato: str = "json",
+    escenario_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Genera el Plan Maestro de Producción (MPS).
+    
+    Args:
+        db: Sesión de base de datos
+        semanas: Número de semanas a planificar
+        nivelar: Si es True, adelanta producción para respetar la capacidad
+            semanal compartida entre todos los SKUs
+        formato: "json" (un diccionario por SKU) o "columnar"
+        escenario_id: Escenario guardado cuyos ajustes se aplican sobre los
+            datos vigentes (el plan resultante no reemplaza al oficial)
+    
+    Returns:
+        Diccionario con el MPS
+    """
+    if formato not in FORMATEADORES_MPS:
+        raise ValueError(f"Formato de MPS no válido: {formato}")
+    
+    datos = cargar_datos_mps(db, semanas)
+    
+    if escenario_id is not None:
+        # Importación local: el servicio de escenarios depende de este módulo
+        from app.services.escenarios import aplicar_escenario
+        datos, overrides = aplicar_escenario(db, datos, escenario_id)
+        nivelar = overrides.get("nivelar", nivelar)
+    
+    if not datos["sku_ids"] and formato == "json":
+        resultado = formatear_mps_vacio(datos)
+    else:
+        plan = calcular_plan(datos)
+        
+        if nivelar:
+            plan = nivelar_plan(datos, plan)
+        
+        resultado = FORMATEADORES_MPS[formato](datos, plan)
+    
+    if escenario_id is not None:
+        return {**resultado, "escenario_id": escenario_id}
+    
+    return resultado
+
 def guardar_ajustes_mps(
     db: Session,
     sku_id: int,
@@ -0,0 +1,152 @@
+import numpy as np
+from sqlmodel import Session
+from typing import Dict, List, Any, Tuple
+from app.crud.componentes import get_componentes
+from app.crud.lista_materiales import get_lista_materiales
+from app.models.componente import Componente
+from app.models.lista_materiales import ListaMateriales
+from app.services.mps import cargar_datos_mps, calcular_plan, nivelar_plan
+
+def construir_matriz_bom(
+    lineas: List[ListaMateriales],
+    sku_ids: List[int],
+    componente_ids: List[int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Construye la lista de materiales como matriz dispersa SKU × componente.
+
+    La matriz se guarda en formato de coordenadas (COO): una entrada por
+    línea de la lista, con la cantidad por unidad ya ajustada por la merma
+    del componente. Las líneas de SKUs o componentes fuera del plan se omiten.
+
+    Args:
+        lineas: Líneas de la lista de materiales
+        sku_ids: SKUs del plan (filas)
+        componente_ids: Componentes activos (columnas)
+
+    Returns:
+        Tupla (filas, columnas, cantidades) de las entradas no nulas
+    """
+    fila_sku = {sku_id: i for i, sku_id in enumerate(sku_ids)}
+    columna_componente = {componente_id: c for c, componente_id in enumerate(componente_ids)}
+
+    lineas = [
+        linea for linea in lineas
+        if linea.sku_id in fila_sku and linea.componente_id in columna_componente
+    ]
+
+    filas = np.array([fila_sku[linea.sku_id] for linea in lineas], dtype=np.int64)
+    columnas = np.array([columna_componente[linea.componente_id] for linea in lineas], dtype=np.int64)
+    cantidades = np.array([linea.cantidad / (1 - linea.scrap) for linea in lineas], dtype=float)
+
+    return filas, columnas, cantidades
+
+def explotar_requerimientos(
+    produccion: np.ndarray,
+    bom: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    lead_times: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Explota la producción del MPS en requerimientos de componentes.
+
+    El requerimiento bruto es el producto de la matriz de lista de
+    materiales (transpuesta) por la matriz de producción SKU × semana. Cada
+    entrada de la matriz dispersa aporta su fila de producción escalada a
+    la fila de su componente, desplazada hacia atrás según el lead time del
+    componente, de modo que todo el catálogo se explota en una sola pasada.
+    Lo que debería haberse liberado antes de la primera semana queda como
+    atrasado.
+
+    Args:
+        produccion: Matriz de producción SKU × semana
+        bom: Matriz de lista de materiales en formato (filas, columnas, cantidades)
+        lead_times: Lead time en semanas de cada componente
+
+    Returns:
+        Diccionario con el requerimiento bruto y la liberación de órdenes
+        (componente × semana) y el atrasado por componente
+    """
+    filas, columnas, cantidades = bom
+    n_componentes = len(lead_times)
+    n_semanas = produccion.shape[1]
+
+    # Aporte de cada entrada de la matriz dispersa: entradas × semana
+    aporte = cantidades[:, None] * produccion[filas]
+
+    requerimiento = np.zeros((n_componentes, n_semanas))
+    np.add.at(requerimiento, columnas, aporte)
+
+    # Semana de liberación de cada aporte según el lead time del componente;
+    # un lead time negativo (dato inválido) se trata como cero
+    lead_times = np.maximum(lead_times, 0)
+    liberacion = np.arange(n_semanas)[None, :] - lead_times[columnas][:, None]
+    atrasado_mascara = liberacion < 0
+
+    ordenes = np.zeros((n_componentes, n_semanas))
+    np.add.at(
+        ordenes,
+        (np.broadcast_to(columnas[:, None], aporte.shape), np.clip(liberacion, 0, n_semanas - 1)),
+        np.where(atrasado_mascara, 0, aporte)
+    )
+
+    atrasado = np.zeros(n_componentes)
+    np.add.at(atrasado, columnas, np.where(atrasado_mascara, aporte, 0).sum(axis=1))
+
+    return {
+        "requerimiento_bruto": requerimiento,
+        "liberacion_ordenes": ordenes,
+        "atrasado": atrasado
+    }
+
+def generar_mrp(db: Session, semanas: int = 6, nivelar: bool = False) -> Dict[str, Any]:
+    """
+    Genera el plan de requerimientos de materiales (MRP) a partir del MPS.
+
+    Args:
+        db: Sesión de base de datos
+        semanas: Número de semanas a planificar
+        nivelar: Si es True, explota el plan nivelado por capacidad
+
+    Returns:
+        Diccionario con los requerimientos por componente y semana
+    """
+    datos = cargar_datos_mps(db, semanas)
+    semanas_ordenadas = datos["semanas"]
+
+    componentes: List[Componente] = get_componentes(db, limit=None, activo=True)
+    if not datos["sku_ids"] or not componentes:
+        return {"semanas": semanas_ordenadas, "data": []}
+
+    plan = calcular_plan(datos)
+    if nivelar:
+        plan = nivelar_plan(datos, plan)
+
+    componente_ids = [componente.id for componente in componentes]
+    bom = construir_matriz_bom(get_lista_materiales(db), datos["sku_ids"], componente_ids)
+    lead_times = np.array([componente.lead_time_semanas for componente in componentes], dtype=np.int64)
+
+    resultado = explotar_requerimientos(plan["produccion"], bom, lead_times)
+
+    # Solo se informan los componentes que usa algún SKU del plan
+    usados = np.zeros(len(componentes), dtype=bool)
+    usados[bom[1]] = True
+
+    data = []
+    for c in np.flatnonzero(usados).tolist():
+        componente = componentes[c]
+        data.append({
+            "componente_id": componente.id,
+            "nombre": componente.nombre,
+            "tipo": componente.tipo,
+            "unidad": componente.unidad,
+            "lead_time_semanas": componente.lead_time_semanas,
+            "requerimiento_bruto": dict(zip(semanas_ordenadas, np.round(resultado["requerimiento_bruto"][c], 3).tolist())),
+            "liberacion_ordenes": dict(zip(semanas_ordenadas, np.round(resultado["liberacion_ordenes"][c], 3).tolist())),
+            "atrasado": round(float(resultado["atrasado"][c]), 3),
+            "total": round(float(resultado["requerimiento_bruto"][c].sum()), 3)
+        })
+
+    return {
+        "semanas": semanas_ordenadas,
+        "data": data
+    }
@@ -0,0 +1,137 @@
+import numpy as np
+from typing import Optional, Tuple, Union
+
+# Tamaño de una tanda de tostado en kg de café verde
+KG_POR_TANDA = 60
+
+# Tolerancia para comparar cargas en kg
+TOLERANCIA_KG = 1e-6
+
+def _ajustar_movimiento(
+    origen: int,
+    destino: int,
+    unidades: int,
+    maximo_destino: int,
+    rendimiento: float
+) -> Tuple[int, int]:
+    """
+    Ajusta un movimiento de producción para no perder entradas por redondeo.
+
+    Las entradas de una semana son la producción neta de scrap redondeada
+    hacia abajo, así que partir la producción entre dos semanas puede
+    perder una unidad de entrada. Se agregan en la semana destino las
+    unidades justas para recuperarla; si no caben, se mueven menos
+    unidades.
+
+    Args:
+        origen: Producción de la semana origen
+        destino: Producción de la semana destino
+        unidades: Unidades que se quieren mover
+        maximo_destino: Unidades que caben en la holgura de la semana destino
+        rendimiento: Fracción de la producción que queda tras el scrap
+
+    Returns:
+        Tupla (unidades a mover, unidades adicionales en la semana destino);
+        (0, 0) si no hay un movimiento que conserve las entradas
+    """
+    entradas = np.floor(origen * rendimiento) + np.floor(destino * rendimiento)
+    for mover in range(min(unidades, maximo_destino), 0, -1):
+        restantes = entradas - np.floor((origen - mover) * rendimiento)
+        adicionales = 0
+        while np.floor((destino + mover + adicionales) * rendimiento) < restantes:
+            adicionales += 1
+        if mover + adicionales <= maximo_destino:
+            return mover, adicionales
+    return 0, 0
+
+def nivelar_produccion(
+    produccion: np.ndarray,
+    kg_por_unidad: np.ndarray,
+    capacidad_semanal: Union[float, np.ndarray],
+    kg_por_tanda: float = KG_POR_TANDA,
+    rendimiento: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Nivela la producción respecto a una capacidad semanal compartida.
+
+    Resuelve la capacidad de forma voraz: para cada semana cuya carga total
+    en kg de café verde supera la capacidad, adelanta producción a la semana
+    anterior más cercana con holgura. Se mueven tandas completas de 60 kg
+    siempre que sea posible y solo se parte una tanda cuando la holgura no
+    alcanza para una completa.
+
+    Las entradas a inventario de cada semana son la producción neta de
+    scrap redondeada hacia abajo, así que repartir la producción de un SKU
+    entre dos semanas puede perder una unidad de entrada. Cada movimiento
+    agrega en la semana destino las unidades que recuperan esa entrada (o
+    mueve menos unidades si no caben): las entradas acumuladas de todas las
+    semanas no disminuyen y el stock de seguridad que se cumplía antes de
+    nivelar se sigue cumpliendo. El exceso de la primera semana no puede
+    adelantarse y se mantiene.
+
+    Args:
+        produccion: Matriz de producción SKU × semana en unidades
+        kg_por_unidad: kg de café verde por unidad de cada SKU
+        capacidad_semanal: Capacidad en kg de café verde, única o por periodo
+        kg_por_tanda: kg de café verde por tanda
+        rendimiento: Fracción de la producción de cada SKU que queda tras
+            el scrap (por defecto, sin scrap)
+
+    Returns:
+        Matriz de producción nivelada SKU × semana
+    """
+    produccion = produccion.astype(np.int64).copy()
+    capacidad = np.broadcast_to(np.asarray(capacidad_semanal, dtype=float), (produccion.shape[1],))
+    kg_por_unidad = np.where(np.isfinite(kg_por_unidad), kg_por_unidad, 0)
+    rendimiento = np.ones(produccion.shape[0]) if rendimiento is None else np.asarray(rendimiento, dtype=float)
+
+    kg = produccion * kg_por_unidad[:, None]
+    carga = kg.sum(axis=0)
+
+    for semana in range(1, produccion.shape[1]):
+        exceso = carga[semana] - capacidad[semana]
+        destino = semana - 1
+        descartados = np.zeros(produccion.shape[0], dtype=bool)
+
+        while exceso > TOLERANCIA_KG and destino >= 0:
+            holgura = capacidad[destino] - carga[destino]
+
+            # SKUs con producción en la semana de los que cabe al menos una unidad
+            candidatos = (produccion[:, semana] > 0) & (kg_por_unidad > 0) & (kg_por_unidad <= holgura) & ~descartados
+            if not candidatos.any():
+                destino -= 1
+                descartados[:] = False
+                continue
+
+            # Mover primero el SKU con mayor carga en la semana
+            i = int(np.argmax(np.where(candidatos, kg[:, semana], -1)))
+
+            # Redondear el exceso a tandas completas sin superar la holgura
+            kg_mover = min(kg[i, semana], holgura, np.ceil(exceso / kg_por_tanda) * kg_por_tanda)
+            if kg_mover >= kg_por_tanda:
+                kg_mover = np.floor(kg_mover / kg_por_tanda) * kg_por_tanda
+
+            unidades, adicionales = _ajustar_movimiento(
+                int(produccion[i, semana]),
+                int(produccion[i, destino]),
+                min(int(produccion[i, semana]), int(kg_mover / kg_por_unidad[i])),
+                int((holgura + TOLERANCIA_KG) / kg_por_unidad[i]),
+                rendimiento[i]
+            )
+            if unidades <= 0:
+                # Probar con otro SKU en la misma semana de destino
+                descartados[i] = True
+                continue
+
+            kg_movidos = unidades * kg_por_unidad[i]
+            kg_adicionales = adicionales * kg_por_unidad[i]
+
+            produccion[i, semana] -= unidades
+            produccion[i, destino] += unidades + adicionales
+            kg[i, semana] -= kg_movidos
+            kg[i, destino] += kg_movidos + kg_adicionales
+            carga[semana] -= kg_movidos
+            carga[destino] += kg_movidos + kg_adicionales
+            exceso -= kg_movidos
+
+    return produccion
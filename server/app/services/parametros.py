@@ -0,0 +1,258 @@
+from sqlmodel import Session, select
+from sqlalchemy import func
+from typing import Dict, Any, Optional
+from datetime import datetime
+from app.core.config import settings
+from app.models.parametro import Parametro
+
+# Parámetros del sistema: tipo, valor por defecto, descripción y rango
+# permitido (límites inclusivos, None si no hay límite)
+PARAMETROS = {
+    "nivel_servicio": {
+        "tipo": float,
+        "defecto": settings.NIVEL_SERVICIO,
+        "descripcion": "Nivel de servicio para cálculo de stock de seguridad (0-1)",
+        "minimo": 0.5,
+        "maximo": 0.999
+    },
+    "capacidad_semanal": {
+        "tipo": float,
+        "defecto": settings.CAPACIDAD_SEMANAL,
+        "descripcion": "Capacidad de producción semanal en kg de café verde",
+        "minimo": 0,
+        "maximo": None
+    },
+    "lead_time_semanas": {
+        "tipo": float,
+        "defecto": 1.0,
+        "descripcion": "Tiempo de reposición en semanas para el stock de seguridad",
+        "minimo": 0,
+        "maximo": None
+    },
+    "ventana_estadisticas_semanas": {
+        "tipo": int,
+        "defecto": 26,
+        "descripcion": "Semanas de ventas usadas para las estadísticas de demanda",
+        "minimo": 2,
+        "maximo": None
+    },
+    "numero_tostadores": {
+        "tipo": int,
+        "defecto": 1,
+        "descripcion": "Número de tostadores disponibles",
+        "minimo": 1,
+        "maximo": None
+    },
+    "minutos_por_tanda": {
+        "tipo": float,
+        "defecto": 20.0,
+        "descripcion": "Minutos de tostado por tanda de 60 kg",
+        "minimo": 1,
+        "maximo": None
+    },
+    "minutos_cambio": {
+        "tipo": float,
+        "defecto": 15.0,
+        "descripcion": "Minutos de cambio entre cafés en un tostador",
+        "minimo": 0,
+        "maximo": None
+    },
+    "horas_por_turno": {
+        "tipo": float,
+        "defecto": 8.0,
+        "descripcion": "Horas de tostado por turno",
+        "minimo": 1,
+        "maximo": 24
+    },
+    "turnos_por_dia": {
+        "tipo": int,
+        "defecto": 1,
+        "descripcion": "Turnos de tostado por día",
+        "minimo": 1,
+        "maximo": 3
+    },
+    "dias_produccion_semana": {
+        "tipo": int,
+        "defecto": 5,
+        "descripcion": "Días de producción por semana",
+        "minimo": 1,
+        "maximo": 7
+    },
+    "time_fence_demanda": {
+        "tipo": int,
+        "defecto": 1,
+        "descripcion": "Semanas en las que la demanda del último plan publicado queda congelada",
+        "minimo": 0,
+        "maximo": None
+    },
+    "time_fence_planificacion": {
+        "tipo": int,
+        "defecto": 2,
+        "descripcion": "Semanas en las que la producción del último plan publicado queda congelada",
+        "minimo": 0,
+        "maximo": None
+    },
+    "dias_inventario_objetivo": {
+        "tipo": float,
+        "defecto": settings.DIAS_INVENTARIO_OBJETIVO,
+        "descripcion": "Objetivo de días de inventario para KPI",
+        "minimo": 0,
+        "maximo": None
+    },
+    "objetivo_cumplimiento_plan": {
+        "tipo": float,
+        "defecto": settings.OBJETIVO_CUMPLIMIENTO_PLAN,
+        "descripcion": "Objetivo de cumplimiento del plan para KPI (0-1)",
+        "minimo": 0,
+        "maximo": 1
+    },
+    "objetivo_otd": {
+        "tipo": float,
+        "defecto": settings.OBJETIVO_OTD,
+        "descripcion": "Objetivo de On-Time Delivery para KPI (0-1)",
+        "minimo": 0,
+        "maximo": 1
+    },
+    "objetivo_rechazos": {
+        "tipo": float,
+        "defecto": settings.OBJETIVO_RECHAZOS,
+        "descripcion": "Objetivo de tasa de rechazos para KPI (0-1)",
+        "minimo": 0,
+        "maximo": 1
+    }
+}
+
+# Valores vigentes ya convertidos a su tipo. Se reemplaza completo en cada
+# actualización para que las lecturas concurrentes vean un estado
+# consistente.
+_cache_parametros: Dict[str, Any] = {}
+
+# Última modificación de los parámetros guardados que refleja el caché.
+# Cada proceso tiene su propio caché; al compararla con la base de datos
+# se detectan los cambios hechos por otros procesos.
+_version_parametros: Optional[datetime] = None
+
+def convertir_parametro(nombre: str, valor: str) -> Any:
+    """
+    Convierte y valida el valor de un parámetro según su definición.
+
+    Args:
+        nombre: Nombre del parámetro
+        valor: Valor como texto, tal como se guarda en la base de datos
+
+    Returns:
+        Valor convertido al tipo del parámetro
+
+    Raises:
+        ValueError: Si el parámetro no existe o el valor no es válido
+    """
+    definicion = PARAMETROS.get(nombre)
+    if definicion is None:
+        raise ValueError(f"Parámetro desconocido: {nombre}")
+
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"El valor de {nombre} debe ser numérico")
+
+    if definicion["tipo"] is int:
+        if not numero.is_integer():
+            raise ValueError(f"El valor de {nombre} debe ser entero")
+        numero = int(numero)
+
+    if definicion["minimo"] is not None and numero < definicion["minimo"]:
+        raise ValueError(f"El valor de {nombre} debe ser mayor o igual que {definicion['minimo']}")
+    if definicion["maximo"] is not None and numero > definicion["maximo"]:
+        raise ValueError(f"El valor de {nombre} debe ser menor o igual que {definicion['maximo']}")
+
+    return numero
+
+def get_version_parametros(db: Session) -> Optional[datetime]:
+    """
+    Obtiene la última modificación de los parámetros guardados.
+
+    Args:
+        db: Sesión de base de datos
+
+    Returns:
+        Mayor ``updated_at`` de los parámetros o None si no hay ninguno
+    """
+    return db.exec(select(func.max(Parametro.updated_at))).one()
+
+def cargar_parametros(db: Session) -> None:
+    """
+    Carga en memoria los valores de los parámetros guardados.
+
+    Los valores guardados que no pasan la validación se reportan y se
+    restablecen en la base de datos al valor por defecto, para que la API
+    muestre el valor que realmente se usa.
+
+    Args:
+        db: Sesión de base de datos
+    """
+    global _cache_parametros, _version_parametros
+
+    valores = {nombre: definicion["defecto"] for nombre, definicion in PARAMETROS.items()}
+    reparados = False
+    for param in db.exec(select(Parametro).where(Parametro.nombre.in_(PARAMETROS))).all():
+        try:
+            valores[param.nombre] = convertir_parametro(param.nombre, param.valor)
+        except ValueError as e:
+            print(f"Valor inválido del parámetro {param.nombre} ({param.valor!r}): {e}. Se restablece el valor por defecto")
+            param.valor = str(PARAMETROS[param.nombre]["defecto"])
+            param.updated_at = datetime.now()
+            db.add(param)
+            reparados = True
+
+    if reparados:
+        db.commit()
+
+    _cache_parametros = valores
+    _version_parametros = get_version_parametros(db)
+
+def sincronizar_parametros(db: Session) -> None:
+    """
+    Recarga el caché de parámetros si cambiaron en la base de datos.
+
+    Cuesta una consulta de una fila; solo se recargan los valores si otro
+    proceso (u otra vía) modificó algún parámetro desde la última carga.
+
+    Args:
+        db: Sesión de base de datos
+    """
+    if _version_parametros is None or get_version_parametros(db) != _version_parametros:
+        cargar_parametros(db)
+
+def actualizar_cache_parametro(nombre: str, valor: Any) -> None:
+    """
+    Reemplaza el valor en memoria de un parámetro tras guardarlo.
+
+    La versión del caché no se avanza: la siguiente sincronización recarga
+    todos los valores, incluidos los que otro proceso haya cambiado entre
+    tanto.
+
+    Args:
+        nombre: Nombre del parámetro
+        valor: Valor ya convertido con ``convertir_parametro``
+    """
+    global _cache_parametros
+    _cache_parametros = {**_cache_parametros, nombre: valor}
+
+def obtener_parametro(nombre: str) -> Any:
+    """
+    Obtiene el valor vigente de un parámetro sin consultar la base de datos.
+
+    El caché es por proceso: se carga al iniciar la aplicación, se
+    actualiza con ``update_parametro`` y ``sincronizar_parametros`` lo
+    recarga en cada sesión de las peticiones y de las tareas periódicas si
+    otro proceso cambió algún parámetro. Si aún no se ha cargado, se usa el
+    valor por defecto.
+
+    Args:
+        nombre: Nombre del parámetro
+
+    Returns:
+        Valor del parámetro con su tipo (float o int)
+    """
+    valor = _cache_parametros.get(nombre)
+    return PARAMETROS[nombre]["defecto"] if valor is None else valor
@@ -0,0 +1,222 @@
+import numpy as np
+from datetime import date
+from sqlmodel import Session
+from typing import Dict, List, Any, Optional, Tuple
+from app.crud.inventario import get_saldos_inventario
+from app.crud.plantas import get_plantas, get_asignaciones_planta
+from app.models.asignacion_planta import AsignacionPlanta
+from app.models.planta import Planta
+from app.services.mps import cargar_datos_mps, calcular_plan, nivelar_plan, formatear_mps, recortar_datos
+from app.utils.paralelo import mapear_en_paralelo
+from app.utils.iso_weeks import semana_iso_a_fecha, parsear_semana_iso
+
+# Tolerancia al sumar participaciones (fracciones en coma flotante)
+TOLERANCIA_PARTICIPACION = 1e-9
+
+def validar_participacion(
+    asignaciones: List[AsignacionPlanta],
+    planta_id: int,
+    participacion: float
+) -> None:
+    """
+    Verifica que la participación de un SKU en una planta no haga que sus
+    participaciones sumen más de 1 entre todas las plantas, lo que contaría
+    dos veces parte de su demanda.
+
+    Args:
+        asignaciones: Asignaciones vigentes del SKU
+        planta_id: Planta que se asigna o actualiza
+        participacion: Nueva participación del SKU en la planta
+
+    Raises:
+        ValueError: Si la suma de participaciones supera 1
+    """
+    otras = sum(a.participacion for a in asignaciones if a.planta_id != planta_id)
+    if otras + participacion > 1 + TOLERANCIA_PARTICIPACION:
+        raise ValueError(
+            f"La participación del SKU en las plantas sumaría {otras + participacion:.4g}; "
+            f"como máximo puede asignarse {max(0.0, 1 - otras):.4g} a esta planta"
+        )
+
+def movimientos_desde_conteo(
+    db: Session,
+    asignaciones: List[AsignacionPlanta],
+    semana: str
+) -> Dict[int, int]:
+    """
+    Calcula el cambio del libro de inventario de cada SKU entre el conteo
+    de inventario de cada asignación y el inicio del plan.
+
+    Se lee un saldo por fecha de conteo distinta, para todos los SKUs a la
+    vez, más el saldo al inicio del plan.
+
+    Args:
+        db: Sesión de base de datos
+        asignaciones: Asignaciones de SKUs a plantas
+        semana: Primera semana del plan en formato "YYYY-SWW"
+
+    Returns:
+        Diccionario con el movimiento neto del SKU por ID de asignación
+        (solo las asignaciones con inventario contado)
+    """
+    contadas = [a for a in asignaciones if a.inventario_inicial is not None and a.fecha_inventario is not None]
+    if not contadas:
+        return {}
+
+    sku_ids = sorted({a.sku_id for a in contadas})
+    inicio = get_saldos_inventario(db, semana_iso_a_fecha(*parsear_semana_iso(semana)), sku_ids)
+
+    saldos_conteo: Dict[date, Dict[int, int]] = {}
+    for fecha in {a.fecha_inventario for a in contadas}:
+        saldos_conteo[fecha] = get_saldos_inventario(db, fecha, sku_ids)
+
+    return {
+        a.id: inicio.get(a.sku_id, 0) - saldos_conteo[a.fecha_inventario].get(a.sku_id, 0)
+        for a in contadas
+    }
+
+def particionar_datos(
+    datos: Dict[str, Any],
+    plantas: List[Planta],
+    asignaciones: List[AsignacionPlanta],
+    movimientos: Optional[Dict[int, int]] = None
+) -> List[Tuple[Dict[str, Any], np.ndarray]]:
+    """
+    Divide los datos del MPS en un problema independiente por planta.
+
+    Cada planta recibe los SKUs que tiene asignados, con la fracción de la
+    demanda que atiende, su inventario y su capacidad semanal. El
+    inventario es la fracción del inventario global del libro según la
+    participación. Si se contó el inventario de la planta, el conteo es el
+    saldo de apertura a su fecha y se le suma la fracción de los
+    movimientos del SKU desde entonces, para que las ventas y la
+    producción posteriores lo actualicen.
+
+    Args:
+        datos: Datos de entrada del MPS
+        plantas: Plantas activas
+        asignaciones: Asignaciones de SKUs a plantas
+        movimientos: Movimiento neto del SKU desde el conteo, por ID de
+            asignación (de ``movimientos_desde_conteo``)
+
+    Returns:
+        Lista con los datos de cada planta y las filas de sus SKUs en los
+        datos originales
+
+    Raises:
+        ValueError: Si las participaciones de un SKU suman más de 1
+    """
+    fila_sku = {sku_id: i for i, sku_id in enumerate(datos["sku_ids"])}
+    movimientos = movimientos or {}
+
+    # Participación total de cada SKU en las plantas activas
+    total: Dict[int, float] = {}
+    plantas_activas = {planta.id for planta in plantas}
+    for a in asignaciones:
+        if a.planta_id in plantas_activas:
+            total[a.sku_id] = total.get(a.sku_id, 0.0) + a.participacion
+    excedidos = sorted(sku_id for sku_id, suma in total.items() if suma > 1 + TOLERANCIA_PARTICIPACION)
+    if excedidos:
+        raise ValueError(
+            f"Las participaciones suman más de 1 para los SKUs: {', '.join(map(str, excedidos))}"
+        )
+
+    particiones = []
+    for planta in plantas:
+        propias = [a for a in asignaciones if a.planta_id == planta.id and a.sku_id in fila_sku]
+        filas = np.array([fila_sku[a.sku_id] for a in propias], dtype=np.int64)
+        participacion = np.array([a.participacion for a in propias], dtype=float)
+
+        datos_planta = recortar_datos(datos, filas)
+        datos_planta["capacidad_semanal"] = planta.capacidad_semanal
+
+        for clave in ("demanda", "demanda_min", "demanda_max"):
+            datos_planta[clave] = np.round(datos_planta[clave] * participacion[:, None]).astype(np.int64)
+        datos_planta["desviacion_demanda"] = datos_planta["desviacion_demanda"] * participacion
+
+        datos_planta["inventario_inicial"] = np.array([
+            max(0, a.inventario_inicial + round(movimientos[a.id] * a.participacion))
+            if a.id in movimientos else int(inventario * a.participacion)
+            for a, inventario in zip(propias, datos_planta["inventario_inicial"])
+        ], dtype=np.int64)
+
+        particiones.append((datos_planta, filas))
+
+    return particiones
+
+def calcular_plan_planta(tarea: Tuple[Dict[str, Any], bool]) -> Dict[str, np.ndarray]:
+    """
+    Calcula el plan de una planta.
+
+    Args:
+        tarea: Tupla (datos de la planta, nivelar)
+
+    Returns:
+        Plan de la planta
+    """
+    datos, nivelar = tarea
+
+    plan = calcular_plan(datos)
+    if nivelar:
+        plan = nivelar_plan(datos, plan)
+
+    return plan
+
+def generar_mps_plantas(db: Session, semanas: int = 6, nivelar: bool = False) -> Dict[str, Any]:
+    """
+    Genera el MPS de cada planta y el consolidado por SKU.
+
+    El pronóstico se carga una sola vez; el plan de cada planta se calcula
+    en un proceso separado y luego se unen los resultados.
+
+    Args:
+        db: Sesión de base de datos
+        semanas: Número de semanas a planificar
+        nivelar: Si es True, nivela la producción de cada planta con su capacidad
+
+    Returns:
+        Diccionario con el MPS por planta, el consolidado y los SKUs sin planta
+    """
+    datos = cargar_datos_mps(db, semanas)
+    semanas_ordenadas = datos["semanas"]
+    plantas = get_plantas(db, activo=True)
+
+    asignaciones = get_asignaciones_planta(db)
+    movimientos = movimientos_desde_conteo(db, asignaciones, semanas_ordenadas[0]) if semanas_ordenadas else {}
+    particiones = particionar_datos(datos, plantas, asignaciones, movimientos)
+    planes = mapear_en_paralelo(calcular_plan_planta, [(datos_planta, nivelar) for datos_planta, _ in particiones])
+
+    # Consolidar producción e inventario por SKU sumando las plantas
+    n_skus, n_semanas = datos["demanda"].shape
+    produccion = np.zeros((n_skus, n_semanas), dtype=np.int64)
+    inventario_final = np.zeros((n_skus, n_semanas), dtype=np.int64)
+    asignado = np.zeros(n_skus, dtype=bool)
+
+    resultado_plantas = []
+    for planta, (datos_planta, filas), plan in zip(plantas, particiones, planes):
+        np.add.at(produccion, filas, plan["produccion"])
+        np.add.at(inventario_final, filas, plan["inventario_final"])
+        asignado[filas] = True
+
+        resultado_plantas.append({
+            "planta_id": planta.id,
+            "nombre": planta.nombre,
+            **formatear_mps(datos_planta, plan)
+        })
+
+    consolidado = []
+    for i in np.flatnonzero(asignado).tolist():
+        consolidado.append({
+            "sku_id": datos["sku_ids"][i],
+            "nombre": datos["nombres"][i],
+            "presentacion_g": int(datos["presentacion_g"][i]),
+            "produccion": dict(zip(semanas_ordenadas, produccion[i].tolist())),
+            "inventario_final": dict(zip(semanas_ordenadas, inventario_final[i].tolist()))
+        })
+
+    return {
+        "semanas": semanas_ordenadas,
+        "plantas": resultado_plantas,
+        "consolidado": consolidado,
+        "skus_sin_planta": [sku_id for sku_id, a in zip(datos["sku_ids"], asignado) if not a]
+    }
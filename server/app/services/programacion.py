@@ -0,0 +1,333 @@
+import time
+import numpy as np
+from sqlmodel import Session
+from typing import Dict, List, Any, Optional, Tuple
+from app.services.mps import cargar_datos_mps, calcular_plan, nivelar_plan, calcular_kg_por_unidad
+from app.services.nivelacion import KG_POR_TANDA
+from app.services.parametros import obtener_parametro
+
+# Tolerancia para descartar restos de kg por redondeo
+TOLERANCIA_KG = 1e-6
+
+# Tiempo máximo de búsqueda del método exacto, en segundos
+MAX_LIMITE_SEGUNDOS = 10.0
+
+def construir_tandas(kg_por_sku: Dict[int, float], cafes: Dict[int, str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Divide la producción de la semana en tandas de 60 kg por café.
+
+    Los SKUs del mismo café (distintas presentaciones) comparten tandas,
+    porque el tostado se hace sobre el café verde antes del empaque. Solo la
+    última tanda de cada café puede quedar parcial.
+
+    Args:
+        kg_por_sku: kg de café verde a tostar por SKU
+        cafes: Nombre del café de cada SKU
+
+    Returns:
+        Diccionario de tandas por café; cada tanda indica sus kg y su
+        reparto entre SKUs
+    """
+    tandas_por_cafe: Dict[str, List[Dict[str, Any]]] = {}
+
+    for sku_id, kg in kg_por_sku.items():
+        if kg <= TOLERANCIA_KG:
+            continue
+
+        tandas = tandas_por_cafe.setdefault(cafes[sku_id], [])
+        restante = kg
+
+        while restante > TOLERANCIA_KG:
+            # Completar la última tanda abierta del café o abrir una nueva
+            if not tandas or tandas[-1]["kg"] >= KG_POR_TANDA - TOLERANCIA_KG:
+                tandas.append({"kg": 0.0, "skus": {}})
+
+            tanda = tandas[-1]
+            kg_tanda = min(restante, KG_POR_TANDA - tanda["kg"])
+            tanda["kg"] += kg_tanda
+            tanda["skus"][sku_id] = tanda["skus"].get(sku_id, 0.0) + kg_tanda
+            restante -= kg_tanda
+
+    return tandas_por_cafe
+
+def _carga(duraciones: List[float], minutos_cambio: float) -> float:
+    """
+    Calcula los minutos de un tostador para los cafés asignados.
+    """
+    if not duraciones:
+        return 0.0
+    return sum(duraciones) + (len(duraciones) - 1) * minutos_cambio
+
+def asignar_heuristico(
+    duraciones: Dict[str, float],
+    numero_tostadores: int,
+    minutos_cambio: float
+) -> List[List[str]]:
+    """
+    Asigna los cafés a tostadores con la regla del mayor tiempo primero.
+
+    Cada café se tuesta de forma contigua en un solo tostador, de modo que
+    cada tostador hace un cambio menos que cafés asignados.
+
+    Args:
+        duraciones: Minutos de tostado por café
+        numero_tostadores: Número de tostadores
+        minutos_cambio: Minutos de cambio entre cafés
+
+    Returns:
+        Lista por tostador con los cafés en orden de tostado
+    """
+    asignacion: List[List[str]] = [[] for _ in range(numero_tostadores)]
+    cargas = np.zeros(numero_tostadores)
+
+    for cafe in sorted(duraciones, key=lambda c: (-duraciones[c], c)):
+        # Costo de agregar el café a cada tostador (incluye el cambio)
+        costo = cargas + duraciones[cafe] + np.array([minutos_cambio if a else 0.0 for a in asignacion])
+        t = int(np.argmin(costo))
+        asignacion[t].append(cafe)
+        cargas[t] = costo[t]
+
+    return asignacion
+
+def asignar_exacto(
+    duraciones: Dict[str, float],
+    numero_tostadores: int,
+    minutos_cambio: float,
+    limite_segundos: float = 1.0
+) -> Tuple[List[List[str]], bool]:
+    """
+    Busca la asignación de cafés a tostadores que minimiza el tiempo total.
+
+    Usa ramificación y acotamiento partiendo de la solución heurística. Si
+    se alcanza el límite de tiempo devuelve la mejor asignación encontrada.
+
+    Args:
+        duraciones: Minutos de tostado por café
+        numero_tostadores: Número de tostadores
+        minutos_cambio: Minutos de cambio entre cafés
+        limite_segundos: Tiempo máximo de búsqueda
+
+    Returns:
+        Tupla (asignación por tostador, True si se probó la optimalidad)
+    """
+    cafes = sorted(duraciones, key=lambda c: (-duraciones[c], c))
+    mejor = asignar_heuristico(duraciones, numero_tostadores, minutos_cambio)
+    mejor_carga = max(_carga([duraciones[c] for c in t], minutos_cambio) for t in mejor)
+
+    # Cota inferior: ningún tostador puede terminar antes que el café más largo
+    # ni que el reparto perfecto del tiempo total
+    cota = max(
+        max(duraciones.values(), default=0.0),
+        (sum(duraciones.values()) + max(0, len(cafes) - numero_tostadores) * minutos_cambio) / numero_tostadores
+    )
+
+    limite = time.monotonic() + limite_segundos
+    asignacion: List[List[str]] = [[] for _ in range(numero_tostadores)]
+    cargas = [0.0] * numero_tostadores
+    completa = True
+
+    def buscar(k: int) -> bool:
+        nonlocal mejor, mejor_carga, completa
+
+        if time.monotonic() > limite:
+            completa = False
+            return False
+
+        if k == len(cafes):
+            carga = max(cargas)
+            if carga < mejor_carga - TOLERANCIA_KG:
+                mejor = [list(t) for t in asignacion]
+                mejor_carga = carga
+            return mejor_carga <= cota + TOLERANCIA_KG
+
+        cafe = cafes[k]
+        probadas = set()
+        for t in range(numero_tostadores):
+            # Tostadores con la misma carga son equivalentes
+            clave = (cargas[t], bool(asignacion[t]))
+            if clave in probadas:
+                continue
+            probadas.add(clave)
+
+            extra = duraciones[cafe] + (minutos_cambio if asignacion[t] else 0.0)
+            if cargas[t] + extra >= mejor_carga - TOLERANCIA_KG:
+                continue
+
+            asignacion[t].append(cafe)
+            cargas[t] += extra
+            optimo = buscar(k + 1)
+            cargas[t] -= extra
+            asignacion[t].pop()
+
+            if optimo or not completa:
+                return optimo
+
+        return False
+
+    if mejor_carga > cota + TOLERANCIA_KG:
+        buscar(0)
+
+    return mejor, completa
+
+def secuenciar(
+    asignacion: List[List[str]],
+    tandas_por_cafe: Dict[str, List[Dict[str, Any]]],
+    minutos_por_tanda: float,
+    minutos_cambio: float,
+    minutos_por_turno: float,
+    turnos_por_dia: int,
+    dias_produccion: int
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Ubica las tandas de cada tostador en días y turnos.
+
+    Las tandas se programan una tras otra; una tanda que no cabe en lo que
+    queda del turno pasa al inicio del turno siguiente. Un cambio de café
+    agrega los minutos de cambio antes de la primera tanda del nuevo café.
+
+    Args:
+        asignacion: Cafés por tostador en orden de tostado
+        tandas_por_cafe: Tandas de cada café
+        minutos_por_tanda: Minutos de tostado por tanda
+        minutos_cambio: Minutos de cambio entre cafés
+        minutos_por_turno: Minutos disponibles por turno
+        turnos_por_dia: Turnos por día
+        dias_produccion: Días de producción en la semana
+
+    Returns:
+        Tupla (programa por tostador, tandas sin asignar por falta de tiempo)
+    """
+    turnos_semana = turnos_por_dia * dias_produccion
+    programa = []
+    sin_asignar = []
+
+    for t, cafes in enumerate(asignacion):
+        turno = 0
+        minuto = 0.0
+        cafe_anterior = None
+        tandas_programadas = []
+        cambios = 0
+
+        for cafe in cafes:
+            for tanda in tandas_por_cafe[cafe]:
+                duracion = minutos_por_tanda + (minutos_cambio if cafe_anterior not in (None, cafe) else 0.0)
+
+                if minuto + duracion > minutos_por_turno:
+                    turno += 1
+                    minuto = 0.0
+
+                if turno >= turnos_semana or duracion > minutos_por_turno:
+                    sin_asignar.append({"cafe": cafe, "kg": tanda["kg"], "skus": tanda["skus"]})
+                    continue
+
+                if cafe_anterior not in (None, cafe):
+                    cambios += 1
+
+                inicio = minuto + duracion - minutos_por_tanda
+                tandas_programadas.append({
+                    "orden": len(tandas_programadas) + 1,
+                    "cafe": cafe,
+                    "kg": round(tanda["kg"], 3),
+                    "skus": {sku_id: round(kg, 3) for sku_id, kg in tanda["skus"].items()},
+                    "dia": turno // turnos_por_dia + 1,
+                    "turno": turno % turnos_por_dia + 1,
+                    "inicio_min": inicio,
+                    "fin_min": inicio + minutos_por_tanda
+                })
+
+                minuto += duracion
+                cafe_anterior = cafe
+
+        programa.append({
+            "tostador": t + 1,
+            "cambios": cambios,
+            "tandas": tandas_programadas
+        })
+
+    return programa, sin_asignar
+
+def generar_programa(
+    db: Session,
+    semana: Optional[str] = None,
+    semanas: int = 6,
+    metodo: str = "heuristico",
+    limite_segundos: float = 1.0,
+    nivelar: bool = False
+) -> Dict[str, Any]:
+    """
+    Genera el programa de tandas por tostador para una semana del MPS.
+
+    Args:
+        db: Sesión de base de datos
+        semana: Semana a programar en formato "YYYY-SWW" (por defecto la primera del plan)
+        semanas: Número de semanas del MPS
+        metodo: "heuristico" o "exacto"
+        limite_segundos: Tiempo máximo del método exacto (hasta
+            ``MAX_LIMITE_SEGUNDOS``)
+        nivelar: Si es True, programa el plan nivelado por capacidad
+
+    Returns:
+        Diccionario con el programa de la semana
+
+    Raises:
+        ValueError: Si el método, el límite de búsqueda o la semana no son
+            válidos
+    """
+    if metodo not in ("heuristico", "exacto"):
+        raise ValueError(f"Método de programación no válido: {metodo}")
+    if not 0 < limite_segundos <= MAX_LIMITE_SEGUNDOS:
+        raise ValueError(f"El límite de búsqueda debe ser mayor que 0 y de hasta {MAX_LIMITE_SEGUNDOS:g} segundos")
+
+    datos = cargar_datos_mps(db, semanas)
+    if not datos["semanas"]:
+        return {"semana": semana, "metodo": metodo, "optimo": True, "tostadores": [], "sin_asignar": []}
+
+    semana = semana or datos["semanas"][0]
+    if semana not in datos["semanas"]:
+        raise ValueError(f"La semana {semana} no está en el horizonte del MPS")
+    j = datos["semanas"].index(semana)
+
+    plan = calcular_plan(datos)
+    if nivelar:
+        plan = nivelar_plan(datos, plan)
+
+    # Parámetros de la planta de tostado
+    numero_tostadores = obtener_parametro("numero_tostadores")
+    minutos_por_tanda = obtener_parametro("minutos_por_tanda")
+    minutos_cambio = obtener_parametro("minutos_cambio")
+    minutos_por_turno = obtener_parametro("horas_por_turno") * 60
+    turnos_por_dia = obtener_parametro("turnos_por_dia")
+    dias_produccion = obtener_parametro("dias_produccion_semana")
+
+    kg_semana = plan["produccion"][:, j] * calcular_kg_por_unidad(datos)
+    kg_por_sku = {sku_id: float(kg) for sku_id, kg in zip(datos["sku_ids"], kg_semana) if np.isfinite(kg)}
+    cafes = dict(zip(datos["sku_ids"], datos["nombres"]))
+
+    tandas_por_cafe = construir_tandas(kg_por_sku, cafes)
+    duraciones = {cafe: len(tandas) * minutos_por_tanda for cafe, tandas in tandas_por_cafe.items()}
+
+    if metodo == "exacto":
+        asignacion, optimo = asignar_exacto(duraciones, numero_tostadores, minutos_cambio, limite_segundos)
+    else:
+        asignacion = asignar_heuristico(duraciones, numero_tostadores, minutos_cambio)
+        optimo = False
+
+    programa, sin_asignar = secuenciar(
+        asignacion,
+        tandas_por_cafe,
+        minutos_por_tanda,
+        minutos_cambio,
+        minutos_por_turno,
+        turnos_por_dia,
+        dias_produccion
+    )
+
+    return {
+        "semana": semana,
+        "metodo": metodo,
+        "optimo": optimo,
+        "total_tandas": sum(len(tandas) for tandas in tandas_por_cafe.values()),
+        "total_cambios": sum(t["cambios"] for t in programa),
+        "tostadores": programa,
+        "sin_asignar": sin_asignar
+    }
@@ -6,7 +6,7 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from app.models.venta import Venta
 from app.models.sku import SKU
-from app.utils.iso_weeks import semana_iso_a_fecha
+from app.utils.iso_weeks import semana_iso_a_fecha, parsear_semana_iso
 
 def obtener_datos_ventas(db: Session, sku_id: Optional[int] = None) -> pd.DataFrame:
     """
@@ -80,7 +80,8 @@ def entrenar_modelo(datos: pd.DataFrame) -> Prophet:
 def generar_pronostico(
     modelo: Prophet,
     periodos: int = 26,
-    frecuencia: str = 'W'
+    frecuencia: str = 'W',
+    fechas: Optional[List] = None
 ) -> pd.DataFrame:
     """
     Genera un pronóstico con el modelo entrenado.
@@ -89,12 +90,17 @@ def generar_pronostico(
         modelo: Modelo entrenado
         periodos: Número de periodos a pronosticar
         frecuencia: Frecuencia del pronóstico ('W' para semanal)
+        fechas: Fechas a pronosticar (opcional); si se indican, solo se
+            pronostican esas fechas, sin la historia ni ``periodos``
     
     Returns:
         DataFrame con el pronóstico
     """
     # Generar fechas futuras
-    future = modelo.make_future_dataframe(periods=periodos, freq=frecuencia)
+    if fechas is not None:
+        future = pd.DataFrame({"ds": pd.to_datetime(fechas)})
+    else:
+        future = modelo.make_future_dataframe(periods=periodos, freq=frecuencia)
     
     # Generar pronóstico
     forecast = modelo.predict(future)
@@ -109,12 +115,20 @@ def generar_pronostico(
     
     return resultado
 
-def entrenar_y_pronosticar(db: Session) -> Dict[int, Dict[str, List[int]]]:
+def entrenar_y_pronosticar(
+    db: Session,
+    periodos: int = 26,
+    semanas_por_sku: Optional[Dict[int, List[str]]] = None
+) -> Dict[int, Dict[str, List[int]]]:
     """
     Entrena modelos y genera pronósticos para todos los SKUs.
     
     Args:
         db: Sesión de base de datos
+        periodos: Número de semanas a pronosticar
+        semanas_por_sku: Semanas ("YYYY-SWW") a pronosticar de cada SKU
+            (opcional). Si se indica, solo se pronostican esas semanas y los
+            SKUs sin semanas pendientes no se entrenan.
     
     Returns:
         Diccionario con pronósticos por SKU
@@ -130,6 +144,14 @@ def entrenar_y_pronosticar(db: Session) -> Dict[int, Dict[str, List[int]]]:
     
     # Procesar cada SKU
     for sku in skus:
+        # Lunes de las semanas pendientes del SKU, si se indicaron
+        fechas = None
+        if semanas_por_sku is not None:
+            semanas_sku = semanas_por_sku.get(sku.id, [])
+            if not semanas_sku:
+                continue
+            fechas = pd.to_datetime([semana_iso_a_fecha(*parsear_semana_iso(s)) for s in semanas_sku])
+        
         # Obtener datos de ventas
         datos = obtener_datos_ventas(db, sku.id)
         
@@ -142,22 +164,26 @@ def entrenar_y_pronosticar(db: Session) -> Dict[int, Dict[str, List[int]]]:
                 promedio = 100  # Valor por defecto
             
             # Generar fechas futuras
-            hoy = datetime.now()
-            fechas_futuras = [hoy + timedelta(weeks=i) for i in range(26)]
+            if fechas is not None:
+                fechas_futuras = fechas
+            else:
+                hoy = datetime.now()
+                fechas_futuras = [hoy + timedelta(weeks=i) for i in range(periodos)]
+            n = len(fechas_futuras)
             
             # Crear DataFrame de pronóstico
             pronostico = pd.DataFrame({
                 "ds": fechas_futuras,
-                "yhat": [promedio] * 26,
-                "yhat_lower": [promedio * 0.8] * 26,
-                "yhat_upper": [promedio * 1.2] * 26
+                "yhat": [promedio] * n,
+                "yhat_lower": [promedio * 0.8] * n,
+                "yhat_upper": [promedio * 1.2] * n
             })
         else:
             # Entrenar modelo
             modelo = entrenar_modelo(datos)
             
             # Generar pronóstico
-            pronostico = generar_pronostico(modelo)
+            pronostico = generar_pronostico(modelo, periodos, fechas=fechas)
         
         # Extraer semanas ISO del pronóstico
         pronostico["año_iso"] = pronostico["ds"].dt.isocalendar().year
@@ -176,13 +202,37 @@ def entrenar_y_pronosticar(db: Session) -> Dict[int, Dict[str, List[int]]]:
     
     return pronosticos
 
-def obtener_pronostico_futuro(db: Session, semanas: int = 6) -> Dict[str, Dict]:
+def semanas_futuras(semanas: int = 6) -> List[str]:
+    """
+    Obtiene las semanas ISO del horizonte, empezando por la semana en curso.
+    
+    Args:
+        semanas: Número de semanas del horizonte
+    
+    Returns:
+        Lista de semanas en formato "YYYY-SWW"
+    """
+    hoy = datetime.now()
+    resultado = []
+    for i in range(semanas):
+        año, semana, _ = (hoy + timedelta(weeks=i)).isocalendar()
+        resultado.append(f"{año}-S{semana:02d}")
+    return resultado
+
+def obtener_pronostico_futuro(
+    db: Session,
+    semanas: int = 6,
+    demanda_conocida: Optional[Dict[int, Dict[str, int]]] = None
+) -> Dict[str, Dict]:
     """
     Obtiene el pronóstico para las próximas semanas.
     
     Args:
         db: Sesión de base de datos
         semanas: Número de semanas a pronosticar
+        demanda_conocida: Demanda ya fijada por SKU y semana (opcional, por
+            ejemplo la de las semanas congeladas). Esas semanas no se
+            pronostican: solo se entrena y pronostica lo pendiente.
     
     Returns:
         Diccionario con pronósticos por SKU y semana
@@ -194,43 +244,51 @@ def obtener_pronostico_futuro(db: Session, semanas: int = 6) -> Dict[str, Dict]:
         return {}
     
     # Generar semanas futuras
-    semanas_futuras = []
-    hoy = datetime.now()
-    año_actual, semana_actual, _ = hoy.isocalendar()
-    
-    for i in range(semanas):
-        fecha = hoy + timedelta(weeks=i)
-        año, semana, _ = fecha.isocalendar()
-        semanas_futuras.append(f"{año}-S{semana:02d}")
+    horizonte = semanas_futuras(semanas)
+    
+    # Semanas pendientes de pronóstico de cada SKU
+    semanas_por_sku = None
+    if demanda_conocida is not None:
+        semanas_por_sku = {
+            sku.id: [s for s in horizonte if s not in demanda_conocida.get(sku.id, {})]
+            for sku in skus
+        }
     
     # Obtener pronósticos
     try:
         # Intentar cargar pronósticos desde la base de datos o archivo
         # En una implementación real, esto podría almacenarse en una tabla
         # Por ahora, generamos nuevos pronósticos
-        pronosticos = entrenar_y_pronosticar(db)
+        # Pronosticar al menos el horizonte pedido
+        pronosticos = entrenar_y_pronosticar(db, max(26, semanas + 1), semanas_por_sku)
     except Exception as e:
         print(f"Error al obtener pronósticos: {e}")
         pronosticos = {}
     
     # Filtrar solo las semanas futuras
+    en_horizonte = set(horizonte)
     resultado = {}
-    for sku_id, datos in pronosticos.items():
-        semanas_sku = datos["semanas"]
-        demanda_sku = datos["demanda"]
+    for sku in skus:
+        datos = pronosticos.get(sku.id, {"semanas": [], "demanda": {}, "demanda_min": {}, "demanda_max": {}})
+        conocida = {
+            s: valor for s, valor in (demanda_conocida or {}).get(sku.id, {}).items()
+            if s in en_horizonte
+        }
         
-        # Filtrar semanas futuras
-        semanas_filtradas = [s for s in semanas_sku if s in semanas_futuras]
+        # Filtrar semanas futuras; la demanda conocida no tiene intervalo
+        semanas_filtradas = sorted(set(s for s in datos["semanas"] if s in en_horizonte) | set(conocida))
+        demanda_sku = {**datos["demanda"], **conocida}
+        demanda_min_sku = {**datos["demanda_min"], **conocida}
+        demanda_max_sku = {**datos["demanda_max"], **conocida}
         
         if semanas_filtradas:
-            # Obtener información del SKU
-            sku = db.get(SKU, sku_id)
-            
-            resultado[sku_id] = {
-                "nombre": sku.nombre if sku else f"SKU {sku_id}",
-                "presentacion_g": sku.presentacion_g if sku else 0,
+            resultado[sku.id] = {
+                "nombre": sku.nombre,
+                "presentacion_g": sku.presentacion_g,
                 "semanas": semanas_filtradas,
-                "demanda": {s: demanda_sku[s] for s in semanas_filtradas if s in demanda_sku}
+                "demanda": {s: demanda_sku[s] for s in semanas_filtradas if s in demanda_sku},
+                "demanda_min": {s: demanda_min_sku[s] for s in semanas_filtradas if s in demanda_min_sku},
+                "demanda_max": {s: demanda_max_sku[s] for s in semanas_filtradas if s in demanda_max_sku}
             }
     
     return resultado
@@ -0,0 +1,228 @@
+import numpy as np
+from sqlmodel import Session
+from typing import Dict, List, Any, Optional, Tuple
+from app.services.parametros import obtener_parametro
+from app.crud.snapshots import get_ultimo_snapshot
+from app.services.mps import (
+    cargar_datos_mps,
+    calcular_plan,
+    nivelar_plan,
+    completar_plan,
+    calcular_inventarios,
+    calcular_kg_por_unidad,
+    FORMATEADORES_MPS,
+    formatear_mps_vacio,
+    recortar_datos
+)
+from app.services.nivelacion import nivelar_produccion
+from app.services.snapshots import deserializar_plan
+from app.services.pronostico import semanas_futuras
+
+def contar_semanas_congeladas(
+    semanas: List[str],
+    semanas_congeladas: List[str],
+    fence: int
+) -> Tuple[int, int]:
+    """
+    Cuenta las semanas iniciales del horizonte que el plan congelado cubre.
+
+    Args:
+        semanas: Semanas del horizonte actual
+        semanas_congeladas: Semanas del plan congelado
+        fence: Time fence en semanas
+
+    Returns:
+        Tupla (número de semanas congeladas, columna del plan congelado que
+        corresponde a la primera semana del horizonte)
+    """
+    if not semanas or semanas[0] not in semanas_congeladas:
+        return 0, 0
+
+    inicio = semanas_congeladas.index(semanas[0])
+    k = 0
+    while (
+        k < min(fence, len(semanas))
+        and inicio + k < len(semanas_congeladas)
+        and semanas_congeladas[inicio + k] == semanas[k]
+    ):
+        k += 1
+
+    return k, inicio
+
+def calcular_plan_con_time_fences(
+    datos: Dict[str, Any],
+    congelado: Dict[str, Any],
+    fence_demanda: int,
+    fence_planificacion: int,
+    nivelar: bool = False
+) -> Tuple[Dict[str, Any], Dict[str, np.ndarray], int]:
+    """
+    Recalcula el MPS respetando las time fences del último plan publicado.
+
+    Dentro de la time fence de planificación la producción y el stock de
+    seguridad se toman del plan congelado; dentro de la de demanda también
+    la demanda, de modo que un cambio del pronóstico no altera las semanas
+    comprometidas. Solo la zona líquida (semanas posteriores) se recalcula,
+    partiendo del inventario proyectado al final de la zona congelada. Los
+    SKUs que no están en el plan congelado se planifican completos.
+
+    Args:
+        datos: Datos de entrada del MPS
+        congelado: Plan congelado (deserializado de un snapshot)
+        fence_demanda: Time fence de demanda en semanas
+        fence_planificacion: Time fence de planificación en semanas
+        nivelar: Si es True, nivela la producción de la zona líquida
+
+    Returns:
+        Tupla (datos con la demanda congelada, plan, semanas congeladas)
+    """
+    k, inicio = contar_semanas_congeladas(datos["semanas"], congelado["semanas"], fence_planificacion)
+
+    fila_congelada = {sku_id: f for f, sku_id in enumerate(congelado["sku_ids"])}
+    en_congelado = np.array([sku_id in fila_congelada for sku_id in datos["sku_ids"]], dtype=bool)
+    filas = np.flatnonzero(en_congelado)
+    nuevas = np.flatnonzero(~en_congelado)
+    filas_congeladas = np.array([fila_congelada[datos["sku_ids"][i]] for i in filas], dtype=np.int64)
+
+    # Demanda congelada dentro de la time fence de demanda
+    k_demanda = min(max(0, fence_demanda), k)
+    demanda = datos["demanda"].copy()
+    demanda[filas, :k_demanda] = congelado["demanda"][filas_congeladas, inicio:inicio + k_demanda]
+    datos = {**datos, "demanda": demanda}
+
+    produccion = np.zeros_like(demanda)
+    stock_seguridad = np.zeros_like(demanda)
+
+    # Zona congelada: producción y stock de seguridad del plan publicado
+    produccion[filas, :k] = congelado["produccion"][filas_congeladas, inicio:inicio + k]
+    stock_seguridad[filas, :k] = congelado["stock_seguridad"][filas_congeladas, inicio:inicio + k]
+
+    # Zona líquida de los SKUs congelados, desde el inventario al final de la zona congelada
+    if len(filas) and k < demanda.shape[1]:
+        datos_liquidos = recortar_datos(datos, filas, slice(k, None))
+        if k > 0:
+            _, inventario_final = calcular_inventarios(recortar_datos(datos, filas, slice(0, k)), produccion[filas, :k])
+            datos_liquidos["inventario_inicial"] = inventario_final[:, -1]
+
+        plan_liquido = calcular_plan(datos_liquidos)
+        produccion[filas, k:] = plan_liquido["produccion"]
+        stock_seguridad[filas, k:] = plan_liquido["stock_seguridad"]
+
+    # SKUs nuevos: todo el horizonte es líquido
+    if len(nuevas):
+        plan_nuevos = calcular_plan(recortar_datos(datos, nuevas))
+        produccion[nuevas] = plan_nuevos["produccion"]
+        stock_seguridad[nuevas] = plan_nuevos["stock_seguridad"]
+
+    if nivelar and k < demanda.shape[1]:
+        # Solo se mueve producción dentro de la zona líquida
+        produccion[:, k:] = nivelar_produccion(
+            produccion[:, k:],
+            calcular_kg_por_unidad(datos),
+            datos["capacidad_semanal"],
+            rendimiento=1 - datos["scrap"]
+        )
+
+    return datos, completar_plan(datos, produccion, stock_seguridad), k
+
+def calcular_mps_replanificado(
+    db: Session,
+    semanas: int = 6,
+    nivelar: bool = False,
+    escenario_id: Optional[int] = None
+) -> Tuple[Dict[str, Any], Dict[str, np.ndarray], int, Optional[int]]:
+    """
+    Calcula el MPS manteniendo las semanas congeladas del último snapshot.
+
+    La demanda de la time fence de demanda se lee del snapshot, así que
+    solo se pronostican las semanas posteriores (y los SKUs que no están
+    en el snapshot); un SKU con todo el horizonte congelado no se entrena.
+    Si no hay snapshots publicados el plan se calcula completo.
+
+    Args:
+        db: Sesión de base de datos
+        semanas: Número de semanas a planificar
+        nivelar: Si es True, nivela la producción de la zona líquida
+        escenario_id: Escenario guardado que se aplica sobre los datos
+
+    Returns:
+        Tupla (datos, plan, semanas congeladas, ID del snapshot usado)
+    """
+    fence_demanda = obtener_parametro("time_fence_demanda")
+    fence_planificacion = obtener_parametro("time_fence_planificacion")
+
+    snapshot = get_ultimo_snapshot(db) if fence_planificacion > 0 else None
+    congelado = deserializar_plan(snapshot.datos) if snapshot is not None else None
+
+    demanda_conocida = None
+    if congelado is not None:
+        horizonte = semanas_futuras(semanas)
+        k, inicio = contar_semanas_congeladas(horizonte, congelado["semanas"], fence_planificacion)
+        k_demanda = min(max(0, fence_demanda), k)
+        demanda_conocida = {
+            sku_id: dict(zip(horizonte[:k_demanda], congelado["demanda"][f, inicio:inicio + k_demanda].tolist()))
+            for f, sku_id in enumerate(congelado["sku_ids"])
+        }
+
+    datos = cargar_datos_mps(db, semanas, demanda_conocida)
+
+    if escenario_id is not None:
+        # Importación local: el servicio de escenarios depende del MPS
+        from app.services.escenarios import aplicar_escenario
+        datos, overrides = aplicar_escenario(db, datos, escenario_id)
+        nivelar = overrides.get("nivelar", nivelar)
+
+    if congelado is not None:
+        datos, plan, k = calcular_plan_con_time_fences(
+            datos,
+            congelado,
+            fence_demanda,
+            fence_planificacion,
+            nivelar
+        )
+        return datos, plan, k, snapshot.id
+
+    plan = calcular_plan(datos)
+    if nivelar:
+        plan = nivelar_plan(datos, plan)
+
+    return datos, plan, 0, None
+
+def generar_mps_replanificado(
+    db: Session,
+    semanas: int = 6,
+    nivelar: bool = False,
+    formato: str = "json",
+    escenario_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Genera el MPS respetando las time fences del último snapshot.
+
+    Args:
+        db: Sesión de base de datos
+        semanas: Número de semanas a planificar
+        nivelar: Si es True, nivela la producción de la zona líquida
+        formato: "json" (un diccionario por SKU) o "columnar"
+        escenario_id: Escenario guardado que se aplica sobre los datos
+
+    Returns:
+        Diccionario con el MPS, las semanas congeladas y el snapshot usado
+    """
+    if formato not in FORMATEADORES_MPS:
+        raise ValueError(f"Formato de MPS no válido: {formato}")
+
+    datos, plan, k, snapshot_id = calcular_mps_replanificado(db, semanas, nivelar, escenario_id)
+
+    if not datos["sku_ids"] and formato == "json":
+        return {**formatear_mps_vacio(datos), "semanas_congeladas": [], "snapshot_id": snapshot_id}
+
+    resultado = {
+        **FORMATEADORES_MPS[formato](datos, plan),
+        "semanas_congeladas": datos["semanas"][:k],
+        "snapshot_id": snapshot_id
+    }
+
+    if escenario_id is not None:
+        return {**resultado, "escenario_id": escenario_id}
+
+    return resultado
@@ -0,0 +1,135 @@
+import numpy as np
+from sqlmodel import Session
+from typing import Dict, Any, Optional
+from app.services.mps import cargar_datos_mps, calcular_plan, nivelar_plan
+
+# Valor z del intervalo de pronóstico: Prophet usa un intervalo del 80 %
+# por defecto (interval_width=0.8) y el modelo simple usa ±20 %, que se
+# trata como el mismo intervalo
+Z_INTERVALO_PRONOSTICO = 1.2816
+
+# Número máximo de muestras que se simulan a la vez, para acotar memoria
+MUESTRAS_POR_BLOQUE = 1000
+
+# Número máximo de muestras por simulación
+MAX_MUESTRAS = 50000
+
+def simular_quiebres(
+    datos: Dict[str, Any],
+    plan: Dict[str, np.ndarray],
+    muestras: int = 5000,
+    semilla: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Simula trayectorias de demanda y estima los quiebres de stock del plan.
+
+    La demanda de cada SKU y semana se muestrea de una normal centrada en
+    el pronóstico, con desviación derivada del intervalo de pronóstico, y
+    se trunca en cero. La producción del plan queda fija y cada trayectoria
+    recorre la recurrencia de inventario como una suma acumulada sobre el
+    arreglo muestras × SKU × semana. La demanda no atendida queda pendiente
+    (backorder) para las semanas siguientes; el faltante de cada semana es
+    lo que crece el pendiente en esa semana, así que cada unidad faltante
+    se cuenta una sola vez.
+
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+        muestras: Número de trayectorias de demanda
+        semilla: Semilla del generador aleatorio (opcional)
+
+    Returns:
+        Diccionario con matrices SKU × semana de probabilidad de quiebre,
+        faltante esperado e inventario final esperado
+    """
+    rng = np.random.default_rng(semilla)
+
+    media = datos["demanda"].astype(np.float64)
+    desviacion = np.maximum(0, datos["demanda_max"] - datos["demanda_min"]) / (2 * Z_INTERVALO_PRONOSTICO)
+
+    rendimiento = 1 - datos["scrap"][:, None]
+    entradas = np.floor(plan["produccion"] * rendimiento)
+    inventario_inicial = datos["inventario_inicial"][:, None].astype(np.float64)
+
+    quiebres = np.zeros_like(media)
+    faltante = np.zeros_like(media)
+    inventario = np.zeros_like(media)
+
+    restantes = muestras
+    while restantes > 0:
+        bloque = min(restantes, MUESTRAS_POR_BLOQUE)
+
+        # Demanda muestreada: muestras × SKU × semana
+        demanda = np.round(np.maximum(0, rng.normal(media, desviacion, size=(bloque,) + media.shape)))
+
+        # Recurrencia de inventario para todas las trayectorias a la vez
+        inventario_final = inventario_inicial + np.cumsum(entradas - demanda, axis=2)
+
+        # Faltante nuevo de cada semana: aumento del pendiente acumulado
+        pendiente = np.maximum(0, -inventario_final)
+        faltante_semana = np.maximum(0, np.diff(pendiente, axis=2, prepend=0))
+
+        quiebres += (inventario_final < 0).sum(axis=0)
+        faltante += faltante_semana.sum(axis=0)
+        inventario += inventario_final.sum(axis=0)
+
+        restantes -= bloque
+
+    return {
+        "probabilidad_quiebre": quiebres / muestras,
+        "faltante_esperado": faltante / muestras,
+        "inventario_final_esperado": inventario / muestras
+    }
+
+def generar_simulacion_mps(
+    db: Session,
+    semanas: int = 6,
+    muestras: int = 5000,
+    semilla: Optional[int] = None,
+    nivelar: bool = False
+) -> Dict[str, Any]:
+    """
+    Genera la simulación de Monte Carlo de quiebres de stock del MPS.
+
+    Args:
+        db: Sesión de base de datos
+        semanas: Número de semanas a planificar
+        muestras: Número de trayectorias de demanda
+        semilla: Semilla del generador aleatorio (opcional)
+        nivelar: Si es True, simula el plan nivelado por capacidad
+
+    Returns:
+        Diccionario con la probabilidad de quiebre y el faltante esperado
+        por SKU y semana
+    """
+    if not 0 < muestras <= MAX_MUESTRAS:
+        raise ValueError(f"El número de muestras debe estar entre 1 y {MAX_MUESTRAS}")
+
+    datos = cargar_datos_mps(db, semanas)
+    semanas_ordenadas = datos["semanas"]
+
+    if not datos["sku_ids"]:
+        return {"semanas": semanas_ordenadas, "muestras": muestras, "data": []}
+
+    plan = calcular_plan(datos)
+    if nivelar:
+        plan = nivelar_plan(datos, plan)
+
+    resultado = simular_quiebres(datos, plan, muestras, semilla)
+
+    data = []
+    for i, sku_id in enumerate(datos["sku_ids"]):
+        data.append({
+            "sku_id": sku_id,
+            "nombre": datos["nombres"][i],
+            "presentacion_g": int(datos["presentacion_g"][i]),
+            "probabilidad_quiebre": dict(zip(semanas_ordenadas, resultado["probabilidad_quiebre"][i].tolist())),
+            "faltante_esperado": dict(zip(semanas_ordenadas, resultado["faltante_esperado"][i].tolist())),
+            "inventario_final_esperado": dict(zip(semanas_ordenadas, resultado["inventario_final_esperado"][i].tolist()))
+        })
+
+    return {
+        "semanas": semanas_ordenadas,
+        "muestras": muestras,
+        "data": data
+    }
@@ -0,0 +1,196 @@
+import io
+import numpy as np
+from sqlmodel import Session
+from typing import Dict, List, Any, Optional
+from app.crud.snapshots import create_snapshot, get_snapshot
+from app.models.mps_snapshot import MPSSnapshot
+from app.services.mps import cargar_datos_mps, calcular_plan, nivelar_plan
+
+# Métricas del plan que se guardan en cada snapshot
+METRICAS_SNAPSHOT = [
+    "demanda",
+    "inventario_inicial",
+    "stock_seguridad",
+    "produccion",
+    "inventario_final"
+]
+
+def serializar_plan(datos: Dict[str, Any], plan: Dict[str, np.ndarray]) -> bytes:
+    """
+    Serializa un plan como arreglos columnares comprimidos.
+    
+    Args:
+        datos: Datos de entrada del MPS
+        plan: Plan calculado
+    
+    Returns:
+        Plan comprimido en formato npz
+    """
+    arreglos = {
+        "semanas": np.array(datos["semanas"], dtype=str),
+        "sku_ids": np.array(datos["sku_ids"], dtype=np.int64),
+        "scrap": datos["scrap"].astype(np.float32),
+        "capacidad_semanal": np.array(datos["capacidad_semanal"])
+    }
+    
+    for metrica in METRICAS_SNAPSHOT:
+        # La demanda es dato de entrada; el resto sale del plan
+        valores = datos["demanda"] if metrica == "demanda" else plan[metrica]
+        arreglos[metrica] = valores.astype(np.int32)
+    
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arreglos)
+    return buffer.getvalue()
+
+def deserializar_plan(contenido: bytes) -> Dict[str, Any]:
+    """
+    Recupera los arreglos de un plan serializado.
+    
+    Args:
+        contenido: Plan comprimido en formato npz
+    
+    Returns:
+        Diccionario con los arreglos del plan
+    """
+    with np.load(io.BytesIO(contenido), allow_pickle=False) as npz:
+        plan = {clave: npz[clave] for clave in npz.files}
+    
+    plan["semanas"] = plan["semanas"].tolist()
+    plan["sku_ids"] = plan["sku_ids"].tolist()
+    plan["capacidad_semanal"] = float(plan["capacidad_semanal"])
+    return plan
+
+def publicar_snapshot(
+    db: Session,
+    semanas: int = 6,
+    nivelar: bool = False,
+    descripcion: Optional[str] = None,
+    respetar_fences: bool = False
+) -> MPSSnapshot:
+    """
+    Calcula el MPS actual, lo guarda como snapshot y precalcula su ATP.
+    
+    Args:
+        db: Sesión de base de datos
+        semanas: Número de semanas a planificar
+        nivelar: Si es True, guarda el plan nivelado por capacidad
+        descripcion: Descripción del snapshot (opcional)
+        respetar_fences: Si es True, mantiene las semanas congeladas del
+            último snapshot
+    
+    Returns:
+        Snapshot creado
+    """
+    if respetar_fences:
+        # Importación local: la replanificación lee los snapshots de este módulo
+        from app.services.replanificacion import calcular_mps_replanificado
+        datos, plan, _, _ = calcular_mps_replanificado(db, semanas, nivelar)
+    else:
+        datos = cargar_datos_mps(db, semanas)
+        plan = calcular_plan(datos)
+        if nivelar:
+            plan = nivelar_plan(datos, plan)
+    
+    snapshot = create_snapshot(
+        db,
+        serializar_plan(datos, plan),
+        len(datos["sku_ids"]),
+        len(datos["semanas"]),
+        descripcion
+    )
+    
+    # Si la semana en curso aún no tiene plan congelado, se congela con
+    # este snapshot. Importación local: la adherencia lee los snapshots
+    from app.services.adherencia import congelar_plan_semana_actual
+    congelar_plan_semana_actual(db)
+    
+    # Precalcular el ATP del plan publicado. Importación local: el ATP lee
+    # los snapshots de este módulo
+    from app.services.atp import obtener_atp
+    obtener_atp(db)
+    
+    return snapshot
+
+def _alinear(plan: Dict[str, Any], sku_ids: List[int], semanas: List[str], metrica: str) -> np.ndarray:
+    """
+    Ubica una métrica del plan en la grilla común de SKUs y semanas.
+    
+    Devuelve dos capas: la máscara de celdas presentes en el plan y los
+    valores de la métrica (cero donde el plan no tiene la celda).
+    """
+    filas = np.searchsorted(sku_ids, plan["sku_ids"])
+    columnas = np.searchsorted(semanas, plan["semanas"])
+    
+    valores = np.zeros((2, len(sku_ids), len(semanas)), dtype=np.int64)
+    valores[0, filas[:, None], columnas[None, :]] = 1
+    valores[1, filas[:, None], columnas[None, :]] = plan[metrica]
+    return valores
+
+def comparar_snapshots(plan_a: Dict[str, Any], plan_b: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compara dos planes celda a celda.
+    
+    Ambos planes se alinean sobre la unión de sus SKUs y semanas, y cada
+    métrica se compara con una sola operación sobre la grilla.
+    
+    Args:
+        plan_a: Plan anterior
+        plan_b: Plan posterior
+    
+    Returns:
+        Diccionario con el resumen y la lista de celdas que cambiaron
+    """
+    sku_ids = np.union1d(plan_a["sku_ids"], plan_b["sku_ids"]).astype(np.int64)
+    semanas = np.union1d(plan_a["semanas"], plan_b["semanas"])
+    
+    cambios = []
+    resumen = {}
+    
+    for metrica in METRICAS_SNAPSHOT:
+        presente_a, valores_a = _alinear(plan_a, sku_ids, semanas, metrica)
+        presente_b, valores_b = _alinear(plan_b, sku_ids, semanas, metrica)
+        
+        distinto = (presente_a != presente_b) | (valores_a != valores_b)
+        filas, columnas = np.nonzero(distinto)
+        resumen[metrica] = len(filas)
+        
+        for i, j in zip(filas.tolist(), columnas.tolist()):
+            cambios.append({
+                "sku_id": int(sku_ids[i]),
+                "semana": str(semanas[j]),
+                "metrica": metrica,
+                "antes": int(valores_a[i, j]) if presente_a[i, j] else None,
+                "despues": int(valores_b[i, j]) if presente_b[i, j] else None
+            })
+    
+    return {
+        "semanas": semanas.tolist(),
+        "sku_ids": sku_ids.tolist(),
+        "resumen": resumen,
+        "cambios": cambios
+    }
+
+def diferencias_snapshots(db: Session, snapshot_a: int, snapshot_b: int) -> Optional[Dict[str, Any]]:
+    """
+    Calcula las diferencias entre dos snapshots del MPS.
+    
+    Args:
+        db: Sesión de base de datos
+        snapshot_a: ID del snapshot anterior
+        snapshot_b: ID del snapshot posterior
+    
+    Returns:
+        Diccionario con las diferencias o None si algún snapshot no existe
+    """
+    db_a = get_snapshot(db, snapshot_a)
+    db_b = get_snapshot(db, snapshot_b)
+    if db_a is None or db_b is None:
+        return None
+    
+    diferencias = comparar_snapshots(deserializar_plan(db_a.datos), deserializar_plan(db_b.datos))
+    
+    return {
+        "snapshot_a": snapshot_a,
+        "snapshot_b": snapshot_b,
+        **diferencias
+    }
@@ -0,0 +1,47 @@
+import asyncio
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+from app.db.session import engine
+from app.services.kpis import materializar_kpis_diarios
+from app.services.adherencia import congelar_plan_semana_actual
+from app.services.inventario import consolidar_saldos_inventario
+from app.services.parametros import sincronizar_parametros
+from app.crud.estadisticas import refrescar_estadisticas_vencidas
+
+# Segundos entre ejecuciones de las tareas periódicas
+INTERVALO_TAREAS = 60
+
+# Tareas que se ejecutan en segundo plano, cada una con su propia sesión:
+# sincronizar el caché de parámetros con los cambios de otros procesos,
+# materializar los KPIs de los días cerrados (y los recálculos pendientes),
+# congelar el plan de la semana al empezar la semana, consolidar los
+# saldos semanales del libro de inventario y avanzar la ventana de las
+# estadísticas de demanda al cambiar de semana
+TAREAS_PERIODICAS = [
+    sincronizar_parametros,
+    materializar_kpis_diarios,
+    congelar_plan_semana_actual,
+    consolidar_saldos_inventario,
+    refrescar_estadisticas_vencidas
+]
+
+def _ejecutar_tareas() -> None:
+    """
+    Ejecuta las tareas periódicas una vez. El error de una tarea no impide
+    ejecutar las demás; se reintenta en la siguiente vuelta.
+    """
+    for tarea in TAREAS_PERIODICAS:
+        with Session(engine) as db:
+            try:
+                tarea(db)
+            except Exception as e:
+                print(f"Error en la tarea periódica {tarea.__name__}: {e}")
+
+async def ejecutar_tareas_periodicas() -> None:
+    """
+    Ejecuta las tareas periódicas cada ``INTERVALO_TAREAS`` segundos,
+    fuera de las peticiones, mientras la aplicación está activa.
+    """
+    while True:
+        await asyncio.sleep(INTERVALO_TAREAS)
+        await run_in_threadpool(_ejecutar_tareas)
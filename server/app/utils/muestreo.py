@@ -0,0 +1,52 @@
+import numpy as np
+
+def lttb(x: np.ndarray, y: np.ndarray, n_puntos: int) -> np.ndarray:
+    """
+    Reduce una serie con Largest-Triangle-Three-Buckets (LTTB).
+
+    Conserva el primer y el último punto y, de cada tramo intermedio, el
+    punto que forma el triángulo de mayor área con el punto elegido en el
+    tramo anterior y el promedio del tramo siguiente. Así se mantienen los
+    picos y valles que definen la forma de la serie.
+
+    Args:
+        x: Coordenadas x de la serie, crecientes
+        y: Valores de la serie
+        n_puntos: Número de puntos a conservar
+
+    Returns:
+        Índices de los puntos conservados, en orden
+    """
+    n = len(x)
+    if n_puntos >= n or n_puntos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Límites de los tramos intermedios (el primer y el último punto van solos)
+    limites = np.floor(np.linspace(1, n - 1, n_puntos - 1)).astype(np.int64)
+
+    indices = np.empty(n_puntos, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for k in range(n_puntos - 2):
+        inicio, fin = limites[k], limites[k + 1]
+
+        # Promedio del tramo siguiente (o el último punto)
+        if k + 2 < len(limites):
+            siguiente = slice(limites[k + 1], limites[k + 2])
+            x_siguiente, y_siguiente = x[siguiente].mean(), y[siguiente].mean()
+        else:
+            x_siguiente, y_siguiente = x[n - 1], y[n - 1]
+
+        areas = np.abs(
+            (x[a] - x_siguiente) * (y[inicio:fin] - y[a])
+            - (x[a] - x[inicio:fin]) * (y_siguiente - y[a])
+        )
+        a = inicio + int(np.argmax(areas))
+        indices[k + 1] = a
+
+    return indices
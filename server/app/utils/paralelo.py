@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional
+from app.core.config import settings
+
+# Pool de procesos compartido, se crea al primer uso
+_executor: Optional[ProcessPoolExecutor] = None
+
+def numero_workers() -> int:
+    """
+    Obtiene el número de procesos para cálculos en paralelo.
+    
+    Returns:
+        Número de procesos
+    """
+    return settings.MPS_WORKERS if settings.MPS_WORKERS > 0 else (os.cpu_count() or 1)
+
+def obtener_executor() -> ProcessPoolExecutor:
+    """
+    Obtiene el pool de procesos compartido.
+    
+    Returns:
+        Pool de procesos
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=numero_workers())
+    return _executor
+
+def mapear_en_paralelo(funcion: Callable[[Any], Any], tareas: Iterable[Any]) -> List[Any]:
+    """
+    Aplica una función a cada tarea en procesos separados.
+    
+    La función debe estar definida a nivel de módulo para poder enviarse a
+    los procesos. Con una sola tarea o un solo proceso se ejecuta en serie.
+    
+    Args:
+        funcion: Función a aplicar
+        tareas: Argumentos de cada tarea
+    
+    Returns:
+        Resultados en el mismo orden que las tareas
+    """
+    tareas = list(tareas)
+    workers = numero_workers()
+    
+    if len(tareas) <= 1 or workers <= 1:
+        return [funcion(tarea) for tarea in tareas]
+    
+    # Agrupar tareas para reducir la comunicación entre procesos
+    chunksize = max(1, -(-len(tareas) // workers))
+    return list(obtener_executor().map(funcion, tareas, chunksize=chunksize))
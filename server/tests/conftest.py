@@ -0,0 +1,40 @@
+import importlib
+import pkgutil
+import pytest
+from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy.pool import StaticPool
+import app.models
+from app.db.version import inicializar_version_datos
+from app.crud.parametros import inicializar_parametros
+from app.models.sku import SKU
+
+# Registrar todas las tablas en los metadatos de SQLModel
+for modulo in pkgutil.iter_modules(app.models.__path__):
+    importlib.import_module(f"app.models.{modulo.name}")
+
+@pytest.fixture
+def db():
+    """
+    Sesión sobre una base SQLite en memoria con las tablas creadas y los
+    parámetros por defecto.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        inicializar_version_datos(session)
+        inicializar_parametros(session)
+        yield session
+
+    engine.dispose()
+
+@pytest.fixture
+def sku(db):
+    """
+    SKU de 250 g.
+    """
+    db_sku = SKU(nombre="Café de prueba", presentacion_g=250)
+    db.add(db_sku)
+    db.commit()
+    db.refresh(db_sku)
+    return db_sku
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from app.crud.pedidos import create_pedido, delete_pedido
+from app.crud.snapshots import create_snapshot
+from app.crud.ventas import create_venta
+from app.models.pedido import PedidoCreate
+from app.models.venta import VentaCreate
+from app.services import atp
+from app.services.snapshots import serializar_plan
+from app.utils.iso_weeks import semana_iso_a_fecha
+
+SEMANAS = ["2026-S44", "2026-S45"]
+
+@pytest.fixture
+def plan_publicado(db, sku, monkeypatch):
+    """
+    Plan publicado de 30 unidades por semana del SKU, sin inventario
+    inicial ni scrap.
+    """
+    monkeypatch.setattr(atp, "_cache_plan", None)
+    monkeypatch.setattr(atp, "_cache_atp", None)
+
+    datos = {
+        "semanas": SEMANAS,
+        "sku_ids": [sku.id],
+        "scrap": np.zeros(1),
+        "capacidad_semanal": 1000.0,
+        "demanda": np.zeros((1, 2))
+    }
+    plan = {
+        "inventario_inicial": np.zeros((1, 2)),
+        "stock_seguridad": np.zeros((1, 2)),
+        "produccion": np.array([[30, 30]]),
+        "inventario_final": np.zeros((1, 2))
+    }
+    create_snapshot(db, serializar_plan(datos, plan), 1, 2)
+
+def atp_semana(db, sku_id, semana, cantidad=1):
+    return atp.consultar_atp(db, [{"sku_id": sku_id, "semana": semana, "cantidad": cantidad}])[0]["atp"]
+
+def pedir(db, sku_id, cantidad):
+    return create_pedido(db, PedidoCreate(sku_id=sku_id, año_iso=2026, semana_iso=44, cantidad=cantidad))
+
+def test_atp_descuenta_pedidos(db, sku, plan_publicado):
+    assert atp_semana(db, sku.id, "2026-S44") == 30
+    pedir(db, sku.id, 5)
+    assert atp_semana(db, sku.id, "2026-S44") == 25
+    assert atp_semana(db, sku.id, "2026-S45") == 55
+
+def test_atp_tras_eliminar_y_crear_pedido(db, sku, plan_publicado):
+    pedir(db, sku.id, 5)
+    segundo = pedir(db, sku.id, 7)
+    assert atp_semana(db, sku.id, "2026-S44") == 18
+
+    # El nuevo pedido puede reutilizar el ID del eliminado: el número de
+    # pedidos y el mayor ID no cambian, pero el ATP sí
+    delete_pedido(db, segundo.id)
+    tercero = pedir(db, sku.id, 20)
+    assert tercero.id == segundo.id
+    assert atp_semana(db, sku.id, "2026-S44") == 5
+
+def test_atp_descuenta_ventas_del_horizonte(db, sku, plan_publicado):
+    pedir(db, sku.id, 5)
+    assert atp_semana(db, sku.id, "2026-S44") == 25
+
+    create_venta(db, VentaCreate(sku_id=sku.id, fecha=semana_iso_a_fecha(2026, 44), unidades=10))
+    assert atp_semana(db, sku.id, "2026-S44") == 15
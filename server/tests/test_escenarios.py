@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from app.services.escenarios import demanda_no_atendida, evaluar_escenarios, resumir_escenario
+
+def datos_escenario(capacidad_semanal):
+    return {
+        "demanda": np.array([[100, 100, 100], [50, 50, 50]]),
+        "scrap": np.array([0.0, 0.0]),
+        "presentacion_g": np.array([1000, 500]),
+        "inventario_inicial": np.array([0, 0]),
+        "desviacion_demanda": np.array([np.nan, np.nan]),
+        "nivel_servicio": 0.95,
+        "lead_time_semanas": 1.0,
+        "capacidad_semanal": capacidad_semanal
+    }
+
+def test_sin_limite_de_capacidad_toda_la_demanda_se_atiende():
+    resumen = resumir_escenario((datos_escenario(1000.0), {}))
+
+    assert resumen["quiebres_proyectados"] == 0
+    assert resumen["demanda_no_atendida"] == 0
+
+def test_capacidad_insuficiente_deja_demanda_sin_atender():
+    holgado = resumir_escenario((datos_escenario(1000.0), {}))
+    ajustado = resumir_escenario((datos_escenario(80.0), {}))
+
+    assert ajustado["quiebres_proyectados"] > 0
+    assert ajustado["demanda_no_atendida"] > holgado["demanda_no_atendida"]
+
+def test_demanda_no_atendida_con_ventas_perdidas():
+    datos = datos_escenario(50.0)
+    plan = {
+        "produccion": np.array([[100, 0, 0], [0, 0, 0]]),
+        "kg_verde": np.array([[100.0, 0, 0], [0, 0, 0]])
+    }
+    datos["demanda"] = np.array([[20, 20, 20], [5, 0, 0]])
+
+    # La producción de la primera semana se recorta a la mitad: 50 unidades
+    # para 60 de demanda
+    np.testing.assert_array_equal(demanda_no_atendida(datos, plan), [[0, 0, 10], [5, 0, 0]])
+    plan["produccion"] = np.array([[40, 0, 0], [0, 0, 0]])
+    plan["kg_verde"] = np.array([[40.0, 0, 0], [0, 0, 0]])
+    np.testing.assert_array_equal(demanda_no_atendida(datos, plan), [[0, 0, 20], [5, 0, 0]])
+
+def test_escenario_que_no_es_objeto_se_rechaza(db):
+    with pytest.raises(ValueError, match="objeto"):
+        evaluar_escenarios(db, [{"nivelar": True}, ["capacidad_semanal", 10]])
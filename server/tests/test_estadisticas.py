@@ -0,0 +1,35 @@
+from datetime import date, datetime, timedelta
+import numpy as np
+import pytest
+from app.crud.estadisticas import actualizar_estadisticas_demanda, refrescar_estadisticas_vencidas
+from app.crud.ventas import create_venta
+from app.models.venta import VentaCreate
+
+def lunes_hace(semanas):
+    hoy = date.today()
+    return hoy - timedelta(days=hoy.weekday(), weeks=semanas)
+
+def test_semanas_sin_ventas_hasta_hoy_cuentan_como_cero(db, sku):
+    # 10 unidades por semana hace 9 a 6 semanas; ninguna desde entonces
+    for semanas in range(6, 10):
+        create_venta(db, VentaCreate(sku_id=sku.id, fecha=lunes_hace(semanas), unidades=10))
+
+    estadistica = actualizar_estadisticas_demanda(db, sku.id)
+    esperado = np.array([10] * 4 + [0] * 6)
+
+    assert estadistica.ventana_semanas == 10
+    assert estadistica.media == pytest.approx(esperado.mean())
+    assert estadistica.desviacion == pytest.approx(esperado.std(ddof=1))
+
+def test_refresco_semanal_de_estadisticas_vencidas(db, sku):
+    create_venta(db, VentaCreate(sku_id=sku.id, fecha=lunes_hace(3), unidades=12))
+    estadistica = actualizar_estadisticas_demanda(db, sku.id)
+    assert refrescar_estadisticas_vencidas(db) == 0
+
+    # Estadística calculada la semana pasada
+    estadistica.updated_at = datetime.now() - timedelta(weeks=1)
+    db.add(estadistica)
+    db.commit()
+
+    assert refrescar_estadisticas_vencidas(db) == 1
+    assert refrescar_estadisticas_vencidas(db) == 0
@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+from sqlalchemy import func
+from sqlmodel import select
+from app.crud.inventario import create_ajuste_inventario, get_saldos_inventario
+from app.crud.produccion import create_produccion
+from app.crud.ventas import create_venta, delete_venta
+from app.models.movimiento_inventario import AjusteInventarioCreate, MovimientoInventario
+from app.models.produccion import ProduccionCreate
+from app.models.venta import VentaCreate
+from app.services.inventario import consolidar_saldos_inventario
+
+def suma_movimientos(db, fecha):
+    """
+    Inventario por SKU sumando todos los movimientos anteriores a la fecha.
+    """
+    return dict(db.exec(
+        select(MovimientoInventario.sku_id, func.sum(MovimientoInventario.cantidad))
+        .where(MovimientoInventario.fecha < fecha)
+        .group_by(MovimientoInventario.sku_id)
+    ).all())
+
+def fechas_de_corte():
+    inicio = date(2026, 7, 20)
+    return [inicio + timedelta(days=dias) for dias in range(0, 50, 3)]
+
+def registrar_historia(db, sku_id):
+    for semana, unidades in [(30, 40), (31, 25), (33, 30)]:
+        create_produccion(db, ProduccionCreate(
+            sku_id=sku_id, año_iso=2026, semana_iso=semana, kg_verde=10, unidades_producidas=unidades
+        ))
+    for dia, unidades in [(2, 12), (6, 9), (10, 20), (17, 7), (24, 15)]:
+        create_venta(db, VentaCreate(sku_id=sku_id, fecha=date(2026, 7, 20) + timedelta(days=dia), unidades=unidades))
+    create_ajuste_inventario(db, AjusteInventarioCreate(sku_id=sku_id, fecha=date(2026, 7, 29), cantidad=-4))
+    create_ajuste_inventario(db, AjusteInventarioCreate(sku_id=sku_id, fecha=date(2026, 8, 12), cantidad=6))
+
+def test_saldo_igual_a_la_suma_de_movimientos(db, sku):
+    registrar_historia(db, sku.id)
+
+    for fecha in fechas_de_corte():
+        assert get_saldos_inventario(db, fecha) == suma_movimientos(db, fecha)
+
+def test_saldo_igual_tras_consolidar_y_corregir(db, sku):
+    registrar_historia(db, sku.id)
+
+    assert consolidar_saldos_inventario(db, hasta=date(2026, 9, 7)) > 0
+    for fecha in fechas_de_corte():
+        assert get_saldos_inventario(db, fecha) == suma_movimientos(db, fecha)
+
+    # Movimientos con fecha anterior a saldos ya consolidados
+    venta = create_venta(db, VentaCreate(sku_id=sku.id, fecha=date(2026, 7, 22), unidades=3))
+    create_ajuste_inventario(db, AjusteInventarioCreate(sku_id=sku.id, fecha=date(2026, 7, 23), cantidad=-2))
+    for fecha in fechas_de_corte():
+        assert get_saldos_inventario(db, fecha) == suma_movimientos(db, fecha)
+
+    delete_venta(db, venta.id)
+    for fecha in fechas_de_corte():
+        assert get_saldos_inventario(db, fecha) == suma_movimientos(db, fecha)
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+import pytest
+from sqlmodel import select
+from app.crud.produccion import create_produccion
+from app.crud.ventas import create_venta
+from app.models.kpi_diario import KpiDiario
+from app.models.plan_semanal import PlanSemanal
+from app.models.produccion import ProduccionCreate
+from app.models.sku import SKU
+from app.models.venta import VentaCreate
+from app.services.kpis import (
+    calcular_dias_inventario,
+    calcular_cumplimiento_plan,
+    calcular_otd,
+    calcular_rechazos,
+    materializar_kpis_diarios
+)
+
+INICIO = date(2026, 6, 29)
+HASTA = date(2026, 8, 30)
+
+def registrar_historia(db, sku_ids):
+    for semana, planificado in [(27, 40), (28, 30), (29, 50), (30, 20), (31, 35)]:
+        for sku_id in sku_ids:
+            db.add(PlanSemanal(año_iso=2026, semana_iso=semana, sku_id=sku_id, unidades_planificadas=planificado))
+    db.commit()
+
+    for sku_id, semana, unidades, scrap in [
+        (sku_ids[0], 27, 40, 0.04),
+        (sku_ids[0], 29, 45, None),
+        (sku_ids[0], 31, 30, 0.08),
+        (sku_ids[1], 28, 20, 0.02),
+        (sku_ids[1], 32, 25, 0.05)
+    ]:
+        create_produccion(db, ProduccionCreate(
+            sku_id=sku_id, año_iso=2026, semana_iso=semana, kg_verde=unidades / 4, unidades_producidas=unidades, scrap=scrap
+        ))
+
+    for dia in range(0, (HASTA - INICIO).days, 2):
+        fecha = INICIO + timedelta(days=dia)
+        create_venta(db, VentaCreate(sku_id=sku_ids[0], fecha=fecha, unidades=3 + dia % 5))
+        if dia % 3 == 0:
+            create_venta(db, VentaCreate(sku_id=sku_ids[1], fecha=fecha, unidades=2 + dia % 4))
+
+@pytest.fixture
+def historia(db, sku):
+    otro = SKU(nombre="Otro café", presentacion_g=500)
+    db.add(otro)
+    db.commit()
+    registrar_historia(db, [sku.id, otro.id])
+
+def test_kpis_materializados_iguales_al_calculo_directo(db, historia):
+    assert materializar_kpis_diarios(db, hasta=HASTA) == (HASTA - INICIO).days + 1
+
+    kpis = db.exec(select(KpiDiario).order_by(KpiDiario.fecha)).all()
+    assert kpis[0].fecha == INICIO and kpis[-1].fecha == HASTA
+
+    for kpi in kpis:
+        assert kpi.dias_inventario == pytest.approx(calcular_dias_inventario(db, kpi.fecha)), kpi.fecha
+        assert kpi.cumplimiento_plan == pytest.approx(calcular_cumplimiento_plan(db, kpi.fecha)), kpi.fecha
+        assert kpi.otd == pytest.approx(calcular_otd(db, kpi.fecha)), kpi.fecha
+        assert kpi.rechazos == pytest.approx(calcular_rechazos(db, kpi.fecha)), kpi.fecha
+
+def test_recalculo_tras_venta_con_fecha_pasada(db, sku, historia):
+    materializar_kpis_diarios(db, hasta=HASTA)
+
+    create_venta(db, VentaCreate(sku_id=sku.id, fecha=date(2026, 7, 15), unidades=30))
+    materializar_kpis_diarios(db, hasta=HASTA)
+
+    for kpi in db.exec(select(KpiDiario).where(KpiDiario.fecha >= date(2026, 7, 13))).all():
+        assert kpi.dias_inventario == pytest.approx(calcular_dias_inventario(db, kpi.fecha)), kpi.fecha
+        assert kpi.otd == pytest.approx(calcular_otd(db, kpi.fecha)), kpi.fecha
@@ -0,0 +1,70 @@
+from datetime import date
+from sqlalchemy import func
+from sqlmodel import select
+from app.crud.inventario import create_ajuste_inventario, get_saldos_inventario
+from app.crud.lotes import get_lotes, get_asignaciones_venta
+from app.crud.produccion import create_produccion
+from app.crud.ventas import create_venta, delete_venta
+from app.models.lote import Lote
+from app.models.movimiento_inventario import AjusteInventarioCreate
+from app.models.produccion import ProduccionCreate
+from app.models.venta import VentaCreate
+
+def producir(db, sku_id, semana, unidades):
+    return create_produccion(db, ProduccionCreate(
+        sku_id=sku_id, año_iso=2026, semana_iso=semana, kg_verde=10, unidades_producidas=unidades
+    ))
+
+def restantes(db, sku_id):
+    return [(lote.fecha_tueste, lote.restante) for lote in get_lotes(db, sku_id=sku_id)]
+
+def assert_lotes_cuadran_con_libro(db, sku_id):
+    restante = db.exec(select(func.sum(Lote.restante)).where(Lote.sku_id == sku_id)).one()
+    saldo = get_saldos_inventario(db, date(2100, 1, 1)).get(sku_id, 0)
+    assert restante == max(0, saldo)
+
+def test_venta_consume_primero_el_lote_mas_antiguo(db, sku):
+    producir(db, sku.id, 30, 30)
+    producir(db, sku.id, 31, 20)
+
+    venta = create_venta(db, VentaCreate(sku_id=sku.id, fecha=date(2026, 8, 5), unidades=40))
+
+    asignaciones = sorted((a.lote_id, a.cantidad) for a in get_asignaciones_venta(db, venta.id))
+    assert asignaciones == [(1, 30), (2, 10)]
+    assert restantes(db, sku.id) == [(date(2026, 7, 20), 0), (date(2026, 7, 27), 10)]
+    assert_lotes_cuadran_con_libro(db, sku.id)
+
+def test_lote_registrado_despues_con_tueste_anterior_se_consume_primero(db, sku):
+    producir(db, sku.id, 31, 20)
+    create_venta(db, VentaCreate(sku_id=sku.id, fecha=date(2026, 8, 5), unidades=15))
+
+    producir(db, sku.id, 30, 10)
+
+    assert restantes(db, sku.id) == [(date(2026, 7, 20), 0), (date(2026, 7, 27), 15)]
+    assert_lotes_cuadran_con_libro(db, sku.id)
+
+def test_ventas_se_despachan_en_orden_de_fecha(db, sku):
+    producir(db, sku.id, 30, 10)
+    producir(db, sku.id, 31, 10)
+    posterior = create_venta(db, VentaCreate(sku_id=sku.id, fecha=date(2026, 8, 6), unidades=8))
+    anterior = create_venta(db, VentaCreate(sku_id=sku.id, fecha=date(2026, 8, 4), unidades=8))
+
+    assert [(a.lote_id, a.cantidad) for a in get_asignaciones_venta(db, anterior.id)] == [(1, 8)]
+    assert sorted((a.lote_id, a.cantidad) for a in get_asignaciones_venta(db, posterior.id)) == [(1, 2), (2, 6)]
+
+    delete_venta(db, anterior.id)
+    assert [(a.lote_id, a.cantidad) for a in get_asignaciones_venta(db, posterior.id)] == [(1, 8)]
+    assert_lotes_cuadran_con_libro(db, sku.id)
+
+def test_ajustes_crean_y_consumen_lotes(db, sku):
+    producir(db, sku.id, 30, 30)
+    producir(db, sku.id, 31, 10)
+
+    create_ajuste_inventario(db, AjusteInventarioCreate(sku_id=sku.id, fecha=date(2026, 7, 28), cantidad=-8))
+    assert restantes(db, sku.id) == [(date(2026, 7, 20), 22), (date(2026, 7, 27), 10)]
+
+    create_ajuste_inventario(db, AjusteInventarioCreate(sku_id=sku.id, fecha=date(2026, 8, 3), cantidad=5))
+    create_venta(db, VentaCreate(sku_id=sku.id, fecha=date(2026, 8, 4), unidades=35))
+
+    assert restantes(db, sku.id) == [(date(2026, 7, 20), 0), (date(2026, 7, 27), 0), (date(2026, 8, 3), 2)]
+    assert_lotes_cuadran_con_libro(db, sku.id)
@@ -0,0 +1,13 @@
+from app.crud.reglas_alerta import inicializar_reglas_alerta, get_reglas_alerta
+from app.services.mps import generar_mps
+
+def test_mps_sin_skus_tiene_la_misma_forma(db):
+    inicializar_reglas_alerta(db)
+
+    resultado = generar_mps(db, 4)
+
+    assert set(resultado) == {"semanas", "capacidad_semanal", "carga_semanal", "catalogo_alertas", "data"}
+    assert resultado["data"] == []
+    assert [regla["codigo"] for regla in resultado["catalogo_alertas"]] == [
+        regla.codigo for regla in get_reglas_alerta(db, activo=True)
+    ]
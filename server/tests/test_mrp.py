@@ -0,0 +1,34 @@
+import numpy as np
+
+from app.services.mrp import explotar_requerimientos
+
+# Un SKU que usa 2 unidades del componente 0 y 1 del componente 1
+BOM = (np.array([0, 0]), np.array([0, 1]), np.array([2.0, 1.0]))
+PRODUCCION = np.array([[10, 20, 30, 40]])
+
+def test_liberacion_desplazada_por_lead_time():
+    resultado = explotar_requerimientos(PRODUCCION, BOM, np.array([1, 0]))
+
+    np.testing.assert_array_equal(resultado["requerimiento_bruto"], [[20, 40, 60, 80], [10, 20, 30, 40]])
+    np.testing.assert_array_equal(resultado["liberacion_ordenes"], [[40, 60, 80, 0], [10, 20, 30, 40]])
+    np.testing.assert_array_equal(resultado["atrasado"], [20, 0])
+
+def test_lead_time_mayor_que_el_horizonte_queda_atrasado():
+    resultado = explotar_requerimientos(PRODUCCION, BOM, np.array([10, 2]))
+
+    np.testing.assert_array_equal(resultado["liberacion_ordenes"], [[0, 0, 0, 0], [30, 40, 0, 0]])
+    np.testing.assert_array_equal(resultado["atrasado"], [200, 30])
+
+def test_lead_time_negativo_se_trata_como_cero():
+    resultado = explotar_requerimientos(PRODUCCION, BOM, np.array([-3, 0]))
+
+    np.testing.assert_array_equal(resultado["liberacion_ordenes"], resultado["requerimiento_bruto"])
+    np.testing.assert_array_equal(resultado["atrasado"], [0, 0])
+
+def test_conserva_el_total_requerido():
+    resultado = explotar_requerimientos(PRODUCCION, BOM, np.array([2, 1]))
+
+    np.testing.assert_allclose(
+        resultado["liberacion_ordenes"].sum(axis=1) + resultado["atrasado"],
+        resultado["requerimiento_bruto"].sum(axis=1)
+    )
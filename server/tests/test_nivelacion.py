@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from app.services.mps import calcular_plan, nivelar_plan
+from app.services.nivelacion import nivelar_produccion
+
+def datos_mps(semilla):
+    """
+    Datos de un MPS con demanda irregular y scrap en todos los SKUs, con
+    una capacidad que alcanza en el total acumulado pero no semana a semana.
+    """
+    rng = np.random.default_rng(semilla)
+    n_skus, n_semanas = 6, 10
+    demanda = rng.integers(20, 400, size=(n_skus, n_semanas))
+    demanda[:, rng.choice(np.arange(1, n_semanas), 3, replace=False)] *= 4
+
+    datos = {
+        "demanda": demanda,
+        "scrap": rng.uniform(0.02, 0.09, n_skus),
+        "presentacion_g": rng.choice([250, 500, 1000], n_skus),
+        "inventario_inicial": rng.integers(0, 200, n_skus),
+        "desviacion_demanda": rng.uniform(5, 40, n_skus),
+        "nivel_servicio": 0.95,
+        "lead_time_semanas": 1.0,
+        "capacidad_semanal": 0.0
+    }
+
+    carga = calcular_plan(datos)["kg_verde"].sum(axis=0)
+    datos["capacidad_semanal"] = float(np.max(np.cumsum(carga) / np.arange(1, n_semanas + 1)) * 1.1)
+    return datos
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_nivelar_plan_respeta_capacidad_y_stock_de_seguridad(semilla):
+    datos = datos_mps(semilla)
+    plan = calcular_plan(datos)
+    nivelado = nivelar_plan(datos, plan)
+
+    assert plan["kg_verde"].sum(axis=0).max() > datos["capacidad_semanal"]
+    assert np.all(nivelado["kg_verde"].sum(axis=0) <= datos["capacidad_semanal"] + 1e-6)
+
+    # Adelantar producción no puede bajar el inventario de ninguna semana
+    assert np.all(nivelado["inventario_final"] >= plan["inventario_final"])
+
+    cumplia = plan["inventario_final"] >= plan["stock_seguridad"]
+    assert np.all(nivelado["inventario_final"][cumplia] >= nivelado["stock_seguridad"][cumplia])
+
+def test_reparto_agrega_la_unidad_perdida_por_redondeo():
+    # Con 5 % de scrap, 20 unidades dan 19 de entrada; partirlas en 11 + 9
+    # daría 10 + 8, así que se agrega una unidad en la semana destino
+    produccion = np.array([[0, 20]])
+    nivelada = nivelar_produccion(produccion, np.array([1.0]), 11, kg_por_tanda=1, rendimiento=np.array([0.95]))
+
+    np.testing.assert_array_equal(nivelada, [[10, 11]])
+    assert np.floor(nivelada * 0.95).sum() == 19
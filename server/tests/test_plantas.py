@@ -0,0 +1,61 @@
+from datetime import date
+import numpy as np
+from app.crud.plantas import asignar_sku_planta
+from app.crud.produccion import create_produccion
+from app.crud.ventas import create_venta
+from app.models.asignacion_planta import AsignacionPlantaCreate
+from app.models.planta import Planta
+from app.models.produccion import ProduccionCreate
+from app.models.venta import VentaCreate
+from app.services.plantas import movimientos_desde_conteo, particionar_datos
+
+SEMANA_PLAN = "2026-S36"
+
+def datos_mps(sku_ids, inventario_inicial):
+    n = len(sku_ids)
+    return {
+        "sku_ids": sku_ids,
+        "nombres": [f"SKU {sku_id}" for sku_id in sku_ids],
+        "semanas": [SEMANA_PLAN],
+        "demanda": np.full((n, 1), 100),
+        "demanda_min": np.full((n, 1), 80),
+        "demanda_max": np.full((n, 1), 120),
+        "presentacion_g": np.full(n, 250),
+        "scrap": np.zeros(n),
+        "inventario_inicial": np.array(inventario_inicial),
+        "desviacion_demanda": np.full(n, 10.0)
+    }
+
+def test_inventario_contado_se_actualiza_con_los_movimientos(db, sku):
+    planta = Planta(nombre="Planta 1", capacidad_semanal=500)
+    db.add(planta)
+    db.commit()
+
+    create_produccion(db, ProduccionCreate(sku_id=sku.id, año_iso=2026, semana_iso=32, kg_verde=10, unidades_producidas=80))
+    asignacion = asignar_sku_planta(db, planta.id, AsignacionPlantaCreate(
+        sku_id=sku.id, participacion=0.5, inventario_inicial=30, fecha_inventario=date(2026, 8, 10)
+    ))
+
+    # Ventas y producción después del conteo, antes del inicio del plan
+    create_venta(db, VentaCreate(sku_id=sku.id, fecha=date(2026, 8, 12), unidades=30))
+    create_produccion(db, ProduccionCreate(sku_id=sku.id, año_iso=2026, semana_iso=34, kg_verde=2, unidades_producidas=10))
+    # Movimiento posterior al inicio del plan: no cuenta
+    create_venta(db, VentaCreate(sku_id=sku.id, fecha=date(2026, 9, 2), unidades=5))
+
+    movimientos = movimientos_desde_conteo(db, [asignacion], SEMANA_PLAN)
+    assert movimientos == {asignacion.id: -20}
+
+    (datos_planta, filas), = particionar_datos(datos_mps([sku.id], [60]), [planta], [asignacion], movimientos)
+    assert datos_planta["inventario_inicial"].tolist() == [20]
+
+def test_sin_conteo_se_usa_la_fraccion_del_libro(db, sku):
+    planta = Planta(nombre="Planta 1", capacidad_semanal=500)
+    db.add(planta)
+    db.commit()
+    asignacion = asignar_sku_planta(db, planta.id, AsignacionPlantaCreate(sku_id=sku.id, participacion=0.25))
+
+    assert asignacion.fecha_inventario is None
+    assert movimientos_desde_conteo(db, [asignacion], SEMANA_PLAN) == {}
+
+    (datos_planta, _), = particionar_datos(datos_mps([sku.id], [60]), [planta], [asignacion])
+    assert datos_planta["inventario_inicial"].tolist() == [15]